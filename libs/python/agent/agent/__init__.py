@@ -2,19 +2,33 @@
 agent - Decorator-based Computer Use Agent with liteLLM integration
 """
 
+import importlib
 import logging
 import sys
 
 from .decorators import register_agent
-from .agent import ComputerAgent
-from .types import Messages, AgentResponse
 
-# Import loops to register them
-from . import loops
+# These pull in litellm (and through it OpenAI types), so they are imported on
+# first access. Agent loops are imported by the registry once a model needs them.
+_LAZY_IMPORTS = {
+    "ComputerAgent": ".agent",
+    "AgentPool": ".pool",
+    "Messages": ".types",
+    "AgentResponse": ".types",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     "register_agent",
     "ComputerAgent",
+    "AgentPool",
     "Messages",
     "AgentResponse"
 ]
@@ -0,0 +1,149 @@
+"""
+Micro-batching scheduler for local model adapters.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+@dataclass
+class _PendingRequest:
+    request: Any
+    future: Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class MicroBatcher:
+    """
+    Gathers requests that arrive within a short time window and runs them as a
+    single batch.
+
+    Requests are grouped by key (e.g. the model name). A batch for a key is
+    dispatched as soon as it holds ``max_batch_size`` requests or its oldest
+    request has waited ``max_wait`` seconds. At most one batch per key runs at
+    a time; requests that arrive while a batch is running are collected into
+    the next one. Batches for different keys run concurrently on up to
+    ``max_workers`` threads.
+
+    The dispatcher thread runs only while requests are pending or running and
+    is started again by the next ``submit``. ``close`` stops it for good.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[Hashable, List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait: float = 0.01,
+        max_workers: int = 1,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            batch_fn: Function called as ``batch_fn(key, requests)`` that must return
+                      one result per request, in order
+            max_batch_size: Maximum number of requests per batch
+            max_wait: Maximum time in seconds a request waits for others to join its batch
+            max_workers: Maximum number of batches executing concurrently
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._pending: Dict[Hashable, List[_PendingRequest]] = {}
+        self._busy: set = set()
+        self._cond = threading.Condition()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, key: Hashable, request: Any) -> Future:
+        """
+        Queue a request.
+
+        Returns:
+            Future resolved with the request's result once its batch completes
+
+        Raises:
+            RuntimeError: If the batcher is closed
+        """
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.setdefault(key, []).append(_PendingRequest(request, future))
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_loop, name="micro-batcher", daemon=True
+                )
+                self._dispatcher.start()
+            self._cond.notify()
+        return future
+
+    def close(self) -> None:
+        """Fail requests that haven't been dispatched and stop the threads, after running batches finish."""
+        with self._cond:
+            self._closed = True
+            pending, self._pending = self._pending, {}
+            dispatcher = self._dispatcher
+            self._cond.notify_all()
+        for items in pending.values():
+            for item in items:
+                item.future.set_exception(RuntimeError("MicroBatcher is closed"))
+        if dispatcher is not None:
+            dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+    def _dispatch_loop(self) -> None:
+        with self._cond:
+            while not self._closed and (self._pending or self._busy):
+                timeout = self._dispatch_ready()
+                self._cond.wait(timeout)
+            # Idle or closed; submit starts a new dispatcher when needed
+            self._dispatcher = None
+
+    def _dispatch_ready(self) -> float | None:
+        """Dispatch every ready batch. Returns how long to wait for the next one."""
+        now = time.monotonic()
+        next_deadline = None
+        for key in list(self._pending):
+            pending = self._pending[key]
+            if key in self._busy:
+                continue
+            deadline = pending[0].enqueued_at + self.max_wait
+            if len(pending) < self.max_batch_size and deadline > now:
+                next_deadline = deadline if next_deadline is None else min(next_deadline, deadline)
+                continue
+
+            batch = pending[: self.max_batch_size]
+            remaining = pending[self.max_batch_size :]
+            if remaining:
+                self._pending[key] = remaining
+            else:
+                del self._pending[key]
+            self._busy.add(key)
+            self._executor.submit(self._run_batch, key, batch)
+
+        return None if next_deadline is None else max(next_deadline - now, 0)
+
+    def _run_batch(self, key: Hashable, batch: List[_PendingRequest]) -> None:
+        try:
+            results = self.batch_fn(key, [item.request for item in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"Batch function returned {len(results)} results for {len(batch)} requests"
+                )
+            for item, result in zip(batch, results, strict=True):
+                item.future.set_result(result)
+        except BaseException as e:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+        finally:
+            with self._cond:
+                self._busy.discard(key)
+                self._cond.notify()
@@ -1,36 +1,138 @@
 import asyncio
-import functools
+import importlib.util
+import threading
+import time
 import warnings
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 from typing import Iterator, AsyncIterator, Dict, List, Any, Optional
 from litellm.types.utils import GenericStreamingChunk, ModelResponse
 from litellm.llms.custom_llm import CustomLLM
 from litellm import completion, acompletion
 
-# Try to import HuggingFace dependencies
-try:
+from .batching import MicroBatcher
+from .prefix_cache import PrefixCache
+
+# torch and transformers take seconds to import, so they are only checked for
+# here and imported on first use
+HF_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("torch", "transformers"))
+
+
+def _hf():
+    """Import the HuggingFace dependencies.
+
+    Returns:
+        Tuple of the torch and transformers modules
+    """
     import torch
-    from transformers import AutoModelForImageTextToText, AutoProcessor
-    HF_AVAILABLE = True
-except ImportError:
-    HF_AVAILABLE = False
+    import transformers
+    return torch, transformers
+
+
+class _FirstTokenTimer:
+    """Logits processor that records when the first token is sampled, i.e. when prefill ends."""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.prefill_seconds = 0.0
+        self._seen = False
+    
+    def __call__(self, input_ids, scores):
+        if not self._seen:
+            self._seen = True
+            self.prefill_seconds = time.perf_counter() - self.start
+        return scores
+
+
+def _image_token_id(processor) -> Optional[int]:
+    """Return the id of the image placeholder token, if the processor has one."""
+    token_id = getattr(processor, "image_token_id", None)
+    if token_id is None and getattr(processor, "image_token", None):
+        tokenizer = getattr(processor, "tokenizer", processor)
+        token_id = tokenizer.convert_tokens_to_ids(processor.image_token)
+    return token_id
+
+
+def _capture_model_state(model) -> Dict[str, Any]:
+    """Capture per-sequence state some models keep between forward passes (e.g. mRoPE deltas)."""
+    return {
+        owner: getattr(target, "rope_deltas")
+        for owner, target in (("model", model), ("inner", getattr(model, "model", None)))
+        if target is not None and getattr(target, "rope_deltas", None) is not None
+    }
+
+
+def _restore_model_state(model, state: Dict[str, Any]) -> None:
+    """Restore state captured by _capture_model_state."""
+    targets = {"model": model, "inner": getattr(model, "model", None)}
+    for owner, rope_deltas in state.items():
+        if targets.get(owner) is not None:
+            targets[owner].rope_deltas = rope_deltas
 
 
 class HuggingFaceLocalAdapter(CustomLLM):
-    """HuggingFace Local Adapter for running vision-language models locally."""
+    """HuggingFace Local Adapter for running vision-language models locally.
+    
+    Concurrent requests for the same model are micro-batched: requests arriving
+    within ``max_batch_wait`` seconds of each other are padded and run through a
+    single ``model.generate`` call, then split back per request.
+    
+    With ``prefix_cache=True``, requests generated on their own reuse the KV
+    cache of the previous step of the same conversation, so only the new suffix
+    of the prompt is prefilled. Per-step prefill timings are kept in
+    ``prefill_stats``. The cache is off by default:
+
+    - Cached KV tensors stay on the model's device, so they take up to
+      ``prefix_cache_max_bytes`` of GPU memory on top of the model.
+    - Image inputs are only read during a full prefill, so a step whose new
+      suffix contains a screenshot reuses nothing. Agent loops that send a new
+      screenshot every step only benefit on steps that add text alone.
+    """
     
-    def __init__(self, device: str = "auto", **kwargs):
+    def __init__(
+        self,
+        device: str = "auto",
+        max_batch_size: int = 8,
+        max_batch_wait: float = 0.01,
+        max_workers: int = 1,
+        prefix_cache: bool = False,
+        prefix_cache_max_sessions: int = 8,
+        prefix_cache_max_bytes: int = 2 << 30,
+        **kwargs
+    ):
         """Initialize the adapter.
         
         Args:
             device: Device to load model on ("auto", "cuda", "cpu", etc.)
+            max_batch_size: Maximum number of requests combined into one generate call
+            max_batch_wait: Maximum time in seconds a request waits for others to batch with
+            max_workers: Maximum number of batches (for different models) generating concurrently
+            prefix_cache: If True, keep per-conversation KV caches between steps (see above)
+            prefix_cache_max_sessions: Maximum number of conversations kept in the prefix cache (LRU)
+            prefix_cache_max_bytes: Memory cap in bytes for all cached KV tensors
             **kwargs: Additional arguments
         """
         super().__init__()
         self.device = device
         self.models = {}  # Cache for loaded models
         self.processors = {}  # Cache for loaded processors
-        self._executor = ThreadPoolExecutor(max_workers=1)  # Single thread pool
+        self._load_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self.prefix_cache = PrefixCache(
+            max_entries=prefix_cache_max_sessions,
+            max_bytes=prefix_cache_max_bytes,
+        ) if prefix_cache else None
+        self.prefill_stats: deque = deque(maxlen=256)
+        self._prefill_seconds_per_token: Dict[str, float] = {}
+        self._batcher = MicroBatcher(
+            self._generate_batch,
+            max_batch_size=max_batch_size,
+            max_wait=max_batch_wait,
+            max_workers=max_workers,
+        )
+    
+    def close(self) -> None:
+        """Stop the batching threads. Requests still waiting for a batch fail."""
+        self._batcher.close()
         
     def _load_model_and_processor(self, model_name: str):
         """Load model and processor if not already cached.
@@ -41,26 +143,32 @@ class HuggingFaceLocalAdapter(CustomLLM):
         Returns:
             Tuple of (model, processor)
         """
-        if model_name not in self.models:
-            # Load model
-            model = AutoModelForImageTextToText.from_pretrained(
-                model_name,
-                torch_dtype=torch.float16,
-                device_map=self.device,
-                attn_implementation="sdpa"
-            )
-            
-            # Load processor
-            processor = AutoProcessor.from_pretrained(
-                model_name,
-                min_pixels=3136,
-                max_pixels=4096 * 2160,
-                device_map=self.device
-            )
-            
-            # Cache them
-            self.models[model_name] = model
-            self.processors[model_name] = processor
+        with self._load_lock:
+            if model_name not in self.models:
+                torch, transformers = _hf()
+                # Load model
+                model = transformers.AutoModelForImageTextToText.from_pretrained(
+                    model_name,
+                    torch_dtype=torch.float32 if self.device == "cpu" else torch.float16,
+                    device_map=self.device,
+                    attn_implementation="sdpa"
+                )
+                
+                # Load processor
+                processor = transformers.AutoProcessor.from_pretrained(
+                    model_name,
+                    min_pixels=3136,
+                    max_pixels=4096 * 2160,
+                    device_map=self.device
+                )
+                
+                # Batched generation needs left padding so prompts end where generation starts
+                tokenizer = getattr(processor, "tokenizer", processor)
+                tokenizer.padding_side = "left"
+                
+                # Cache them
+                self.models[model_name] = model
+                self.processors[model_name] = processor
             
         return self.models[model_name], self.processors[model_name]
     
@@ -108,14 +216,14 @@ class HuggingFaceLocalAdapter(CustomLLM):
             
         return converted_messages
     
-    def _generate(self, **kwargs) -> str:
-        """Generate response using the local HuggingFace model.
+    def _prepare_request(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the generation request from litellm kwargs.
         
         Args:
-            **kwargs: Keyword arguments containing messages and model info
+            kwargs: Keyword arguments containing messages and model info
             
         Returns:
-            Generated text response
+            Dict with model name, HuggingFace messages and max_new_tokens
         """
         if not HF_AVAILABLE:
             raise ImportError(
@@ -123,51 +231,181 @@ class HuggingFaceLocalAdapter(CustomLLM):
                 "Please install with: pip install \"cua-agent[uitars-hf]\""
             )
         
-        # Extract messages and model from kwargs
-        messages = kwargs.get('messages', [])
-        model_name = kwargs.get('model', 'ByteDance-Seed/UI-TARS-1.5-7B')
-        max_new_tokens = kwargs.get('max_tokens', 128)
-        
         # Warn about ignored kwargs
         ignored_kwargs = set(kwargs.keys()) - {'messages', 'model', 'max_tokens'}
         if ignored_kwargs:
-            warnings.warn(f"Ignoring unsupported kwargs: {ignored_kwargs}")
+            warnings.warn(f"Ignoring unsupported kwargs: {ignored_kwargs}", stacklevel=2)
+        
+        return {
+            "model": kwargs.get('model', 'ByteDance-Seed/UI-TARS-1.5-7B'),
+            "messages": self._convert_messages(kwargs.get('messages', [])),
+            "max_new_tokens": kwargs.get('max_tokens', 128),
+        }
+    
+    def _generate_batch(self, model_name: str, requests: List[Dict[str, Any]]) -> List[str]:
+        """Generate responses for a batch of requests to the same model.
         
+        Args:
+            model_name: Name of the model shared by all requests
+            requests: Requests as returned by _prepare_request
+            
+        Returns:
+            Generated text for each request, in order
+        """
         # Load model and processor
         model, processor = self._load_model_and_processor(model_name)
         
-        # Convert messages to HuggingFace format
-        hf_messages = self._convert_messages(messages)
+        if len(requests) == 1 and self.prefix_cache is not None:
+            return [self._run_generate_cached(model_name, model, processor, requests[0])]
         
+        if len(requests) > 1:
+            try:
+                return self._run_generate(model, processor, requests)
+            except Exception as e:
+                # Some processors/models can't pad mixed image inputs; fall back to one by one
+                warnings.warn(f"Batched generation failed, falling back to sequential: {e}", stacklevel=2)
+                return [self._run_generate(model, processor, [request])[0] for request in requests]
+        
+        return self._run_generate(model, processor, requests)
+    
+    def _run_generate(self, model, processor, requests: List[Dict[str, Any]]) -> List[str]:
+        """Run a single (padded) generate call over one or more requests."""
         # Apply chat template and tokenize
         inputs = processor.apply_chat_template(
-            hf_messages,
+            [request["messages"] for request in requests] if len(requests) > 1 else requests[0]["messages"],
             add_generation_prompt=True,
             tokenize=True,
             return_dict=True,
-            return_tensors="pt"
+            return_tensors="pt",
+            padding=len(requests) > 1,
         )
         
         # Move inputs to the same device as model
         inputs = inputs.to(model.device)
         
-        # Generate response
+        # Generate response, long enough for the most demanding request in the batch
+        max_new_tokens = max(request["max_new_tokens"] for request in requests)
+        torch, _ = _hf()
         with torch.no_grad():
             generated_ids = model.generate(**inputs, max_new_tokens=max_new_tokens)
             
-        # Trim input tokens from output
+        # Trim input tokens (including left padding) and cap each output at its own limit
         generated_ids_trimmed = [
-            out_ids[len(in_ids):] for in_ids, out_ids in zip(inputs.input_ids, generated_ids)
+            out_ids[len(in_ids):len(in_ids) + request["max_new_tokens"]]
+            for in_ids, out_ids, request in zip(inputs.input_ids, generated_ids, requests, strict=True)
         ]
         
         # Decode output
-        output_text = processor.batch_decode(
+        return processor.batch_decode(
             generated_ids_trimmed, 
             skip_special_tokens=True, 
             clean_up_tokenization_spaces=False
         )
+    
+    def _run_generate_cached(self, model_name: str, model, processor, request: Dict[str, Any]) -> str:
+        """Run generate for a single request, reusing the conversation's KV prefix cache."""
+        inputs = processor.apply_chat_template(
+            request["messages"],
+            add_generation_prompt=True,
+            tokenize=True,
+            return_dict=True,
+            return_tensors="pt",
+        ).to(model.device)
+        input_ids = inputs.input_ids[0]
+        
+        with self._cache_lock:
+            entry, shared = self.prefix_cache.take(model_name, input_ids)
+        
+        # At least one token must be prefilled, and pixel values are only consumed
+        # during a full prefill, so a suffix carrying new image tokens can't reuse the cache
+        reuse = min(shared, len(input_ids) - 1)
+        image_token_id = _image_token_id(processor)
+        if entry and image_token_id is not None and (input_ids[reuse:] == image_token_id).any():
+            reuse = 0
+        
+        generate_kwargs: Dict[str, Any] = {}
+        if entry and reuse > 0:
+            entry.cache.crop(reuse)
+            generate_kwargs["past_key_values"] = entry.cache
+            _restore_model_state(model, entry.state)
+        else:
+            reuse = 0
+        
+        torch, transformers = _hf()
+        timer = _FirstTokenTimer()
+        try:
+            with torch.no_grad():
+                outputs = model.generate(
+                    **inputs,
+                    max_new_tokens=request["max_new_tokens"],
+                    logits_processor=transformers.LogitsProcessorList([timer]),
+                    return_dict_in_generate=True,
+                    use_cache=True,
+                    **generate_kwargs,
+                )
+        except Exception as e:
+            if not reuse:
+                raise
+            warnings.warn(f"Generation with cached prefix failed, retrying without cache: {e}", stacklevel=2)
+            return self._run_generate(model, processor, [request])[0]
+        
+        self._record_prefill(model_name, len(input_ids), reuse, timer.prefill_seconds)
+        
+        # Keep the extended cache for the conversation's next step
+        sequence = outputs.sequences[0]
+        cache = getattr(outputs, "past_key_values", None)
+        if cache is not None and hasattr(cache, "crop"):
+            with self._cache_lock:
+                self.prefix_cache.put(
+                    model_name,
+                    sequence[:cache.get_seq_length()],
+                    cache,
+                    _capture_model_state(model),
+                )
+        
+        return processor.batch_decode(
+            [sequence[len(input_ids):]],
+            skip_special_tokens=True,
+            clean_up_tokenization_spaces=False
+        )[0]
+    
+    def _record_prefill(self, model_name: str, prompt_tokens: int, cached_tokens: int, prefill_seconds: float) -> None:
+        """Record prefill timing for a step and estimate the time saved by the prefix cache."""
+        prefilled = prompt_tokens - cached_tokens
+        seconds_per_token = self._prefill_seconds_per_token.get(model_name)
+        if cached_tokens == 0 and prefilled > 0:
+            # Full prefills calibrate the per-token cost (exponential moving average)
+            sample = prefill_seconds / prefilled
+            seconds_per_token = sample if seconds_per_token is None else 0.8 * seconds_per_token + 0.2 * sample
+            self._prefill_seconds_per_token[model_name] = seconds_per_token
+        
+        self.prefill_stats.append({
+            "model": model_name,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "prefill_seconds": prefill_seconds,
+            "estimated_seconds_saved": cached_tokens * seconds_per_token if seconds_per_token else None,
+        })
+    
+    def _generate(self, **kwargs) -> str:
+        """Generate response using the local HuggingFace model.
         
-        return output_text[0] if output_text else ""
+        Blocks until the batch containing this request has been generated.
+        
+        Args:
+            **kwargs: Keyword arguments containing messages and model info
+            
+        Returns:
+            Generated text response
+        """
+        request = self._prepare_request(kwargs)
+        return self._batcher.submit(request["model"], request).result() or ""
+    
+    async def _agenerate(self, **kwargs) -> str:
+        """Asynchronous version of _generate that doesn't block the event loop."""
+        request = self._prepare_request(kwargs)
+        future = self._batcher.submit(request["model"], request)
+        return await asyncio.wrap_future(future) or ""
     
     def completion(self, *args, **kwargs) -> ModelResponse:
         """Synchronous completion method.
@@ -188,12 +426,8 @@ class HuggingFaceLocalAdapter(CustomLLM):
         Returns:
             ModelResponse with generated text
         """
-        # Run _generate in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        generated_text = await loop.run_in_executor(
-            self._executor, 
-            functools.partial(self._generate, **kwargs)
-        )
+        # Queue the request for batched generation without blocking
+        generated_text = await self._agenerate(**kwargs)
         
         return await acompletion(
             model=f"huggingface-local/{kwargs['model']}",
@@ -225,12 +459,8 @@ class HuggingFaceLocalAdapter(CustomLLM):
         Returns:
             AsyncIterator of GenericStreamingChunk
         """
-        # Run _generate in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        generated_text = await loop.run_in_executor(
-            self._executor, 
-            functools.partial(self._generate, **kwargs)
-        )
+        # Queue the request for batched generation without blocking
+        generated_text = await self._agenerate(**kwargs)
         
         generic_streaming_chunk: GenericStreamingChunk = {
             "finish_reason": "stop",
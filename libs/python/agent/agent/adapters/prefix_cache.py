@@ -0,0 +1,119 @@
+"""
+Prompt/KV prefix cache for local model adapters.
+
+Successive agent steps resend almost the whole conversation. Keeping the KV
+cache of the previous step lets the next step prefill only the new suffix.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+def cache_nbytes(cache: Any) -> int:
+    """Estimate the memory used by a transformers KV cache object."""
+    tensors = []
+    if hasattr(cache, "layers"):
+        for layer in cache.layers:
+            tensors += [getattr(layer, "keys", None), getattr(layer, "values", None)]
+    elif hasattr(cache, "key_cache"):
+        tensors = list(cache.key_cache) + list(cache.value_cache)
+    return sum(t.numel() * t.element_size() for t in tensors if t is not None)
+
+
+@dataclass
+class PrefixCacheEntry:
+    """KV cache covering ``token_ids`` for one conversation."""
+    model_name: str
+    token_ids: Any  # 1-D tensor on CPU
+    cache: Any
+    state: Dict[str, Any]
+    nbytes: int
+
+
+class PrefixCache:
+    """
+    LRU store of KV caches keyed by the token prefix they cover.
+
+    There is no explicit session id in a completion request, so a session is
+    identified by its prompt: a new request picks the entry sharing the
+    longest token prefix with it. The entry is handed out (removed) and the
+    caller stores the extended cache afterwards, so each conversation keeps a
+    single, moving entry. Entries are evicted least-recently-used first when
+    ``max_entries`` or ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, max_entries: int = 8, max_bytes: int = 2 << 30, min_reuse_ratio: float = 0.5):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached conversations
+            max_bytes: Maximum total size of cached KV tensors
+            min_reuse_ratio: Minimum fraction of an entry that must match a new prompt
+                             for the entry to be reused. Prevents a new conversation from
+                             taking over another one's cache because of a shared system prompt.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.min_reuse_ratio = min_reuse_ratio
+        self._entries: "OrderedDict[int, PrefixCacheEntry]" = OrderedDict()
+        self._next_key = 0
+        self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def take(self, model_name: str, token_ids: Any) -> Tuple[Optional[PrefixCacheEntry], int]:
+        """
+        Remove and return the entry sharing the longest prefix with ``token_ids``.
+
+        Returns:
+            Tuple of (entry or None, number of leading tokens shared with the entry)
+        """
+        best_key, best_len = None, 0
+        for key, entry in self._entries.items():
+            if entry.model_name != model_name:
+                continue
+            shared = _common_prefix_length(entry.token_ids, token_ids)
+            if shared > best_len and shared >= self.min_reuse_ratio * len(entry.token_ids):
+                best_key, best_len = key, shared
+
+        if best_key is None:
+            return None, 0
+        entry = self._entries.pop(best_key)
+        self.total_bytes -= entry.nbytes
+        return entry, best_len
+
+    def put(self, model_name: str, token_ids: Any, cache: Any, state: Optional[Dict[str, Any]] = None) -> None:
+        """Store the KV cache covering ``token_ids``, evicting old entries if needed."""
+        entry = PrefixCacheEntry(
+            model_name=model_name,
+            token_ids=token_ids.detach().cpu(),
+            cache=cache,
+            state=state or {},
+            nbytes=cache_nbytes(cache),
+        )
+        if entry.nbytes > self.max_bytes:
+            return
+        self._entries[self._next_key] = entry
+        self._next_key += 1
+        self.total_bytes += entry.nbytes
+
+        while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._entries.clear()
+        self.total_bytes = 0
+
+
+def _common_prefix_length(a: Any, b: Any) -> int:
+    """Length of the shared prefix of two 1-D token id tensors."""
+    n = min(len(a), len(b))
+    if n == 0:
+        return 0
+    mismatch = (a[:n].to(b.device) != b[:n]).nonzero()
+    return int(mismatch[0]) if len(mismatch) else n
@@ -3,9 +3,11 @@ ComputerAgent - Main agent class that selects and runs agent loops
 """
 
 import asyncio
+from contextlib import aclosing
 from typing import Dict, List, Any, Optional, AsyncGenerator, Union, cast, Callable, Set, Tuple
 
 from litellm.responses.utils import Usage
+from core.tracing import KIND, KIND_MODEL, get_tracer
 
 from .types import Messages, AgentCapability
 from .decorators import find_agent_config
@@ -29,6 +31,7 @@ from .computers import (
     is_agent_computer,
     make_computer_handler
 )
+from .computers.screenshot_reuse import ScreenshotReusingHandler
 
 def get_json(obj: Any, max_depth: int = 10) -> Any:
     def custom_serializer(o: Any, depth: int = 0, seen: Optional[Set[int]] = None) -> Any:
@@ -124,6 +127,32 @@ def sanitize_message(msg: Any) -> Any:
             return sanitized
     return msg
 
+_hf_adapter: Optional[HuggingFaceLocalAdapter] = None
+_hf_adapter_options: Dict[str, Any] = {}
+
+def get_huggingface_local_adapter(options: Optional[Dict[str, Any]] = None) -> HuggingFaceLocalAdapter:
+    """Return the process-wide HuggingFaceLocalAdapter, creating it on first use.
+
+    Args:
+        options: HuggingFaceLocalAdapter arguments, such as max_batch_size, max_batch_wait
+                 or prefix_cache. They are fixed once the adapter exists, because every
+                 agent in the process shares its loaded models and batches.
+
+    Raises:
+        ValueError: If the adapter already exists with different options
+    """
+    global _hf_adapter, _hf_adapter_options
+    options = options or {}
+    if _hf_adapter is None:
+        _hf_adapter = HuggingFaceLocalAdapter(**{"device": "auto", **options})
+        _hf_adapter_options = dict(options)
+    elif options and options != _hf_adapter_options:
+        raise ValueError(
+            f"The HuggingFace local adapter was already created with {_hf_adapter_options}, "
+            f"its options can't change to {options}"
+        )
+    return _hf_adapter
+
 def get_output_call_ids(messages: List[Dict[str, Any]]) -> List[str]:
     call_ids = []
     for message in messages:
@@ -148,9 +177,11 @@ class ComputerAgent:
         trajectory_dir: Optional[str] = None,
         max_retries: Optional[int] = 3,
         screenshot_delay: Optional[float | int] = 0.5,
+        screenshot_stable_ms: Optional[int] = None,
         use_prompt_caching: Optional[bool] = False,
         max_trajectory_budget: Optional[float | dict] = None,
         telemetry_enabled: Optional[bool] = True,
+        huggingface_local_options: Optional[Dict[str, Any]] = None,
         **kwargs
     ):
         """
@@ -166,9 +197,11 @@ class ComputerAgent:
             trajectory_dir: If set, saves trajectory data (screenshots, responses) to this directory. Adds TrajectorySaverCallback automatically.
             max_retries: Maximum number of retries for failed API calls
             screenshot_delay: Delay before screenshots in seconds
+            screenshot_stable_ms: If set, wait for the screen to settle instead of sleeping for screenshot_delay: the screenshot is taken once the frame is unchanged for this many milliseconds, waiting at most screenshot_delay seconds.
             use_prompt_caching: If set, use prompt caching to avoid reprocessing the same prompt. Intended for use with anthropic providers.
             max_trajectory_budget: If set, adds BudgetManagerCallback to track usage costs and stop when budget is exceeded
             telemetry_enabled: If set, adds TelemetryCallback to track anonymized usage data. Enabled by default.
+            huggingface_local_options: Options of the HuggingFaceLocalAdapter that runs huggingface-local/ models, e.g. {"max_batch_size": 4, "max_batch_wait": 0.05}. The adapter is shared by every agent in the process, so only the first agent to create it can set them; other agents must pass the same options or none.
             **kwargs: Additional arguments passed to the agent loop
         """
         self.model = model
@@ -180,6 +213,7 @@ class ComputerAgent:
         self.trajectory_dir = trajectory_dir
         self.max_retries = max_retries
         self.screenshot_delay = screenshot_delay
+        self.screenshot_stable_ms = screenshot_stable_ms
         self.use_prompt_caching = use_prompt_caching
         self.telemetry_enabled = telemetry_enabled
         self.kwargs = kwargs
@@ -215,9 +249,9 @@ class ComputerAgent:
         # == Enable local model providers w/ LiteLLM ==
 
         # Register local model providers
-        hf_adapter = HuggingFaceLocalAdapter(
-            device="auto"
-        )
+        # (the HuggingFace adapter is shared so concurrent agents batch their requests
+        # and reuse loaded models)
+        hf_adapter = get_huggingface_local_adapter(huggingface_local_options)
         human_adapter = HumanAdapter()
         litellm.custom_provider_map = [
             {"provider": "huggingface-local", "custom_handler": hf_adapter},
@@ -241,6 +275,9 @@ class ComputerAgent:
         
         self.tool_schemas = []
         self.computer_handler = None
+
+        # Tracing spans of model calls between _on_api_start and _on_api_end
+        self._api_spans: List[Any] = []
         
     async def _initialize_computers(self):
         """Initialize computer objects"""
@@ -254,7 +291,8 @@ class ComputerAgent:
                 if schema["type"] == "computer":
                     computer_handler = await make_computer_handler(schema["computer"])
                     break
-            self.computer_handler = computer_handler
+            # Share post-action screenshots with loops that take their own when none is in the history
+            self.computer_handler = ScreenshotReusingHandler(computer_handler) if computer_handler else None
     
     def _process_input(self, input: Messages) -> List[Dict[str, Any]]:
         """Process input messages and create schemas for the agent loop"""
@@ -377,12 +415,22 @@ class ComputerAgent:
     
     async def _on_api_start(self, kwargs: Dict[str, Any]) -> None:
         """Called when an LLM API call is about to start."""
+        span = get_tracer().start_span("agent.model_call", attributes={
+            KIND: KIND_MODEL,
+            "cua.model": str(kwargs.get("model")),
+            "cua.max_retries": kwargs.get("num_retries") or 0,
+        })
+        if span.is_recording():
+            span.set_attribute("cua.payload.bytes", len(json.dumps(get_json(kwargs))))
+        self._api_spans.append(span)
         for callback in self.callbacks:
             if hasattr(callback, 'on_api_start'):
                 await callback.on_api_start(get_json(kwargs))
     
     async def _on_api_end(self, kwargs: Dict[str, Any], result: Any) -> None:
         """Called when an LLM API call has completed."""
+        if self._api_spans:
+            self._api_spans.pop().end()
         for callback in self.callbacks:
             if hasattr(callback, 'on_api_end'):
                 await callback.on_api_end(get_json(kwargs), get_json(result))
@@ -404,6 +452,14 @@ class ComputerAgent:
     # ============================================================================
     
     async def _handle_item(self, item: Any, computer: Optional[AsyncComputerHandler] = None, ignore_call_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Handle each item in an ``agent.handle_item`` span; may cause a computer action + screenshot."""
+        attributes = {"cua.item_type": str(item.get("type"))}
+        if item.get("type") == "computer_call":
+            attributes["cua.action"] = str((item.get("action") or {}).get("type"))
+        with get_tracer().start_as_current_span("agent.handle_item", attributes=attributes):
+            return await self._handle_item_impl(item, computer, ignore_call_ids)
+
+    async def _handle_item_impl(self, item: Any, computer: Optional[AsyncComputerHandler] = None, ignore_call_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Handle each item; may cause a computer action + screenshot."""
         if ignore_call_ids and item.get("call_id") and item.get("call_id") in ignore_call_ids:
             return []
@@ -444,10 +500,14 @@ class ComputerAgent:
                 print(f"Unknown computer action: {action_type}")
                 return []
             
-            # Take screenshot after action
-            if self.screenshot_delay and self.screenshot_delay > 0:
-                await asyncio.sleep(self.screenshot_delay)
-            screenshot_base64 = await computer.screenshot()
+            # Take screenshot after action; the same frame is returned again if
+            # the next predict_step asks the computer for a screenshot
+            if isinstance(computer, ScreenshotReusingHandler):
+                screenshot_base64 = await computer.capture_after_action(self.screenshot_delay or 0, self.screenshot_stable_ms)
+            else:
+                if self.screenshot_delay and self.screenshot_delay > 0:
+                    await asyncio.sleep(self.screenshot_delay)
+                screenshot_base64 = await computer.screenshot()
             await self._on_screenshot(screenshot_base64, "screenshot_after")
             
             # Handle safety checks
@@ -533,6 +593,21 @@ class ComputerAgent:
         Returns:
             AsyncGenerator that yields response chunks
         """
+        attributes = {"cua.model": self.model}
+        if self.agent_config_info:
+            attributes["cua.agent_loop"] = self.agent_config_info.agent_class.__name__
+        with get_tracer().start_as_current_span("agent.run", attributes=attributes):
+            async with aclosing(self._run_impl(messages, stream, **kwargs)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+
+    async def _run_impl(
+        self,
+        messages: Messages,
+        stream: bool = False,
+        **kwargs
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Run the agent; see run."""
         if not self.agent_config_info:
             raise ValueError("Agent configuration not found")
         
@@ -556,73 +631,92 @@ class ComputerAgent:
             "agent_loop": self.agent_config_info.agent_class.__name__,
             **merged_kwargs
         }
-        await self._on_run_start(run_kwargs, old_items)
-
-        while new_items[-1].get("role") != "assistant" if new_items else True:
-            # Lifecycle hook: Check if we should continue based on callbacks (e.g., budget manager)
-            should_continue = await self._on_run_continue(run_kwargs, old_items, new_items)
-            if not should_continue:
-                break
-
-            # Lifecycle hook: Prepare messages for the LLM call
-            # Use cases:
-            # - PII anonymization
-            # - Image retention policy
-            combined_messages = old_items + new_items
-            preprocessed_messages = await self._on_llm_start(combined_messages)
+        try:
+            await self._on_run_start(run_kwargs, old_items)
+
+            while new_items[-1].get("role") != "assistant" if new_items else True:
+                # Lifecycle hook: Check if we should continue based on callbacks (e.g., budget manager)
+                should_continue = await self._on_run_continue(run_kwargs, old_items, new_items)
+                if not should_continue:
+                    break
+
+                # Lifecycle hook: Prepare messages for the LLM call
+                # Use cases:
+                # - PII anonymization
+                # - Image retention policy
+                combined_messages = old_items + new_items
+                preprocessed_messages = await self._on_llm_start(combined_messages)
             
-            loop_kwargs = {
-                "messages": preprocessed_messages,
-                "model": self.model,
-                "tools": self.tool_schemas,
-                "stream": False,
-                "computer_handler": self.computer_handler,
-                "max_retries": self.max_retries,
-                "use_prompt_caching": self.use_prompt_caching,
-                **merged_kwargs
-            }
+                loop_kwargs = {
+                    "messages": preprocessed_messages,
+                    "model": self.model,
+                    "tools": self.tool_schemas,
+                    "stream": False,
+                    "computer_handler": self.computer_handler,
+                    "max_retries": self.max_retries,
+                    "use_prompt_caching": self.use_prompt_caching,
+                    **merged_kwargs
+                }
 
-            # Run agent loop iteration
-            result = await self.agent_loop.predict_step(
-                **loop_kwargs,
-                _on_api_start=self._on_api_start,
-                _on_api_end=self._on_api_end,
-                _on_usage=self._on_usage,
-                _on_screenshot=self._on_screenshot,
-            )
-            result = get_json(result)
+                # Run agent loop iteration
+                result = await self._predict_step(loop_kwargs)
             
-            # Lifecycle hook: Postprocess messages after the LLM call
-            # Use cases:
-            # - PII deanonymization (if you want tool calls to see PII)
-            result["output"] = await self._on_llm_end(result.get("output", []))
-            await self._on_responses(loop_kwargs, result)
+                # Lifecycle hook: Postprocess messages after the LLM call
+                # Use cases:
+                # - PII deanonymization (if you want tool calls to see PII)
+                result["output"] = await self._on_llm_end(result.get("output", []))
+                await self._on_responses(loop_kwargs, result)
             
-            # Yield agent response
-            yield result
-
-            # Add agent response to new_items
-            new_items += result.get("output")
-
-            # Get output call ids
-            output_call_ids = get_output_call_ids(result.get("output", []))
-
-            # Handle computer actions
-            for item in result.get("output"):
-                partial_items = await self._handle_item(item, self.computer_handler, ignore_call_ids=output_call_ids)
-                new_items += partial_items
-
-                # Yield partial response
-                yield {
-                    "output": partial_items,
-                    "usage": Usage(
-                        prompt_tokens=0,
-                        completion_tokens=0,
-                        total_tokens=0,
-                    )
-                }
+                # Yield agent response
+                yield result
+
+                # Add agent response to new_items
+                new_items += result.get("output")
+
+                # Get output call ids
+                output_call_ids = get_output_call_ids(result.get("output", []))
+
+                # Handle computer actions
+                for item in result.get("output"):
+                    partial_items = await self._handle_item(item, self.computer_handler, ignore_call_ids=output_call_ids)
+                    new_items += partial_items
+
+                    # Yield partial response
+                    yield {
+                        "output": partial_items,
+                        "usage": Usage(
+                            prompt_tokens=0,
+                            completion_tokens=0,
+                            total_tokens=0,
+                        )
+                    }
+        finally:
+            # Don't hand a frame from this run to a later one, even if it raised
+            if isinstance(self.computer_handler, ScreenshotReusingHandler):
+                self.computer_handler.invalidate()
         
         await self._on_run_end(loop_kwargs, old_items, new_items)
+
+    async def _predict_step(self, loop_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one agent loop iteration in an ``agent.predict_step`` span."""
+        with get_tracer().start_as_current_span(
+            "agent.predict_step", attributes={"cua.messages": len(loop_kwargs["messages"])}
+        ) as span:
+            try:
+                result = await self.agent_loop.predict_step(
+                    **loop_kwargs,
+                    _on_api_start=self._on_api_start,
+                    _on_api_end=self._on_api_end,
+                    _on_usage=self._on_usage,
+                    _on_screenshot=self._on_screenshot,
+                )
+            finally:
+                # Model calls that failed never reached _on_api_end
+                while self._api_spans:
+                    self._api_spans.pop().end()
+            result = get_json(result)
+            span.set_attribute("cua.output_items", len(result.get("output") or []))
+            return result
     
     async def predict_click(
         self,
@@ -2,16 +2,17 @@
 Trajectory saving callback handler for ComputerAgent.
 """
 
-import os
+import asyncio
 import json
 import uuid
 from datetime import datetime
 import base64
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union, override
+from typing import List, Dict, Any, Optional, Union, Callable, Literal, override
 from PIL import Image, ImageDraw
 import io
 from .base import AsyncCallbackHandler
+from .trajectory_writer import FsyncPolicy, ImageBlobStore, TrajectoryWriter
 
 def sanitize_image_urls(data: Any) -> Any:
     """
@@ -51,7 +52,16 @@ class TrajectorySaverCallback(AsyncCallbackHandler):
     within the trajectory gets its own folder with screenshots and responses.
     """
     
-    def __init__(self, trajectory_dir: str, reset_on_run: bool = True):
+    def __init__(
+        self,
+        trajectory_dir: str,
+        reset_on_run: bool = True,
+        background_writes: bool = True,
+        max_queue_size: int = 256,
+        compact_json: bool = False,
+        fsync: FsyncPolicy = "never",
+        format: Literal["dir", "jsonl"] = "dir",
+    ):
         """
         Initialize trajectory saver.
         
@@ -59,7 +69,20 @@ class TrajectorySaverCallback(AsyncCallbackHandler):
             trajectory_dir: Base directory to save trajectories
             reset_on_run: If True, reset trajectory_id/turn/artifact on each run.
                          If False, continue using existing trajectory_id if set.
+            background_writes: If True, write artifacts from a background thread so
+                         agent steps never wait on disk I/O. The thread starts with the
+                         first write and stops once pending writes are flushed at the
+                         end of each run, or on close().
+            max_queue_size: Maximum number of pending writes before callbacks wait
+            compact_json: If True, write JSON without indentation
+            fsync: When to fsync written files - "never", "run_end" or "always"
+            format: "dir" writes one file per artifact in turn folders. "jsonl" appends
+                   every artifact to a single trajectory.jsonl file and stores screenshots
+                   in a shared, content-addressed blob store (identical screenshots are
+                   saved once) - better suited to high-volume runs.
         """
+        if format not in ("dir", "jsonl"):
+            raise ValueError(f"Invalid trajectory format: {format}")
         self.trajectory_dir = Path(trajectory_dir)
         self.trajectory_id: Optional[str] = None
         self.current_turn: int = 0
@@ -67,6 +90,15 @@ class TrajectorySaverCallback(AsyncCallbackHandler):
         self.model: Optional[str] = None
         self.total_usage: Dict[str, Any] = {}
         self.reset_on_run = reset_on_run
+        self.background_writes = background_writes
+        self.format = format
+        self.metadata: Dict[str, Any] = {}
+        self.writer = TrajectoryWriter(
+            max_queue_size=max_queue_size,
+            compact_json=compact_json,
+            fsync=fsync,
+        )
+        self.blob_store = ImageBlobStore(self.trajectory_dir / "blobs")
         
         # Ensure trajectory directory exists
         self.trajectory_dir.mkdir(parents=True, exist_ok=True)
@@ -77,26 +109,62 @@ class TrajectorySaverCallback(AsyncCallbackHandler):
             raise ValueError("Trajectory not initialized - call _on_run_start first")
         
         # format: trajectory_id/turn_000
-        turn_dir = self.trajectory_dir / self.trajectory_id / f"turn_{self.current_turn:03d}"
-        turn_dir.mkdir(parents=True, exist_ok=True)
-        return turn_dir
+        # (created lazily by the writer when the first artifact lands)
+        return self.trajectory_dir / self.trajectory_id / f"turn_{self.current_turn:03d}"
 
-    def _save_artifact(self, name: str, artifact: Union[str, bytes, Dict[str, Any]]) -> None:
+    async def _write(self, job: Callable[[], None]) -> None:
+        """Hand a write job to the writer without blocking the event loop."""
+        if not self.background_writes:
+            job()
+        elif not self.writer.try_submit(job):
+            # Queue is full - wait for room off the event loop
+            await asyncio.to_thread(self.writer.submit, job)
+
+    async def _flush(self) -> None:
+        """Wait for all pending writes to reach the disk and stop the writer thread."""
+        await asyncio.to_thread(self.writer.close)
+
+    def close(self) -> None:
+        """Flush pending writes and stop the writer thread, e.g. after a run that raised."""
+        self.writer.close()
+
+    async def _save_artifact(self, name: str, artifact: Union[str, bytes, Dict[str, Any]]) -> None:
         """Save an artifact to the current turn directory."""
+        if not self.trajectory_id:
+            raise ValueError("Trajectory not initialized - call _on_run_start first")
+
+        # format: 0000_name
+        artifact_filename = f"{self.current_artifact:04d}_{name}"
+        self.current_artifact += 1
+
+        if self.format == "jsonl":
+            record: Dict[str, Any] = {
+                "turn": self.current_turn,
+                "artifact": artifact_filename,
+                "timestamp": str(uuid.uuid1().time),
+            }
+            if isinstance(artifact, bytes):
+                image_ref, blob_job = self.blob_store.put(self.writer, artifact)
+                record["image"] = image_ref
+                if blob_job:
+                    await self._write(blob_job)
+            else:
+                record["data"] = sanitize_image_urls(artifact)
+            # Records are single lines, so always serialize compactly
+            line = json.dumps(record, separators=(",", ":"))
+            path = self.trajectory_dir / self.trajectory_id / "trajectory.jsonl"
+            await self._write(self.writer.append_line(path, line))
+            return
+
         turn_dir = self._get_turn_dir()
         if isinstance(artifact, bytes):
             # format: turn_000/0000_name.png
-            artifact_filename = f"{self.current_artifact:04d}_{name}"
-            artifact_path = turn_dir / f"{artifact_filename}.png"
-            with open(artifact_path, "wb") as f:
-                f.write(artifact)
+            await self._write(self.writer.write_bytes(turn_dir / f"{artifact_filename}.png", artifact))
         else:
             # format: turn_000/0000_name.json
-            artifact_filename = f"{self.current_artifact:04d}_{name}"
-            artifact_path = turn_dir / f"{artifact_filename}.json"
-            with open(artifact_path, "w") as f:
-                json.dump(sanitize_image_urls(artifact), f, indent=2)
-        self.current_artifact += 1
+            await self._write(
+                self.writer.write_json(turn_dir / f"{artifact_filename}.json", sanitize_image_urls(artifact))
+            )
 
     def _update_usage(self, usage: Dict[str, Any]) -> None:
         """Update total usage statistics."""
@@ -131,20 +199,18 @@ class TrajectorySaverCallback(AsyncCallbackHandler):
             self.model = model
             self.total_usage = {}
             
-            # Create trajectory directory
-            trajectory_path = self.trajectory_dir / self.trajectory_id
-            trajectory_path.mkdir(parents=True, exist_ok=True)
-            
-            # Save trajectory metadata
-            metadata = {
+            # Save trajectory metadata (kept in memory and rewritten on run end,
+            # so the file never has to be read back)
+            self.metadata = {
                 "trajectory_id": self.trajectory_id,
                 "created_at": str(uuid.uuid1().time),
                 "status": "running",
+                "format": self.format,
                 "kwargs": kwargs,
             }
-            
-            with open(trajectory_path / "metadata.json", "w") as f:
-                json.dump(metadata, f, indent=2)
+            metadata_path = self.trajectory_dir / self.trajectory_id / "metadata.json"
+            # kwargs reference live objects, so serialize them right away
+            await self._write(self.writer.write_text(metadata_path, self.writer.dumps(self.metadata)))
         else:
             # Continue with existing trajectory - just update model if needed
             self.model = model
@@ -156,18 +222,8 @@ class TrajectorySaverCallback(AsyncCallbackHandler):
             return
         
         # Update metadata with completion status, total usage, and new items
-        trajectory_path = self.trajectory_dir / self.trajectory_id
-        metadata_path = trajectory_path / "metadata.json"
-        
-        # Read existing metadata
-        if metadata_path.exists():
-            with open(metadata_path, "r") as f:
-                metadata = json.load(f)
-        else:
-            metadata = {}
-        
-        # Update metadata with completion info
-        metadata.update({
+        metadata_path = self.trajectory_dir / self.trajectory_id / "metadata.json"
+        self.metadata.update({
             "status": "completed",
             "completed_at": str(uuid.uuid1().time),
             "total_usage": self.total_usage,
@@ -175,16 +231,16 @@ class TrajectorySaverCallback(AsyncCallbackHandler):
             "total_turns": self.current_turn
         })
         
-        # Save updated metadata
-        with open(metadata_path, "w") as f:
-            json.dump(metadata, f, indent=2)
+        # Save updated metadata and wait for the trajectory to be fully written
+        await self._write(self.writer.write_json(metadata_path, dict(self.metadata)))
+        await self._flush()
     
     @override 
     async def on_api_start(self, kwargs: Dict[str, Any]) -> None:
         if not self.trajectory_id:
             return
         
-        self._save_artifact("api_start", { "kwargs": kwargs })
+        await self._save_artifact("api_start", { "kwargs": kwargs })
     
     @override
     async def on_api_end(self, kwargs: Dict[str, Any], result: Any) -> None:
@@ -192,14 +248,14 @@ class TrajectorySaverCallback(AsyncCallbackHandler):
         if not self.trajectory_id:
             return
         
-        self._save_artifact("api_result", { "kwargs": kwargs, "result": result })
+        await self._save_artifact("api_result", { "kwargs": kwargs, "result": result })
 
     @override
     async def on_screenshot(self, screenshot: Union[str, bytes], name: str = "screenshot") -> None:
         """Save a screenshot."""
         if isinstance(screenshot, str):
             screenshot = base64.b64decode(screenshot)
-        self._save_artifact(name, screenshot)
+        await self._save_artifact(name, screenshot)
 
     @override
     async def on_usage(self, usage: Dict[str, Any]) -> None:
@@ -213,7 +269,6 @@ class TrajectorySaverCallback(AsyncCallbackHandler):
             return
         
         # Save responses
-        turn_dir = self._get_turn_dir()
         response_data = {
             "timestamp": str(uuid.uuid1().time),
             "model": self.model,
@@ -221,7 +276,7 @@ class TrajectorySaverCallback(AsyncCallbackHandler):
             "response": responses
         }
         
-        self._save_artifact("agent_response", response_data)
+        await self._save_artifact("agent_response", response_data)
         
         # Increment turn counter
         self.current_turn += 1
@@ -270,7 +325,7 @@ class TrajectorySaverCallback(AsyncCallbackHandler):
         if not self.trajectory_id:
             return
         
-        self._save_artifact("computer_call_result", { "item": item, "result": result })
+        await self._save_artifact("computer_call_result", { "item": item, "result": result })
         
         # Check if action has x/y coordinates and there's a screenshot in the result
         action = item.get("action", {})
@@ -295,14 +350,15 @@ class TrajectorySaverCallback(AsyncCallbackHandler):
                         image_bytes = base64.b64decode(base64_data)
                         
                         # Draw crosshair at the action coordinates
-                        annotated_image = self._draw_crosshair_on_image(
+                        annotated_image = await asyncio.to_thread(
+                            self._draw_crosshair_on_image,
                             image_bytes, 
                             int(action["x"]), 
                             int(action["y"])
                         )
                         
                         # Save as screenshot_action
-                        self._save_artifact("screenshot_action", annotated_image)
+                        await self._save_artifact("screenshot_action", annotated_image)
                         
                     except Exception as e:
                         # If annotation fails, just log and continue
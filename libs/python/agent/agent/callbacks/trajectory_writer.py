@@ -0,0 +1,228 @@
+"""
+Background writers used by TrajectorySaverCallback.
+
+Disk writes are handed to a dedicated thread through a bounded queue so that
+saving a trajectory never adds file system latency to an agent step.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, Literal, Optional, Set, Tuple
+
+FsyncPolicy = Literal["never", "run_end", "always"]
+
+_STOP = object()
+
+
+class TrajectoryWriter:
+    """
+    Writes trajectory artifacts from a background thread.
+
+    Jobs are queued in order and executed by a single worker thread, so files
+    written for one trajectory always land on disk in the order they were
+    submitted. The queue is bounded; when it is full, ``submit`` waits for the
+    worker to catch up instead of growing memory without limit.
+
+    The worker thread is started by the first submitted job and stopped by
+    ``close()``, when the writer is garbage collected, or at interpreter exit.
+    A closed writer starts a new worker for the next job.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 256,
+        compact_json: bool = False,
+        fsync: FsyncPolicy = "never",
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            max_queue_size: Maximum number of pending write jobs
+            compact_json: If True, write JSON without indentation
+            fsync: When to fsync written files - "never", "run_end" (on flush) or "always"
+        """
+        if fsync not in ("never", "run_end", "always"):
+            raise ValueError(f"Invalid fsync policy: {fsync}")
+        self.compact_json = compact_json
+        self.fsync = fsync
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._unsynced: Set[Path] = set()
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_worker: Optional[weakref.finalize] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Producer API
+    # ------------------------------------------------------------------
+
+    def submit(self, job: Callable[[], None]) -> None:
+        """Queue a write job, blocking while the queue is full."""
+        self._start()
+        self._queue.put(job)
+
+    def try_submit(self, job: Callable[[], None]) -> bool:
+        """Queue a write job without blocking. Returns False if the queue is full."""
+        self._start()
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except queue.Full:
+            return False
+
+    def write_bytes(self, path: Path, data: bytes) -> Callable[[], None]:
+        """Build a job that writes raw bytes to ``path``."""
+        return lambda: self._write(path, data, "wb")
+
+    def write_json(self, path: Path, data: Any) -> Callable[[], None]:
+        """Build a job that serializes ``data`` as JSON to ``path``."""
+        return lambda: self._write(path, self.dumps(data), "w")
+
+    def write_text(self, path: Path, text: str) -> Callable[[], None]:
+        """Build a job that writes already serialized text to ``path``."""
+        return lambda: self._write(path, text, "w")
+
+    def append_line(self, path: Path, line: str) -> Callable[[], None]:
+        """Build a job that appends a single line to ``path``."""
+        return lambda: self._write(path, line + "\n", "a")
+
+    def dumps(self, data: Any) -> str:
+        """Serialize JSON honoring the compact_json setting."""
+        if self.compact_json:
+            return json.dumps(data, separators=(",", ":"))
+        return json.dumps(data, indent=2)
+
+    def flush(self) -> None:
+        """Block until every queued job has been written (and fsynced if configured)."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+        self._finish()
+
+    def close(self) -> None:
+        """Flush pending jobs and stop the worker thread."""
+        with self._lock:
+            stop_worker, self._stop_worker = self._stop_worker, None
+        if stop_worker is not None:
+            stop_worker()
+        self._finish()
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._stop_worker is not None:
+                return
+            # The thread only holds a weak reference, so an unclosed writer
+            # can still be collected, which stops the thread
+            self._thread = threading.Thread(
+                target=_worker, args=(self._queue, weakref.ref(self)), name="trajectory-writer", daemon=True
+            )
+            self._thread.start()
+            # Also called at interpreter exit, so pending artifacts reach the disk
+            self._stop_worker = weakref.finalize(self, _stop, self._queue, self._thread)
+
+    def _finish(self) -> None:
+        self._sync_pending()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _write(self, path: Path, data: Any, mode: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, mode) as f:
+            f.write(data)
+            if self.fsync == "always":
+                f.flush()
+                os.fsync(f.fileno())
+        if self.fsync == "run_end":
+            self._unsynced.add(path)
+
+    def _sync_pending(self) -> None:
+        while self._unsynced:
+            path = self._unsynced.pop()
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+
+def _worker(jobs: "queue.Queue[Any]", ref: "weakref.ref[TrajectoryWriter]") -> None:
+    while True:
+        job = jobs.get()
+        try:
+            if job is _STOP:
+                return
+            job()
+        except BaseException as e:  # noqa: B036 - surfaced on flush()
+            writer = ref()
+            if writer is not None:
+                writer._error = e
+        finally:
+            # Jobs reference the writer; don't keep the last one alive while waiting
+            job = None
+            jobs.task_done()
+
+
+def _stop(jobs: "queue.Queue[Any]", thread: threading.Thread) -> None:
+    jobs.put(_STOP)
+    if thread is not threading.current_thread():
+        thread.join()
+
+
+class ImageBlobStore:
+    """
+    Content-addressed store for screenshots.
+
+    Images are stored once under ``<root>/<sha[:2]>/<sha>.png``; identical
+    screenshots (common when the screen did not change between steps) are
+    only written the first time they are seen.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._known: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.png"
+
+    def put(
+        self, writer: TrajectoryWriter, data: bytes
+    ) -> Tuple[Dict[str, Any], Optional[Callable[[], None]]]:
+        """
+        Prepare ``data`` for storage.
+
+        Returns:
+            Tuple of (reference record, write job). The record holds the content
+            hash, relative blob path, size and whether the image was deduplicated.
+            The job is None when the image is already stored.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        with self._lock:
+            deduplicated = digest in self._known
+            self._known.add(digest)
+        job = None
+        if not deduplicated:
+            write = writer.write_bytes(path, data)
+            # Blobs may already exist from an earlier run sharing the store
+            job = lambda: path.exists() or write()  # noqa: E731
+        record = {
+            "sha256": digest,
+            "blob": str(path.relative_to(self.root.parent)),
+            "size": len(data),
+            "deduplicated": deduplicated,
+        }
+        return record, job
@@ -0,0 +1,102 @@
+"""
+Computer handler wrapper that shares post-action screenshots with agent loops.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Any, Optional
+
+from .base import AsyncComputerHandler
+
+# Methods that read state without changing the screen
+_READ_ONLY_METHODS = {"screenshot", "get_environment", "get_dimensions", "get_current_url"}
+
+
+class ScreenshotReusingHandler:
+    """
+    Wraps a computer handler so the screenshot taken after an action isn't captured twice.
+
+    ComputerAgent captures a screenshot after every computer action, and
+    several loops (UITARS, GLM-4.5V, composed grounding) take another one at
+    the start of the next step when they can't find an image in the history.
+    The post-action frame is kept, and the next ``screenshot()`` call returns
+    it instead of capturing again, as long as nothing ran in between that
+    could have changed the screen. Every other method is forwarded to the
+    wrapped handler.
+    """
+
+    def __init__(self, handler: AsyncComputerHandler):
+        self.handler = handler
+        self._frame: Optional[str] = None
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.handler, name)
+        if name in _READ_ONLY_METHODS or not callable(attr):
+            return attr
+
+        async def call_action(*args, **kwargs):
+            # The screen is about to change; a kept frame would be stale
+            self.invalidate()
+            result = attr(*args, **kwargs)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+
+        return call_action
+
+    def invalidate(self) -> None:
+        """Drop the kept frame, so the next ``screenshot()`` captures a new one."""
+        self._frame = None
+
+    async def capture_after_action(self, delay: float = 0, stable_ms: Optional[int] = None) -> str:
+        """
+        Capture the post-action screenshot and keep it for the next ``screenshot()`` call.
+
+        Args:
+            delay: Seconds to wait before capturing. With ``stable_ms`` this is the
+                   maximum time to wait for the screen to settle.
+            stable_ms: If set, poll until the frame is unchanged for this many
+                       milliseconds instead of sleeping for a fixed ``delay``.
+
+        Returns:
+            The base64 screenshot
+        """
+        self.invalidate()
+        if stable_ms:
+            frame = await self._capture_when_stable(stable_ms / 1000.0, delay)
+        else:
+            frame = await self._capture_after(delay)
+        self._frame = frame
+        return frame
+
+    async def screenshot(self) -> str:
+        """Return the kept post-action frame if there is one, else take a screenshot."""
+        frame, self._frame = self._frame, None
+        if frame is not None:
+            return frame
+        return await self.handler.screenshot()
+
+    async def _capture_after(self, delay: float) -> str:
+        if delay and delay > 0:
+            await asyncio.sleep(delay)
+        return await self.handler.screenshot()
+
+    async def _capture_when_stable(self, stable_window: float, max_wait: float) -> str:
+        """Poll screenshots until the frame hash stays the same for ``stable_window`` seconds."""
+        deadline = time.monotonic() + max(max_wait or 0, stable_window)
+        await asyncio.sleep(stable_window)
+        frame = await self.handler.screenshot()
+        digest = hashlib.sha1(frame.encode() if isinstance(frame, str) else frame).digest()
+        stable_since = time.monotonic()
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(max(0, min(stable_window, deadline - time.monotonic())))
+            frame = await self.handler.screenshot()
+            now = time.monotonic()
+            new_digest = hashlib.sha1(frame.encode() if isinstance(frame, str) else frame).digest()
+            if new_digest != digest:
+                digest, stable_since = new_digest, now
+            elif now - stable_since >= stable_window:
+                break
+        return frame
@@ -2,12 +2,31 @@
 Decorators for agent - agent_loop decorator
 """
 
-from typing import List, Optional
+import re
+from typing import List, Optional, Set
 from .types import AgentConfigInfo
 
 # Global registry
 _agent_configs: List[AgentConfigInfo] = []
 
+# Built-in loop modules imported so far (see loops.LOOP_MANIFEST)
+_loaded_loops: Set[str] = set()
+
+def _load_builtin_loops(model: Optional[str] = None) -> None:
+    """
+    Import the built-in loops whose manifest regex matches a model.
+    
+    Args:
+        model: Model name to match, or None to import every built-in loop
+    """
+    from .loops import LOOP_MANIFEST, load_loop
+    for entry in LOOP_MANIFEST:
+        if entry.module in _loaded_loops:
+            continue
+        if model is None or re.match(entry.models, model):
+            load_loop(entry.module)
+            _loaded_loops.add(entry.module)
+
 def register_agent(models: str, priority: int = 0):
     """
     Decorator to register an AsyncAgentConfig class.
@@ -42,10 +61,12 @@ def register_agent(models: str, priority: int = 0):
 
 def get_agent_configs() -> List[AgentConfigInfo]:
     """Get all registered agent configs"""
+    _load_builtin_loops()
     return _agent_configs.copy()
 
 def find_agent_config(model: str) -> Optional[AgentConfigInfo]:
     """Find the best matching agent config for a model"""
+    _load_builtin_loops(model)
     for config_info in _agent_configs:
         if config_info.matches_model(model):
             return config_info
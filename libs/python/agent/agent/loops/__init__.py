@@ -1,14 +1,43 @@
 """
 Agent loops for agent
+
+Loop modules import litellm and other heavy dependencies, so they are not
+imported with the package. LOOP_MANIFEST lists each built-in loop's model
+regex and priority, exactly as passed to @register_agent in the module; the
+registry imports a loop module only once a model matches its entry.
 """
 
-# Import the loops to register them
-from . import anthropic
-from . import openai
-from . import uitars
-from . import omniparser
-from . import gta1
-from . import composed_grounded
-from . import glm45v
+import importlib
+from typing import List, NamedTuple
+
+
+class LoopManifestEntry(NamedTuple):
+    """A built-in agent loop module and the models it registers for."""
+    module: str
+    models: str
+    priority: int = 0
+
+
+LOOP_MANIFEST: List[LoopManifestEntry] = [
+    LoopManifestEntry("anthropic", r".*claude-.*"),
+    LoopManifestEntry("openai", r".*computer-use-preview.*"),
+    LoopManifestEntry("uitars", r"(?i).*ui-?tars.*"),
+    LoopManifestEntry("omniparser", r"omniparser\+.*|omni\+.*", priority=2),
+    LoopManifestEntry("gta1", r".*GTA1.*"),
+    LoopManifestEntry("composed_grounded", r".*\+.*", priority=1),
+    LoopManifestEntry("glm45v", r"(?i).*GLM-4\.5V.*"),
+]
+
+__all__ = [entry.module for entry in LOOP_MANIFEST]
+
+
+def load_loop(module: str):
+    """Import a built-in loop module, registering its agent config."""
+    return importlib.import_module(f"{__name__}.{module}")
+
 
-__all__ = ["anthropic", "openai", "uitars", "omniparser", "gta1", "composed_grounded", "glm45v"]
+def __getattr__(name: str):
+    # Keep `agent.loops.anthropic` and friends working without eager imports
+    if name in __all__:
+        return load_loop(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -22,7 +22,7 @@ from ..responses import (
     convert_computer_calls_desc2xy,
     get_all_element_descriptions
 )
-from ..agent import find_agent_config
+from ..decorators import find_agent_config
 
 GROUNDED_COMPUTER_TOOL_SCHEMA = {
   "type": "function",
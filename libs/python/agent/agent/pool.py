@@ -0,0 +1,258 @@
+"""
+AgentPool - run many agent tasks concurrently over a pool of computers
+"""
+
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from .agent import ComputerAgent
+from .callbacks import AsyncCallbackHandler
+from .types import Messages
+
+
+class _UsageTrackerCallback(AsyncCallbackHandler):
+    """Accumulates usage for a single task."""
+
+    def __init__(self):
+        self.usage: Dict[str, Any] = {}
+
+    async def on_usage(self, usage: Dict[str, Any]) -> None:
+        for key, value in usage.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.usage[key] = self.usage.get(key, 0) + value
+
+
+class _ThrottledLoop:
+    """Agent loop wrapper that limits concurrent model calls across the pool."""
+
+    # Methods that call the model. Only those the wrapped loop has are provided,
+    # since ComputerAgent checks for predict_click with hasattr
+    _THROTTLED = {"predict_step", "predict_click"}
+
+    def __init__(self, loop: Any, semaphore: asyncio.Semaphore):
+        self._loop = loop
+        self._semaphore = semaphore
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._loop, name)
+        if name not in self._THROTTLED:
+            return attr
+
+        async def throttled(*args, **kwargs):
+            async with self._semaphore:
+                return await attr(*args, **kwargs)
+
+        return throttled
+
+
+@dataclass
+class PoolMetrics:
+    """Aggregate metrics for the tasks run by an AgentPool."""
+    tasks_completed: int = 0
+    tasks_failed: int = 0
+    latencies: List[float] = field(default_factory=list)
+    total_cost: float = 0.0
+    total_tokens: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Wall-clock seconds since the first task started."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Finished tasks per minute."""
+        elapsed = self.elapsed
+        done = self.tasks_completed + self.tasks_failed
+        return done * 60.0 / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "tasks_completed": self.tasks_completed,
+            "tasks_failed": self.tasks_failed,
+            "elapsed_seconds": self.elapsed,
+            "throughput_per_minute": self.throughput,
+            "latency_mean": statistics.fmean(latencies) if latencies else None,
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p95": _percentile(latencies, 0.95),
+            "total_cost": self.total_cost,
+            "total_tokens": self.total_tokens,
+        }
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class AgentPool:
+    """
+    Runs N agent tasks over M computers.
+
+    Each task gets its own ComputerAgent bound to a free computer; when a
+    task finishes its computer goes back to the pool for the next task. The
+    number of concurrent model calls across all tasks can be capped
+    separately from the number of computers.
+
+    Example:
+        pool = AgentPool("anthropic/claude-3-5-sonnet-20241022", computers=[c1, c2])
+        async for event in pool.run(["Open Safari", "Open Notes", "Open Mail"]):
+            if event["type"] == "task_end":
+                print(event["task_index"], event["usage"])
+        print(pool.metrics.to_dict())
+    """
+
+    def __init__(
+        self,
+        model: str,
+        computers: List[Any],
+        max_concurrent_llm_calls: Optional[int] = None,
+        tools: Optional[List[Any]] = None,
+        **agent_kwargs,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            model: Model name passed to each ComputerAgent
+            computers: Computer instances (or computer handlers) to schedule tasks onto.
+                       Each computer runs one task at a time.
+            max_concurrent_llm_calls: If set, maximum number of agent steps calling the model at once
+            tools: Additional non-computer tools given to every agent
+            **agent_kwargs: Additional arguments passed to each ComputerAgent
+        """
+        if not computers:
+            raise ValueError("AgentPool requires at least one computer")
+        self.model = model
+        self.computers = list(computers)
+        self.tools = tools or []
+        self.agent_kwargs = agent_kwargs
+        self._llm_semaphore = (
+            asyncio.Semaphore(max_concurrent_llm_calls) if max_concurrent_llm_calls else None
+        )
+        self.metrics = PoolMetrics()
+
+    def _make_agent(self, computer: Any, usage_tracker: _UsageTrackerCallback) -> ComputerAgent:
+        kwargs = dict(self.agent_kwargs)
+        callbacks = list(kwargs.pop("callbacks", None) or []) + [usage_tracker]
+        agent = ComputerAgent(
+            model=self.model,
+            tools=[computer, *self.tools],
+            callbacks=callbacks,
+            **kwargs,
+        )
+        if self._llm_semaphore is not None:
+            agent.agent_loop = _ThrottledLoop(agent.agent_loop, self._llm_semaphore)
+        return agent
+
+    async def _run_task(
+        self,
+        index: int,
+        task: Messages,
+        computers: "asyncio.Queue[Any]",
+        events: "asyncio.Queue[Optional[Dict[str, Any]]]",
+        stream: bool,
+    ) -> None:
+        computer = await computers.get()
+        usage_tracker = _UsageTrackerCallback()
+        started = time.monotonic()
+        output: List[Dict[str, Any]] = []
+        error: Optional[BaseException] = None
+        computer_index = self.computers.index(computer)
+        await events.put({"type": "task_start", "task_index": index, "computer_index": computer_index})
+        try:
+            agent = self._make_agent(computer, usage_tracker)
+            async for result in agent.run(task):
+                output += result.get("output", [])
+                if stream:
+                    await events.put({"type": "task_step", "task_index": index, "result": result})
+        except Exception as e:
+            error = e
+        finally:
+            computers.put_nowait(computer)
+
+        latency = time.monotonic() - started
+        usage = usage_tracker.usage
+        # The same usage data BudgetManagerCallback sums its budget from
+        cost = usage.get("response_cost", 0.0)
+
+        self.metrics.latencies.append(latency)
+        self.metrics.total_cost += cost
+        self.metrics.total_tokens += int(usage.get("total_tokens", 0))
+        if error is None:
+            self.metrics.tasks_completed += 1
+        else:
+            self.metrics.tasks_failed += 1
+
+        await events.put({
+            "type": "task_end",
+            "task_index": index,
+            "computer_index": computer_index,
+            "output": output,
+            "usage": usage,
+            "cost": cost,
+            "latency": latency,
+            "error": error,
+        })
+
+    async def run(self, tasks: List[Messages], stream: bool = False) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Run tasks concurrently, yielding events as they happen.
+
+        Args:
+            tasks: Task inputs, each a prompt string or message list
+            stream: If True, also yield a "task_step" event for every agent step
+
+        Yields:
+            Event dicts with a "type" of "task_start", "task_step" or "task_end" and the
+            "task_index" of the task. "task_start" and "task_end" events carry the
+            "computer_index" the task runs on. "task_end" events also carry the task's
+            output items, usage, cost, latency in seconds, and error (None on success).
+        """
+        computers: "asyncio.Queue[Any]" = asyncio.Queue()
+        for computer in self.computers:
+            computers.put_nowait(computer)
+        events: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+
+        if self.metrics.started_at is None:
+            self.metrics.started_at = time.monotonic()
+        self.metrics.finished_at = None
+
+        # Tasks wait for a free computer inside _run_task, so at most
+        # len(computers) of them are actually running at any time
+        runners = [
+            asyncio.create_task(self._run_task(i, task, computers, events, stream))
+            for i, task in enumerate(tasks)
+        ]
+
+        async def close_when_done():
+            await asyncio.gather(*runners, return_exceptions=True)
+            await events.put(None)
+
+        closer = asyncio.create_task(close_when_done())
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+        finally:
+            for runner in runners:
+                runner.cancel()
+            closer.cancel()
+            self.metrics.finished_at = time.monotonic()
+
+    async def run_all(self, tasks: List[Messages]) -> List[Dict[str, Any]]:
+        """Run tasks and return their "task_end" events, ordered by task index."""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+        async for event in self.run(tasks):
+            if event["type"] == "task_end":
+                results[event["task_index"]] = event
+        return results  # type: ignore[return-value]
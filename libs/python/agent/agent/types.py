@@ -2,21 +2,39 @@
 Type definitions for agent
 """
 
-from typing import Dict, List, Any, Optional, Callable, Protocol, Literal
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Callable, Protocol, Literal
 from pydantic import BaseModel
 import re
-from litellm import ResponseInputParam, ResponsesAPIResponse, ToolParam
 from collections.abc import Iterable
 
-# Agent input types
-Messages = str | ResponseInputParam | List[Dict[str, Any]]
-Tools = Optional[Iterable[ToolParam]]
+if TYPE_CHECKING:
+    from litellm import ResponseInputParam, ResponsesAPIResponse, ToolParam
+
+    # Agent input types
+    Messages = str | ResponseInputParam | List[Dict[str, Any]]
+    Tools = Optional[Iterable[ToolParam]]
+
+    # Agent output types
+    AgentResponse = ResponsesAPIResponse
 
-# Agent output types
-AgentResponse = ResponsesAPIResponse 
 AgentCapability = Literal["step", "click"]
 
 
+def __getattr__(name: str) -> Any:
+    # The aliases over litellm types are built on first use, so importing this
+    # module (e.g. for register_agent) doesn't import litellm
+    if name not in ("Messages", "Tools", "AgentResponse"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from litellm import ResponseInputParam, ResponsesAPIResponse, ToolParam
+    aliases = {
+        "Messages": str | ResponseInputParam | List[Dict[str, Any]],
+        "Tools": Optional[Iterable[ToolParam]],
+        "AgentResponse": ResponsesAPIResponse,
+    }
+    globals().update(aliases)
+    return aliases[name]
+
+
 # Agent config registration
 class AgentConfigInfo(BaseModel):
     """Information about a registered agent config"""
@@ -0,0 +1,46 @@
+"""Tests for the tracing spans around agent runs."""
+
+import pytest
+
+from core import tracing
+
+from agent import ComputerAgent
+
+
+class FakeLoop:
+    """Makes one model call and answers with a message, which ends the run."""
+
+    async def predict_step(self, _on_api_start, _on_api_end, **kwargs):
+        await _on_api_start({"model": kwargs["model"]})
+        await _on_api_end({"model": kwargs["model"]}, {})
+        text = {"type": "message", "role": "assistant", "content": [{"type": "output_text", "text": "done"}]}
+        return {"output": [text], "usage": {}}
+
+
+@pytest.fixture
+def exporter():
+    exporter = tracing.InMemorySpanExporter()
+    tracing.set_tracer(tracing.Tracer(exporter))
+    yield exporter
+    tracing.set_tracer(None)
+
+
+async def test_run_steps_and_items_are_traced(exporter):
+    agent = ComputerAgent("anthropic/claude-3-5-sonnet-20241022", telemetry_enabled=False)
+    agent.agent_loop = FakeLoop()
+    results = [result async for result in agent.run("hi")]
+    assert results[0]["output"][0]["content"][0]["text"] == "done"
+
+    spans = exporter.get_finished_spans()
+    by_id = {span.span_id: span for span in spans}
+    parents = {span.name: by_id[span.parent_id].name if span.parent_id else None for span in spans}
+    assert parents == {
+        "agent.run": None,
+        "agent.predict_step": "agent.run",
+        "agent.model_call": "agent.predict_step",
+        "agent.handle_item": "agent.run",
+    }
+    (run,) = [span for span in spans if span.name == "agent.run"]
+    assert run.attributes["cua.model"] == "anthropic/claude-3-5-sonnet-20241022"
+    (item,) = [span for span in spans if span.name == "agent.handle_item"]
+    assert item.attributes["cua.item_type"] == "message"
@@ -0,0 +1,108 @@
+"""Tests for micro-batching in the local HuggingFace adapter."""
+
+import asyncio
+import importlib
+import threading
+import time
+
+import pytest
+
+from agent.adapters.batching import MicroBatcher
+
+TINY_MODEL = "trl-internal-testing/tiny-Qwen2VLForConditionalGeneration"
+
+
+def _dispatchers():
+    return [thread for thread in threading.enumerate() if thread.name == "micro-batcher"]
+
+
+def test_concurrent_requests_share_a_batch():
+    batches = []
+
+    def batch_fn(key, requests):
+        batches.append((key, list(requests)))
+        return [request * 2 for request in requests]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=3, max_wait=0.2)
+    futures = [batcher.submit("model", i) for i in range(4)]
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6]
+    # Full batches go straight away, the rest waits for max_wait
+    assert batches == [("model", [0, 1, 2]), ("model", [3])]
+    batcher.close()
+
+
+def test_dispatcher_stops_when_idle():
+    before = len(_dispatchers())
+    batcher = MicroBatcher(lambda key, requests: requests, max_wait=0)
+    assert batcher.submit("model", 1).result(timeout=5) == 1
+    deadline = time.monotonic() + 5
+    while len(_dispatchers()) > before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(_dispatchers()) == before
+    # And starts again for the next request
+    assert batcher.submit("model", 2).result(timeout=5) == 2
+    batcher.close()
+
+
+def test_close_fails_waiting_requests():
+    before = len(_dispatchers())
+    batcher = MicroBatcher(lambda key, requests: requests, max_wait=60)
+    future = batcher.submit("model", 1)
+    batcher.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        future.result(timeout=5)
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit("model", 2)
+    assert len(_dispatchers()) == before
+
+
+def test_agents_pass_options_to_the_shared_adapter(monkeypatch):
+    agent_module = importlib.import_module("agent.agent")
+    monkeypatch.setattr(agent_module, "_hf_adapter", None)
+    monkeypatch.setattr(agent_module, "_hf_adapter_options", {})
+
+    options = {"max_batch_size": 2, "max_batch_wait": 0.05}
+    adapter = agent_module.get_huggingface_local_adapter(options)
+    try:
+        assert (adapter._batcher.max_batch_size, adapter._batcher.max_wait) == (2, 0.05)
+        # Later agents share it, with the same options or none
+        assert agent_module.get_huggingface_local_adapter(dict(options)) is adapter
+        assert agent_module.get_huggingface_local_adapter() is adapter
+        with pytest.raises(ValueError, match="already created"):
+            agent_module.get_huggingface_local_adapter({"max_batch_size": 4})
+    finally:
+        adapter.close()
+
+
+async def test_tiny_model_generates_concurrent_requests_in_one_batch():
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from agent.adapters.huggingfacelocal_adapter import HuggingFaceLocalAdapter
+
+    adapter = HuggingFaceLocalAdapter(device="cpu", max_batch_size=4, max_batch_wait=0.5, prefix_cache=False)
+    try:
+        try:
+            await asyncio.to_thread(adapter._load_model_and_processor, TINY_MODEL)
+        except OSError as e:
+            pytest.skip(f"{TINY_MODEL} is not available: {e}")
+
+        batch_sizes = []
+        generate_batch = adapter._generate_batch
+
+        def spy(model_name, requests):
+            batch_sizes.append(len(requests))
+            return generate_batch(model_name, requests)
+
+        adapter._batcher.batch_fn = spy
+        texts = await asyncio.gather(*(
+            adapter._agenerate(
+                model=TINY_MODEL,
+                messages=[{"role": "user", "content": f"Request {i}"}],
+                max_tokens=4,
+            )
+            for i in range(3)
+        ))
+        assert batch_sizes == [3]
+        assert all(isinstance(text, str) for text in texts)
+    finally:
+        adapter.close()
@@ -0,0 +1,91 @@
+"""Tests for AgentPool."""
+
+import asyncio
+
+import pytest
+
+from agent.pool import AgentPool, _ThrottledLoop
+
+
+class FakeAgent:
+    """Runs a task by sleeping on its computer, reporting usage like a model call."""
+
+    running = {}
+
+    def __init__(self, computer, usage_tracker):
+        self.computer = computer
+        self.usage_tracker = usage_tracker
+
+    async def run(self, task):
+        assert not FakeAgent.running.get(self.computer), "computer used by two tasks at once"
+        FakeAgent.running[self.computer] = True
+        try:
+            await asyncio.sleep(0.01)
+            await self.usage_tracker.on_usage({"total_tokens": 10, "response_cost": 0.5})
+            if task == "fail":
+                raise RuntimeError("task failed")
+            yield {"output": [{"type": "message", "content": [{"text": task}]}]}
+        finally:
+            FakeAgent.running[self.computer] = False
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = AgentPool("test/model", computers=["computer0", "computer1"])
+    monkeypatch.setattr(pool, "_make_agent", FakeAgent)
+    return pool
+
+
+async def test_tasks_are_scheduled_onto_free_computers(pool):
+    events = [event async for event in pool.run(["a", "b", "c", "d", "fail"])]
+
+    ends = {event["task_index"]: event for event in events if event["type"] == "task_end"}
+    assert sorted(ends) == [0, 1, 2, 3, 4]
+    assert {event["computer_index"] for event in ends.values()} == {0, 1}
+    assert ends[2]["output"] == [{"type": "message", "content": [{"text": "c"}]}]
+    assert str(ends[4]["error"]) == "task failed"
+    for event in events:
+        if event["type"] == "task_start":
+            # Every task starts before it ends
+            assert events.index(event) < events.index(ends[event["task_index"]])
+
+    metrics = pool.metrics.to_dict()
+    assert metrics["tasks_completed"] == 4 and metrics["tasks_failed"] == 1
+    assert metrics["total_tokens"] == 50
+    assert metrics["total_cost"] == pytest.approx(2.5)
+
+
+async def test_run_all_orders_results_by_task(pool):
+    results = await pool.run_all(["a", "b", "c"])
+    assert [result["output"][0]["content"][0]["text"] for result in results] == ["a", "b", "c"]
+    assert all(result["cost"] == 0.5 for result in results)
+
+
+async def test_throttled_loop_limits_model_calls():
+    active = peak = 0
+
+    class Loop:
+        async def predict_step(self, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {"output": []}
+
+    loop = _ThrottledLoop(Loop(), asyncio.Semaphore(2))
+    await asyncio.gather(*(loop.predict_step(messages=[]) for _ in range(6)))
+    assert peak == 2
+
+
+def test_throttled_loop_only_has_methods_of_the_wrapped_loop():
+    class StepOnly:
+        async def predict_step(self, **kwargs):
+            return {}
+
+    class WithClick(StepOnly):
+        async def predict_click(self, **kwargs):
+            return (1, 2)
+
+    assert not hasattr(_ThrottledLoop(StepOnly(), asyncio.Semaphore(1)), "predict_click")
+    assert hasattr(_ThrottledLoop(WithClick(), asyncio.Semaphore(1)), "predict_click")
@@ -0,0 +1,175 @@
+"""Tests for the KV prefix cache of the local HuggingFace adapter."""
+
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from agent.adapters.prefix_cache import PrefixCache
+
+IMAGE_TOKEN = 99
+
+
+class FakeLayer:
+    def __init__(self, length: int):
+        self.keys = torch.zeros(1, 1, length, 4)
+        self.values = torch.zeros(1, 1, length, 4)
+
+
+class FakeCache:
+    """KV cache of one layer holding ``length`` float32 keys and values of 4 values each."""
+
+    def __init__(self, length: int):
+        self.layers = [FakeLayer(length)]
+        self.cropped_to = None
+
+    def get_seq_length(self) -> int:
+        return self.layers[0].keys.shape[2]
+
+    def crop(self, length: int) -> None:
+        self.cropped_to = length
+        self.layers = [FakeLayer(length)]
+
+
+def tokens(*ids):
+    return torch.tensor(ids)
+
+
+def put(cache: PrefixCache, *ids, model="m"):
+    cache.put(model, tokens(*ids), FakeCache(len(ids)))
+
+
+def test_take_returns_the_longest_matching_prefix_and_removes_it():
+    cache = PrefixCache()
+    put(cache, 1, 2, 3)
+    put(cache, 1, 2, 3, 4, 5)
+    put(cache, 1, 2, 3, 4, 5, model="other")
+
+    entry, shared = cache.take("m", tokens(1, 2, 3, 4, 6, 7))
+    assert entry.token_ids.tolist() == [1, 2, 3, 4, 5]
+    assert shared == 4
+    assert len(cache) == 2
+    # Each conversation has a single entry, so it's gone until put back
+    entry, shared = cache.take("m", tokens(1, 2, 3, 4, 6, 7))
+    assert (entry.token_ids.tolist(), shared) == ([1, 2, 3], 3)
+    assert cache.take("m", tokens(1, 2, 3)) == (None, 0)
+    assert cache.total_bytes == FakeCache(5).layers[0].keys.nbytes * 2
+
+
+def test_entries_must_match_the_prompt_for_min_reuse_ratio():
+    cache = PrefixCache(min_reuse_ratio=0.5)
+    put(cache, 1, 2, 3, 4, 5, 6)
+    # Only a shared system prompt: another conversation must not take the entry
+    assert cache.take("m", tokens(1, 2, 9, 9)) == (None, 0)
+    entry, shared = cache.take("m", tokens(1, 2, 3, 9))
+    assert (entry is not None, shared) == (True, 3)
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = PrefixCache(max_entries=2)
+    put(cache, 1)
+    put(cache, 2)
+    # Taking and putting back an entry makes it the most recent one
+    entry, _ = cache.take("m", tokens(1))
+    cache.put("m", entry.token_ids, entry.cache)
+    put(cache, 3)
+
+    assert len(cache) == 2
+    assert cache.take("m", tokens(2)) == (None, 0)
+    assert cache.take("m", tokens(1))[1] == 1
+    assert cache.take("m", tokens(3))[1] == 1
+
+
+def test_entries_are_evicted_to_stay_under_max_bytes():
+    entry_bytes = FakeCache(4).layers[0].keys.nbytes * 2
+    cache = PrefixCache(max_bytes=2 * entry_bytes)
+    put(cache, 1, 1, 1, 1)
+    put(cache, 2, 2, 2, 2)
+    put(cache, 3, 3, 3, 3)
+    assert (len(cache), cache.total_bytes) == (2, 2 * entry_bytes)
+    assert cache.take("m", tokens(1, 1, 1, 1)) == (None, 0)
+
+    # An entry larger than the whole cache is not stored, and evicts nothing
+    put(cache, *range(20))
+    assert (len(cache), cache.total_bytes) == (2, 2 * entry_bytes)
+
+
+class Inputs(dict):
+    """Tokenized prompt, as returned by a processor's apply_chat_template."""
+
+    @property
+    def input_ids(self):
+        return self["input_ids"]
+
+    def to(self, device):
+        return self
+
+
+class FakeProcessor:
+    """Processor whose messages are already token ids."""
+
+    image_token_id = IMAGE_TOKEN
+
+    def apply_chat_template(self, messages, **kwargs):
+        return Inputs(input_ids=torch.tensor([messages]))
+
+    def batch_decode(self, sequences, **kwargs):
+        return [" ".join(map(str, sequence.tolist())) for sequence in sequences]
+
+
+class FakeModel:
+    """Model that generates two tokens and returns a cache covering all but the last one."""
+
+    device = "cpu"
+
+    def __init__(self):
+        self.past_key_values = []
+
+    def generate(self, input_ids, max_new_tokens, logits_processor, past_key_values=None, **kwargs):
+        self.past_key_values.append(past_key_values)
+        for processor in logits_processor:
+            processor(input_ids, None)
+        sequence = torch.cat([input_ids[0], torch.tensor([7, 8])])
+        return SimpleNamespace(sequences=sequence[None], past_key_values=FakeCache(len(sequence) - 1))
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    hf = pytest.importorskip("agent.adapters.huggingfacelocal_adapter")
+    # Only LogitsProcessorList is needed from transformers
+    monkeypatch.setattr(hf, "_hf", lambda: (torch, SimpleNamespace(LogitsProcessorList=list)))
+    adapter = hf.HuggingFaceLocalAdapter(device="cpu", prefix_cache=True)
+    yield adapter
+    adapter.close()
+
+
+def test_prefill_stats_count_reused_tokens(adapter):
+    model, processor = FakeModel(), FakeProcessor()
+
+    def step(*prompt):
+        return adapter._run_generate_cached("m", model, processor, {"messages": list(prompt), "max_new_tokens": 2})
+
+    assert step(1, 2, 3, 4) == "7 8"
+    # The next step resends the conversation, with the reply and a new message
+    assert step(1, 2, 3, 4, 7, 8, 5) == "7 8"
+    assert model.past_key_values[0] is None
+    assert model.past_key_values[1].cropped_to == 5
+
+    stats = list(adapter.prefill_stats)
+    assert [(s["prompt_tokens"], s["cached_tokens"]) for s in stats] == [(4, 0), (7, 5)]
+    # The full prefill of the first step sets the per-token cost of the estimate
+    assert stats[0]["estimated_seconds_saved"] == 0
+    assert stats[1]["estimated_seconds_saved"] == pytest.approx(5 * stats[0]["prefill_seconds"] / 4)
+
+
+def test_new_image_tokens_force_a_full_prefill(adapter):
+    model, processor = FakeModel(), FakeProcessor()
+
+    def step(*prompt):
+        adapter._run_generate_cached("m", model, processor, {"messages": list(prompt), "max_new_tokens": 2})
+
+    step(1, 2, 3)
+    step(1, 2, 3, 7, 8, IMAGE_TOKEN, 4)
+    assert model.past_key_values == [None, None]
+    assert [s["cached_tokens"] for s in adapter.prefill_stats] == [0, 0]
@@ -0,0 +1,62 @@
+"""Tests for reusing the post-action screenshot."""
+
+import pytest
+
+from agent.computers.screenshot_reuse import ScreenshotReusingHandler
+
+
+class FakeComputer:
+    def __init__(self, frames=None):
+        self.frames = list(frames or [])
+        self.captures = 0
+        self.clicks = []
+
+    async def screenshot(self):
+        self.captures += 1
+        return self.frames.pop(0) if self.frames else f"frame{self.captures}"
+
+    async def click(self, x, y, button="left"):
+        if x < 0:
+            raise ValueError("off screen")
+        self.clicks.append((x, y))
+
+
+async def test_post_action_frame_is_returned_once():
+    computer = FakeComputer()
+    handler = ScreenshotReusingHandler(computer)
+
+    assert await handler.capture_after_action() == "frame1"
+    assert await handler.screenshot() == "frame1"
+    assert computer.captures == 1
+    # Only the first request gets the kept frame
+    assert await handler.screenshot() == "frame2"
+
+
+async def test_actions_drop_the_kept_frame():
+    computer = FakeComputer()
+    handler = ScreenshotReusingHandler(computer)
+
+    await handler.capture_after_action()
+    await handler.click(1, 2)
+    assert computer.clicks == [(1, 2)]
+    assert await handler.screenshot() == "frame2"
+
+    await handler.capture_after_action()
+    with pytest.raises(ValueError):
+        await handler.click(-1, 0)
+    assert await handler.screenshot() == "frame4"
+
+
+async def test_invalidate_drops_the_kept_frame():
+    handler = ScreenshotReusingHandler(FakeComputer())
+    await handler.capture_after_action()
+    handler.invalidate()
+    assert await handler.screenshot() == "frame2"
+
+
+async def test_capture_waits_for_a_stable_frame():
+    computer = FakeComputer(["loading", "half", "done", "done", "done"])
+    handler = ScreenshotReusingHandler(computer)
+
+    assert await handler.capture_after_action(delay=1, stable_ms=10) == "done"
+    assert computer.captures in (4, 5)
@@ -0,0 +1,142 @@
+"""Tests for the background trajectory writer."""
+
+import gc
+import json
+import os
+import threading
+
+import pytest
+
+from agent.callbacks import trajectory_writer
+from agent.callbacks.trajectory_saver import TrajectorySaverCallback
+from agent.callbacks.trajectory_writer import TrajectoryWriter
+
+
+def _writer_threads():
+    return [thread for thread in threading.enumerate() if thread.name == "trajectory-writer"]
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    calls = []
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        calls.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(trajectory_writer.os, "fsync", fsync)
+    return calls
+
+
+def test_jobs_are_written_in_order(tmp_path):
+    writer = TrajectoryWriter(max_queue_size=4)
+    path = tmp_path / "lines.txt"
+    for i in range(100):
+        writer.submit(writer.append_line(path, str(i)))
+    writer.close()
+    assert path.read_text().split() == [str(i) for i in range(100)]
+
+
+def test_thread_starts_on_first_job_and_stops_on_close(tmp_path):
+    before = len(_writer_threads())
+    writer = TrajectoryWriter()
+    assert len(_writer_threads()) == before
+
+    writer.submit(writer.write_text(tmp_path / "a.txt", "a"))
+    assert len(_writer_threads()) == before + 1
+    writer.close()
+    assert len(_writer_threads()) == before
+
+    # A closed writer starts again for the next job
+    writer.submit(writer.write_text(tmp_path / "b.txt", "b"))
+    writer.close()
+    assert (tmp_path / "b.txt").read_text() == "b"
+
+
+def test_unclosed_writer_is_collected(tmp_path):
+    before = len(_writer_threads())
+    writer = TrajectoryWriter()
+    writer.submit(writer.write_text(tmp_path / "a.txt", "a"))
+    writer.flush()
+    del writer
+    gc.collect()
+    assert len(_writer_threads()) == before
+
+
+def test_errors_surface_on_flush(tmp_path):
+    writer = TrajectoryWriter()
+
+    def fail():
+        raise OSError("disk full")
+
+    writer.submit(fail)
+    with pytest.raises(OSError, match="disk full"):
+        writer.flush()
+    writer.close()
+
+
+@pytest.mark.parametrize("policy, on_write, on_flush", [("never", 0, 0), ("always", 2, 0), ("run_end", 0, 2)])
+def test_fsync_policies(tmp_path, fsyncs, policy, on_write, on_flush):
+    writer = TrajectoryWriter(fsync=policy)
+    writer.submit(writer.write_text(tmp_path / "a.txt", "a"))
+    writer.submit(writer.write_json(tmp_path / "b.json", {"b": 1}))
+    writer._queue.join()
+    assert len(fsyncs) == on_write
+    writer.flush()
+    assert len(fsyncs) == on_write + on_flush
+    writer.close()
+
+
+async def test_run_end_flushes_and_stops_the_writer(tmp_path):
+    before = len(_writer_threads())
+    callback = TrajectorySaverCallback(str(tmp_path), compact_json=True)
+    await callback.on_run_start({"model": "test/model"}, [])
+    await callback.on_responses({}, {"output": []})
+    await callback.on_screenshot(b"png", "screenshot")
+    await callback.on_run_end({}, [], [{"type": "message"}])
+    assert len(_writer_threads()) == before
+
+    trajectory = tmp_path / callback.trajectory_id
+    metadata = json.loads((trajectory / "metadata.json").read_text())
+    assert metadata["status"] == "completed"
+    assert sorted(path.name for path in (trajectory / "turn_000").iterdir()) == ["0000_agent_response.json"]
+    assert (trajectory / "turn_001" / "0001_screenshot.png").read_bytes() == b"png"
+
+
+async def test_foreground_writes_start_no_thread(tmp_path):
+    before = len(_writer_threads())
+    callback = TrajectorySaverCallback(str(tmp_path), background_writes=False)
+    await callback.on_run_start({"model": "test/model"}, [])
+    assert len(_writer_threads()) == before
+    assert (tmp_path / callback.trajectory_id / "metadata.json").exists()
+    await callback.on_run_end({}, [], [])
+    callback.close()
+
+
+async def test_jsonl_trajectory_stores_repeated_screenshots_once(tmp_path):
+    callback = TrajectorySaverCallback(str(tmp_path), format="jsonl")
+    await callback.on_run_start({"model": "test/model"}, [])
+    for _ in range(2):
+        await callback.on_responses({}, {"output": []})
+        await callback.on_screenshot(b"same frame", "screenshot")
+    await callback.on_run_end({}, [], [{"type": "message"}])
+
+    lines = (tmp_path / callback.trajectory_id / "trajectory.jsonl").read_text().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [(record["turn"], record["artifact"]) for record in records] == [
+        (0, "0000_agent_response"),
+        (1, "0001_screenshot"),
+        (1, "0002_agent_response"),
+        (2, "0003_screenshot"),
+    ]
+    assert records[0]["data"]["model"] == "test/model"
+
+    images = [record["image"] for record in records if "image" in record]
+    assert [image["deduplicated"] for image in images] == [False, True]
+    assert images[0]["blob"] == images[1]["blob"]
+    assert images[0]["size"] == len(b"same frame")
+    blobs = [path for path in (tmp_path / "blobs").rglob("*") if path.is_file()]
+    assert [str(path.relative_to(tmp_path)) for path in blobs] == [images[0]["blob"]]
+    assert blobs[0].read_bytes() == b"same frame"
+    assert blobs[0].stem == images[0]["sha256"]
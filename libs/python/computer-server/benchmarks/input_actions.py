@@ -0,0 +1,107 @@
+"""
+Benchmark the Linux input backends.
+
+Runs the same actions through every input backend that works on the
+display and reports actions per second: cursor moves, clicks, key presses,
+typing a line of text and dragging along a path without a duration, which
+measures the overhead around the events rather than the drag itself. Runs
+on the current ``DISPLAY``, or on a fresh Xvfb server with ``--xvfb``
+(requires the ``Xvfb`` binary).
+
+Usage:
+    python benchmarks/input_actions.py --xvfb
+    python benchmarks/input_actions.py --xvfb --runs 50 --backends xtest
+    DISPLAY=:0 python benchmarks/input_actions.py --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from screenshot_capture import _start_xvfb
+
+TEXT = "The quick brown fox jumps over the lazy dog 0123456789"
+PATH = [(100 + 10 * i, 100 + (i % 10) * 10) for i in range(50)]
+
+
+def _actions(backend) -> Dict[str, Callable[[int], Awaitable[None]]]:
+    return {
+        "move": lambda i: backend.move(100 + i % 200, 100 + i % 100),
+        "click": lambda i: backend.click(200 + i % 200, 200),
+        "press": lambda i: backend.press("shift"),
+        "type_text": lambda i: backend.type_text(TEXT),
+        "drag_path": lambda i: backend.drag_path(PATH, duration=0),
+    }
+
+
+async def _measure(action: Callable[[int], Awaitable[None]], runs: int) -> float:
+    """Actions per second over ``runs`` calls, after a warm-up call."""
+    await action(0)
+    start = time.perf_counter()
+    for i in range(runs):
+        await action(i)
+    return runs / (time.perf_counter() - start)
+
+
+async def _run_backends(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    # Imported once DISPLAY is set, as the handlers connect to it on import
+    from computer_server.handlers import linux_input
+
+    results = []
+    for name in args.backends or list(linux_input.INPUT_BACKENDS):
+        try:
+            backend = linux_input.INPUT_BACKENDS[name]()
+        except Exception as e:
+            results.append({"backend": name, "error": str(e)})
+            continue
+        try:
+            rates = {action: round(await _measure(run, args.runs), 1) for action, run in _actions(backend).items()}
+        except Exception as e:
+            results.append({"backend": name, "error": str(e)})
+            continue
+        finally:
+            backend.close()
+        results.append({"backend": name, "actions_per_second": rates})
+    return results
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    xvfb = _start_xvfb(args.resolution) if args.xvfb else None
+    try:
+        results = asyncio.run(_run_backends(args))
+        return {"display": os.environ.get("DISPLAY"), "results": results}
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--xvfb", action="store_true", help="Start an Xvfb server to send input to")
+    parser.add_argument("--resolution", default="1920x1080", help="Xvfb screen size (default: 1920x1080)")
+    parser.add_argument("--runs", type=int, default=20, help="Calls per action and backend")
+    parser.add_argument("--backends", nargs="+", help="Backends to measure (default: all)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"Display {report['display']}, actions per second (text is {len(TEXT)} characters, drags {len(PATH)} points)")
+    for result in report["results"]:
+        if "error" in result:
+            print(f"{result['backend']:<10} failed: {result['error']}")
+        else:
+            rates = "  ".join(f"{action} {rate:>8.1f}" for action, rate in result["actions_per_second"].items())
+            print(f"{result['backend']:<10} {rates}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
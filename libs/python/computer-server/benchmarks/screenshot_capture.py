@@ -0,0 +1,115 @@
+"""
+Benchmark the Linux screen capture backends.
+
+Captures the screen repeatedly with every backend that works on the
+display and reports the median and 95th percentile capture latency, and
+which backend the handler would select. Runs on the current ``DISPLAY``,
+or on a fresh Xvfb server with ``--xvfb`` (requires the ``Xvfb`` binary).
+
+Usage:
+    python benchmarks/screenshot_capture.py --xvfb
+    python benchmarks/screenshot_capture.py --xvfb --resolution 3840x2160 --runs 50
+    DISPLAY=:0 python benchmarks/screenshot_capture.py --json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+
+def _start_xvfb(resolution: str) -> subprocess.Popen:
+    if not shutil.which("Xvfb"):
+        raise RuntimeError("Xvfb not found; install it (e.g. apt-get install xvfb) or run on an existing DISPLAY")
+    for number in range(99, 200):
+        if not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            break
+    display = f":{number}"
+    process = subprocess.Popen(
+        ["Xvfb", display, "-screen", "0", f"{resolution}x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Xvfb did not start on {display}")
+        time.sleep(0.05)
+    os.environ["DISPLAY"] = display
+    return process
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    xvfb: Optional[subprocess.Popen] = _start_xvfb(args.resolution) if args.xvfb else None
+    try:
+        # Imported once DISPLAY is set, as the handlers connect to it on import
+        from computer_server.handlers import linux_capture
+
+        results = []
+        for backend in linux_capture.available_backends(args.backends):
+            try:
+                backend.capture()
+                times = []
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    image = backend.capture()
+                    times.append(time.perf_counter() - start)
+            except Exception as e:
+                results.append({"backend": backend.name, "error": str(e)})
+                continue
+            finally:
+                backend.close()
+            results.append({
+                "backend": backend.name,
+                "size": list(image.size),
+                "p50_ms": round(_percentile(times, 0.5) * 1000, 2),
+                "p95_ms": round(_percentile(times, 0.95) * 1000, 2),
+                "fps": round(1 / _percentile(times, 0.5), 1),
+            })
+
+        selected = linux_capture.select_backend()
+        selected.close()
+        return {"display": os.environ.get("DISPLAY"), "selected": selected.name, "results": results}
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--xvfb", action="store_true", help="Start an Xvfb server to capture")
+    parser.add_argument("--resolution", default="1920x1080", help="Xvfb screen size (default: 1920x1080)")
+    parser.add_argument("--runs", type=int, default=20, help="Captures per backend")
+    parser.add_argument("--backends", nargs="+", help="Backends to measure (default: all)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"Display {report['display']}, selected backend: {report['selected']}")
+    for result in report["results"]:
+        if "error" in result:
+            print(f"{result['backend']:<10} failed: {result['error']}")
+        else:
+            print(
+                f"{result['backend']:<10} {result['size'][0]}x{result['size'][1]}  "
+                f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  {result['fps']:>7.1f} fps"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -51,6 +51,11 @@ def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
         default=30,
         help="Watchdog ping interval in seconds (default: 30)",
     )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Record metrics and serve them on /metrics (also enabled by CUA_METRICS=1)",
+    )
     parser.add_argument(
         "--no-restart",
         action="store_true",
@@ -70,6 +75,10 @@ def main() -> None:
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
 
+    if args.metrics:
+        from . import metrics
+        metrics.enable()
+
     # Check if watchdog should be enabled
     container_name = os.environ.get("CONTAINER_NAME")
     enable_watchdog = args.watchdog or bool(container_name)
@@ -94,7 +103,8 @@ def main() -> None:
                     'port': args.port,
                     'log_level': args.log_level,
                     'ssl_keyfile': args.ssl_keyfile,
-                    'ssl_certfile': args.ssl_certfile
+                    'ssl_certfile': args.ssl_certfile,
+                    'metrics': args.metrics
                 }
                 
                 # Create watchdog with restart settings
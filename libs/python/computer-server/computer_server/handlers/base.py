@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
+
+from .process import DEFAULT_MAX_BYTES, stream_command
 
 class BaseAccessibilityHandler(ABC):
     """Abstract base class for OS-specific accessibility handlers."""
@@ -217,4 +219,10 @@ class BaseAutomationHandler(ABC):
     @abstractmethod
     async def run_command(self, command: str) -> Dict[str, Any]:
         """Run a command and return the output."""
-        pass
\ No newline at end of file
+        pass
+
+    async def run_command_stream(self, command: str, max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                                 timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Run a command and yield stdout/stderr chunks as they arrive, then its exit status."""
+        async for event in stream_command(command, max_bytes=max_bytes, timeout=timeout):
+            yield event
\ No newline at end of file
@@ -6,97 +6,243 @@ Includes:
 
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, List, Optional, Tuple, TypeVar
 from .base import BaseFileHandler
+from .. import metrics
+import asyncio
 import base64
+import functools
+import hashlib
+import os
+import shutil
+import stat
+
+T = TypeVar("T")
+
+# Threads doing the handlers' blocking file I/O. The pool is bounded so that
+# many large transfers queue up instead of taking every thread, and it is
+# separate from the default executor that runs other blocking commands.
+FILE_IO_WORKERS = 4
+
+_file_io_executor: Optional[ThreadPoolExecutor] = None
+
+async def run_file_io(func: Callable[..., T], *args: Any) -> T:
+    """Run blocking file I/O on the file I/O thread pool, keeping the event loop free."""
+    global _file_io_executor
+    if _file_io_executor is None:
+        _file_io_executor = ThreadPoolExecutor(max_workers=FILE_IO_WORKERS, thread_name_prefix="file-io")
+    metrics.FILE_IO_QUEUE_DEPTH.inc()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_file_io_executor, functools.partial(func, *args))
+    finally:
+        metrics.FILE_IO_QUEUE_DEPTH.dec()
 
 def resolve_path(path: str) -> Path:
     """Resolve a path to its absolute path. Expand ~ to the user's home directory."""
     return Path(path).expanduser().resolve()
 
+def file_sha256(path: Path, offset: int = 0, length: Optional[int] = None) -> Tuple[str, int]:
+    """Hash a file, or ``length`` bytes of it from ``offset``, returning the SHA-256 and the bytes hashed."""
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        remaining = length
+        while remaining is None or remaining > 0:
+            chunk = f.read(1024 * 1024 if remaining is None else min(1024 * 1024, remaining))
+            if not chunk:
+                break
+            sha256.update(chunk)
+            size += len(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return sha256.hexdigest(), size
+
+def _entry_type(mode: int) -> str:
+    if stat.S_ISREG(mode):
+        return "file"
+    if stat.S_ISDIR(mode):
+        return "dir"
+    if stat.S_ISLNK(mode):
+        return "symlink"
+    return "other"
+
+def _stat_entry(path: str) -> Dict[str, Any]:
+    try:
+        st = resolve_path(path).stat()
+    except (FileNotFoundError, NotADirectoryError):
+        return {"path": path, "exists": False}
+    except OSError as e:
+        return {"path": path, "exists": False, "error": str(e)}
+    return {"path": path, "exists": True, "type": _entry_type(st.st_mode), "size": st.st_size, "mtime": st.st_mtime}
+
+def _walk(root: Path, with_hash: bool) -> List[Dict[str, Any]]:
+    if not root.is_dir():
+        raise NotADirectoryError(f"Not a directory: {root}")
+
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in dirnames + filenames:
+            full = os.path.join(dirpath, name)
+            st = os.lstat(full)
+            entry = {
+                "path": Path(os.path.relpath(full, root)).as_posix(),
+                "type": _entry_type(st.st_mode),
+                "size": st.st_size,
+                "mtime": st.st_mtime,
+            }
+            if entry["type"] == "symlink":
+                entry["target"] = os.readlink(full)
+            elif entry["type"] == "file" and with_hash:
+                entry["sha256"] = file_sha256(Path(full))[0]
+            entries.append(entry)
+    entries.sort(key=lambda entry: entry["path"])
+    return entries
+
+def _delete(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    else:
+        path.unlink()
+
+def _write_b64(path: str, content_b64: str, append: bool) -> None:
+    with open(resolve_path(path), 'ab' if append else 'wb') as f:
+        f.write(base64.b64decode(content_b64))
+
+def _read_b64(path: str, offset: int, length: Optional[int]) -> str:
+    with open(resolve_path(path), 'rb') as f:
+        if offset > 0:
+            f.seek(offset)
+        content = f.read(length) if length is not None else f.read()
+    return base64.b64encode(content).decode('utf-8')
+
 class GenericFileHandler(BaseFileHandler):
+    """File operations. Blocking I/O runs on the file I/O thread pool, so
+    large files don't hold up other commands."""
+
     async def file_exists(self, path: str) -> Dict[str, Any]:
         try:
-            return {"success": True, "exists": resolve_path(path).is_file()}
+            return {"success": True, "exists": await run_file_io(lambda: resolve_path(path).is_file())}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
     async def directory_exists(self, path: str) -> Dict[str, Any]:
         try:
-            return {"success": True, "exists": resolve_path(path).is_dir()}
+            return {"success": True, "exists": await run_file_io(lambda: resolve_path(path).is_dir())}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
     async def list_dir(self, path: str) -> Dict[str, Any]:
+        def names() -> List[str]:
+            return [p.name for p in resolve_path(path).iterdir() if p.is_file() or p.is_dir()]
+
         try:
-            return {"success": True, "files": [p.name for p in resolve_path(path).iterdir() if p.is_file() or p.is_dir()]}
+            return {"success": True, "files": await run_file_io(names)}
         except Exception as e:
             return {"success": False, "error": str(e)}
         
     async def read_text(self, path: str) -> Dict[str, Any]:
         try:
-            return {"success": True, "content": resolve_path(path).read_text()}
+            return {"success": True, "content": await run_file_io(lambda: resolve_path(path).read_text())}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
     async def write_text(self, path: str, content: str) -> Dict[str, Any]:
         try:
-            resolve_path(path).write_text(content)
+            await run_file_io(lambda: resolve_path(path).write_text(content))
             return {"success": True}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
     async def write_bytes(self, path: str, content_b64: str, append: bool = False) -> Dict[str, Any]:
         try:
-            mode = 'ab' if append else 'wb'
-            with open(resolve_path(path), mode) as f:
-                f.write(base64.b64decode(content_b64))
+            await run_file_io(_write_b64, path, content_b64, append)
             return {"success": True}
         except Exception as e:
             return {"success": False, "error": str(e)}
         
     async def read_bytes(self, path: str, offset: int = 0, length: Optional[int] = None) -> Dict[str, Any]:
         try:
-            file_path = resolve_path(path)
-            with open(file_path, 'rb') as f:
-                if offset > 0:
-                    f.seek(offset)
-                
-                if length is not None:
-                    content = f.read(length)
-                else:
-                    content = f.read()
-                
-            return {"success": True, "content_b64": base64.b64encode(content).decode('utf-8')}
+            return {"success": True, "content_b64": await run_file_io(_read_b64, path, offset, length)}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
     async def get_file_size(self, path: str) -> Dict[str, Any]:
         try:
-            file_path = resolve_path(path)
-            size = file_path.stat().st_size
-            return {"success": True, "size": size}
+            return {"success": True, "size": await run_file_io(lambda: resolve_path(path).stat().st_size)}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def file_hash(self, path: str, offset: int = 0, length: Optional[int] = None) -> Dict[str, Any]:
+        """Compute the SHA-256 of a file, or of ``length`` bytes from ``offset``."""
+        try:
+            sha256, size = await run_file_io(lambda: file_sha256(resolve_path(path), offset, length))
+            return {"success": True, "sha256": sha256, "size": size}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def stat_many(self, paths: List[str]) -> Dict[str, Any]:
+        """Stat several paths at once.
+
+        Each entry has ``path`` and ``exists``; existing paths also have
+        ``type`` ("file", "dir" or "other"), ``size`` and ``mtime``.
+        """
+        try:
+            return {"success": True, "stats": await run_file_io(lambda: [_stat_entry(p) for p in paths])}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    async def walk(self, path: str, hash: bool = False) -> Dict[str, Any]:
+        """List a directory recursively.
+
+        Entries are sorted by ``path``, relative to the directory with "/"
+        separators, and have ``type`` ("file", "dir", "symlink" or "other"),
+        ``size`` and ``mtime``. Symlinks are not followed and have a
+        ``target``; files have a ``sha256`` when ``hash`` is set.
+        """
+        try:
+            return {"success": True, "entries": await run_file_io(lambda: _walk(resolve_path(path), hash))}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def delete_paths(self, paths: List[str]) -> Dict[str, Any]:
+        """Delete files and directory trees; paths that don't exist are skipped."""
+        def delete_all() -> Dict[str, str]:
+            errors = {}
+            for path in paths:
+                try:
+                    # Don't resolve the last component, to delete symlinks rather than their targets
+                    _delete(Path(os.path.abspath(os.path.expanduser(path))))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    errors[path] = str(e)
+            return errors
+
+        errors = await run_file_io(delete_all)
+        if errors:
+            return {"success": False, "error": "; ".join(f"{path}: {error}" for path, error in errors.items())}
+        return {"success": True}
+
     async def delete_file(self, path: str) -> Dict[str, Any]:
         try:
-            resolve_path(path).unlink()
+            await run_file_io(lambda: resolve_path(path).unlink())
             return {"success": True}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
     async def create_dir(self, path: str) -> Dict[str, Any]:
         try:
-            resolve_path(path).mkdir(parents=True, exist_ok=True)
+            await run_file_io(lambda: resolve_path(path).mkdir(parents=True, exist_ok=True))
             return {"success": True}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
     async def delete_dir(self, path: str) -> Dict[str, Any]:
         try:
-            resolve_path(path).rmdir()
+            await run_file_io(lambda: resolve_path(path).rmdir())
             return {"success": True}
         except Exception as e:
             return {"success": False, "error": str(e)}
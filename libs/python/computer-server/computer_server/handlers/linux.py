@@ -7,13 +7,14 @@ To use GUI automation in a headless environment:
 1. Install Xvfb: sudo apt-get install xvfb
 2. Run with virtual display: xvfb-run python -m computer_server
 """
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Awaitable, Callable, Dict, Any, List, Tuple, Optional
 import logging
 import subprocess
 import asyncio
 import base64
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
 # Configure logger
@@ -29,10 +30,10 @@ try:
 except Exception as e:
     logger.warning(f"pyautogui import failed: {str(e)}. GUI operations will be simulated.")
 
-from pynput.mouse import Button, Controller as MouseController
-from pynput.keyboard import Key, Controller as KeyboardController
-
 from .base import BaseAccessibilityHandler, BaseAutomationHandler
+from .linux_capture import CaptureBackend, PyAutoGUIBackend, select_backend
+from .linux_input import InputBackend, select_input_backend
+from .. import metrics
 
 class LinuxAccessibilityHandler(BaseAccessibilityHandler):
     """Linux implementation of accessibility handler."""
@@ -86,167 +87,118 @@ class LinuxAccessibilityHandler(BaseAccessibilityHandler):
         return 1920, 1080
 
 class LinuxAutomationHandler(BaseAutomationHandler):
-    """Linux implementation of automation handler using pyautogui."""
-    keyboard = KeyboardController()
-    
-    # Mouse Actions
-    async def mouse_down(self, x: Optional[int] = None, y: Optional[int] = None, button: str = "left") -> Dict[str, Any]:
+    """Linux implementation of automation handler using XTest or pyautogui."""
+    # Chosen on the first screenshot, see linux_capture
+    capture_backend: Optional[CaptureBackend] = None
+    # Screenshots are taken on this thread, off the event loop. Choosing a
+    # backend takes several captures, and some backends keep per-thread
+    # display connections, so selection and captures share one thread.
+    _capture_executor: Optional[ThreadPoolExecutor] = None
+    # Chosen on the first input action, see linux_input
+    input_backend: Optional[InputBackend] = None
+
+    def _capture(self):
+        if self.capture_backend is None:
+            self.capture_backend = select_backend()
         try:
-            if x is not None and y is not None:
-                pyautogui.moveTo(x, y)
-            pyautogui.mouseDown(button=button)
-            return {"success": True}
+            return self.capture_backend.capture()
         except Exception as e:
-            return {"success": False, "error": str(e)}
-    
-    async def mouse_up(self, x: Optional[int] = None, y: Optional[int] = None, button: str = "left") -> Dict[str, Any]:
+            if isinstance(self.capture_backend, PyAutoGUIBackend):
+                raise
+            logger.warning(f"Screenshot backend {self.capture_backend.name} failed ({e}), falling back to pyautogui")
+            self.capture_backend.close()
+            self.capture_backend = PyAutoGUIBackend()
+            return self.capture_backend.capture()
+
+    async def _send_input(self, action: Callable[[InputBackend], Awaitable[None]]) -> Dict[str, Any]:
         try:
-            if x is not None and y is not None:
-                pyautogui.moveTo(x, y)
-            pyautogui.mouseUp(button=button)
+            if self.input_backend is None:
+                self.input_backend = select_input_backend()
+            await action(self.input_backend)
             return {"success": True}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
         except Exception as e:
+            # Select a backend again on the next action, in case the display connection was lost
+            if self.input_backend is not None:
+                self.input_backend.close()
+                self.input_backend = None
             return {"success": False, "error": str(e)}
     
+    # Mouse Actions
+    async def mouse_down(self, x: Optional[int] = None, y: Optional[int] = None, button: str = "left") -> Dict[str, Any]:
+        return await self._send_input(lambda backend: backend.mouse_down(x, y, button))
+    
+    async def mouse_up(self, x: Optional[int] = None, y: Optional[int] = None, button: str = "left") -> Dict[str, Any]:
+        return await self._send_input(lambda backend: backend.mouse_up(x, y, button))
+    
     async def move_cursor(self, x: int, y: int) -> Dict[str, Any]:
-        try:
-            pyautogui.moveTo(x, y)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.move(x, y))
 
     async def left_click(self, x: Optional[int] = None, y: Optional[int] = None) -> Dict[str, Any]:
-        try:
-            if x is not None and y is not None:
-                pyautogui.moveTo(x, y)
-            pyautogui.click()
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.click(x, y, "left"))
 
     async def right_click(self, x: Optional[int] = None, y: Optional[int] = None) -> Dict[str, Any]:
-        try:
-            if x is not None and y is not None:
-                pyautogui.moveTo(x, y)
-            pyautogui.rightClick()
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.click(x, y, "right"))
 
     async def double_click(self, x: Optional[int] = None, y: Optional[int] = None) -> Dict[str, Any]:
-        try:
-            if x is not None and y is not None:
-                pyautogui.moveTo(x, y)
-            pyautogui.doubleClick(interval=0.1)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.click(x, y, "left", clicks=2))
 
     async def click(self, x: Optional[int] = None, y: Optional[int] = None, button: str = "left") -> Dict[str, Any]:
-        try:
-            if x is not None and y is not None:
-                pyautogui.moveTo(x, y)
-            pyautogui.click(button=button)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.click(x, y, button))
 
     async def drag_to(self, x: int, y: int, button: str = "left", duration: float = 0.5) -> Dict[str, Any]:
-        try:
-            pyautogui.dragTo(x, y, duration=duration, button=button)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.drag_to(x, y, button, duration))
 
     async def drag(self, start_x: int, start_y: int, end_x: int, end_y: int, button: str = "left") -> Dict[str, Any]:
-        try:
-            pyautogui.moveTo(start_x, start_y)
-            pyautogui.dragTo(end_x, end_y, duration=0.5, button=button)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.drag_path([(start_x, start_y), (end_x, end_y)], button))
 
     async def drag_path(self, path: List[Tuple[int, int]], button: str = "left", duration: float = 0.5) -> Dict[str, Any]:
-        try:
-            if not path:
-                return {"success": False, "error": "Path is empty"}
-            pyautogui.moveTo(*path[0])
-            for x, y in path[1:]:
-                pyautogui.dragTo(x, y, duration=duration, button=button)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        if not path:
+            return {"success": False, "error": "Path is empty"}
+        return await self._send_input(lambda backend: backend.drag_path(path, button, duration))
 
     # Keyboard Actions
     async def key_down(self, key: str) -> Dict[str, Any]:
-        try:
-            pyautogui.keyDown(key)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.key_down(key))
         
     async def key_up(self, key: str) -> Dict[str, Any]:
-        try:
-            pyautogui.keyUp(key)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.key_up(key))
     
     async def type_text(self, text: str) -> Dict[str, Any]:
-        try:
-            # use pynput for Unicode support
-            self.keyboard.type(text)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.type_text(text))
 
     async def press_key(self, key: str) -> Dict[str, Any]:
-        try:
-            pyautogui.press(key)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.press(key))
 
     async def hotkey(self, keys: List[str]) -> Dict[str, Any]:
-        try:
-            pyautogui.hotkey(*keys)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.hotkey(keys))
 
     # Scrolling Actions
     async def scroll(self, x: int, y: int) -> Dict[str, Any]:
-        try:
-            pyautogui.scroll(x, y)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.scroll(x, y))
     
     async def scroll_down(self, clicks: int = 1) -> Dict[str, Any]:
-        try:
-            pyautogui.scroll(-clicks)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.scroll(0, -clicks))
 
     async def scroll_up(self, clicks: int = 1) -> Dict[str, Any]:
-        try:
-            pyautogui.scroll(clicks)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._send_input(lambda backend: backend.scroll(0, clicks))
 
     # Screen Actions
     async def screenshot(self) -> Dict[str, Any]:
         try:
             from PIL import Image
-            screenshot = pyautogui.screenshot()
+            if LinuxAutomationHandler._capture_executor is None:
+                LinuxAutomationHandler._capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot")
+            with metrics.phase("screenshot", "capture"):
+                screenshot = await asyncio.get_running_loop().run_in_executor(self._capture_executor, self._capture)
             if not isinstance(screenshot, Image.Image):
                 return {"success": False, "error": "Failed to capture screenshot"}
-            buffered = BytesIO()
-            screenshot.save(buffered, format="PNG", optimize=True)
-            buffered.seek(0)
-            image_data = base64.b64encode(buffered.getvalue()).decode()
+            with metrics.phase("screenshot", "encode"):
+                buffered = BytesIO()
+                screenshot.save(buffered, format="PNG", optimize=True)
+                buffered.seek(0)
+                image_data = base64.b64encode(buffered.getvalue()).decode()
             return {"success": True, "image_data": image_data}
         except Exception as e:
             return {"success": False, "error": f"Screenshot error: {str(e)}"}
@@ -0,0 +1,367 @@
+"""
+Screen capture backends for the Linux handler.
+
+pyautogui captures the screen by running ``scrot`` or through a slow
+Xlib path, hundreds of milliseconds for a 1080p frame. The backends here
+keep a display connection open between captures:
+
+- ``xshm``: the MIT-SHM extension through libX11/libXext. The X server
+  copies the frame into a shared memory segment that is reused for every
+  capture, so no pixels go through the socket.
+- ``mss``: the mss package.
+- ``xlib``: ``XGetImage`` through python-xlib, with the frame sent over
+  the X connection.
+- ``pyautogui``: the previous behavior, as the fallback.
+
+``select_backend`` measures the available backends on the current display
+and keeps the fastest, falling back to pyautogui, which isn't measured, if
+none works. ``CUA_SCREENSHOT_BACKEND`` forces one by name.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Captures timed per backend when selecting one; the first is a warm-up
+SELECTION_CAPTURES = 3
+
+
+class CaptureBackend:
+    """Captures the whole screen as an RGB image."""
+
+    name = ""
+
+    def capture(self) -> Image.Image:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class PyAutoGUIBackend(CaptureBackend):
+    name = "pyautogui"
+
+    def capture(self) -> Image.Image:
+        import pyautogui
+        return pyautogui.screenshot()
+
+
+class XlibBackend(CaptureBackend):
+    """``XGetImage`` over a persistent python-xlib connection."""
+
+    name = "xlib"
+
+    def __init__(self) -> None:
+        from Xlib import X, display
+
+        self._z_pixmap = X.ZPixmap
+        self._display = display.Display()
+        self._root = self._display.screen().root
+
+    def capture(self) -> Image.Image:
+        geometry = self._root.get_geometry()
+        size = (geometry.width, geometry.height)
+        reply = self._root.get_image(0, 0, size[0], size[1], self._z_pixmap, 0xFFFFFFFF)
+        return Image.frombuffer("RGB", size, reply.data, "raw", "BGRX", 0, 1)
+
+    def close(self) -> None:
+        self._display.close()
+
+
+class MssBackend(CaptureBackend):
+    name = "mss"
+
+    def __init__(self) -> None:
+        import mss
+
+        self._mss = mss.mss()
+
+    def capture(self) -> Image.Image:
+        # Monitor 0 spans all monitors
+        shot = self._mss.grab(self._mss.monitors[0])
+        return Image.frombuffer("RGB", shot.size, shot.bgra, "raw", "BGRX", 0, 1)
+
+    def close(self) -> None:
+        self._mss.close()
+
+
+class _XImage(ctypes.Structure):
+    # The leading fields of XImage, up to the ones read here
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong),
+        ("green_mask", ctypes.c_ulong),
+        ("blue_mask", ctypes.c_ulong),
+        ("obdata", ctypes.c_void_p),
+    ]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+class _XWindowAttributes(ctypes.Structure):
+    # The leading fields of XWindowAttributes
+    _fields_ = [
+        ("x", ctypes.c_int),
+        ("y", ctypes.c_int),
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+    ] + [("_rest", ctypes.c_char * 256)]
+
+
+_X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+
+_Z_PIXMAP = 2
+_ALL_PLANES = ctypes.c_ulong(-1).value
+_IPC_PRIVATE = 0
+_IPC_CREAT = 0o1000
+_IPC_RMID = 0
+
+
+# The code of the last X error, set by _on_x_error
+_x_error: Optional[int] = None
+
+
+@_X_ERROR_HANDLER
+def _on_x_error(display: int, event: int) -> int:
+    # Xlib's default handler exits the process, e.g. when the X server runs
+    # on another host and can't attach a shared memory segment.
+    # XErrorEvent starts with type, display, resourceid and serial.
+    global _x_error
+    _x_error = ctypes.cast(event, ctypes.POINTER(ctypes.c_ubyte))[ctypes.sizeof(ctypes.c_void_p) * 4]
+    return 0
+
+
+def _load(name: str) -> ctypes.CDLL:
+    path = ctypes.util.find_library(name)
+    if not path:
+        raise OSError(f"lib{name} not found")
+    return ctypes.CDLL(path, use_errno=True)
+
+
+def _bind(lib: ctypes.CDLL, name: str, restype, *argtypes) -> Callable:
+    function = getattr(lib, name)
+    function.restype = restype
+    function.argtypes = argtypes
+    return function
+
+
+class XShmBackend(CaptureBackend):
+    """``XShmGetImage`` into a shared memory segment kept between captures."""
+
+    name = "xshm"
+
+    def __init__(self) -> None:
+        x11, xext, libc = _load("X11"), _load("Xext"), _load("c")
+        p = ctypes.c_void_p
+        self._XOpenDisplay = _bind(x11, "XOpenDisplay", p, ctypes.c_char_p)
+        self._XCloseDisplay = _bind(x11, "XCloseDisplay", ctypes.c_int, p)
+        self._XDefaultScreen = _bind(x11, "XDefaultScreen", ctypes.c_int, p)
+        self._XRootWindow = _bind(x11, "XRootWindow", ctypes.c_ulong, p, ctypes.c_int)
+        self._XDefaultVisual = _bind(x11, "XDefaultVisual", p, p, ctypes.c_int)
+        self._XDefaultDepth = _bind(x11, "XDefaultDepth", ctypes.c_int, p, ctypes.c_int)
+        self._XGetWindowAttributes = _bind(
+            x11, "XGetWindowAttributes", ctypes.c_int, p, ctypes.c_ulong, ctypes.POINTER(_XWindowAttributes)
+        )
+        self._XSync = _bind(x11, "XSync", ctypes.c_int, p, ctypes.c_int)
+        self._XDestroyImage = _bind(x11, "XDestroyImage", ctypes.c_int, ctypes.POINTER(_XImage))
+        self._XSetErrorHandler = _bind(x11, "XSetErrorHandler", p, _X_ERROR_HANDLER)
+        self._XShmQueryExtension = _bind(xext, "XShmQueryExtension", ctypes.c_int, p)
+        self._XShmCreateImage = _bind(
+            xext, "XShmCreateImage", ctypes.POINTER(_XImage),
+            p, p, ctypes.c_uint, ctypes.c_int, p, ctypes.POINTER(_XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint,
+        )
+        self._XShmAttach = _bind(xext, "XShmAttach", ctypes.c_int, p, ctypes.POINTER(_XShmSegmentInfo))
+        self._XShmDetach = _bind(xext, "XShmDetach", ctypes.c_int, p, ctypes.POINTER(_XShmSegmentInfo))
+        self._XShmGetImage = _bind(
+            xext, "XShmGetImage", ctypes.c_int, p, ctypes.c_ulong, ctypes.POINTER(_XImage), ctypes.c_int, ctypes.c_int,
+            ctypes.c_ulong,
+        )
+        self._shmget = _bind(libc, "shmget", ctypes.c_int, ctypes.c_int, ctypes.c_size_t, ctypes.c_int)
+        self._shmat = _bind(libc, "shmat", p, ctypes.c_int, p, ctypes.c_int)
+        self._shmdt = _bind(libc, "shmdt", ctypes.c_int, p)
+        self._shmctl = _bind(libc, "shmctl", ctypes.c_int, ctypes.c_int, ctypes.c_int, p)
+
+        self._XSetErrorHandler(_on_x_error)
+
+        self._display = self._XOpenDisplay(None)
+        if not self._display:
+            raise OSError("Cannot open display")
+        if not self._XShmQueryExtension(self._display):
+            self._XCloseDisplay(self._display)
+            raise OSError("The X server has no MIT-SHM extension")
+        screen = self._XDefaultScreen(self._display)
+        self._root = self._XRootWindow(self._display, screen)
+        self._visual = self._XDefaultVisual(self._display, screen)
+        self._depth = self._XDefaultDepth(self._display, screen)
+        self._image: Optional[ctypes._Pointer] = None
+        self._segment = _XShmSegmentInfo()
+
+    def _screen_size(self) -> tuple:
+        attributes = _XWindowAttributes()
+        self._XGetWindowAttributes(self._display, self._root, ctypes.byref(attributes))
+        return attributes.width, attributes.height
+
+    def _allocate(self, width: int, height: int) -> None:
+        self._release()
+        segment = _XShmSegmentInfo()
+        image = self._XShmCreateImage(
+            self._display, self._visual, self._depth, _Z_PIXMAP, None, ctypes.byref(segment), width, height
+        )
+        if not image:
+            raise OSError("XShmCreateImage failed")
+        size = image.contents.bytes_per_line * height
+        segment.shmid = self._shmget(_IPC_PRIVATE, size, _IPC_CREAT | 0o600)
+        if segment.shmid < 0:
+            self._destroy(image)
+            raise OSError(ctypes.get_errno(), "shmget failed")
+        address = self._shmat(segment.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            self._shmctl(segment.shmid, _IPC_RMID, None)
+            self._destroy(image)
+            raise OSError(ctypes.get_errno(), "shmat failed")
+        segment.shmaddr = image.contents.data = address
+        segment.readOnly = 0
+
+        global _x_error
+        _x_error = None
+        self._XShmAttach(self._display, ctypes.byref(segment))
+        self._XSync(self._display, 0)
+        # Freed once both this process and the X server detach
+        self._shmctl(segment.shmid, _IPC_RMID, None)
+        self._image, self._segment = image, segment
+        if _x_error is not None:
+            error, _x_error = _x_error, None
+            self._release()
+            raise OSError(f"XShmAttach failed with X error {error}")
+
+    def _destroy(self, image: "ctypes._Pointer") -> None:
+        # XDestroyImage frees data and obdata, which are the shared memory
+        # segment and a structure owned by this object
+        image.contents.data = None
+        image.contents.obdata = None
+        self._XDestroyImage(image)
+
+    def _release(self) -> None:
+        if self._image is None:
+            return
+        self._XShmDetach(self._display, ctypes.byref(self._segment))
+        self._XSync(self._display, 0)
+        self._shmdt(self._segment.shmaddr)
+        self._destroy(self._image)
+        self._image = None
+
+    def capture(self) -> Image.Image:
+        width, height = self._screen_size()
+        if self._image is None or (self._image.contents.width, self._image.contents.height) != (width, height):
+            self._allocate(width, height)
+        image = self._image.contents
+        if image.bits_per_pixel != 32:
+            raise OSError(f"Unsupported pixel format: {image.bits_per_pixel} bits per pixel")
+
+        global _x_error
+        _x_error = None
+        if not self._XShmGetImage(self._display, self._root, self._image, 0, 0, _ALL_PLANES) or _x_error is not None:
+            raise OSError(f"XShmGetImage failed with X error {_x_error}")
+        frame = (ctypes.c_char * (image.bytes_per_line * height)).from_address(image.data)
+        return Image.frombuffer("RGB", (width, height), frame, "raw", "BGRX", image.bytes_per_line, 1)
+
+    def close(self) -> None:
+        if self._display:
+            self._release()
+            self._XCloseDisplay(self._display)
+            self._display = None
+
+
+BACKENDS: Dict[str, Callable[[], CaptureBackend]] = {
+    "xshm": XShmBackend,
+    "mss": MssBackend,
+    "xlib": XlibBackend,
+    "pyautogui": PyAutoGUIBackend,
+}
+
+
+def _time_backend(backend: CaptureBackend) -> float:
+    """Median of ``SELECTION_CAPTURES`` captures after a warm-up, in seconds."""
+    backend.capture()
+    times = []
+    for _ in range(SELECTION_CAPTURES):
+        start = time.perf_counter()
+        image = backend.capture()
+        times.append(time.perf_counter() - start)
+        if not isinstance(image, Image.Image) or image.size[0] <= 0:
+            raise OSError("Captured no image")
+    return sorted(times)[len(times) // 2]
+
+
+def available_backends(names: Optional[List[str]] = None) -> List[CaptureBackend]:
+    """Open every backend that works on the current display, in ``BACKENDS`` order."""
+    backends = []
+    for name in names or list(BACKENDS):
+        try:
+            backends.append(BACKENDS[name]())
+        except Exception as e:
+            logger.debug(f"Screenshot backend {name} unavailable: {e}")
+    return backends
+
+
+def select_backend() -> CaptureBackend:
+    """The backend forced by ``CUA_SCREENSHOT_BACKEND``, or else the fastest one that works.
+
+    Choosing one takes several captures per backend, so this blocks for a
+    while. pyautogui is only used when no other backend works, so it isn't
+    measured.
+
+    Raises:
+        ValueError: If ``CUA_SCREENSHOT_BACKEND`` names an unknown backend
+    """
+    forced = os.environ.get("CUA_SCREENSHOT_BACKEND")
+    if forced:
+        if forced not in BACKENDS:
+            raise ValueError(f"Unknown screenshot backend {forced!r}, expected one of {', '.join(BACKENDS)}")
+        return BACKENDS[forced]()
+
+    best, best_time = None, float("inf")
+    for backend in available_backends([name for name in BACKENDS if name != PyAutoGUIBackend.name]):
+        try:
+            elapsed = _time_backend(backend)
+        except Exception as e:
+            logger.debug(f"Screenshot backend {backend.name} failed: {e}")
+            backend.close()
+            continue
+        logger.debug(f"Screenshot backend {backend.name}: {elapsed * 1000:.1f} ms per capture")
+        if elapsed < best_time:
+            if best is not None:
+                best.close()
+            best, best_time = backend, elapsed
+        else:
+            backend.close()
+
+    if best is None:
+        return PyAutoGUIBackend()
+    logger.info(f"Using the {best.name} screenshot backend ({best_time * 1000:.1f} ms per capture)")
+    return best
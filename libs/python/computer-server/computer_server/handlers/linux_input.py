@@ -0,0 +1,482 @@
+"""
+Mouse and keyboard input backends for the Linux handler.
+
+pyautogui sleeps ``pyautogui.PAUSE`` after every call and pynput types one
+round trip per key. The ``xtest`` backend sends synthetic events with the
+XTEST extension over a persistent python-xlib connection instead. Every
+action queues all of its events, a whole string or drag path included, and
+flushes them to the X server once. Delays between events, such as the
+steps of a drag, are left to the X server through the XTest event time.
+
+- ``xtest``: XTest over python-xlib, used when the display supports it.
+- ``pyautogui``: the previous behavior, as the fallback.
+
+``CUA_INPUT_BACKEND`` forces one by name.
+"""
+
+import asyncio
+import logging
+import math
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Events per second sent while dragging
+DRAG_RATE = 60
+
+# Delay between the clicks of a double click, as pyautogui uses
+MULTI_CLICK_INTERVAL = 0.1
+
+# X button numbers
+BUTTONS = {"left": 1, "middle": 2, "right": 3}
+SCROLL_UP, SCROLL_DOWN, SCROLL_LEFT, SCROLL_RIGHT = 4, 5, 6, 7
+
+# pyautogui key names that aren't X keysym names
+KEY_NAMES = {
+    "enter": "Return",
+    "return": "Return",
+    "\n": "Return",
+    "\r": "Return",
+    "\t": "Tab",
+    "tab": "Tab",
+    "space": "space",
+    "esc": "Escape",
+    "escape": "Escape",
+    "backspace": "BackSpace",
+    "delete": "Delete",
+    "del": "Delete",
+    "insert": "Insert",
+    "home": "Home",
+    "end": "End",
+    "pageup": "Prior",
+    "pgup": "Prior",
+    "pagedown": "Next",
+    "pgdn": "Next",
+    "up": "Up",
+    "down": "Down",
+    "left": "Left",
+    "right": "Right",
+    "shift": "Shift_L",
+    "shiftleft": "Shift_L",
+    "shiftright": "Shift_R",
+    "ctrl": "Control_L",
+    "ctrlleft": "Control_L",
+    "ctrlright": "Control_R",
+    "alt": "Alt_L",
+    "altleft": "Alt_L",
+    "altright": "Alt_R",
+    "option": "Alt_L",
+    "win": "Super_L",
+    "winleft": "Super_L",
+    "winright": "Super_R",
+    "super": "Super_L",
+    "command": "Super_L",
+    "cmd": "Super_L",
+    "meta": "Super_L",
+    "capslock": "Caps_Lock",
+    "numlock": "Num_Lock",
+    "scrolllock": "Scroll_Lock",
+    "printscreen": "Print",
+    "prtsc": "Print",
+    "pause": "Pause",
+    "apps": "Menu",
+    "menu": "Menu",
+    **{f"f{number}": f"F{number}" for number in range(1, 25)},
+}
+
+
+def char_keysym(char: str) -> int:
+    """The keysym typing ``char`` produces.
+
+    Latin-1 characters are their own keysyms; other characters use the
+    Unicode keysym range.
+    """
+    if char in KEY_NAMES:
+        from Xlib import XK
+        return XK.string_to_keysym(KEY_NAMES[char])
+    code = ord(char)
+    if 0x20 <= code <= 0x7E or 0xA0 <= code <= 0xFF:
+        return code
+    return 0x01000000 | code
+
+
+def key_keysym(key: str) -> int:
+    """The keysym of a pyautogui key name, a single character or an X keysym name.
+
+    Raises:
+        ValueError: If the key is unknown
+    """
+    if len(key) == 1:
+        return char_keysym(key)
+    from Xlib import XK
+    keysym = XK.string_to_keysym(KEY_NAMES.get(key.lower(), key))
+    if not keysym:
+        raise ValueError(f"Unknown key {key!r}")
+    return keysym
+
+
+def drag_points(path: Sequence[Tuple[int, int]], duration: float) -> List[Tuple[int, int]]:
+    """The points to move through when dragging along ``path`` in ``duration`` seconds.
+
+    Paths with fewer points than ``DRAG_RATE`` moves per second are
+    interpolated at even distances along their length.
+    """
+    points = [(int(x), int(y)) for x, y in path]
+    steps = max(int(duration * DRAG_RATE), 1)
+    lengths = [math.dist(a, b) for a, b in zip(points, points[1:])]
+    total = sum(lengths)
+    if len(points) - 1 >= steps or total == 0:
+        return points
+
+    result = [points[0]]
+    segment, travelled = 0, 0.0
+    for step in range(1, steps + 1):
+        target = total * step / steps
+        while segment < len(lengths) - 1 and travelled + lengths[segment] < target:
+            travelled += lengths[segment]
+            segment += 1
+        (x0, y0), (x1, y1) = points[segment], points[segment + 1]
+        fraction = min((target - travelled) / lengths[segment], 1.0) if lengths[segment] else 1.0
+        result.append((round(x0 + (x1 - x0) * fraction), round(y0 + (y1 - y0) * fraction)))
+    return result
+
+
+class InputBackend:
+    """Injects mouse and keyboard input. Coordinates are screen pixels."""
+
+    name = ""
+
+    async def move(self, x: int, y: int) -> None:
+        raise NotImplementedError
+
+    async def mouse_down(self, x: Optional[int], y: Optional[int], button: str = "left") -> None:
+        raise NotImplementedError
+
+    async def mouse_up(self, x: Optional[int], y: Optional[int], button: str = "left") -> None:
+        raise NotImplementedError
+
+    async def click(self, x: Optional[int], y: Optional[int], button: str = "left", clicks: int = 1) -> None:
+        raise NotImplementedError
+
+    async def drag_path(self, path: Sequence[Tuple[int, int]], button: str = "left", duration: float = 0.5) -> None:
+        """Press ``button`` at the first point, move through the others and release it, in ``duration`` seconds."""
+        raise NotImplementedError
+
+    async def drag_to(self, x: int, y: int, button: str = "left", duration: float = 0.5) -> None:
+        raise NotImplementedError
+
+    async def key_down(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def key_up(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def press(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def hotkey(self, keys: Sequence[str]) -> None:
+        raise NotImplementedError
+
+    async def type_text(self, text: str) -> None:
+        raise NotImplementedError
+
+    async def scroll(self, x: int, y: int) -> None:
+        """Scroll ``x`` clicks right and ``y`` clicks up; negative values scroll left and down."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class PyAutoGUIInput(InputBackend):
+    """pyautogui, with pynput for typing Unicode text."""
+
+    name = "pyautogui"
+
+    def __init__(self) -> None:
+        import pyautogui
+        from pynput.keyboard import Controller
+
+        self._pyautogui = pyautogui
+        self._keyboard = Controller()
+
+    async def move(self, x: int, y: int) -> None:
+        self._pyautogui.moveTo(x, y)
+
+    async def mouse_down(self, x: Optional[int], y: Optional[int], button: str = "left") -> None:
+        if x is not None and y is not None:
+            self._pyautogui.moveTo(x, y)
+        self._pyautogui.mouseDown(button=button)
+
+    async def mouse_up(self, x: Optional[int], y: Optional[int], button: str = "left") -> None:
+        if x is not None and y is not None:
+            self._pyautogui.moveTo(x, y)
+        self._pyautogui.mouseUp(button=button)
+
+    async def click(self, x: Optional[int], y: Optional[int], button: str = "left", clicks: int = 1) -> None:
+        if x is not None and y is not None:
+            self._pyautogui.moveTo(x, y)
+        self._pyautogui.click(button=button, clicks=clicks, interval=MULTI_CLICK_INTERVAL if clicks > 1 else 0.0)
+
+    async def drag_path(self, path: Sequence[Tuple[int, int]], button: str = "left", duration: float = 0.5) -> None:
+        self._pyautogui.moveTo(*path[0])
+        step_duration = duration / (len(path) - 1) if len(path) > 1 else 0.0
+        for x, y in path[1:]:
+            self._pyautogui.dragTo(x, y, duration=step_duration, button=button)
+
+    async def drag_to(self, x: int, y: int, button: str = "left", duration: float = 0.5) -> None:
+        self._pyautogui.dragTo(x, y, duration=duration, button=button)
+
+    async def key_down(self, key: str) -> None:
+        self._pyautogui.keyDown(key)
+
+    async def key_up(self, key: str) -> None:
+        self._pyautogui.keyUp(key)
+
+    async def press(self, key: str) -> None:
+        self._pyautogui.press(key)
+
+    async def hotkey(self, keys: Sequence[str]) -> None:
+        self._pyautogui.hotkey(*keys)
+
+    async def type_text(self, text: str) -> None:
+        self._keyboard.type(text)
+
+    async def scroll(self, x: int, y: int) -> None:
+        if y:
+            self._pyautogui.scroll(y)
+        if x:
+            self._pyautogui.hscroll(x)
+
+
+class XTestInput(InputBackend):
+    """XTest events over a persistent python-xlib connection.
+
+    Characters without a keycode in the current keyboard mapping are
+    typed by mapping them onto keycodes that have no keysyms. Those
+    mappings are kept for later text, reusing the least recently used
+    keycode when all are taken, and removed on ``close()``.
+    """
+
+    name = "xtest"
+
+    def __init__(self) -> None:
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+
+        self._X = X
+        self._fake_input = xtest.fake_input
+        self._display = display.Display()
+        if not self._display.has_extension("XTEST"):
+            self._display.close()
+            raise OSError("The display has no XTEST extension")
+        self._root = self._display.screen().root
+        self._shift = self._display.keysym_to_keycode(XK.string_to_keysym("Shift_L"))
+        # Serializes actions, so one never waits on the events of another
+        self._lock: Optional[asyncio.Lock] = None
+
+        first = self._display.display.info.min_keycode
+        count = self._display.display.info.max_keycode - first + 1
+        mapping = self._display.get_keyboard_mapping(first, count)
+        self._keysyms_per_keycode = len(mapping[0]) if mapping else 1
+        self._spare = [first + i for i, keysyms in enumerate(mapping) if not any(keysyms)]
+        # Keysyms mapped onto spare keycodes, least recently used first
+        self._remapped: "OrderedDict[int, int]" = OrderedDict()
+
+    def _event(self, event_type: int, detail: int = 0, delay: int = 0, **position: int) -> None:
+        # The XTest time is a delay in milliseconds before the X server plays the event
+        self._fake_input(self._display, event_type, detail, delay, **position)
+
+    async def _send(self, build: Callable[[], Optional[int]]) -> None:
+        """Queue the events from ``build``, flush them once and wait out their delays.
+
+        ``build`` returns the sum of the delays it queued in milliseconds, if any.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            delay = build()
+            self._display.flush()
+            if delay:
+                await asyncio.sleep(delay / 1000)
+                self._display.sync()
+
+    def _button(self, button: str) -> int:
+        if button not in BUTTONS:
+            raise ValueError(f"Unknown button {button!r}, expected one of {', '.join(BUTTONS)}")
+        return BUTTONS[button]
+
+    def _move(self, x: Optional[int], y: Optional[int], delay: int = 0) -> None:
+        if x is not None and y is not None:
+            self._event(self._X.MotionNotify, 0, delay, root=self._root.id, x=int(x), y=int(y))
+
+    def _keycode(self, keysym: int) -> Tuple[int, bool]:
+        """A keycode producing ``keysym``, and whether Shift must be held for it."""
+        if keysym in self._remapped:
+            self._remapped.move_to_end(keysym)
+            return self._remapped[keysym], False
+        for keycode, index in self._display.keysym_to_keycodes(keysym):
+            if index in (0, 1) and keycode not in self._remapped.values():
+                return keycode, index == 1
+        return self._remap(keysym), False
+
+    def _remap(self, keysym: int) -> int:
+        if len(self._remapped) < len(self._spare):
+            keycode = self._spare[len(self._remapped)]
+        elif self._spare:
+            _, keycode = self._remapped.popitem(last=False)
+        else:
+            raise ValueError(f"No keycode produces keysym {keysym:#x} and none is free to map it to")
+        # Queued with the key events, so it takes effect in order with them
+        self._display.change_keyboard_mapping(keycode, [(keysym,) * self._keysyms_per_keycode])
+        self._remapped[keysym] = keycode
+        return keycode
+
+    def _tap(self, keysym: int) -> None:
+        keycode, shift = self._keycode(keysym)
+        if shift:
+            self._event(self._X.KeyPress, self._shift)
+        self._event(self._X.KeyPress, keycode)
+        self._event(self._X.KeyRelease, keycode)
+        if shift:
+            self._event(self._X.KeyRelease, self._shift)
+
+    async def move(self, x: int, y: int) -> None:
+        await self._send(lambda: self._move(x, y))
+
+    async def mouse_down(self, x: Optional[int], y: Optional[int], button: str = "left") -> None:
+        detail = self._button(button)
+
+        def build() -> None:
+            self._move(x, y)
+            self._event(self._X.ButtonPress, detail)
+
+        await self._send(build)
+
+    async def mouse_up(self, x: Optional[int], y: Optional[int], button: str = "left") -> None:
+        detail = self._button(button)
+
+        def build() -> None:
+            self._move(x, y)
+            self._event(self._X.ButtonRelease, detail)
+
+        await self._send(build)
+
+    async def click(self, x: Optional[int], y: Optional[int], button: str = "left", clicks: int = 1) -> None:
+        detail = self._button(button)
+        interval = int(MULTI_CLICK_INTERVAL * 1000)
+
+        def build() -> int:
+            self._move(x, y)
+            for i in range(clicks):
+                self._event(self._X.ButtonPress, detail, interval if i else 0)
+                self._event(self._X.ButtonRelease, detail)
+            return interval * (clicks - 1)
+
+        await self._send(build)
+
+    async def drag_path(self, path: Sequence[Tuple[int, int]], button: str = "left", duration: float = 0.5) -> None:
+        detail = self._button(button)
+        points = drag_points(path, duration)
+
+        def build() -> int:
+            self._move(*points[0])
+            self._event(self._X.ButtonPress, detail)
+            # Spread the duration over the moves, carrying rounding to whole milliseconds
+            elapsed = 0
+            for step, (x, y) in enumerate(points[1:], 1):
+                target = round(duration * 1000 * step / (len(points) - 1))
+                self._move(x, y, target - elapsed)
+                elapsed = target
+            self._event(self._X.ButtonRelease, detail)
+            return elapsed
+
+        await self._send(build)
+
+    async def drag_to(self, x: int, y: int, button: str = "left", duration: float = 0.5) -> None:
+        pointer = self._root.query_pointer()
+        await self.drag_path([(pointer.root_x, pointer.root_y), (x, y)], button, duration)
+
+    async def key_down(self, key: str) -> None:
+        keysym = key_keysym(key)
+        await self._send(lambda: self._event(self._X.KeyPress, self._keycode(keysym)[0]))
+
+    async def key_up(self, key: str) -> None:
+        keysym = key_keysym(key)
+        await self._send(lambda: self._event(self._X.KeyRelease, self._keycode(keysym)[0]))
+
+    async def press(self, key: str) -> None:
+        keysym = key_keysym(key)
+        await self._send(lambda: self._tap(keysym))
+
+    async def hotkey(self, keys: Sequence[str]) -> None:
+        keysyms = [key_keysym(key) for key in keys]
+
+        def build() -> None:
+            keycodes = [self._keycode(keysym)[0] for keysym in keysyms]
+            for keycode in keycodes:
+                self._event(self._X.KeyPress, keycode)
+            for keycode in reversed(keycodes):
+                self._event(self._X.KeyRelease, keycode)
+
+        await self._send(build)
+
+    async def type_text(self, text: str) -> None:
+        keysyms = [char_keysym(char) for char in text]
+
+        def build() -> None:
+            for keysym in keysyms:
+                self._tap(keysym)
+
+        await self._send(build)
+
+    async def scroll(self, x: int, y: int) -> None:
+        clicks = [(SCROLL_UP if y > 0 else SCROLL_DOWN, abs(y)), (SCROLL_RIGHT if x > 0 else SCROLL_LEFT, abs(x))]
+
+        def build() -> None:
+            for detail, count in clicks:
+                for _ in range(count):
+                    self._event(self._X.ButtonPress, detail)
+                    self._event(self._X.ButtonRelease, detail)
+
+        await self._send(build)
+
+    def close(self) -> None:
+        if self._display is None:
+            return
+        for keycode in self._remapped.values():
+            self._display.change_keyboard_mapping(keycode, [(0,) * self._keysyms_per_keycode])
+        self._remapped.clear()
+        self._display.close()
+        self._display = None
+
+
+INPUT_BACKENDS: Dict[str, Callable[[], InputBackend]] = {
+    "xtest": XTestInput,
+    "pyautogui": PyAutoGUIInput,
+}
+
+
+def select_input_backend() -> InputBackend:
+    """The backend forced by ``CUA_INPUT_BACKEND``, or else XTest if the display supports it.
+
+    Raises:
+        ValueError: If ``CUA_INPUT_BACKEND`` names an unknown backend
+    """
+    forced = os.environ.get("CUA_INPUT_BACKEND")
+    if forced:
+        if forced not in INPUT_BACKENDS:
+            raise ValueError(f"Unknown input backend {forced!r}, expected one of {', '.join(INPUT_BACKENDS)}")
+        return INPUT_BACKENDS[forced]()
+
+    for name, backend in INPUT_BACKENDS.items():
+        try:
+            selected = backend()
+        except Exception as e:
+            logger.debug(f"Input backend {name} unavailable: {e}")
+            continue
+        logger.info(f"Using the {name} input backend")
+        return selected
+    return PyAutoGUIInput()
@@ -48,6 +48,7 @@ import json
 import copy
 import asyncio
 from .base import BaseAccessibilityHandler, BaseAutomationHandler
+from .. import metrics
 import logging
 
 logger = logging.getLogger(__name__)
@@ -889,14 +890,16 @@ class MacOSAutomationHandler(BaseAutomationHandler):
         try:
             from PIL import Image
 
-            screenshot = pyautogui.screenshot()
+            with metrics.phase("screenshot", "capture"):
+                screenshot = pyautogui.screenshot()
             if not isinstance(screenshot, Image.Image):
                 return {"success": False, "error": "Failed to capture screenshot"}
 
-            buffered = BytesIO()
-            screenshot.save(buffered, format="PNG", optimize=True)
-            buffered.seek(0)
-            image_data = base64.b64encode(buffered.getvalue()).decode()
+            with metrics.phase("screenshot", "encode"):
+                buffered = BytesIO()
+                screenshot.save(buffered, format="PNG", optimize=True)
+                buffered.seek(0)
+                image_data = base64.b64encode(buffered.getvalue()).decode()
             return {"success": True, "image_data": image_data}
         except Exception as e:
             return {"success": False, "error": f"Screenshot error: {str(e)}"}
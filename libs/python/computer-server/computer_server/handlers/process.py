@@ -0,0 +1,133 @@
+"""
+Streaming shell command execution shared by all OS handlers.
+
+``run_command`` waits for the command to exit and returns its whole output at
+once. ``stream_command`` instead yields output chunks as they are read, so
+clients see progress and large outputs never have to fit in one message.
+"""
+
+import asyncio
+import codecs
+import os
+import signal
+from typing import Any, AsyncIterator, Dict, Optional
+
+# Bytes read from a pipe at a time
+CHUNK_SIZE = 64 * 1024
+
+# Output forwarded per command before the rest is discarded
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Chunks buffered between the pipe readers and the consumer. When the client
+# reads slowly, the readers block and the command blocks on its full pipe.
+QUEUE_CHUNKS = 16
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    """Kill the command and anything it started."""
+    if process.returncode is not None:
+        return
+    try:
+        if os.name == "nt":
+            process.kill()
+        else:
+            # The shell runs in its own session, so this also kills its children
+            os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def stream_command(
+    command: str,
+    max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    timeout: Optional[float] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run a shell command and yield its output as it arrives.
+
+    Yields ``{"type": "stdout" | "stderr", "data": str}`` events, then one
+    ``{"type": "exit", ...}`` event with ``return_code``, ``truncated``
+    (output beyond ``max_bytes`` was discarded), ``timed_out`` and
+    ``bytes`` (total output size, including discarded output).
+
+    Closing the generator early, e.g. because the client disconnected,
+    kills the command.
+
+    Args:
+        command: Shell command to run
+        max_bytes: Maximum bytes of output to forward; None for no limit
+        timeout: Seconds after which the command is killed; None for no limit
+        chunk_size: Maximum bytes read from a pipe at a time
+    """
+    kwargs = {} if os.name == "nt" else {"start_new_session": True}
+    process = await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **kwargs,
+    )
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_CHUNKS)
+
+    async def pump(name: str, pipe: asyncio.StreamReader) -> None:
+        try:
+            while chunk := await pipe.read(chunk_size):
+                await chunks.put((name, chunk))
+        except (ConnectionError, OSError):
+            pass
+        await chunks.put((name, None))
+
+    readers = [
+        asyncio.create_task(pump("stdout", process.stdout)),
+        asyncio.create_task(pump("stderr", process.stderr)),
+    ]
+    decoders = {
+        name: codecs.getincrementaldecoder("utf-8")(errors="replace") for name in ("stdout", "stderr")
+    }
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    total = 0
+    truncated = False
+    timed_out = False
+    open_pipes = 2
+
+    try:
+        while open_pipes:
+            remaining = None if deadline is None else deadline - loop.time()
+            try:
+                name, chunk = await asyncio.wait_for(chunks.get(), remaining)
+            except asyncio.TimeoutError:
+                timed_out = True
+                break
+
+            if chunk is None:
+                open_pipes -= 1
+                tail = decoders[name].decode(b"", final=True)
+                if tail:
+                    yield {"type": name, "data": tail}
+                continue
+
+            total += len(chunk)
+            if max_bytes is not None and total > max_bytes:
+                # Keep reading so the command isn't blocked on a full pipe
+                chunk = chunk[: max(0, max_bytes - (total - len(chunk)))]
+                truncated = True
+            data = decoders[name].decode(chunk)
+            if data:
+                yield {"type": name, "data": data}
+
+        if timed_out:
+            _kill(process)
+        return_code = await process.wait()
+        yield {
+            "type": "exit",
+            "return_code": return_code,
+            "truncated": truncated,
+            "timed_out": timed_out,
+            "bytes": total,
+        }
+    finally:
+        _kill(process)
+        for reader in readers:
+            reader.cancel()
+        if process.returncode is None:
+            await process.wait()
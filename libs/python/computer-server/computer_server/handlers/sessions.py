@@ -0,0 +1,459 @@
+"""
+Persistent shell sessions and Python workers shared by all OS handlers.
+
+``run_command`` starts a new shell for every command, so ``cd``, ``export``
+and activated virtual environments are lost between calls, and every Python
+call pays interpreter start-up and imports again. Sessions keep one shell
+running per client task; Python workers keep one interpreter running per
+virtual environment, so imported modules stay loaded between calls.
+
+Sessions and workers that stay idle longer than their ``idle_timeout`` are
+closed in the background. Each runs with optional memory and CPU limits.
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import shutil
+import signal
+import sys
+import time
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+
+# Open sessions and Python workers allowed at once
+MAX_SESSIONS = 16
+
+# Seconds between checks for idle sessions
+REAP_INTERVAL = 5.0
+
+# Largest JSON line a Python worker may send back
+WORKER_LINE_LIMIT = 64 * 1024 * 1024
+
+# Runs inside a Python worker. Requests and responses are JSON lines; the
+# original stdout is kept for responses and fd 1 is pointed at stderr so
+# that output written outside Python's sys.stdout can't corrupt them.
+# After each response the request's marker is written to stderr, so the
+# server knows where the call's stderr output ends.
+WORKER_SOURCE = r'''
+import contextlib, io, json, os, sys, traceback
+responses = os.fdopen(os.dup(1), "w")
+os.dup2(2, 1)
+namespace = {"__name__": "__cua_worker__"}
+for line in sys.stdin:
+    request = json.loads(line)
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            exec(request["source"], namespace)
+            result = namespace[request["func_name"]](*request["args"], **request["kwargs"])
+        response = {"success": True, "result": result, "error": None}
+    except BaseException as e:
+        response = {"success": False, "result": None, "error": {
+            "type": type(e).__name__, "message": str(e), "traceback": traceback.format_exc()}}
+    response["stdout"] = output.getvalue()
+    responses.write(json.dumps(response, default=str) + "\n")
+    responses.flush()
+    sys.stderr.flush()
+    os.write(2, ("\n" + request["marker"] + "\n").encode())
+'''
+
+
+@dataclass
+class SessionLimits:
+    """Resource limits of a session or Python worker. None means no limit."""
+
+    # Seconds without a command before the session is closed
+    idle_timeout: float = 600.0
+    # Seconds a single command may run before the session is killed
+    command_timeout: Optional[float] = None
+    # Output bytes returned per stream and command; the rest is discarded
+    max_output_bytes: int = 16 * 1024 * 1024
+    # Address space of the shell and each process it starts
+    max_memory_bytes: Optional[int] = None
+    # CPU seconds of the shell and each process it starts
+    max_cpu_seconds: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, values: Optional[Dict[str, Any]]) -> "SessionLimits":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (values or {}).items() if k in names and v is not None})
+
+    def preexec(self):
+        """Return a function applying the memory and CPU limits in a child process."""
+        if os.name == "nt" or (self.max_memory_bytes is None and self.max_cpu_seconds is None):
+            return None
+        import resource
+
+        def apply() -> None:
+            if self.max_memory_bytes is not None:
+                resource.setrlimit(resource.RLIMIT_AS, (self.max_memory_bytes, self.max_memory_bytes))
+            if self.max_cpu_seconds is not None:
+                resource.setrlimit(resource.RLIMIT_CPU, (self.max_cpu_seconds, self.max_cpu_seconds))
+
+        return apply
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is not None:
+        return
+    try:
+        if os.name == "nt":
+            process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def _spawn(args: List[str], limits: SessionLimits, cwd: Optional[str], env: Dict[str, str], **kwargs):
+    if os.name != "nt":
+        # Own process group, so killing the session also kills what it started
+        kwargs["start_new_session"] = True
+        kwargs["preexec_fn"] = limits.preexec()
+    return await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        env=env,
+        **kwargs,
+    )
+
+
+class StreamEnded(EOFError):
+    """A session or worker stream ended before the expected marker."""
+
+    def __init__(self, output: bytes):
+        super().__init__("Session exited")
+        # What was read before the stream ended, within the output limit
+        self.output = output
+
+
+async def _read_until(stream: asyncio.StreamReader, marker: bytes, max_bytes: int) -> bytes:
+    """Read up to ``marker``, keeping at most ``max_bytes`` of what precedes it.
+
+    Returns:
+        The kept output, followed by the marker and the rest of its line
+
+    Raises:
+        StreamEnded: If the stream ends before the marker
+    """
+    kept = bytearray()
+    pending = b""
+    while True:
+        chunk = await stream.read(64 * 1024)
+        if not chunk:
+            raise StreamEnded(bytes(kept) + pending[: max(0, max_bytes - len(kept))])
+        pending += chunk
+        index = pending.find(marker)
+        if index >= 0:
+            end = pending.find(b"\n", index + len(marker))
+            while end < 0:
+                more = await stream.read(64 * 1024)
+                if not more:
+                    raise StreamEnded(bytes(kept) + pending[: max(0, max_bytes - len(kept))])
+                pending += more
+                end = pending.find(b"\n", index + len(marker))
+            kept += pending[:index][: max(0, max_bytes - len(kept))]
+            return bytes(kept) + pending[index:end]
+        # Hold back a possible partial marker at the end of the chunk
+        cut = max(0, len(pending) - len(marker))
+        kept += pending[:cut][: max(0, max_bytes - len(kept))]
+        pending = pending[cut:]
+
+
+class ShellSession:
+    """A shell that keeps its working directory, environment and activated venv between commands."""
+
+    def __init__(self, session_id: str, process: asyncio.subprocess.Process, limits: SessionLimits):
+        self.session_id = session_id
+        self.process = process
+        self.limits = limits
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def exec(self, command: str, timeout: Optional[float] = None, keep_state: bool = True) -> Dict[str, Any]:
+        """Run ``command`` in the shell.
+
+        With ``keep_state`` the command runs as if typed at the shell's prompt:
+        ``cd``, ``export`` and ``set`` carry over to later commands, and
+        ``exit`` ends the session. Otherwise it runs in a subshell, which starts
+        from the session's state but leaves it unchanged, and ``exit N`` just
+        returns N.
+
+        If the command runs longer than its timeout, the whole session is killed.
+        """
+        async with self.lock:
+            token = secrets.token_hex(8)
+            marker = f"__CUA_DONE_{token}__"
+            # The command is passed through a quoted here-document, so it needs no escaping
+            run = f"eval \"$(cat <<'__CUA_EOF_{token}__'\n{command}\n__CUA_EOF_{token}__\n)\""
+            if not keep_state:
+                run = f"({run})"
+            script = (
+                f"{run} < /dev/null\n"
+                f"printf '\\n{marker} %d\\n' \"$?\"\n"
+                f"printf '\\n{marker}\\n' >&2\n"
+            )
+            self.process.stdin.write(script.encode())
+            await self.process.stdin.drain()
+
+            limit = self.limits.max_output_bytes
+            marker_bytes = f"\n{marker}".encode()
+            timeout = timeout if timeout is not None else self.limits.command_timeout
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    asyncio.gather(
+                        _read_until(self.process.stdout, marker_bytes, limit),
+                        _read_until(self.process.stderr, marker_bytes, limit),
+                    ),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                await self.close()
+                raise TimeoutError(f"Command timed out after {timeout}s; session {self.session_id} was closed")
+            finally:
+                self.last_used = time.monotonic()
+
+            stdout, status = stdout.split(marker_bytes)
+            stderr = stderr.split(marker_bytes)[0]
+            return {
+                "stdout": stdout.decode(errors="replace"),
+                "stderr": stderr.decode(errors="replace"),
+                "return_code": int(status.strip()),
+            }
+
+    async def close(self) -> None:
+        _kill(self.process)
+        await self.process.wait()
+
+
+class PythonWorker:
+    """A Python interpreter that runs functions on request, keeping its imports loaded."""
+
+    def __init__(self, process: asyncio.subprocess.Process, limits: SessionLimits):
+        self.process = process
+        self.limits = limits
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def call(self, request: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send a call to the worker and return its response.
+
+        What the call wrote to stderr is read as it is written, so it can't
+        pile up between calls, and returned as "stderr", up to
+        ``max_output_bytes``.
+        """
+        async with self.lock:
+            marker = f"__CUA_DONE_{secrets.token_hex(8)}__"
+            self.process.stdin.write((json.dumps({**request, "marker": marker}) + "\n").encode())
+            await self.process.stdin.drain()
+            timeout = timeout if timeout is not None else self.limits.command_timeout
+            marker_bytes = f"\n{marker}".encode()
+            try:
+                line, stderr = await asyncio.wait_for(
+                    asyncio.gather(
+                        self.process.stdout.readline(),
+                        _read_until(self.process.stderr, marker_bytes, self.limits.max_output_bytes),
+                    ),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                await self.close()
+                raise TimeoutError(f"Python call timed out after {timeout}s; the worker was stopped")
+            except StreamEnded as e:
+                await self.process.wait()
+                raise RuntimeError(f"Python worker exited: {e.output[-2000:].decode(errors='replace')}")
+            finally:
+                self.last_used = time.monotonic()
+            response = json.loads(line)
+            response["stderr"] = stderr.split(marker_bytes)[0].decode(errors="replace")
+            return response
+
+    async def close(self) -> None:
+        _kill(self.process)
+        await self.process.wait()
+
+
+def _venv_python(venv: Optional[str]) -> str:
+    if venv is None:
+        return sys.executable if os.name == "nt" else shutil.which("python3") or sys.executable
+    subdir, name = ("Scripts", "python.exe") if os.name == "nt" else ("bin", "python")
+    python = os.path.join(os.path.expanduser(venv), subdir, name)
+    if not os.path.exists(python):
+        raise FileNotFoundError(f"Virtual environment '{venv}' does not exist")
+    return python
+
+
+class SessionHandler:
+    """Creates, runs commands in, and reaps persistent shell sessions and Python workers."""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, ShellSession] = {}
+        self.workers: Dict[Optional[str], PythonWorker] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+    def _check_capacity(self) -> None:
+        if len(self.sessions) + len(self.workers) >= self.max_sessions:
+            raise RuntimeError(f"Too many open sessions (limit {self.max_sessions}); close one first")
+
+    def _start_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap())
+
+    async def _reap(self) -> None:
+        """Close sessions and workers that have been idle for longer than their limit."""
+        while self.sessions or self.workers:
+            await asyncio.sleep(REAP_INTERVAL)
+            now = time.monotonic()
+            for session_id, session in list(self.sessions.items()):
+                if not session.alive or now - session.last_used > session.limits.idle_timeout:
+                    if not session.lock.locked():
+                        del self.sessions[session_id]
+                        await session.close()
+            for venv, worker in list(self.workers.items()):
+                if not worker.alive or now - worker.last_used > worker.limits.idle_timeout:
+                    if not worker.lock.locked():
+                        del self.workers[venv]
+                        await worker.close()
+
+    async def session_create(
+        self,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        venv: Optional[str] = None,
+        limits: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Start a persistent shell session.
+
+        Args:
+            cwd: Initial working directory, defaults to the home directory
+            env: Environment variables added to the server's environment
+            venv: Virtual environment to activate, e.g. "~/.venvs/demo"
+            limits: SessionLimits fields to override
+        """
+        if os.name == "nt":
+            return {"success": False, "error": "Persistent sessions are not supported on Windows"}
+        try:
+            self._check_capacity()
+            session_limits = SessionLimits.from_dict(limits)
+            shell = shutil.which("bash")
+            args = [shell, "--noprofile", "--norc"] if shell else ["/bin/sh"]
+            process = await _spawn(
+                args,
+                session_limits,
+                os.path.expanduser(cwd or "~"),
+                {**os.environ, **(env or {})},
+            )
+            session = ShellSession(secrets.token_hex(8), process, session_limits)
+            if venv is not None:
+                activate = os.path.join(os.path.expanduser(venv), "bin", "activate")
+                result = await session.exec(f". '{activate}'")
+                if result["return_code"] != 0:
+                    await session.close()
+                    return {"success": False, "error": f"Virtual environment '{venv}' does not exist"}
+            self.sessions[session.session_id] = session
+            self._start_reaper()
+            return {"success": True, "session_id": session.session_id}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def session_exec(
+        self, session_id: str, command: str, timeout: Optional[float] = None, keep_state: bool = True
+    ) -> Dict[str, Any]:
+        """Run a command in a session and return its output and exit code.
+
+        Args:
+            session_id: ID returned by session_create
+            command: Shell command to run
+            timeout: Seconds after which the command, and with it the session, is killed
+            keep_state: If False, run the command in a subshell so its ``cd``,
+                        ``export`` and ``exit`` don't affect the session
+        """
+        session = self.sessions.get(session_id)
+        if session is None or not session.alive:
+            self.sessions.pop(session_id, None)
+            return {"success": False, "error": f"Unknown session: {session_id}"}
+        try:
+            return {"success": True, **(await session.exec(command, timeout, keep_state))}
+        except (EOFError, TimeoutError) as e:
+            self.sessions.pop(session_id, None)
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def session_close(self, session_id: str) -> Dict[str, Any]:
+        """Close a session and kill anything still running in it."""
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            await session.close()
+        return {"success": True}
+
+    async def session_list(self) -> Dict[str, Any]:
+        """List open sessions with their idle time in seconds."""
+        now = time.monotonic()
+        return {
+            "success": True,
+            "sessions": [
+                {"session_id": s.session_id, "idle": now - s.last_used, "busy": s.lock.locked()}
+                for s in self.sessions.values()
+            ],
+            "python_workers": [venv for venv in self.workers],
+        }
+
+    async def python_exec(
+        self,
+        source: str,
+        func_name: str,
+        args: Optional[List[Any]] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+        venv: Optional[str] = None,
+        timeout: Optional[float] = None,
+        limits: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Define a function from ``source`` and call it in the Python worker of ``venv``.
+
+        The worker for each venv is started on first use and reused afterwards,
+        so modules it imported stay loaded.
+
+        Returns:
+            "output" with "success", "result", "error" (type, message and
+            traceback if the function raised), "stdout" (what it printed) and
+            "stderr" (what it and anything it started wrote to stderr)
+        """
+        worker = self.workers.get(venv)
+        try:
+            if worker is None or not worker.alive:
+                self.workers.pop(venv, None)
+                self._check_capacity()
+                worker_limits = SessionLimits.from_dict(limits)
+                worker = PythonWorker(
+                    await _spawn(
+                        [_venv_python(venv), "-u", "-c", WORKER_SOURCE],
+                        worker_limits,
+                        os.path.expanduser("~"),
+                        dict(os.environ),
+                        limit=WORKER_LINE_LIMIT,
+                    ),
+                    worker_limits,
+                )
+                self.workers[venv] = worker
+                self._start_reaper()
+            request = {"source": source, "func_name": func_name, "args": args or [], "kwargs": kwargs or {}}
+            return {"success": True, "output": await worker.call(request, timeout)}
+        except Exception as e:
+            if worker is not None and not worker.alive:
+                self.workers.pop(venv, None)
+            return {"success": False, "error": str(e)}
@@ -1,5 +1,5 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, HTTPException, Header
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Dict, Any, Optional
 import uvicorn
 import logging
@@ -10,6 +10,9 @@ import inspect
 from contextlib import redirect_stdout, redirect_stderr
 from io import StringIO
 from .handlers.factory import HandlerFactory
+from .handlers.generic import resolve_path
+from .handlers.sessions import SessionHandler
+from . import metrics, transfer
 import os
 import aiohttp
 import hashlib
@@ -22,6 +25,10 @@ logger.setLevel(logging.INFO)
 # Configure WebSocket with larger message size
 WEBSOCKET_MAX_SIZE = 1024 * 1024 * 10  # 10MB limit
 
+# Output of a streaming command collected into a single WebSocket response,
+# leaving room for JSON escaping
+WEBSOCKET_STREAM_MAX_BYTES = WEBSOCKET_MAX_SIZE // 4
+
 # Configure application with WebSocket settings
 app = FastAPI(
     title="Computer API",
@@ -43,6 +50,7 @@ except Exception:
         package_version = "unknown"
 
 accessibility_handler, automation_handler, diorama_handler, file_handler = HandlerFactory.create_handlers()
+session_handler = SessionHandler()
 handlers = {
     "version": lambda: {"protocol": protocol_version, "package": package_version},
     # App-Use commands
@@ -52,6 +60,13 @@ handlers = {
     "find_element": accessibility_handler.find_element,
     # Shell commands
     "run_command": automation_handler.run_command,
+    "run_command_stream": automation_handler.run_command_stream,
+    # Persistent shell sessions and Python workers
+    "session_create": session_handler.session_create,
+    "session_exec": session_handler.session_exec,
+    "session_close": session_handler.session_close,
+    "session_list": session_handler.session_list,
+    "python_exec": session_handler.python_exec,
     # File system commands
     "file_exists": file_handler.file_exists,
     "directory_exists": file_handler.directory_exists,
@@ -61,6 +76,10 @@ handlers = {
     "read_bytes": file_handler.read_bytes,
     "write_bytes": file_handler.write_bytes,
     "get_file_size": file_handler.get_file_size,
+    "file_hash": file_handler.file_hash,
+    "stat_many": file_handler.stat_many,
+    "walk": file_handler.walk,
+    "delete_paths": file_handler.delete_paths,
     "delete_file": file_handler.delete_file,
     "create_dir": file_handler.create_dir,
     "delete_dir": file_handler.delete_dir,
@@ -189,9 +208,11 @@ class ConnectionManager:
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        metrics.ACTIVE_CONNECTIONS.set(value=len(self.active_connections))
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
+        metrics.ACTIVE_CONNECTIONS.set(value=len(self.active_connections))
 
 
 manager = ConnectionManager()
@@ -289,23 +310,43 @@ async def websocket_endpoint(websocket: WebSocket):
                     )
                     continue
 
+                start = time.perf_counter()
+                metrics.COMMANDS_IN_PROGRESS.inc("websocket")
                 try:
                     # Filter params to only include those accepted by the handler function
                     handler_func = handlers[command]
                     sig = inspect.signature(handler_func)
                     filtered_params = {k: v for k, v in params.items() if k in sig.parameters}
                     
-                    # Handle both sync and async functions
-                    if asyncio.iscoroutinefunction(handler_func):
+                    # Handle streaming, async and sync functions
+                    if inspect.isasyncgenfunction(handler_func):
+                        # A WebSocket command gets one response, so collect the events,
+                        # capped to fit in a message; clients stream them over /cmd
+                        if "max_bytes" in sig.parameters:
+                            requested = filtered_params.get("max_bytes") or WEBSOCKET_STREAM_MAX_BYTES
+                            filtered_params["max_bytes"] = min(requested, WEBSOCKET_STREAM_MAX_BYTES)
+                        events = [event async for event in handler_func(**filtered_params)]
+                        result = {"events": events}
+                    elif asyncio.iscoroutinefunction(handler_func):
                         result = await handler_func(**filtered_params)
                     else:
                         # Run sync functions in thread pool to avoid blocking event loop
                         result = await asyncio.to_thread(handler_func, **filtered_params)
-                    await websocket.send_json({"success": True, **result})
+                    response = {"success": True, **result}
+                    # Serialized like send_json, so the response size is known
+                    message = json.dumps(response, separators=(",", ":"), ensure_ascii=False)
                 except Exception as cmd_error:
+                    metrics.record_command(command, "websocket", start, False, None)
                     logger.error(f"Error executing command {command}: {str(cmd_error)}")
                     logger.error(traceback.format_exc())
                     await websocket.send_json({"success": False, "error": str(cmd_error)})
+                    continue
+                finally:
+                    metrics.COMMANDS_IN_PROGRESS.dec("websocket")
+
+                metrics.record_command(command, "websocket", start, response["success"], len(message))
+                with metrics.phase(command, "send"):
+                    await websocket.send_text(message)
 
             except WebSocketDisconnect:
                 raise
@@ -332,6 +373,67 @@ async def websocket_endpoint(websocket: WebSocket):
         manager.disconnect(websocket)
 
 
+@app.websocket("/ws/ready", name="ready_endpoint")
+async def ready_endpoint(websocket: WebSocket):
+    """
+    Push a single {"type": "ready"} message once the server can serve commands,
+    then close. Clients listen here instead of polling while the display comes up.
+
+    On cloud providers the handshake needs the same X-Container-Name and
+    X-API-Key headers as /cmd; it is rejected otherwise.
+    """
+    try:
+        await authenticate_request(
+            websocket.headers.get("X-Container-Name"), websocket.headers.get("X-API-Key")
+        )
+    except HTTPException as e:
+        logger.warning(f"Rejected ready notification request: {e.detail}")
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    await websocket.accept()
+    try:
+        delay = 0.025
+        while True:
+            try:
+                result = await automation_handler.get_screen_size()
+                if result.get("success", False):
+                    break
+            except Exception as e:
+                logger.debug(f"Display not ready yet: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+        await websocket.send_json({"type": "ready", "protocol": protocol_version, "package": package_version})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+async def authenticate_request(container_name: Optional[str], api_key: Optional[str]) -> None:
+    """Check the cloud authentication headers of an HTTP request.
+
+    Raises:
+        HTTPException: 401 if running on a cloud provider and the headers are missing or invalid
+    """
+    # Check if CONTAINER_NAME is set (indicating cloud provider)
+    server_container_name = os.environ.get("CONTAINER_NAME")
+    
+    # If cloud provider, perform authentication
+    if server_container_name:
+        logger.info(f"Cloud provider detected. CONTAINER_NAME: {server_container_name}. Performing authentication...")
+        
+        # Validate required headers
+        if not container_name:
+            raise HTTPException(status_code=401, detail="Container name required")
+        
+        if not api_key:
+            raise HTTPException(status_code=401, detail="API key required")
+        
+        # Validate with AuthenticationManager
+        is_authenticated = await auth_manager.auth(container_name, api_key)
+        if not is_authenticated:
+            raise HTTPException(status_code=401, detail="Authentication failed")
+
+
 @app.post("/cmd")
 async def cmd_endpoint(
     request: Request,
@@ -365,36 +467,31 @@ async def cmd_endpoint(
     if not command:
         raise HTTPException(status_code=400, detail="Command is required")
     
-    # Check if CONTAINER_NAME is set (indicating cloud provider)
-    server_container_name = os.environ.get("CONTAINER_NAME")
-    
-    # If cloud provider, perform authentication
-    if server_container_name:
-        logger.info(f"Cloud provider detected. CONTAINER_NAME: {server_container_name}. Performing authentication...")
-        
-        # Validate required headers
-        if not container_name:
-            raise HTTPException(status_code=401, detail="Container name required")
-        
-        if not api_key:
-            raise HTTPException(status_code=401, detail="API key required")
-        
-        # Validate with AuthenticationManager
-        is_authenticated = await auth_manager.auth(container_name, api_key)
-        if not is_authenticated:
-            raise HTTPException(status_code=401, detail="Authentication failed")
+    await authenticate_request(container_name, api_key)
     
     if command not in handlers:
         raise HTTPException(status_code=400, detail=f"Unknown command: {command}")
     
     async def generate_response():
         """Generate streaming response for the command execution"""
+        start = time.perf_counter()
+        metrics.COMMANDS_IN_PROGRESS.inc("http")
         try:
             # Filter params to only include those accepted by the handler function
             handler_func = handlers[command]
             sig = inspect.signature(handler_func)
             filtered_params = {k: v for k, v in params.items() if k in sig.parameters}
             
+            # Stream each event of streaming commands as it is produced
+            if inspect.isasyncgenfunction(handler_func):
+                size = 0
+                async for event in handler_func(**filtered_params):
+                    data = f"data: {json.dumps({'success': True, **event})}\n\n"
+                    size += len(data)
+                    yield data
+                metrics.record_command(command, "http", start, True, size)
+                return
+
             # Handle both sync and async functions
             if asyncio.iscoroutinefunction(handler_func):
                 result = await handler_func(**filtered_params)
@@ -404,15 +501,22 @@ async def cmd_endpoint(
             
             # Stream the successful result
             response_data = {"success": True, **result}
-            yield f"data: {json.dumps(response_data)}\n\n"
+            data = f"data: {json.dumps(response_data)}\n\n"
+            metrics.record_command(command, "http", start, response_data["success"], len(data))
+            # The response is sent while the generator waits here
+            with metrics.phase(command, "send"):
+                yield data
             
         except Exception as cmd_error:
+            metrics.record_command(command, "http", start, False, None)
             logger.error(f"Error executing command {command}: {str(cmd_error)}")
             logger.error(traceback.format_exc())
             
             # Stream the error result
             error_data = {"success": False, "error": str(cmd_error)}
             yield f"data: {json.dumps(error_data)}\n\n"
+        finally:
+            metrics.COMMANDS_IN_PROGRESS.dec("http")
     
     return StreamingResponse(
         generate_response(),
@@ -427,5 +531,77 @@ async def cmd_endpoint(
     )
 
 
+@app.get("/files")
+async def download_file_endpoint(
+    request: Request,
+    path: str,
+    container_name: Optional[str] = Header(None, alias="X-Container-Name"),
+    api_key: Optional[str] = Header(None, alias="X-API-Key")
+):
+    """
+    Download a file as raw bytes.
+
+    Supports a single ``Range`` header to read part of the file or resume a
+    download, and ``If-Range`` with the ``ETag`` of the previous response.
+    """
+    await authenticate_request(container_name, api_key)
+    return await transfer.send_file(request, resolve_path(path))
+
+
+@app.put("/files")
+async def upload_file_endpoint(
+    request: Request,
+    path: str,
+    offset: int = 0,
+    append: bool = False,
+    container_name: Optional[str] = Header(None, alias="X-Container-Name"),
+    api_key: Optional[str] = Header(None, alias="X-API-Key")
+):
+    """
+    Upload a file as raw bytes, streamed or chunked.
+
+    Query parameters:
+    - path: File to write
+    - offset: Position to write at, to resume an interrupted upload
+    - append: Write at the end of the file instead
+
+    Returns the number of bytes written and their SHA-256.
+    """
+    await authenticate_request(container_name, api_key)
+    return await transfer.receive_file(request, resolve_path(path), offset=offset, append=append)
+
+
+@app.put("/files/archive")
+async def upload_archive_endpoint(
+    request: Request,
+    path: str,
+    container_name: Optional[str] = Header(None, alias="X-Container-Name"),
+    api_key: Optional[str] = Header(None, alias="X-API-Key")
+):
+    """
+    Extract a tar stream, optionally compressed, into the directory ``path``.
+
+    Returns the number of files extracted and their total size.
+    """
+    await authenticate_request(container_name, api_key)
+    return await transfer.receive_archive(request, resolve_path(path))
+
+
+@app.get("/metrics")
+async def metrics_endpoint(
+    container_name: Optional[str] = Header(None, alias="X-Container-Name"),
+    api_key: Optional[str] = Header(None, alias="X-API-Key")
+):
+    """
+    Server metrics in the Prometheus text format.
+
+    Only available when the server runs with ``--metrics`` or ``CUA_METRICS=1``.
+    """
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled; start the server with --metrics")
+    await authenticate_request(container_name, api_key)
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,219 @@
+"""
+Server metrics in the Prometheus text format.
+
+Metrics are off unless the server is started with ``--metrics`` or the
+``CUA_METRICS`` environment variable is set. While they are off, recording
+returns straight away and ``/metrics`` responds 404.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+enabled = os.environ.get("CUA_METRICS", "").lower() in ("1", "true", "yes")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from input events up to slow shell commands
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Bytes, from small replies up to 4K screenshots
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+
+def enable(on: bool = True) -> None:
+    """Turn recording and the ``/metrics`` endpoint on or off."""
+    global enabled
+    enabled = on
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(label) for label in labels)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """A count that only goes up."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        if not enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """A value that goes up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        if not enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Observations counted in cumulative buckets, with their sum."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: a count per bucket, the last for +Inf, then the sum
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not enabled:
+            return
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def _time(self, labels: Sequence[str]) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def time(self, *labels: str):
+        """Context manager observing how long its block takes, in seconds."""
+        return self._time(labels) if enabled else nullcontext()
+
+    def count(self, *labels: str) -> int:
+        counts = self._values.get(self._key(labels))
+        return int(sum(counts[:-1])) if counts else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, counts in sorted(self._values.items()):
+                total = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts[:-1]):
+                    total += count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {_format_value(total)}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(counts[-1])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {_format_value(total)}")
+        return lines
+
+
+COMMANDS = Counter(
+    "cua_commands_total", "Commands handled, by command, transport and outcome.", ["command", "transport", "status"]
+)
+COMMAND_DURATION = Histogram(
+    "cua_command_duration_seconds", "Time spent running command handlers.", ["command", "transport"]
+)
+COMMAND_PHASE_DURATION = Histogram(
+    "cua_command_phase_duration_seconds",
+    "Time spent in each phase of a command, such as capturing, encoding and sending a screenshot.",
+    ["command", "phase"],
+)
+RESPONSE_BYTES = Histogram(
+    "cua_response_bytes", "Size of command responses, in bytes.", ["command", "transport"], buckets=SIZE_BUCKETS
+)
+COMMANDS_IN_PROGRESS = Gauge("cua_commands_in_progress", "Commands currently running.", ["transport"])
+ACTIVE_CONNECTIONS = Gauge("cua_active_connections", "Open WebSocket connections.")
+FILE_IO_QUEUE_DEPTH = Gauge(
+    "cua_file_io_queue_depth", "File operations waiting for or running on the file I/O threads."
+)
+FILE_TRANSFER_BYTES = Counter(
+    "cua_file_transfer_bytes_total", "Bytes moved through the /files endpoints.", ["direction"]
+)
+
+REGISTRY: List[_Metric] = [
+    COMMANDS,
+    COMMAND_DURATION,
+    COMMAND_PHASE_DURATION,
+    RESPONSE_BYTES,
+    COMMANDS_IN_PROGRESS,
+    ACTIVE_CONNECTIONS,
+    FILE_IO_QUEUE_DEPTH,
+    FILE_TRANSFER_BYTES,
+]
+
+
+def phase(command: str, name: str):
+    """Context manager timing one phase of a command, e.g. ``phase("screenshot", "encode")``."""
+    return COMMAND_PHASE_DURATION._time((command, name)) if enabled else nullcontext()
+
+
+def record_command(command: str, transport: str, start: float, success: bool, response_bytes: Optional[int]) -> None:
+    """Record a finished command that started at ``start``, a ``time.perf_counter()`` value."""
+    if not enabled:
+        return
+    COMMAND_DURATION.observe(time.perf_counter() - start, command, transport)
+    COMMANDS.inc(command, transport, "success" if success else "error")
+    if response_bytes is not None:
+        RESPONSE_BYTES.observe(response_bytes, command, transport)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,318 @@
+"""
+Streaming file transfer over plain HTTP.
+
+The ``read_bytes`` and ``write_bytes`` commands carry file contents as base64
+inside JSON, so clients split large files into many sequential round trips.
+The ``/files`` endpoints move raw bytes in a single streamed request instead:
+
+- ``GET /files?path=...`` sends the file. A single ``Range`` header selects
+  part of it, so interrupted downloads resume where they stopped; pass the
+  ``ETag`` back in ``If-Range`` to restart if the file changed meanwhile.
+- ``PUT /files?path=...`` writes the request body as it arrives, optionally
+  at ``offset`` so interrupted uploads resume, and returns the SHA-256 of the
+  bytes it wrote.
+- ``PUT /files/archive?path=...`` extracts a tar stream into a directory as
+  it arrives, to copy many files in one request.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import re
+import tarfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+from starlette.exceptions import HTTPException
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from . import metrics
+from .handlers.generic import run_file_io
+
+# Bytes read from disk, or buffered before writing to disk, at a time
+CHUNK_SIZE = 1024 * 1024
+
+# Request body chunks buffered for the thread extracting an archive
+ARCHIVE_QUEUE_CHUNKS = 64
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def file_etag(stat: os.stat_result) -> str:
+    """Identify a version of a file by its modification time and size."""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a ``Range`` header into the inclusive ``(first, last)`` byte positions.
+
+    Returns None when the whole file should be sent: the header is missing,
+    malformed, or asks for several ranges.
+
+    Raises:
+        HTTPException: 416 if the range starts beyond the end of the file
+    """
+    match = _RANGE.fullmatch(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+
+    if not first:
+        # Suffix range: the last N bytes
+        first, last = max(0, size - int(last)), size - 1
+    else:
+        first, last = int(first), size - 1 if not last else min(int(last), size - 1)
+        if last < first and first < size:
+            return None
+
+    if first >= size or last < first:
+        raise HTTPException(416, headers={"Content-Range": f"bytes */{size}"})
+    return first, last
+
+
+class FileRangeResponse(Response):
+    """Send ``count`` bytes of an open file, starting at ``offset``.
+
+    When the ASGI server offers the zero-copy extension, the kernel copies
+    the file straight to the socket (``sendfile``). Otherwise the file is
+    read in ``CHUNK_SIZE`` blocks off the event loop.
+    """
+
+    def __init__(self, file: BinaryIO, offset: int, count: int, status_code: int, headers: Dict[str, str]):
+        super().__init__(status_code=status_code, headers=headers, media_type="application/octet-stream")
+        self.file = file
+        self.offset = offset
+        self.count = count
+        self.headers["content-length"] = str(count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if scope["method"] == "HEAD" or not self.count:
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            if "http.response.zerocopy" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": self.file,
+                    "offset": self.offset,
+                    "count": self.count,
+                })
+                metrics.FILE_TRANSFER_BYTES.inc("download", amount=self.count)
+                return
+
+            await run_file_io(self.file.seek, self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await run_file_io(self.file.read, min(CHUNK_SIZE, remaining))
+                # A file truncated while it is sent ends the body early; the
+                # client sees fewer bytes than Content-Length
+                remaining = remaining - len(chunk) if chunk else 0
+                metrics.FILE_TRANSFER_BYTES.inc("download", amount=len(chunk))
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        finally:
+            await run_file_io(self.file.close)
+
+
+async def send_file(request: Request, path: Path) -> FileRangeResponse:
+    """Respond to a download request for ``path``, honouring ``Range`` and ``If-Range``."""
+    try:
+        file = await run_file_io(open, path, "rb")
+    except FileNotFoundError:
+        raise HTTPException(404, detail=f"File not found: {path}")
+    except OSError as e:
+        raise HTTPException(400, detail=str(e))
+
+    try:
+        stat = os.fstat(file.fileno())
+        etag = file_etag(stat)
+        headers = {"Accept-Ranges": "bytes", "ETag": etag}
+
+        if_range = request.headers.get("if-range")
+        byte_range = None
+        if if_range is None or if_range == etag:
+            byte_range = parse_range(request.headers.get("range"), stat.st_size)
+    except BaseException:
+        file.close()
+        raise
+
+    if byte_range is None:
+        return FileRangeResponse(file, 0, stat.st_size, 200, headers)
+    first, last = byte_range
+    headers["Content-Range"] = f"bytes {first}-{last}/{stat.st_size}"
+    return FileRangeResponse(file, first, last - first + 1, 206, headers)
+
+
+def _open_for_upload(path: Path, offset: int, append: bool) -> BinaryIO:
+    if append:
+        return open(path, "ab")
+    if not offset:
+        return open(path, "wb")
+
+    file = open(path, "r+b")
+    try:
+        size = os.fstat(file.fileno()).st_size
+        if offset > size:
+            raise ValueError(f"Offset {offset} is beyond the end of the file ({size} bytes)")
+        file.seek(offset)
+        file.truncate()
+    except BaseException:
+        file.close()
+        raise
+    return file
+
+
+def _write(file: BinaryIO, digest: Any, data: bytearray) -> None:
+    file.write(data)
+    digest.update(data)
+
+
+async def receive_file(request: Request, path: Path, offset: int = 0, append: bool = False) -> Dict[str, Any]:
+    """Write the body of an upload request to ``path`` as it arrives.
+
+    Bytes received before the client disconnects are kept, so the client can
+    resume the upload from the new size of the file.
+
+    Args:
+        request: The upload request
+        path: File to write
+        offset: Position to write at; the file is truncated there first
+        append: Write at the end of the file instead
+
+    Returns:
+        Dict with the number of bytes written and their SHA-256
+    """
+    try:
+        file = await run_file_io(_open_for_upload, path, offset, append)
+    except (OSError, ValueError) as e:
+        raise HTTPException(400, detail=str(e))
+
+    digest = hashlib.sha256()
+    written = 0
+    buffer = bytearray()
+    try:
+        try:
+            async for chunk in request.stream():
+                buffer += chunk
+                if len(buffer) >= CHUNK_SIZE:
+                    data, buffer = buffer, bytearray()
+                    await run_file_io(_write, file, digest, data)
+                    written += len(data)
+        finally:
+            # Also keep a partial buffer when the client disconnects
+            if buffer:
+                await run_file_io(_write, file, digest, buffer)
+                written += len(buffer)
+            metrics.FILE_TRANSFER_BYTES.inc("upload", amount=written)
+    except OSError as e:
+        raise HTTPException(400, detail=str(e))
+    finally:
+        await run_file_io(file.close)
+
+    return {"success": True, "size": written, "sha256": digest.hexdigest()}
+
+
+class _QueueReader(io.RawIOBase):
+    """A blocking file over chunks put on an asyncio queue, read from a worker thread."""
+
+    def __init__(self, chunks: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+        self.chunks = chunks
+        self.loop = loop
+        self.pending = memoryview(b"")
+        self.eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.pending and not self.eof:
+            chunk = asyncio.run_coroutine_threadsafe(self.chunks.get(), self.loop).result()
+            if chunk is None:
+                self.eof = True
+            else:
+                self.pending = memoryview(chunk)
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+def _checked_members(archive: tarfile.TarFile, dest: str) -> Iterator[tarfile.TarInfo]:
+    """Reject members that would be written outside ``dest``, for Pythons without extraction filters."""
+    for member in archive:
+        target = os.path.realpath(os.path.join(dest, member.name))
+        if os.path.commonpath([dest, target]) != dest:
+            raise ValueError(f"Archive member {member.name!r} is outside the destination")
+        if member.islnk() or member.issym():
+            link = os.path.join(os.path.dirname(target), member.linkname) if member.issym() else os.path.join(dest, member.linkname)
+            if os.path.commonpath([dest, os.path.realpath(link)]) != dest:
+                raise ValueError(f"Archive member {member.name!r} links outside the destination")
+        elif not (member.isfile() or member.isdir()):
+            raise ValueError(f"Archive member {member.name!r} is not a file, directory or link")
+        yield member
+
+
+def _extract(file: io.RawIOBase, dest: Path) -> Dict[str, Any]:
+    dest.mkdir(parents=True, exist_ok=True)
+    root = os.path.realpath(dest)
+    files = 0
+    size = 0
+
+    def counted(members: Iterator[tarfile.TarInfo]) -> Iterator[tarfile.TarInfo]:
+        nonlocal files, size
+        for member in members:
+            if member.isfile():
+                files += 1
+                size += member.size
+            yield member
+
+    with tarfile.open(fileobj=io.BufferedReader(file, CHUNK_SIZE), mode="r|*") as archive:
+        if hasattr(tarfile, "data_filter"):
+            archive.extractall(root, members=counted(archive), filter="data")
+        else:
+            archive.extractall(root, members=counted(_checked_members(archive, root)))
+    return {"success": True, "files": files, "bytes": size}
+
+
+async def receive_archive(request: Request, path: Path) -> Dict[str, Any]:
+    """Extract the tar stream in the body of an upload request into the directory ``path``.
+
+    The archive is extracted while it arrives, so it never has to fit in
+    memory or on disk. Members that would land outside ``path`` are
+    rejected; modification times are kept.
+
+    Returns:
+        Dict with the number of files extracted and their total size
+    """
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=ARCHIVE_QUEUE_CHUNKS)
+
+    async def feed() -> None:
+        try:
+            async for chunk in request.stream():
+                if chunk:
+                    metrics.FILE_TRANSFER_BYTES.inc("upload", amount=len(chunk))
+                    await chunks.put(chunk)
+        except ClientDisconnect:
+            # The extraction fails on the truncated archive
+            pass
+        await chunks.put(None)
+
+    feeder = asyncio.create_task(feed())
+    try:
+        # The extraction holds its thread until the upload ends, so it gets
+        # its own rather than one of the file I/O workers
+        return await asyncio.to_thread(_extract, _QueueReader(chunks, loop), path)
+    except (OSError, ValueError, tarfile.TarError) as e:
+        raise HTTPException(400, detail=str(e))
+    finally:
+        # Stops reading the body if the extraction failed early
+        feeder.cancel()
+        # Unblocks the extraction thread if this request was cancelled
+        while not chunks.empty():
+            chunks.get_nowait()
+        chunks.put_nowait(None)
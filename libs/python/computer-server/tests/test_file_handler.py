@@ -0,0 +1,117 @@
+"""Tests for the generic file handler."""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from computer_server import main
+from computer_server.handlers.generic import GenericFileHandler
+from computer_server.handlers.linux_capture import CaptureBackend
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "src/pkg").mkdir(parents=True)
+    (tmp_path / "src/pkg/mod.py").write_text("x = 1\n")
+    (tmp_path / "README").write_text("hello")
+    (tmp_path / "empty").mkdir()
+    os.symlink("README", tmp_path / "link")
+    return tmp_path
+
+
+async def test_walk_lists_the_tree(tree):
+    result = await GenericFileHandler().walk(str(tree), hash=True)
+
+    entries = {entry["path"]: entry for entry in result["entries"]}
+    assert list(entries) == ["README", "empty", "link", "src", "src/pkg", "src/pkg/mod.py"]
+    assert entries["src/pkg/mod.py"]["type"] == "file"
+    assert entries["src/pkg/mod.py"]["size"] == 6
+    assert entries["src/pkg/mod.py"]["sha256"] == hashlib.sha256(b"x = 1\n").hexdigest()
+    assert entries["src"]["type"] == "dir"
+    assert entries["link"]["type"] == "symlink"
+    assert entries["link"]["target"] == "README"
+    assert "sha256" not in entries["link"]
+
+    result = await GenericFileHandler().walk(str(tree / "missing"))
+    assert not result["success"]
+
+
+async def test_stat_many(tree):
+    result = await GenericFileHandler().stat_many([str(tree / "README"), str(tree / "src"), str(tree / "nope")])
+
+    readme, src, missing = result["stats"]
+    assert (readme["exists"], readme["type"], readme["size"]) == (True, "file", 5)
+    assert readme["mtime"] == (tree / "README").stat().st_mtime
+    assert (src["exists"], src["type"]) == (True, "dir")
+    assert missing == {"path": str(tree / "nope"), "exists": False}
+
+
+async def test_delete_paths(tree):
+    handler = GenericFileHandler()
+    result = await handler.delete_paths([str(tree / "src"), str(tree / "link"), str(tree / "nope")])
+
+    assert result == {"success": True}
+    assert not (tree / "src").exists()
+    # The symlink is deleted, not its target
+    assert not (tree / "link").is_symlink()
+    assert (tree / "README").exists()
+
+
+class StillBackend(CaptureBackend):
+    """Capture backend returning a blank frame, so screenshots work without a display."""
+
+    name = "still"
+
+    def capture(self):
+        return Image.new("RGB", (64, 48))
+
+
+def _post(client, command, params, results):
+    response = client.post("/cmd", json={"command": command, "params": params})
+    results[command] = json.loads(response.text.removeprefix("data: "))
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs os.mkfifo")
+def test_screenshot_completes_during_a_large_read(tmp_path, monkeypatch):
+    monkeypatch.delenv("CONTAINER_NAME", raising=False)
+    monkeypatch.setattr(main.automation_handler, "capture_backend", StillBackend())
+    # Reading a FIFO blocks until a writer shows up, standing in for a slow read
+    fifo = tmp_path / "fifo"
+    os.mkfifo(fifo)
+    data = os.urandom(4 * 1024 * 1024)
+    results = {}
+
+    def write():
+        with open(fifo, "wb") as f:
+            f.write(data)
+
+    # The app runs on the client's own event loop thread; requests come from other threads
+    with TestClient(main.app) as client:
+        read = threading.Thread(target=_post, args=(client, "read_bytes", {"path": str(fifo)}, results), daemon=True)
+        read.start()
+        time.sleep(0.1)
+        screenshot = threading.Thread(target=_post, args=(client, "screenshot", {}, results), daemon=True)
+        screenshot.start()
+        screenshot.join(timeout=5)
+        screenshot_done, read_done = not screenshot.is_alive(), not read.is_alive()
+
+        # Unblock the read either way, so a blocked loop fails the test instead of hanging it
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        read.join(timeout=10)
+        writer.join(timeout=10)
+        screenshot.join(timeout=10)
+
+    assert screenshot_done, "screenshot waited for the file read"
+    assert not read_done
+    assert results["screenshot"]["success"]
+    assert Image.open(io.BytesIO(base64.b64decode(results["screenshot"]["image_data"]))).size == (64, 48)
+    assert base64.b64decode(results["read_bytes"]["content_b64"]) == data
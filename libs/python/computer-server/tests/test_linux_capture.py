@@ -0,0 +1,87 @@
+"""Tests for choosing a Linux screen capture backend."""
+
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from computer_server.handlers import linux_capture
+from computer_server.handlers.linux import LinuxAutomationHandler
+
+
+def _backend(name, delay=0.0, fails=False):
+    class Backend(linux_capture.CaptureBackend):
+        opened_on = None
+        closed = False
+
+        def __init__(self):
+            type(self).opened_on = threading.current_thread()
+            if fails == "open":
+                raise OSError("no display")
+            self.name = name
+
+        def capture(self):
+            if fails == "capture":
+                raise OSError("capture failed")
+            time.sleep(delay)
+            return Image.new("RGB", (4, 3))
+
+        def close(self):
+            type(self).closed = True
+
+    return Backend
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    monkeypatch.delenv("CUA_SCREENSHOT_BACKEND", raising=False)
+    fakes = {
+        "xshm": _backend("xshm", fails="open"),
+        "mss": _backend("mss", delay=0.01),
+        "xlib": _backend("xlib", fails="capture"),
+        "pyautogui": _backend("pyautogui", delay=0.02),
+    }
+    monkeypatch.setattr(linux_capture, "BACKENDS", fakes)
+    return fakes
+
+
+def test_fastest_working_backend_is_selected(backends):
+    backend = linux_capture.select_backend()
+    assert backend.name == "mss"
+    assert not backends["mss"].closed
+    assert backends["xlib"].closed
+    # pyautogui is only the fallback, so it isn't timed
+    assert backends["pyautogui"].opened_on is None
+
+
+def test_pyautogui_is_the_fallback(backends, monkeypatch):
+    monkeypatch.setitem(backends, "mss", _backend("mss", fails="capture"))
+    assert isinstance(linux_capture.select_backend(), linux_capture.PyAutoGUIBackend)
+
+
+def test_backend_can_be_forced(backends, monkeypatch):
+    monkeypatch.setenv("CUA_SCREENSHOT_BACKEND", "pyautogui")
+    assert linux_capture.select_backend().name == "pyautogui"
+
+    monkeypatch.setenv("CUA_SCREENSHOT_BACKEND", "scrot")
+    with pytest.raises(ValueError, match="Unknown screenshot backend"):
+        linux_capture.select_backend()
+
+
+async def test_handler_falls_back_to_pyautogui(monkeypatch):
+    monkeypatch.setattr(linux_capture.PyAutoGUIBackend, "capture", lambda self: Image.new("RGB", (8, 6)))
+    handler = LinuxAutomationHandler()
+    handler.capture_backend = _backend("xshm", fails="capture")()
+
+    result = await handler.screenshot()
+
+    assert result["success"]
+    assert handler.capture_backend.name == "pyautogui"
+
+
+async def test_handler_selects_a_backend_off_the_event_loop(backends):
+    handler = LinuxAutomationHandler()
+    assert (await handler.screenshot())["success"]
+    assert handler.capture_backend.name == "mss"
+    assert backends["mss"].opened_on is not threading.current_thread()
@@ -0,0 +1,148 @@
+"""Tests for the Linux input backends."""
+
+from collections import OrderedDict
+
+import pytest
+from Xlib import X, XK
+
+from computer_server.handlers import linux_input
+from computer_server.handlers.linux import LinuxAutomationHandler
+
+
+class FakeDisplay:
+    """Records requests; keycode 38 is a/A, keycodes 200-201 are free."""
+
+    def __init__(self):
+        self.requests = []
+
+    def keysym_to_keycodes(self, keysym):
+        return {ord("a"): [(38, 0)], ord("A"): [(38, 1)]}.get(keysym, [])
+
+    def change_keyboard_mapping(self, keycode, keysyms):
+        self.requests.append(("map", keycode, keysyms[0][0]))
+
+    def flush(self):
+        self.requests.append(("flush",))
+
+    def sync(self):
+        self.requests.append(("sync",))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def xtest():
+    backend = object.__new__(linux_input.XTestInput)
+    backend._X = X
+    backend._display = display = FakeDisplay()
+    backend._root = type("Root", (), {"id": 1})()
+    backend._shift = 50
+    backend._lock = None
+    backend._keysyms_per_keycode = 2
+    backend._spare = [200, 201]
+    backend._remapped = OrderedDict()
+    backend._fake_input = lambda _, *event, **position: display.requests.append(event + tuple(position.values()))
+    return backend
+
+
+def test_key_names():
+    assert linux_input.key_keysym("enter") == XK.string_to_keysym("Return")
+    assert linux_input.key_keysym("pageup") == XK.string_to_keysym("Prior")
+    assert linux_input.key_keysym("F12") == XK.string_to_keysym("F12")
+    assert linux_input.key_keysym("a") == ord("a")
+    assert linux_input.char_keysym("é") == 0xE9
+    assert linux_input.char_keysym("€") == 0x010020AC
+    with pytest.raises(ValueError, match="Unknown key"):
+        linux_input.key_keysym("hyper-space")
+
+
+def test_drag_points_spread_over_duration():
+    points = linux_input.drag_points([(0, 0), (100, 0), (100, 100)], duration=0.5)
+    assert len(points) == 31
+    assert points[0] == (0, 0) and points[15] == (100, 0) and points[-1] == (100, 100)
+
+    dense = [(x, 0) for x in range(100)]
+    assert linux_input.drag_points(dense, duration=0.1) == dense
+
+
+async def test_text_is_sent_in_one_flush(xtest):
+    await xtest.type_text("aA€€")
+    # The unmapped character takes a free keycode once
+    assert xtest._display.requests == [
+        (X.KeyPress, 38, 0), (X.KeyRelease, 38, 0),
+        (X.KeyPress, 50, 0), (X.KeyPress, 38, 0), (X.KeyRelease, 38, 0), (X.KeyRelease, 50, 0),
+        ("map", 200, 0x010020AC),
+        (X.KeyPress, 200, 0), (X.KeyRelease, 200, 0),
+        (X.KeyPress, 200, 0), (X.KeyRelease, 200, 0),
+        ("flush",),
+    ]
+
+
+async def test_free_keycodes_are_reused(xtest):
+    await xtest.type_text("αβγ")
+    maps = [request for request in xtest._display.requests if request[0] == "map"]
+    assert maps == [("map", 200, 0x010003B1), ("map", 201, 0x010003B2), ("map", 200, 0x010003B3)]
+
+
+async def test_drag_is_timed_by_the_x_server(xtest):
+    await xtest.drag_path([(0, 0), (10, 0)], duration=0.05)
+    requests = xtest._display.requests
+    moves = [request for request in requests if request[0] == X.MotionNotify]
+    assert moves[0] == (X.MotionNotify, 0, 0, 1, 0, 0) and moves[-1][4:] == (10, 0)
+    assert sum(move[2] for move in moves) == 50
+    assert requests[-2:] == [("flush",), ("sync",)]
+
+
+def _backend(name, fails=False):
+    class Backend(linux_input.InputBackend):
+        closed = False
+
+        def __init__(self):
+            if fails:
+                raise OSError("no XTEST")
+            self.name = name
+            self.actions = []
+
+        async def click(self, x, y, button="left", clicks=1):
+            if button == "middle":
+                raise OSError("connection lost")
+            self.actions.append(("click", x, y, button, clicks))
+
+        async def press(self, key):
+            linux_input.key_keysym(key)
+
+        def close(self):
+            type(self).closed = True
+
+    return Backend
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    monkeypatch.delenv("CUA_INPUT_BACKEND", raising=False)
+    fakes = {"xtest": _backend("xtest", fails=True), "pyautogui": _backend("pyautogui")}
+    monkeypatch.setattr(linux_input, "INPUT_BACKENDS", fakes)
+    return fakes
+
+
+def test_falls_back_without_xtest(backends, monkeypatch):
+    assert linux_input.select_input_backend().name == "pyautogui"
+
+    monkeypatch.setenv("CUA_INPUT_BACKEND", "xdotool")
+    with pytest.raises(ValueError, match="Unknown input backend"):
+        linux_input.select_input_backend()
+
+
+async def test_handler_reselects_after_backend_error(backends):
+    handler = LinuxAutomationHandler()
+
+    assert await handler.double_click(5, 6) == {"success": True}
+    assert handler.input_backend.actions == [("click", 5, 6, "left", 2)]
+
+    # Bad arguments keep the backend, other errors drop it
+    result = await handler.press_key("hyper-space")
+    assert not result["success"] and handler.input_backend is not None
+    result = await handler.click(1, 2, button="middle")
+    assert result == {"success": False, "error": "connection lost"}
+    assert handler.input_backend is None and backends["pyautogui"].closed
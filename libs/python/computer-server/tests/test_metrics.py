@@ -0,0 +1,72 @@
+"""Tests for the server metrics."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from computer_server import main, metrics
+
+
+@pytest.fixture
+def enabled():
+    metrics.enable()
+    yield
+    metrics.enable(False)
+
+
+def test_histogram_renders_cumulative_buckets(enabled):
+    histogram = metrics.Histogram("test_seconds", "A test histogram.", ["command"], buckets=(0.1, 1.0))
+    histogram.observe(0.05, "screenshot")
+    histogram.observe(0.5, "screenshot")
+    histogram.observe(5, "screenshot")
+
+    assert histogram.render() == [
+        "# HELP test_seconds A test histogram.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{command="screenshot",le="0.1"} 1',
+        'test_seconds_bucket{command="screenshot",le="1"} 2',
+        'test_seconds_bucket{command="screenshot",le="+Inf"} 3',
+        'test_seconds_sum{command="screenshot"} 5.55',
+        'test_seconds_count{command="screenshot"} 3',
+    ]
+
+
+def test_label_values_are_escaped(enabled):
+    counter = metrics.Counter("test_total", "A test counter.", ["path"])
+    counter.inc('C:\\dir "x"\n')
+    assert counter.render()[-1] == 'test_total{path="C:\\\\dir \\"x\\"\\n"} 1'
+
+
+def test_nothing_is_recorded_while_disabled():
+    counter = metrics.Counter("test_total", "A test counter.")
+    histogram = metrics.Histogram("test_seconds", "A test histogram.")
+    counter.inc()
+    histogram.observe(1)
+    with histogram.time():
+        pass
+    assert counter.value() == 0
+    assert histogram.count() == 0
+
+    response = TestClient(main.app).get("/metrics")
+    assert response.status_code == 404
+
+
+def test_commands_are_recorded_and_exposed(enabled, monkeypatch):
+    monkeypatch.delenv("CONTAINER_NAME", raising=False)
+    client = TestClient(main.app)
+
+    response = client.post("/cmd", json={"command": "version", "params": {}})
+    assert response.status_code == 200
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_json({"command": "version", "params": {}})
+        assert websocket.receive_json()["success"]
+        assert metrics.ACTIVE_CONNECTIONS.value() >= 1
+
+    assert metrics.COMMANDS.value("version", "http", "success") >= 1
+    assert metrics.COMMANDS.value("version", "websocket", "success") >= 1
+    assert metrics.COMMAND_PHASE_DURATION.count("version", "send") >= 2
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'cua_commands_total{command="version",transport="http",status="success"}' in response.text
+    assert "# TYPE cua_command_duration_seconds histogram" in response.text
+    assert 'cua_response_bytes_bucket{command="version",transport="websocket",le="256"}' in response.text
@@ -0,0 +1,46 @@
+"""Tests for the /ws/ready notification endpoint."""
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from computer_server import main
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def get_screen_size():
+        return {"success": True, "size": {"width": 1024, "height": 768}}
+
+    monkeypatch.setattr(main.automation_handler, "get_screen_size", get_screen_size)
+    # Only cloud containers set CONTAINER_NAME
+    monkeypatch.delenv("CONTAINER_NAME", raising=False)
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def cloud(monkeypatch):
+    async def auth(container_name, api_key):
+        return (container_name, api_key) == ("vm1", "secret")
+
+    monkeypatch.setenv("CONTAINER_NAME", "vm1")
+    monkeypatch.setattr(main.auth_manager, "auth", auth)
+
+
+def test_ready_is_pushed_once_the_display_is_up(client):
+    with client.websocket_connect("/ws/ready") as ws:
+        message = ws.receive_json()
+    assert message["type"] == "ready"
+    assert message["protocol"] == main.protocol_version
+
+
+def test_cloud_ready_requires_credentials(client, cloud):
+    for headers in ({}, {"X-Container-Name": "vm1"}, {"X-Container-Name": "vm1", "X-API-Key": "wrong"}):
+        with pytest.raises(WebSocketDisconnect) as info:
+            with client.websocket_connect("/ws/ready", headers=headers):
+                pass
+        assert info.value.code == 1008
+
+    headers = {"X-Container-Name": "vm1", "X-API-Key": "secret"}
+    with client.websocket_connect("/ws/ready", headers=headers) as ws:
+        assert ws.receive_json()["type"] == "ready"
@@ -0,0 +1,167 @@
+"""Tests for persistent shell sessions and Python workers."""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from computer_server.handlers import sessions
+from computer_server.handlers.sessions import SessionHandler
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="sessions need a POSIX shell")
+
+
+@pytest.fixture
+async def handler():
+    handler = SessionHandler(max_sessions=3)
+    yield handler
+    for session_id in list(handler.sessions):
+        await handler.session_close(session_id)
+    for worker in handler.workers.values():
+        await worker.close()
+
+
+@pytest.fixture(scope="module")
+def venv(tmp_path_factory):
+    path = tmp_path_factory.mktemp("venvs") / "demo"
+    subprocess.run([sys.executable, "-m", "venv", "--without-pip", str(path)], check=True)
+    return str(path)
+
+
+async def test_state_persists_between_commands(handler, tmp_path):
+    session_id = (await handler.session_create(cwd=str(tmp_path), env={"GREETING": "hi"}))["session_id"]
+
+    await handler.session_exec(session_id, "mkdir work && cd work && export COUNT=1")
+    result = await handler.session_exec(session_id, 'pwd; echo "$GREETING $COUNT"; echo oops >&2; exit_code() { return 3; }; exit_code')
+
+    assert result["stdout"] == f"{tmp_path / 'work'}\nhi 1\n"
+    assert result["stderr"] == "oops\n"
+    assert result["return_code"] == 3
+
+    # Quoting in the command is passed through untouched
+    result = await handler.session_exec(session_id, "printf '%s' \"a 'b' $(echo c)\"")
+    assert result["stdout"] == "a 'b' c"
+
+
+async def test_stateless_commands_leave_the_session_unchanged(handler, tmp_path):
+    session_id = (await handler.session_create(cwd=str(tmp_path)))["session_id"]
+
+    result = await handler.session_exec(session_id, "echo hi; exit 3", keep_state=False)
+    assert (result["success"], result["stdout"], result["return_code"]) == (True, "hi\n", 3)
+
+    await handler.session_exec(session_id, "mkdir work && cd work && export COUNT=1 && set -e", keep_state=False)
+    result = await handler.session_exec(session_id, 'pwd; echo "count=$COUNT"; false; echo still here', keep_state=False)
+    assert result["stdout"] == f"{tmp_path}\ncount=\nstill here\n"
+
+    # Exiting the shell itself ends the session
+    assert not (await handler.session_exec(session_id, "exit 3"))["success"]
+    assert session_id not in handler.sessions
+
+
+async def test_venv_stays_activated(handler, venv):
+    session_id = (await handler.session_create(venv=venv))["session_id"]
+    result = await handler.session_exec(session_id, "command -v python")
+    assert result["stdout"].strip() == os.path.join(venv, "bin", "python")
+
+    missing = await handler.session_create(venv=venv + "-missing")
+    assert not missing["success"]
+    assert "does not exist" in missing["error"]
+
+
+async def test_timeout_kills_the_session(handler):
+    session_id = (await handler.session_create())["session_id"]
+    result = await handler.session_exec(session_id, "sleep 10", timeout=0.2)
+    assert not result["success"]
+    assert "timed out" in result["error"]
+    assert (await handler.session_exec(session_id, "true"))["error"].startswith("Unknown session")
+
+
+async def test_output_limit(handler):
+    session_id = (await handler.session_create(limits={"max_output_bytes": 5}))["session_id"]
+    result = await handler.session_exec(session_id, "seq 1 100000")
+    assert result["stdout"] == "1\n2\n3"
+    # The session is still usable after discarding output
+    assert (await handler.session_exec(session_id, "echo ok"))["stdout"] == "ok\n"
+
+
+async def test_memory_limit(handler):
+    session_id = (await handler.session_create(limits={"max_memory_bytes": 512 * 1024 * 1024}))["session_id"]
+    result = await handler.session_exec(
+        session_id, f"{sys.executable} -c 'bytearray(1024 * 1024 * 1024)' 2>&1 | tail -n 1"
+    )
+    assert "MemoryError" in result["stdout"]
+
+
+async def test_capacity_limit(handler):
+    for _ in range(3):
+        assert (await handler.session_create())["success"]
+    result = await handler.session_create()
+    assert not result["success"]
+    assert "Too many open sessions" in result["error"]
+
+
+async def test_idle_sessions_are_reaped(handler, monkeypatch):
+    monkeypatch.setattr(sessions, "REAP_INTERVAL", 0.05)
+    session_id = (await handler.session_create(limits={"idle_timeout": 0.1}))["session_id"]
+    process = handler.sessions[session_id].process
+
+    await asyncio.wait_for(process.wait(), 5)
+    await asyncio.sleep(0.1)
+    assert session_id not in handler.sessions
+
+
+SOURCE = '''
+def remember(value):
+    import os
+    global seen
+    seen = globals().get("seen", []) + [value]
+    print("called with", value)
+    return {"pid": os.getpid(), "seen": seen}
+'''
+
+
+async def test_python_worker_keeps_state_between_calls(handler, venv):
+    first = await handler.python_exec(SOURCE, "remember", [1], venv=venv)
+    second = await handler.python_exec(SOURCE, "remember", [2], venv=venv)
+
+    assert first["output"]["stdout"] == "called with 1\n"
+    assert second["output"]["result"]["pid"] == first["output"]["result"]["pid"]
+    assert second["output"]["result"]["seen"] == [1, 2]
+
+
+async def test_python_worker_returns_stderr_per_call(handler, venv):
+    source = "def warn(n):\n    import sys\n    sys.stderr.write('w' * n)\n    return n\n"
+    result = await handler.python_exec(source, "warn", [3], venv=venv)
+    assert result["output"]["stderr"] == "www"
+    assert (await handler.python_exec(source, "warn", [0], venv=venv))["output"]["stderr"] == ""
+
+
+async def test_python_worker_stderr_is_bounded(handler):
+    # More than a pipe buffer holds; the worker must not block on it
+    source = "def spam():\n    import sys\n    sys.stderr.write('x' * 1_000_000)\n    return 'done'\n"
+    result = await handler.python_exec(source, "spam", limits={"max_output_bytes": 10}, timeout=10)
+    assert result["output"]["result"] == "done"
+    assert result["output"]["stderr"] == "x" * 10
+
+
+async def test_python_worker_exit_reports_its_stderr(handler):
+    source = "def die():\n    import os, sys\n    sys.stderr.write('bye')\n    os._exit(1)\n"
+    result = await handler.python_exec(source, "die")
+    assert not result["success"]
+    assert result["error"] == "Python worker exited: bye"
+    assert None not in handler.workers
+
+
+async def test_python_worker_reports_exceptions(handler, venv):
+    result = await handler.python_exec("def fail():\n    raise KeyError('k')\n", "fail", venv=venv)
+    output = result["output"]
+    assert not output["success"]
+    assert output["error"]["type"] == "KeyError"
+    assert "Traceback" in output["error"]["traceback"]
+
+    # A timeout stops the worker; the next call starts a new one
+    result = await handler.python_exec("def hang():\n    import time; time.sleep(10)\n", "hang", venv=venv, timeout=0.2)
+    assert "timed out" in result["error"]
+    assert (await handler.python_exec(SOURCE, "remember", [3], venv=venv))["output"]["result"]["seen"] == [3]
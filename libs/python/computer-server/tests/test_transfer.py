@@ -0,0 +1,162 @@
+"""Tests for the streaming file transfer endpoints."""
+
+import hashlib
+import io
+import os
+import tarfile
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from computer_server import transfer
+from computer_server.handlers.generic import GenericFileHandler
+
+
+@pytest.fixture
+def client():
+    # The same routes as the server, without the OS automation handlers
+    app = FastAPI()
+
+    @app.get("/files")
+    async def download(request: Request, path: str):
+        return await transfer.send_file(request, Path(path))
+
+    @app.put("/files")
+    async def upload(request: Request, path: str, offset: int = 0, append: bool = False):
+        return await transfer.receive_file(request, Path(path), offset=offset, append=append)
+
+    @app.put("/files/archive")
+    async def upload_archive(request: Request, path: str):
+        return await transfer.receive_archive(request, Path(path))
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def data():
+    return os.urandom(3 * transfer.CHUNK_SIZE + 12345)
+
+
+def test_download_whole_file_and_ranges(client, tmp_path, data):
+    path = tmp_path / "blob"
+    path.write_bytes(data)
+
+    response = client.get("/files", params={"path": str(path)})
+    assert response.status_code == 200
+    assert response.content == data
+    assert response.headers["accept-ranges"] == "bytes"
+    etag = response.headers["etag"]
+
+    response = client.get("/files", params={"path": str(path)}, headers={"Range": "bytes=100-"})
+    assert response.status_code == 206
+    assert response.content == data[100:]
+    assert response.headers["content-range"] == f"bytes 100-{len(data) - 1}/{len(data)}"
+
+    response = client.get("/files", params={"path": str(path)}, headers={"Range": "bytes=10-19"})
+    assert response.content == data[10:20]
+    response = client.get("/files", params={"path": str(path)}, headers={"Range": "bytes=-5"})
+    assert response.content == data[-5:]
+
+    # Resuming against a changed file restarts from the beginning
+    response = client.get("/files", params={"path": str(path)}, headers={"Range": "bytes=100-", "If-Range": etag})
+    assert response.status_code == 206
+    path.write_bytes(b"changed")
+    response = client.get("/files", params={"path": str(path)}, headers={"Range": "bytes=3-", "If-Range": etag})
+    assert (response.status_code, response.content) == (200, b"changed")
+
+
+def test_download_errors(client, tmp_path):
+    path = tmp_path / "small"
+    path.write_bytes(b"abc")
+
+    response = client.get("/files", params={"path": str(path)}, headers={"Range": "bytes=3-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */3"
+
+    response = client.get("/files", params={"path": str(tmp_path / "missing")})
+    assert response.status_code == 404
+    assert response.json()["detail"].startswith("File not found")
+
+
+def test_upload_streams_and_reports_hash(client, tmp_path, data):
+    path = tmp_path / "upload"
+
+    def chunks():
+        for i in range(0, len(data), 100_000):
+            yield data[i:i + 100_000]
+
+    response = client.put("/files", params={"path": str(path)}, content=chunks())
+    assert response.json() == {"success": True, "size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+    assert path.read_bytes() == data
+
+    response = client.put("/files", params={"path": str(path), "append": True}, content=b"tail")
+    assert response.json()["size"] == 4
+    assert path.read_bytes() == data + b"tail"
+
+
+def test_upload_resumes_at_offset(client, tmp_path, data):
+    path = tmp_path / "upload"
+    path.write_bytes(data[:1000] + b"partial garbage")
+
+    response = client.put("/files", params={"path": str(path), "offset": 1000}, content=data[1000:])
+    assert response.json()["sha256"] == hashlib.sha256(data[1000:]).hexdigest()
+    assert path.read_bytes() == data
+
+    response = client.put("/files", params={"path": str(path), "offset": len(data) + 1}, content=b"x")
+    assert response.status_code == 400
+    assert "beyond the end" in response.json()["detail"]
+
+
+async def test_file_hash(tmp_path, data):
+    path = tmp_path / "blob"
+    path.write_bytes(data)
+    handler = GenericFileHandler()
+
+    assert (await handler.file_hash(str(path)))["sha256"] == hashlib.sha256(data).hexdigest()
+    result = await handler.file_hash(str(path), offset=10, length=2 * transfer.CHUNK_SIZE)
+    assert result == {
+        "success": True,
+        "sha256": hashlib.sha256(data[10:10 + 2 * transfer.CHUNK_SIZE]).hexdigest(),
+        "size": 2 * transfer.CHUNK_SIZE,
+    }
+
+
+def _tar(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT) as archive:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            if content is None:
+                info.type = tarfile.DIRTYPE
+                archive.addfile(info)
+            else:
+                info.size = len(content)
+                info.mtime = 1_600_000_000.5
+                archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def test_archive_is_extracted_as_it_streams(client, tmp_path, data):
+    archive = _tar({"src/a.py": b"print(1)", "src/big.bin": data, "empty": None})
+
+    def chunks():
+        for i in range(0, len(archive), 50_000):
+            yield archive[i:i + 50_000]
+
+    response = client.put("/files/archive", params={"path": str(tmp_path / "dest")}, content=chunks())
+    assert response.json() == {"success": True, "files": 2, "bytes": len(data) + 8}
+    assert (tmp_path / "dest/src/big.bin").read_bytes() == data
+    assert (tmp_path / "dest/empty").is_dir()
+    # Modification times are kept, so later syncs see the files as unchanged
+    assert (tmp_path / "dest/src/a.py").stat().st_mtime == 1_600_000_000.5
+
+
+def test_archive_members_outside_the_destination_are_rejected(client, tmp_path):
+    response = client.put("/files/archive", params={"path": str(tmp_path / "dest")}, content=_tar({"../escape": b"x"}))
+    assert response.status_code == 400
+    assert not (tmp_path / "escape").exists()
+
+    response = client.put("/files/archive", params={"path": str(tmp_path / "dest")}, content=b"not a tar" * 100)
+    assert response.status_code == 400
@@ -0,0 +1,122 @@
+"""
+Benchmark file transfer throughput between the interface and a computer server.
+
+Writes and reads files of several sizes through the streaming ``/files``
+endpoints and through the base64 ``write_bytes``/``read_bytes`` commands
+they replace, checking every round trip, and reports MB/s for each. Runs
+against a server that is already up, or starts one locally with
+``--start-server`` (requires the ``cua-computer-server`` package).
+
+Usage:
+    python benchmarks/file_transfer.py --start-server
+    python benchmarks/file_transfer.py --host 192.168.64.5 --sizes 16 128 512
+    python benchmarks/file_transfer.py --start-server --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from computer.interface.generic import GenericComputerInterface
+
+
+async def _measure(
+    interface: GenericComputerInterface, path: str, data: bytes, streaming: bool, runs: int
+) -> Dict[str, Any]:
+    """Write then read ``data`` ``runs`` times and report the best throughput of each."""
+    interface._file_endpoints = streaming
+    writes, reads = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await interface.write_bytes(path, data)
+        writes.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        copy = await interface.read_bytes(path)
+        reads.append(time.perf_counter() - start)
+        if copy != data:
+            raise RuntimeError(f"Read back {len(copy)} bytes that differ from the {len(data)} written")
+
+    mb = len(data) / (1024 * 1024)
+    return {
+        "method": "http" if streaming else "commands",
+        "size_mb": mb,
+        "write_mb_s": round(mb / min(writes), 1),
+        "read_mb_s": round(mb / min(reads), 1),
+    }
+
+
+async def _wait_for_server(interface: GenericComputerInterface, timeout: float) -> None:
+    # File transfer doesn't need a display, so don't wait for one like wait_for_ready does
+    deadline = time.monotonic() + timeout
+    while not (await interface._send_command_rest("version")).get("success", False):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Computer server at {interface.rest_uri} not ready after {timeout} seconds")
+        await asyncio.sleep(0.5)
+
+
+def _start_server(port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "computer_server", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+    )
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    server: Optional[subprocess.Popen] = _start_server(args.port) if args.start_server else None
+    interface = GenericComputerInterface(args.host, api_port=args.port)
+    path = f"{args.remote_dir.rstrip('/')}/cua-transfer-benchmark.bin"
+    try:
+        await _wait_for_server(interface, timeout=60)
+        results = []
+        for size in args.sizes:
+            data = os.urandom(int(size * 1024 * 1024))
+            for streaming in (True, False):
+                if not streaming and size > args.max_command_mb:
+                    continue
+                results.append(await _measure(interface, path, data, streaming, args.runs))
+        await interface.delete_file(path)
+        return results
+    finally:
+        interface.close()
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="Computer server address")
+    parser.add_argument("--port", type=int, default=8000, help="Computer server port")
+    parser.add_argument("--start-server", action="store_true", help="Start a local computer server on --port")
+    parser.add_argument("--remote-dir", default="/tmp", help="Directory on the computer to write the test file to")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 16, 128], help="File sizes in MB")
+    parser.add_argument("--runs", type=int, default=3, help="Transfers per size and method; the fastest is reported")
+    parser.add_argument(
+        "--max-command-mb", type=float, default=128, help="Skip the base64 commands for larger files, which are slow"
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print(
+                f"{result['size_mb']:>8.1f} MB  {result['method']:<9} "
+                f"write {result['write_mb_s']:>8.1f} MB/s  read {result['read_mb_s']:>8.1f} MB/s"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
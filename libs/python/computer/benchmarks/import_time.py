@@ -0,0 +1,105 @@
+"""
+Benchmark import time of the computer and agent packages.
+
+CLIs and the MCP server import these packages on startup, so heavy
+dependencies must stay out of the import path until they are used. Each
+target is imported in a fresh interpreter with ``-X importtime``, several
+times, and the fastest run is reported. The run fails if a target exceeds
+its time budget or imports one of the modules that should load lazily.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 10 --max-ms 150
+    python benchmarks/import_time.py --target "from agent import ComputerAgent" --json
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from typing import Any, Dict, List, Sequence
+
+# Import statements measured by default, with modules they must not load
+DEFAULT_TARGETS: Dict[str, Sequence[str]] = {
+    "import computer": ("aiohttp", "websockets", "PIL", "gradio", "computer.interface"),
+    "from computer import Computer": ("aiohttp", "websockets", "PIL", "gradio"),
+    "import agent": ("litellm", "openai", "torch", "transformers", "gradio", "agent.loops.anthropic"),
+}
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _import_once(statement: str) -> Dict[str, Any]:
+    """Run ``statement`` in a fresh interpreter and parse its import timings."""
+    probe = f"{statement}\nimport json, sys\nprint(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{result.stderr[-2000:]}")
+
+    total_us = 0
+    slowest = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if indent == 1:
+            total_us += cumulative
+            slowest.append((cumulative, name))
+    modules = json.loads(result.stdout.strip().splitlines()[-1])
+    return {
+        "total_ms": total_us / 1000,
+        "slowest": [{"module": name, "ms": us / 1000} for us, name in sorted(slowest, reverse=True)[:5]],
+        "modules": modules,
+    }
+
+
+def measure(statement: str, forbidden: Sequence[str], runs: int) -> Dict[str, Any]:
+    """Import ``statement`` ``runs`` times and report the fastest run."""
+    samples = [_import_once(statement) for _ in range(runs)]
+    best = min(samples, key=lambda s: s["total_ms"])
+    loaded = set(best["modules"])
+    return {
+        "target": statement,
+        "best_ms": round(best["total_ms"], 1),
+        "runs_ms": [round(s["total_ms"], 1) for s in samples],
+        "slowest": best["slowest"],
+        "modules_loaded": len(loaded),
+        "eager_heavy_imports": sorted(m for m in forbidden if m in loaded),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", help="Import statement to measure (repeatable)")
+    parser.add_argument("--runs", type=int, default=5, help="Imports per target; the fastest is reported")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if a target takes longer than this")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    targets = {t: DEFAULT_TARGETS.get(t, ()) for t in args.target} if args.target else DEFAULT_TARGETS
+    results = [measure(statement, forbidden, args.runs) for statement, forbidden in targets.items()]
+
+    failed = False
+    for result in results:
+        over_budget = args.max_ms is not None and result["best_ms"] > args.max_ms
+        failed = failed or over_budget or bool(result["eager_heavy_imports"])
+        if not args.json:
+            slowest = ", ".join(f"{s['module']} {s['ms']:.1f}ms" for s in result["slowest"][:3])
+            print(f"{result['target']:<35} {result['best_ms']:>8.1f} ms  ({result['modules_loaded']} modules; {slowest})")
+            if over_budget:
+                print(f"  over budget of {args.max_ms} ms")
+            if result["eager_heavy_imports"]:
+                print(f"  imports heavy modules eagerly: {', '.join(result['eager_heavy_imports'])}")
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Benchmark startup time and per-session memory of local Xvfb sessions versus containers.
+
+Starts N sessions one after another, measuring the time from launch until
+each computer server answers, then samples resident memory with all
+sessions running. Containers are measured the same way when an image
+running the computer server on port 8000 is given.
+
+Usage:
+    python benchmarks/local_xvfb.py --sessions 8
+    python benchmarks/local_xvfb.py --sessions 8 --container-image my/cua-linux:latest
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+from computer.interface.factory import InterfaceFactory
+from computer.providers.lumier.docker_client import AsyncDockerClient
+from computer.providers.xvfb import LocalXvfbProvider
+
+
+async def _wait_for_server(ip_address: str, port: int, timeout: float) -> None:
+    interface = InterfaceFactory.create_interface_for_os("linux", ip_address, api_port=port)
+    try:
+        await interface.wait_for_ready(timeout=int(timeout))
+    finally:
+        interface.close()
+
+
+def _summary(kind: str, startups: List[float], memory_mb: List[float]) -> Dict[str, Any]:
+    return {
+        "kind": kind,
+        "sessions": len(startups),
+        "startup_p50_s": round(statistics.median(startups), 3),
+        "startup_max_s": round(max(startups), 3),
+        "memory_mean_mb": round(statistics.mean(memory_mb), 1),
+        "memory_total_mb": round(sum(memory_mb), 1),
+    }
+
+
+async def bench_xvfb(sessions: int, base_port: int, timeout: float) -> Dict[str, Any]:
+    startups = []
+    async with LocalXvfbProvider(base_port=base_port) as provider:
+        for i in range(sessions):
+            name = f"bench-xvfb-{i}"
+            started = time.monotonic()
+            await provider.run_vm("local", name, {})
+            ip_address = await provider.get_ip(name, retry_delay=1)
+            await _wait_for_server(ip_address, provider.get_api_port(name), timeout)
+            startups.append(time.monotonic() - started)
+        memory = [vm["memory_rss_mb"] for vm in await provider.list_vms()]
+    return _summary("local_xvfb", startups, memory)
+
+
+async def bench_containers(sessions: int, image: str, base_port: int, timeout: float) -> Dict[str, Any]:
+    client = AsyncDockerClient()
+    names = [f"bench-container-{i}" for i in range(sessions)]
+    startups = []
+    try:
+        for i, name in enumerate(names):
+            started = time.monotonic()
+            await client.run_container(image, name, ports={8000: base_port + i})
+            await _wait_for_server("127.0.0.1", base_port + i, timeout)
+            startups.append(time.monotonic() - started)
+        memory = []
+        for name in names:
+            stats = (await client.stats(name)).get("memory_stats", {})
+            # Exclude reclaimable page cache, as `docker stats` does
+            cache = stats.get("stats", {}).get("inactive_file", 0)
+            memory.append((stats.get("usage", 0) - cache) / (1024 * 1024))
+    finally:
+        await asyncio.gather(*(client.remove_container(name) for name in names), return_exceptions=True)
+        await client.close()
+    return _summary("container", startups, memory)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=4, help="Number of sessions to start (default: 4)")
+    parser.add_argument("--container-image", help="Image running the computer server on port 8000 to compare against")
+    parser.add_argument("--base-port", type=int, default=8100, help="First host port to use (default: 8100)")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-session startup timeout in seconds")
+    args = parser.parse_args()
+
+    results = [await bench_xvfb(args.sessions, args.base_port, args.timeout)]
+    if args.container_image:
+        results.append(
+            await bench_containers(args.sessions, args.container_image, args.base_port + 1000, args.timeout)
+        )
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,6 @@
 """CUA Computer Interface for cross-platform computer control."""
 
+import importlib
 import logging
 import sys
 
@@ -42,10 +43,21 @@ except Exception as e:
     # Other issues with telemetry
     logger.warning(f"Error initializing telemetry: {e}")
 
-# Core components
-from .computer import Computer
+# Core and provider components, imported on first access so that importing the
+# package doesn't load the interface clients (aiohttp, websockets) or PIL
+_LAZY_IMPORTS = {
+    "Computer": ".computer",
+    "ComputerPool": ".pool",
+    "VMProviderType": ".providers.base",
+}
 
-# Provider components
-from .providers.base import VMProviderType
 
-__all__ = ["Computer", "VMProviderType"]
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["Computer", "ComputerPool", "VMProviderType"]
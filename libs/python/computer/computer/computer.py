@@ -1,9 +1,7 @@
-from typing import Optional, List, Literal, Dict, Any, Union, TYPE_CHECKING, cast
+from typing import Optional, Callable, List, Literal, Dict, Any, Sequence, Union, TYPE_CHECKING, cast
 import asyncio
 from .models import Computer as ComputerConfig, Display
-from .interface.factory import InterfaceFactory
 import time
-from PIL import Image
 import io
 import re
 from .logger import Logger, LogLevel
@@ -12,9 +10,11 @@ import logging
 from .telemetry import record_computer_initialization
 import os
 from . import helpers
+from .readiness import StartupTimings
+from .reset import DEFAULT_MAX_SNAPSHOT_BYTES, DEFAULT_RESET_PATHS, FileSnapshot, ResetResult
 
 # Import provider related modules
-from .providers.base import VMProviderType
+from .providers.base import BaseVMProvider, VMProviderType
 from .providers.factory import VMProviderFactory
 
 OSType = Literal["macos", "linux", "windows"]
@@ -55,7 +55,8 @@ class Computer:
         storage: Optional[str] = None,
         ephemeral: bool = False,
         api_key: Optional[str] = None,
-        experiments: Optional[List[str]] = None
+        experiments: Optional[List[str]] = None,
+        vm_provider: Optional[BaseVMProvider] = None,
     ):
         """Initialize a new Computer instance.
 
@@ -83,6 +84,8 @@ class Computer:
             ephemeral: Whether to use ephemeral storage
             api_key: Optional API key for cloud providers
             experiments: Optional list of experimental features to enable (e.g. ["app-use"])
+            vm_provider: Optional provider instance to use instead of creating one from
+                        provider_type (e.g. a custom or fake BaseVMProvider)
         """
 
         self.logger = Logger("computer", verbosity)
@@ -130,6 +133,19 @@ class Computer:
         self._initialized = False
         self._running = False
 
+        # Per-phase durations of the last run() (provision, ip, server, first_screenshot)
+        self.startup_timings = StartupTimings()
+
+        # Restore point saved by snapshot(): a provider snapshot name or a FileSnapshot
+        self._restore_point: Optional[Union[str, FileSnapshot]] = None
+        # Method and step durations of the last reset()
+        self.reset_timings: Optional[ResetResult] = None
+
+        # Persistent shell session per virtual environment, used by the venv helpers
+        self._venv_sessions: Dict[str, str] = {}
+        # Cleared when the computer server turns out not to support sessions
+        self._sessions_supported = True
+
         # Configure root logger
         self.verbosity = verbosity
         self.logger = Logger("computer", verbosity)
@@ -170,7 +186,7 @@ class Computer:
                 cpu=cpu,
             )
             # Initialize VM provider but don't start it yet - we'll do that in run()
-            self.config.vm_provider = None  # Will be initialized in run()
+            self.config.vm_provider = vm_provider  # Created in run() if not given
 
         # Store shared directories config
         self.shared_directories = shared_directories or []
@@ -221,6 +237,7 @@ class Computer:
 
         self.logger.info("Starting computer...")
         start_time = time.time()
+        self.startup_timings.start()
 
         try:
             # If using host computer server
@@ -230,6 +247,7 @@ class Computer:
                 ip_address = "localhost"
                 # Create the interface with explicit type annotation
                 from .interface.base import BaseComputerInterface
+                from .interface.factory import InterfaceFactory
 
                 self._interface = cast(
                     BaseComputerInterface,
@@ -239,7 +257,8 @@ class Computer:
                 )
 
                 self.logger.info("Waiting for host computer server to be ready...")
-                await self._interface.wait_for_ready()
+                with self.startup_timings.phase("server"):
+                    await self._interface.wait_for_ready()
                 self.logger.info("Host computer server ready")
             else:
                 # Start or connect to VM
@@ -261,7 +280,9 @@ class Computer:
 
                         # Create VM provider instance with explicit parameters
                         try:
-                            if self.provider_type == VMProviderType.LUMIER:
+                            if self.config.vm_provider is not None:
+                                self.logger.verbose("Using provided VM provider instance")
+                            elif self.provider_type == VMProviderType.LUMIER:
                                 self.logger.info(f"Using VM image for Lumier provider: {image}")
                                 if shared_path:
                                     self.logger.info(f"Using shared path for Lumier provider: {shared_path}")
@@ -302,6 +323,11 @@ class Computer:
                                     verbose=verbose,
                                     ephemeral=ephemeral,
                                 )
+                            elif self.provider_type == VMProviderType.LOCAL_XVFB:
+                                self.config.vm_provider = VMProviderFactory.create_provider(
+                                    self.provider_type,
+                                    verbose=verbose,
+                                )
                             else:
                                 raise ValueError(f"Unsupported provider type: {self.provider_type}")
                             self._provider_context = await self.config.vm_provider.__aenter__()
@@ -397,18 +423,21 @@ class Computer:
                         self.logger.error(f"Failed to run VM: {run_error}")
                         raise RuntimeError(f"Failed to start VM: {run_error}")
 
+                self.startup_timings.record("provision", time.monotonic() - self.startup_timings.started_at)
+
                 # Wait for VM to be ready with a valid IP address
                 self.logger.info("Waiting for VM to be ready with a valid IP address...")
                 try:
                     if self.provider_type == VMProviderType.LUMIER:
                         max_retries = 60  # Increased for Lumier VM startup which takes longer
-                        retry_delay = 3    # 3 seconds between retries for Lumier
+                        retry_delay = 3    # Poll at most every 3 seconds for Lumier
                     else:
                         max_retries = 30  # Default for other providers
-                        retry_delay = 2    # 2 seconds between retries
+                        retry_delay = 2    # Poll at most every 2 seconds
                     
                     self.logger.info(f"Waiting up to {max_retries * retry_delay} seconds for VM to be ready...")
-                    ip = await self.get_ip(max_retries=max_retries, retry_delay=retry_delay)
+                    with self.startup_timings.phase("ip"):
+                        ip = await self.get_ip(max_retries=max_retries, retry_delay=retry_delay)
                     
                     # If we get here, we have a valid IP
                     self.logger.info(f"VM is ready with IP: {ip}")
@@ -431,6 +460,12 @@ class Computer:
             # Initialize the interface using the factory with the specified OS
             self.logger.info(f"Initializing interface for {self.os_type} at {ip_address}")
             from .interface.base import BaseComputerInterface
+            from .interface.factory import InterfaceFactory
+
+            # Providers hosting several computer servers per host assign each its own port
+            api_port = None
+            if not self.use_host_computer_server and self.config.vm_provider is not None:
+                api_port = self.config.vm_provider.get_api_port(self.config.name)
 
             # Pass authentication credentials if using cloud provider
             if self.provider_type == VMProviderType.CLOUD and self.api_key and self.config.name:
@@ -448,7 +483,8 @@ class Computer:
                     BaseComputerInterface,
                     InterfaceFactory.create_interface_for_os(
                         os=self.os_type, 
-                        ip_address=ip_address
+                        ip_address=ip_address,
+                        api_port=api_port
                     ),
                 )
 
@@ -458,7 +494,8 @@ class Computer:
             try:
                 # Use a single timeout for the entire connection process
                 # The VM should already be ready at this point, so we're just establishing the connection
-                await self._interface.wait_for_ready(timeout=30)
+                with self.startup_timings.phase("server"):
+                    await self._interface.wait_for_ready(timeout=30)
                 self.logger.info("WebSocket interface connected successfully")
             except TimeoutError as e:
                 self.logger.error(f"Failed to connect to WebSocket interface at {ip_address}")
@@ -474,7 +511,10 @@ class Computer:
                 self._stop_event = asyncio.Event()
                 self._keep_alive_task = asyncio.create_task(self._stop_event.wait())
 
-            self.logger.info("Computer is ready")
+            self.startup_timings.mark_ready()
+            if hasattr(self._interface, "startup_timings"):
+                self._interface.startup_timings = self.startup_timings
+            self.logger.info(f"Computer is ready (startup timings: {self.startup_timings.to_dict()})")
 
             # Set the initialization flag and clear the initializing flag
             self._initialized = True
@@ -483,7 +523,7 @@ class Computer:
             helpers.set_default_computer(self)
             
             self.logger.info("Computer successfully initialized")
-        except Exception as e:
+        except Exception:
             raise
         finally:
             # Log initialization time for performance monitoring
@@ -502,6 +542,7 @@ class Computer:
 
         try:
             self.logger.info("Stopping Computer...")
+            await self._close_venv_sessions()
 
             # In VM mode, first explicitly stop the VM, then exit the provider context
             if not self.use_host_computer_server and self._provider_context and self.config.vm_provider is not None:
@@ -514,6 +555,14 @@ class Computer:
                 except Exception as e:
                     self.logger.error(f"Error stopping VM: {e}")
 
+                # Provider snapshots taken by snapshot() live as long as this computer
+                if isinstance(self._restore_point, str):
+                    try:
+                        await self.config.vm_provider.delete_snapshot(self._restore_point, storage=self.storage)
+                    except Exception as e:
+                        self.logger.error(f"Error deleting snapshot {self._restore_point}: {e}")
+                    self._restore_point = None
+
                 self.logger.verbose("Closing VM provider context...")
                 await self.config.vm_provider.__aexit__(None, None, None)
                 self._provider_context = None
@@ -528,6 +577,96 @@ class Computer:
             self.logger.debug(f"Computer stop process took {duration_ms:.2f}ms")
         return
 
+    async def _cycle_vm(self, operation: str, result: ResetResult) -> None:
+        """Stop the VM, run a provider snapshot or restore on it, and start it again."""
+        provider = self.config.vm_provider
+        storage = "ephemeral" if self.ephemeral else self.storage
+        snapshot_name = self._restore_point if isinstance(self._restore_point, str) else f"{self.config.name}-snapshot"
+
+        await self.disconnect()
+        if getattr(self, "_stop_event", None) is not None:
+            self._stop_event.set()
+        self._initialized = False
+
+        with result.phase(operation):
+            call = provider.snapshot if operation == "snapshot" else provider.restore
+            response = await call(self.config.name, snapshot_name, storage=storage)
+        if "error" in response:
+            raise RuntimeError(f"Failed to {operation} VM {self.config.name}: {response['error']}")
+        result.details["snapshot"] = snapshot_name
+
+        with result.phase("boot"):
+            await self.run()
+        result.details["startup"] = self.startup_timings.to_dict()
+
+    async def snapshot(
+        self,
+        paths: Optional[Sequence[str]] = None,
+        max_bytes: int = DEFAULT_MAX_SNAPSHOT_BYTES,
+    ) -> ResetResult:
+        """Save the computer's current state as the point reset() returns to.
+
+        The fastest mechanism available is chosen here, once:
+
+        - With ``paths``, or if the provider has no snapshots, the files under
+          ``paths`` (default: Desktop, Documents and Downloads) are captured
+          through the file API. Resetting then only rolls those files back,
+          without a reboot.
+        - Otherwise the provider snapshots the whole VM (Lume clones it). The
+          VM is stopped for the snapshot and started again, and every reset
+          reboots from the snapshot.
+
+        A provider snapshot is deleted again when the computer is stopped.
+
+        Args:
+            paths: Directories to capture instead of snapshotting the whole VM
+            max_bytes: Maximum total size of the files a file snapshot captures
+
+        Returns:
+            The method used and how long each step took
+        """
+        if not self._initialized:
+            raise RuntimeError("Computer must be running to take a snapshot; call run() first")
+
+        provider = None if self.use_host_computer_server else self.config.vm_provider
+        if paths is None and provider is not None and provider.supports_snapshots:
+            result = ResetResult("provider")
+            await self._cycle_vm("snapshot", result)
+            self._restore_point = result.details["snapshot"]
+        else:
+            result = ResetResult("files")
+            with result.phase("capture"):
+                snapshot = await FileSnapshot.capture(self.interface, paths or DEFAULT_RESET_PATHS, max_bytes)
+            result.details.update(files=len(snapshot.files), bytes=snapshot.size)
+            self._restore_point = snapshot
+
+        self.logger.info(f"Saved restore point in {result.total:.2f}s ({result.method})")
+        return result
+
+    async def reset(self) -> ResetResult:
+        """Return the computer to the state saved by snapshot().
+
+        Returns:
+            The method used and how long each step took; also kept in ``reset_timings``
+
+        Raises:
+            RuntimeError: If no snapshot was taken or restoring it failed
+        """
+        if self._restore_point is None:
+            raise RuntimeError("No restore point to reset to; call snapshot() first")
+
+        if isinstance(self._restore_point, FileSnapshot):
+            result = ResetResult("files")
+            with result.phase("rollback"):
+                result.details.update(await self._restore_point.restore(self.interface))
+        else:
+            result = ResetResult("provider")
+            await self._cycle_vm("restore", result)
+
+        self.reset_timings = result
+        self.logger.info(f"Computer reset in {result.total:.2f}s ({result.method})")
+        return result
+
     # @property
     async def get_ip(self, max_retries: int = 15, retry_delay: int = 3) -> str:
         """Get the IP address of the VM or localhost if using host computer server.
@@ -537,7 +676,7 @@ class Computer:
         
         Args:
             max_retries: Unused parameter, kept for backward compatibility
-            retry_delay: Delay between retries in seconds (default: 2)
+            retry_delay: Maximum delay between retries in seconds (default: 3)
             
         Returns:
             IP address of the VM or localhost if using host computer server
@@ -697,6 +836,8 @@ class Computer:
         Returns:
             Dict[str, int]: Dictionary containing 'width' and 'height' of the image
         """
+        from PIL import Image
+
         image = Image.open(io.BytesIO(screenshot))
         width, height = image.size
         return {"width": width, "height": height}
@@ -752,13 +893,80 @@ class Computer:
         return await self.interface.to_screenshot_coordinates(x, y)
 
 
+    async def _run_command(self, command: str, on_output: Optional[Callable[[str, str], Any]] = None):
+        """Run a shell command, streaming its output to ``on_output`` if given.
+
+        Args:
+            command: Shell command to run
+            on_output: Called with ("stdout" or "stderr", text) for each output chunk
+
+        Returns:
+            CommandResult with the complete output
+        """
+        if on_output is None:
+            return await self.interface.run_command(command)
+
+        from .interface.models import CommandResult
+
+        output: Dict[str, List[str]] = {"stdout": [], "stderr": []}
+        returncode = 0
+        async for event in self.interface.run_command_stream(command):
+            if event.type == "exit":
+                returncode = event.returncode
+            else:
+                output[event.type].append(event.data)
+                on_output(event.type, event.data)
+        return CommandResult("".join(output["stdout"]), "".join(output["stderr"]), returncode)
+
+    async def _venv_session_exec(self, venv_name: str, command: str):
+        """Run a command in the persistent session of a virtual environment.
+
+        The session is created, with the venv activated, on first use and
+        recreated if the server closed it while idle. Each command runs in a
+        subshell of the session, so like a separate run_command it can't change
+        the directory or environment of later commands, and ``exit N`` only
+        sets its return code.
+
+        Returns:
+            CommandResult, or None if the computer server has no sessions
+
+        Raises:
+            RuntimeError: If the virtual environment does not exist
+        """
+        if not self._sessions_supported:
+            return None
+        for attempt in range(2):
+            session_id = self._venv_sessions.get(venv_name)
+            try:
+                if session_id is None:
+                    session_id = await self.interface.create_session(venv=f"~/.venvs/{venv_name}")
+                    self._venv_sessions[venv_name] = session_id
+                return await self.interface.session_exec(session_id, command, keep_state=False)
+            except NotImplementedError:
+                self._sessions_supported = False
+                return None
+            except RuntimeError as e:
+                if attempt or not str(e).startswith("Unknown session"):
+                    raise
+                self._venv_sessions.pop(venv_name, None)
+
+    async def _close_venv_sessions(self) -> None:
+        """Close the venv helpers' sessions; the server would otherwise close them once idle."""
+        sessions, self._venv_sessions = self._venv_sessions, {}
+        for session_id in sessions.values():
+            try:
+                await self.interface.close_session(session_id)
+            except Exception as e:
+                self.logger.debug(f"Error closing session {session_id}: {e}")
+
     # Add virtual environment management functions to computer interface
-    async def venv_install(self, venv_name: str, requirements: list[str]):
+    async def venv_install(self, venv_name: str, requirements: list[str], on_output: Optional[Callable[[str, str], Any]] = None):
         """Install packages in a virtual environment.
         
         Args:
             venv_name: Name of the virtual environment
             requirements: List of package requirements to install
+            on_output: Called with ("stdout" or "stderr", text) as pip prints output
             
         Returns:
             Tuple of (stdout, stderr) from the installation command
@@ -775,20 +983,36 @@ class Computer:
         
         # Install packages
         requirements_str = " ".join(requirements)
+        if on_output is None:
+            result = await self._venv_session_exec(venv_name, f"pip install {requirements_str}")
+            if result is not None:
+                return result
         install_cmd = f". {venv_path}/bin/activate && pip install {requirements_str}"
-        return await self.interface.run_command(install_cmd)
+        return await self._run_command(install_cmd, on_output)
     
-    async def venv_cmd(self, venv_name: str, command: str):
+    async def venv_cmd(self, venv_name: str, command: str, on_output: Optional[Callable[[str, str], Any]] = None):
         """Execute a shell command in a virtual environment.
         
         Args:
             venv_name: Name of the virtual environment
             command: Shell command to execute in the virtual environment
+            on_output: Called with ("stdout" or "stderr", text) as the command prints output
             
         Returns:
             Tuple of (stdout, stderr) from the command execution
         """
         venv_path = f"~/.venvs/{venv_name}"
+
+        # Run in the venv's persistent session, where it is already activated
+        if on_output is None:
+            try:
+                result = await self._venv_session_exec(venv_name, command)
+            except RuntimeError as e:
+                if "does not exist" not in str(e):
+                    raise
+                return "", f"Virtual environment '{venv_name}' does not exist. Create it first using venv_install."
+            if result is not None:
+                return result
         
         # Check if virtual environment exists
         check_cmd = f"test -d {venv_path}"
@@ -799,8 +1023,19 @@ class Computer:
         
         # Activate virtual environment and run command
         full_command = f". {venv_path}/bin/activate && {command}"
-        return await self.interface.run_command(full_command)
+        return await self._run_command(full_command, on_output)
     
+    @staticmethod
+    def _venv_exec_result(output_payload: Dict[str, Any]) -> Any:
+        """Return the result of a venv_exec call, or raise the exception it raised."""
+        if output_payload["success"]:
+            return output_payload["result"]
+        else:
+            # Recreate and raise the original exception
+            error_info = output_payload["error"]
+            error_class = eval(error_info["type"])
+            raise error_class(error_info["message"])
+
     async def venv_exec(self, venv_name: str, python_func, *args, **kwargs):
         """Execute Python function in a virtual environment using source code extraction.
         
@@ -815,7 +1050,6 @@ class Computer:
         """
         import base64
         import inspect
-        import json
         import textwrap
         
         try:
@@ -839,6 +1073,22 @@ class Computer:
             raise Exception(f"Cannot retrieve source code for function {python_func.__name__}: {e}")
         except Exception as e:
             raise Exception(f"Failed to reconstruct function source: {e}")
+
+        # Call the function in the venv's persistent Python worker, which keeps
+        # the modules imported by earlier calls loaded
+        if self._sessions_supported:
+            try:
+                output_payload = await self.interface.python_exec(
+                    func_source,
+                    func_name,
+                    json.loads(args_json),
+                    json.loads(kwargs_json),
+                    venv=f"~/.venvs/{venv_name}",
+                )
+                print(output_payload.get("stdout", ""))
+                return self._venv_exec_result(output_payload)
+            except NotImplementedError:
+                self._sessions_supported = False
         
         # Create Python code that will define and execute the function
         python_code = f'''
@@ -890,15 +1140,32 @@ print(f"<<<VENV_EXEC_START>>>{{output_json}}<<<VENV_EXEC_END>>>")
         
         # Execute the Python code in the virtual environment
         python_command = f"python -c \"import base64; exec(base64.b64decode('{encoded_code}').decode('utf-8'))\""
-        result = await self.venv_cmd(venv_name, python_command)
-        
-        # Parse the output to extract the payload
+
         start_marker = "<<<VENV_EXEC_START>>>"
         end_marker = "<<<VENV_EXEC_END>>>"
 
-        # Print original stdout
-        print(result.stdout[:result.stdout.find(start_marker)])
-        
+        # Print the function's own stdout as it arrives, up to the payload marker.
+        # A possible partial marker at the end of a chunk is held back.
+        printed = {"pending": "", "done": False}
+
+        def echo(stream: str, data: str) -> None:
+            if stream != "stdout" or printed["done"]:
+                return
+            pending = printed["pending"] + data
+            if start_marker in pending:
+                print(pending[:pending.find(start_marker)], end="", flush=True)
+                printed["done"] = True
+                return
+            keep = len(start_marker) - 1
+            print(pending[:-keep], end="", flush=True)
+            printed["pending"] = pending[-keep:]
+
+        result = await self.venv_cmd(venv_name, python_command, on_output=echo)
+        if not printed["done"]:
+            print(printed["pending"], end="")
+        print()
+
+        # Parse the output to extract the payload
         if start_marker in result.stdout and end_marker in result.stdout:
             start_idx = result.stdout.find(start_marker) + len(start_marker)
             end_idx = result.stdout.find(end_marker)
@@ -912,13 +1179,7 @@ print(f"<<<VENV_EXEC_START>>>{{output_json}}<<<VENV_EXEC_END>>>")
                 except Exception as e:
                     raise Exception(f"Failed to decode output payload: {e}")
                 
-                if output_payload["success"]:
-                    return output_payload["result"]
-                else:
-                    # Recreate and raise the original exception
-                    error_info = output_payload["error"]
-                    error_class = eval(error_info["type"])
-                    raise error_class(error_info["message"])
+                return self._venv_exec_result(output_payload)
             else:
                 raise Exception("Invalid output format: markers found but no content between them")
         else:
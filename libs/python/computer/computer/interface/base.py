@@ -1,9 +1,9 @@
 """Base interface for computer control."""
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, Tuple, List
+from typing import Optional, Dict, Any, AsyncIterator, Tuple, List
 from ..logger import Logger, LogLevel
-from .models import MouseButton, CommandResult
+from .models import MouseButton, CommandEvent, CommandResult, SyncResult
 
 class BaseComputerInterface(ABC):
     """Base class for computer control interfaces."""
@@ -395,7 +395,94 @@ class BaseComputerInterface(ABC):
             The size of the file in bytes.
         """
         pass
-    
+
+    async def upload_file(self, local_path: str, remote_path: str) -> None:
+        """Copy a local file to the computer.
+
+        Interfaces that support it stream the file without loading it into
+        memory and check the copy with a SHA-256 hash.
+
+        Args:
+            local_path: Path of the file on this machine
+            remote_path: Path to write on the computer
+        """
+        with open(local_path, "rb") as f:
+            content = f.read()
+        await self.write_bytes(remote_path, content)
+
+    async def download_file(self, remote_path: str, local_path: str, verify: bool = True) -> None:
+        """Copy a file from the computer to this machine.
+
+        Interfaces that support it stream the file without loading it into
+        memory and resume interrupted downloads.
+
+        Args:
+            remote_path: Path of the file on the computer
+            local_path: Path to write on this machine
+            verify: Compare the SHA-256 of the copy with the file on the computer,
+                where the interface supports it
+        """
+        content = await self.read_bytes(remote_path)
+        with open(local_path, "wb") as f:
+            f.write(content)
+
+    async def stat_many(self, paths: List[str]) -> List[Dict[str, Any]]:
+        """Get the type, size and modification time of several paths in one call.
+
+        Args:
+            paths: Paths on the computer
+
+        Returns:
+            One dict per path, in order, with ``path`` and ``exists``; existing
+            paths also have ``type`` ("file", "dir" or "other"), ``size`` and
+            ``mtime``
+
+        Raises:
+            NotImplementedError: If the computer server does not support it
+        """
+        raise NotImplementedError("This interface does not support stat_many")
+
+    async def walk(self, path: str, hash: bool = False) -> List[Dict[str, Any]]:
+        """List a directory on the computer recursively.
+
+        Args:
+            path: Directory to list
+            hash: Include the SHA-256 of every file, which reads them all
+
+        Returns:
+            Entries sorted by ``path``, relative to the directory with "/"
+            separators, with ``type`` ("file", "dir", "symlink" or "other"),
+            ``size`` and ``mtime``. Symlinks have a ``target`` and are not followed.
+
+        Raises:
+            NotImplementedError: If the computer server does not support it
+        """
+        raise NotImplementedError("This interface does not support walk")
+
+    async def sync_dir(
+        self, local_dir: str, remote_dir: str, delete: bool = False, checksum: bool = False
+    ) -> SyncResult:
+        """Make a directory on the computer match a local directory, sending only what changed.
+
+        Like rsync, a file is sent when it is missing on the computer or its
+        size or modification time differ. Modification times are copied, so
+        syncing again sends nothing.
+
+        Args:
+            local_dir: Directory on this machine
+            remote_dir: Directory on the computer, created if missing
+            delete: Also delete files on the computer that don't exist locally
+            checksum: Compare file contents by SHA-256 instead of size and
+                modification time, which reads every file on both sides
+
+        Returns:
+            SyncResult: The paths uploaded and deleted
+
+        Raises:
+            NotImplementedError: If the computer server does not support it
+        """
+        raise NotImplementedError("This interface does not support sync_dir")
+
     @abstractmethod
     async def run_command(self, command: str) -> CommandResult:
         """Run shell command and return structured result.
@@ -424,6 +511,116 @@ class BaseComputerInterface(ABC):
         """
         pass
 
+    async def run_command_stream(
+        self, command: str, max_bytes: Optional[int] = None, timeout: Optional[float] = None
+    ) -> AsyncIterator[CommandEvent]:
+        """Run shell command and yield its output as it arrives.
+
+        Interfaces without streaming run the command with run_command and
+        yield its whole output at once.
+
+        Args:
+            command: The shell command to execute
+            max_bytes: Maximum bytes of output to receive; the rest is discarded
+            timeout: Seconds after which the command is killed
+
+        Yields:
+            CommandEvent: "stdout" and "stderr" chunks, then one "exit" event
+
+        Example:
+            async for event in interface.run_command_stream("pip install torch"):
+                if event.type == "exit":
+                    print(f"Exit code: {event.returncode}")
+                else:
+                    print(event.data, end="")
+        """
+        result = await self.run_command(command)
+        if result.stdout:
+            yield CommandEvent("stdout", result.stdout)
+        if result.stderr:
+            yield CommandEvent("stderr", result.stderr)
+        yield CommandEvent("exit", returncode=result.returncode)
+
+    # Persistent sessions
+    async def create_session(
+        self,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        venv: Optional[str] = None,
+        limits: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Start a shell on the computer that keeps its state between commands.
+
+        Unlike run_command, which starts a new shell every time, commands run
+        in a session see the working directory, exported variables and
+        activated virtual environment left by earlier commands. The server
+        closes sessions that stay idle for too long.
+
+        Args:
+            cwd: Initial working directory, defaults to the home directory
+            env: Environment variables to set
+            venv: Path of a virtual environment to activate, e.g. "~/.venvs/demo"
+            limits: Resource limits: idle_timeout, command_timeout,
+                max_output_bytes, max_memory_bytes, max_cpu_seconds
+
+        Returns:
+            str: The session ID
+
+        Raises:
+            NotImplementedError: If the computer server does not support sessions
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support sessions")
+
+    async def session_exec(
+        self, session_id: str, command: str, timeout: Optional[float] = None, keep_state: bool = True
+    ) -> CommandResult:
+        """Run a command in a session created with create_session.
+
+        Args:
+            session_id: ID returned by create_session
+            command: The shell command to execute
+            timeout: Seconds after which the command, and with it the session, is killed
+            keep_state: If True, ``cd``, ``export`` and ``set`` carry over to later
+                        commands and ``exit`` ends the session. If False, the command
+                        runs in a subshell that leaves the session unchanged.
+
+        Raises:
+            RuntimeError: If the session does not exist (anymore) or the command timed out
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support sessions")
+
+    async def close_session(self, session_id: str) -> None:
+        """Close a session and kill anything still running in it."""
+        raise NotImplementedError(f"{type(self).__name__} does not support sessions")
+
+    async def python_exec(
+        self,
+        source: str,
+        func_name: str,
+        args: Optional[List[Any]] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+        venv: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Call a Python function in a persistent interpreter on the computer.
+
+        The server keeps one interpreter per virtual environment, so modules
+        imported by earlier calls stay loaded.
+
+        Args:
+            source: Source code defining the function
+            func_name: Name of the function to call
+            args: JSON-serializable positional arguments
+            kwargs: JSON-serializable keyword arguments
+            venv: Path of the virtual environment whose Python runs the function
+            timeout: Seconds after which the interpreter is killed
+
+        Returns:
+            Dict with "success", "result", "error" (type, message and traceback
+            if the function raised) and "stdout" (what the function printed)
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support persistent Python workers")
+
     # Accessibility Actions
     @abstractmethod
     async def get_accessibility_tree(self) -> Dict:
@@ -11,7 +11,8 @@ class InterfaceFactory:
         os: Literal['macos', 'linux', 'windows'],
         ip_address: str,
         api_key: Optional[str] = None,
-        vm_name: Optional[str] = None
+        vm_name: Optional[str] = None,
+        api_port: Optional[int] = None
     ) -> BaseComputerInterface:
         """Create an interface for the specified OS.
         
@@ -20,6 +21,7 @@ class InterfaceFactory:
             ip_address: IP address of the computer to control
             api_key: Optional API key for cloud authentication
             vm_name: Optional VM name for cloud authentication
+            api_port: Optional computer server port, if not the default
             
         Returns:
             BaseComputerInterface: The appropriate interface for the OS
@@ -33,10 +35,10 @@ class InterfaceFactory:
         from .windows import WindowsComputerInterface
         
         if os == 'macos':
-            return MacOSComputerInterface(ip_address, api_key=api_key, vm_name=vm_name)
+            return MacOSComputerInterface(ip_address, api_key=api_key, vm_name=vm_name, api_port=api_port)
         elif os == 'linux':
-            return LinuxComputerInterface(ip_address, api_key=api_key, vm_name=vm_name)
+            return LinuxComputerInterface(ip_address, api_key=api_key, vm_name=vm_name, api_port=api_port)
         elif os == 'windows':
-            return WindowsComputerInterface(ip_address, api_key=api_key, vm_name=vm_name)
+            return WindowsComputerInterface(ip_address, api_key=api_key, vm_name=vm_name, api_port=api_port)
         else:
             raise ValueError(f"Unsupported OS type: {os}")
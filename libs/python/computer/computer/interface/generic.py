@@ -1,23 +1,45 @@
 import asyncio
+import hashlib
 import json
+import os
 import time
-from typing import Any, Dict, List, Optional, Tuple
-from PIL import Image
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import websockets
 import aiohttp
+from core.tracing import KIND, KIND_ENVIRONMENT, get_tracer
 
 from ..logger import Logger, LogLevel
+from ..readiness import Backoff, StartupTimings, first_ready, poll_until
 from .base import BaseComputerInterface
 from ..utils import decode_base64_image, encode_base64_image, bytes_to_image, draw_box, resize_image
-from .models import Key, KeyType, MouseButton, CommandResult
+from .models import Key, KeyType, MouseButton, CommandEvent, CommandResult, SyncResult
+from . import sync
+
+
+# Bytes read from or written to a local source at a time during file transfers
+FILE_CHUNK_SIZE = 1024 * 1024
+
+# Requests made for one file transfer before giving up; later ones resume
+# where the interrupted request stopped
+TRANSFER_ATTEMPTS = 3
+
+
+class StreamingUnavailable(Exception):
+    """The server could not be reached over REST, or doesn't know the streaming command."""
+
+
+class FileEndpointsUnavailable(Exception):
+    """The server could not be reached over HTTP, or has no /files endpoints."""
 
 
 class GenericComputerInterface(BaseComputerInterface):
     """Generic interface with common functionality for all supported platforms (Windows, Linux, macOS)."""
 
-    def __init__(self, ip_address: str, username: str = "lume", password: str = "lume", api_key: Optional[str] = None, vm_name: Optional[str] = None, logger_name: str = "computer.interface.generic"):
+    def __init__(self, ip_address: str, username: str = "lume", password: str = "lume", api_key: Optional[str] = None, vm_name: Optional[str] = None, logger_name: str = "computer.interface.generic", api_port: Optional[int] = None):
         super().__init__(ip_address, username, password, api_key, vm_name)
+        # Overrides the default server port (8000, or 8443 for cloud) when set
+        self.api_port = api_port
         self._ws = None
         self._reconnect_task = None
         self._closed = False
@@ -36,6 +58,12 @@ class GenericComputerInterface(BaseComputerInterface):
         # Optional default delay time between commands (in seconds)
         self.delay = 0.0
 
+        # Set by Computer.run to record the first screenshot as a startup phase
+        self.startup_timings: Optional[StartupTimings] = None
+
+        # Cleared when the server turns out to predate the /files endpoints
+        self._file_endpoints = True
+
     async def _handle_delay(self, delay: Optional[float] = None):
         """Handle delay between commands using async sleep.
         
@@ -56,7 +84,7 @@ class GenericComputerInterface(BaseComputerInterface):
             WebSocket URI for the Computer API Server
         """
         protocol = "wss" if self.api_key else "ws"
-        port = "8443" if self.api_key else "8000"
+        port = self.api_port or ("8443" if self.api_key else "8000")
         return f"{protocol}://{self.ip_address}:{port}/ws"
     
     @property
@@ -67,9 +95,20 @@ class GenericComputerInterface(BaseComputerInterface):
             REST URI for the Computer API Server
         """
         protocol = "https" if self.api_key else "http"
-        port = "8443" if self.api_key else "8000"
+        port = self.api_port or ("8443" if self.api_key else "8000")
         return f"{protocol}://{self.ip_address}:{port}/cmd"
 
+    @property
+    def files_uri(self) -> str:
+        """Get the URI of the streaming file transfer endpoints.
+
+        Returns:
+            File transfer URI for the Computer API Server
+        """
+        protocol = "https" if self.api_key else "http"
+        port = self.api_port or ("8443" if self.api_key else "8000")
+        return f"{protocol}://{self.ip_address}:{port}/files"
+
     # Mouse actions
     async def mouse_down(self, x: Optional[int] = None, y: Optional[int] = None, button: str = "left", delay: Optional[float] = None) -> None:
         await self._send_command("mouse_down", {"x": x, "y": y, "button": button})
@@ -243,11 +282,18 @@ class GenericComputerInterface(BaseComputerInterface):
         Returns:
             bytes: The screenshot image data, optionally with boxes drawn on it and scaled
         """
+        started = time.monotonic()
         result = await self._send_command("screenshot")
+        if self.startup_timings is not None and result.get("image_data"):
+            self.startup_timings.record("first_screenshot", time.monotonic() - started)
+            self.startup_timings = None
         if not result.get("image_data"):
             raise RuntimeError("Failed to take screenshot, no image data received from server")
 
-        screenshot = decode_base64_image(result["image_data"])
+        with get_tracer().start_as_current_span(
+            "computer.decode_image", attributes={"cua.payload.bytes": len(result["image_data"])}
+        ):
+            screenshot = decode_base64_image(result["image_data"])
 
         if boxes:
             # Get the natural scaling between screen and screenshot
@@ -326,6 +372,16 @@ class GenericComputerInterface(BaseComputerInterface):
             current_offset = chunk_end
 
     async def write_bytes(self, path: str, content: bytes, append: bool = False) -> None:
+        if self._file_endpoints:
+            async def read(offset: int, length: int) -> bytes:
+                return content[offset:offset + length]
+
+            try:
+                await self._upload(path, read, len(content), append)
+                return
+            except FileEndpointsUnavailable as e:
+                self.logger.debug(f"Streaming upload unavailable, sending {path} as commands: {e}")
+
         # For large files, use chunked writing
         if len(content) > 5 * 1024 * 1024:  # 5MB threshold
             await self._write_bytes_chunked(path, content, append)
@@ -362,6 +418,18 @@ class GenericComputerInterface(BaseComputerInterface):
         return b''.join(chunks)
 
     async def read_bytes(self, path: str, offset: int = 0, length: Optional[int] = None) -> bytes:
+        if self._file_endpoints:
+            chunks = []
+
+            async def write(chunk: bytes) -> None:
+                chunks.append(chunk)
+
+            try:
+                await self._download(path, offset, length, write)
+                return b"".join(chunks)
+            except FileEndpointsUnavailable as e:
+                self.logger.debug(f"Streaming download unavailable, reading {path} as commands: {e}")
+
         # For large files, use chunked reading
         if length is None:
             # Get file size first to determine if we need chunking
@@ -405,6 +473,277 @@ class GenericComputerInterface(BaseComputerInterface):
         content_bytes = content.encode(encoding)
         await self.write_bytes(path, content_bytes, append)
 
+    async def upload_file(self, local_path: str, remote_path: str) -> None:
+        if not self._file_endpoints:
+            return await super().upload_file(local_path, remote_path)
+
+        with open(local_path, "rb") as f:
+            def read_at(offset: int, length: int) -> bytes:
+                f.seek(offset)
+                return f.read(length)
+
+            async def read(offset: int, length: int) -> bytes:
+                return await asyncio.to_thread(read_at, offset, length)
+
+            try:
+                await self._upload(remote_path, read, os.fstat(f.fileno()).st_size, append=False)
+                return
+            except FileEndpointsUnavailable as e:
+                self.logger.debug(f"Streaming upload unavailable, sending {remote_path} as commands: {e}")
+        await super().upload_file(local_path, remote_path)
+
+    async def download_file(self, remote_path: str, local_path: str, verify: bool = True) -> None:
+        if not self._file_endpoints:
+            return await super().download_file(remote_path, local_path, verify)
+
+        digest = hashlib.sha256()
+        with open(local_path, "wb") as f:
+            def write_chunk(chunk: bytes) -> None:
+                f.write(chunk)
+                digest.update(chunk)
+
+            async def write(chunk: bytes) -> None:
+                await asyncio.to_thread(write_chunk, chunk)
+
+            try:
+                size = await self._download(remote_path, 0, None, write)
+            except FileEndpointsUnavailable as e:
+                self.logger.debug(f"Streaming download unavailable, reading {remote_path} as commands: {e}")
+                size = None
+
+        if size is None:
+            await super().download_file(remote_path, local_path, verify)
+        elif verify:
+            await self._verify_remote_hash(remote_path, 0, size, digest.hexdigest())
+
+    async def stat_many(self, paths: List[str]) -> List[Dict[str, Any]]:
+        result = await self._send_optional_command("stat_many", {"paths": paths})
+        return result.get("stats", [])
+
+    async def walk(self, path: str, hash: bool = False) -> List[Dict[str, Any]]:
+        result = await self._send_optional_command("walk", {"path": path, "hash": hash})
+        return result.get("entries", [])
+
+    async def sync_dir(
+        self, local_dir: str, remote_dir: str, delete: bool = False, checksum: bool = False
+    ) -> SyncResult:
+        if not os.path.isdir(local_dir):
+            raise NotADirectoryError(f"Not a directory: {local_dir}")
+        local, remote = await asyncio.gather(
+            asyncio.to_thread(sync.walk_local, local_dir, checksum),
+            self._walk_if_exists(remote_dir, checksum),
+        )
+        plan = sync.plan_sync(local, remote, checksum=checksum, delete=delete)
+
+        if plan.delete:
+            remote_root = remote_dir.rstrip("/")
+            await self._send_optional_command(
+                "delete_paths", {"paths": [f"{remote_root}/{path}" for path in plan.delete]}
+            )
+        if plan.upload:
+            await self._upload_archive(local_dir, remote_dir, plan.upload)
+        elif not remote:
+            await self.create_dir(remote_dir)
+        return SyncResult(
+            uploaded=plan.upload, deleted=plan.delete, unchanged=plan.unchanged, bytes_sent=plan.upload_bytes
+        )
+
+    async def _walk_if_exists(self, path: str, hash: bool) -> Dict[str, Dict[str, Any]]:
+        if not await self.directory_exists(path):
+            return {}
+        return {entry["path"]: entry for entry in await self.walk(path, hash=hash)}
+
+    async def _upload_archive(self, local_dir: str, remote_dir: str, paths: List[str]) -> None:
+        """Send ``paths`` under ``local_dir`` to ``remote_dir`` as one tar stream."""
+        if self._file_endpoints:
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+            try:
+                async with aiohttp.ClientSession(timeout=timeout) as session:
+                    async with session.put(
+                        f"{self.files_uri}/archive",
+                        params={"path": remote_dir},
+                        data=sync.tar_stream(local_dir, paths),
+                        headers=self._transfer_headers(),
+                    ) as response:
+                        if response.status != 200:
+                            raise await self._transfer_error(response)
+                return
+            except (aiohttp.ClientConnectorError, FileEndpointsUnavailable) as e:
+                self.logger.debug(f"Archive upload unavailable, sending files one by one: {e}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise RuntimeError(f"Upload of {local_dir} failed: {e or type(e).__name__}") from e
+
+        remote_root = remote_dir.rstrip("/")
+        await self.create_dir(remote_root)
+        for path in paths:
+            local_path = os.path.join(local_dir, path)
+            if os.path.islink(local_path):
+                self.logger.warning(f"Skipping symlink {path}: the computer server can't receive archives")
+            elif os.path.isdir(local_path):
+                await self.create_dir(f"{remote_root}/{path}")
+            else:
+                await self.upload_file(local_path, f"{remote_root}/{path}")
+
+    async def _transfer_error(self, response: aiohttp.ClientResponse) -> Exception:
+        """Turn an error response from the /files endpoints into an exception."""
+        try:
+            detail = (await response.json()).get("detail")
+        except (aiohttp.ClientError, ValueError, AttributeError):
+            detail = None
+        # Routing errors, as opposed to errors about the file, which carry a detail
+        if response.status == 405 or (response.status == 404 and detail in (None, "Not Found")):
+            self._file_endpoints = False
+            return FileEndpointsUnavailable(f"HTTP {response.status}")
+        return RuntimeError(detail or f"HTTP {response.status}")
+
+    def _transfer_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.api_key:
+            headers["X-API-Key"] = self.api_key
+        if self.vm_name:
+            headers["X-Container-Name"] = self.vm_name
+        return headers
+
+    async def _verify_remote_hash(self, path: str, offset: int, length: int, sha256: str) -> None:
+        """Check that ``length`` bytes of ``path`` from ``offset`` have the given SHA-256."""
+        result = await self._send_command("file_hash", {"path": path, "offset": offset, "length": length})
+        if not result.get("success", False):
+            raise RuntimeError(result.get("error", "Failed to hash file"))
+        if result.get("size") != length or result.get("sha256") != sha256:
+            raise RuntimeError(f"Integrity check failed for {path}: the file on the computer differs from the data sent")
+
+    async def _upload(
+        self, path: str, read: Callable[[int, int], Awaitable[bytes]], size: int, append: bool
+    ) -> None:
+        """Upload through the /files endpoint in a ``computer.upload`` span; see _upload_impl."""
+        with get_tracer().start_as_current_span(
+            "computer.upload", attributes={KIND: KIND_ENVIRONMENT, "cua.path": path, "cua.payload.bytes": size}
+        ):
+            await self._upload_impl(path, read, size, append)
+
+    async def _upload_impl(
+        self, path: str, read: Callable[[int, int], Awaitable[bytes]], size: int, append: bool
+    ) -> None:
+        """Stream ``size`` bytes to ``path`` through the /files endpoint.
+
+        ``read(offset, length)`` returns the bytes to send at ``offset``. When
+        the connection drops, the upload resumes from the bytes the server
+        kept. The server reports the SHA-256 of what it wrote, which must
+        match the data sent.
+
+        Raises:
+            FileEndpointsUnavailable: If the server can't be reached or has no /files endpoints
+            RuntimeError: If the upload fails or the integrity check fails
+        """
+        base = 0
+        if append:
+            # Resuming an append needs the size of the file before it
+            base = (await self._send_command("get_file_size", {"path": path})).get("size", 0)
+
+        # Only bound waiting on the network, not the time the transfer takes
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+        kept = 0
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            for attempt in range(TRANSFER_ATTEMPTS):
+                digest = hashlib.sha256()
+
+                async def body(position: int = kept, digest=digest) -> AsyncIterator[bytes]:
+                    while position < size:
+                        chunk = await read(position, min(FILE_CHUNK_SIZE, size - position))
+                        digest.update(chunk)
+                        position += len(chunk)
+                        yield chunk
+
+                if kept:
+                    params = {"path": path, "offset": str(base + kept)}
+                else:
+                    params = {"path": path, "append": "true" if append else "false"}
+                try:
+                    async with session.put(self.files_uri, params=params, data=body(), headers=self._transfer_headers()) as response:
+                        if response.status != 200:
+                            raise await self._transfer_error(response)
+                        result = await response.json()
+                    break
+                except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                    if attempt == 0 and isinstance(e, aiohttp.ClientConnectorError):
+                        raise FileEndpointsUnavailable(str(e)) from e
+                    if attempt + 1 == TRANSFER_ATTEMPTS:
+                        raise RuntimeError(f"Upload of {path} failed: {e or type(e).__name__}") from e
+                    kept = min(max(await self.get_file_size(path) - base, 0), size)
+                    self.logger.warning(f"Upload of {path} interrupted ({e or type(e).__name__}), resuming at byte {kept}")
+
+        if result.get("size") != size - kept or result.get("sha256") != digest.hexdigest():
+            raise RuntimeError(f"Integrity check failed for {path}: the file on the computer differs from the data sent")
+        if kept:
+            # The first bytes were written by interrupted requests
+            digest = hashlib.sha256()
+            for position in range(0, kept, FILE_CHUNK_SIZE):
+                digest.update(await read(position, min(FILE_CHUNK_SIZE, kept - position)))
+            await self._verify_remote_hash(path, base, kept, digest.hexdigest())
+
+    async def _download(
+        self, path: str, offset: int, length: Optional[int], write: Callable[[bytes], Awaitable[None]]
+    ) -> int:
+        """Download through the /files endpoint in a ``computer.download`` span; see _download_impl."""
+        with get_tracer().start_as_current_span(
+            "computer.download", attributes={KIND: KIND_ENVIRONMENT, "cua.path": path}
+        ) as span:
+            received = await self._download_impl(path, offset, length, write)
+            span.set_attribute("cua.payload.bytes", received)
+            return received
+
+    async def _download_impl(
+        self, path: str, offset: int, length: Optional[int], write: Callable[[bytes], Awaitable[None]]
+    ) -> int:
+        """Stream ``length`` bytes of ``path`` from ``offset`` through the /files endpoint.
+
+        Each chunk is passed to ``write`` as it arrives. When the connection
+        drops, the download resumes with a range request, unless the file
+        changed in the meantime.
+
+        Returns:
+            int: The number of bytes received
+
+        Raises:
+            FileEndpointsUnavailable: If the server can't be reached or has no /files endpoints
+            RuntimeError: If the download fails
+        """
+        if length == 0:
+            return 0
+
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+        received = 0
+        etag = None
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            for attempt in range(TRANSFER_ATTEMPTS):
+                headers = self._transfer_headers()
+                if offset + received or length is not None:
+                    last = "" if length is None else str(offset + length - 1)
+                    headers["Range"] = f"bytes={offset + received}-{last}"
+                if etag:
+                    headers["If-Range"] = etag
+                try:
+                    async with session.get(self.files_uri, params={"path": path}, headers=headers) as response:
+                        if response.status == 416:
+                            # Reading from the end of the file
+                            return received
+                        if response.status not in (200, 206):
+                            raise await self._transfer_error(response)
+                        if received and response.status != 206:
+                            raise RuntimeError(f"Download of {path} failed: the file changed on the computer")
+                        etag = response.headers.get("ETag")
+                        async for chunk in response.content.iter_any():
+                            await write(chunk)
+                            received += len(chunk)
+                    return received
+                except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                    if attempt == 0 and isinstance(e, aiohttp.ClientConnectorError):
+                        raise FileEndpointsUnavailable(str(e)) from e
+                    if attempt + 1 == TRANSFER_ATTEMPTS:
+                        raise RuntimeError(f"Download of {path} failed: {e or type(e).__name__}") from e
+                    self.logger.warning(f"Download of {path} interrupted ({e or type(e).__name__}), resuming at byte {offset + received}")
+        return received
+
     async def get_file_size(self, path: str) -> int:
         result = await self._send_command("get_file_size", {"path": path})
         if not result.get("success", False):
@@ -451,6 +790,122 @@ class GenericComputerInterface(BaseComputerInterface):
             returncode=result.get("return_code", 0)
         )
 
+    async def run_command_stream(
+        self, command: str, max_bytes: Optional[int] = None, timeout: Optional[float] = None
+    ) -> AsyncIterator[CommandEvent]:
+        """Run shell command and yield its output as the server reads it.
+
+        Output is streamed over the REST endpoint. If that is unreachable, the
+        WebSocket returns all events in one response (capped by the server to
+        fit in a message), and servers without streaming fall back to
+        run_command. Closing the iterator early (``aclose()``, or leaving an
+        ``async with contextlib.aclosing(...)`` block) kills the command.
+
+        Args:
+            command: The shell command to execute
+            max_bytes: Maximum bytes of output to receive; the rest is discarded
+            timeout: Seconds after which the command is killed
+
+        Yields:
+            CommandEvent: "stdout" and "stderr" chunks, then one "exit" event
+        """
+        params: Dict[str, Any] = {"command": command}
+        if max_bytes is not None:
+            params["max_bytes"] = max_bytes
+        if timeout is not None:
+            params["timeout"] = timeout
+
+        received = False
+        messages = self._stream_command_rest("run_command_stream", params)
+        try:
+            async for message in messages:
+                received = True
+                event = self._command_event(message)
+                yield event
+                if event.type == "exit":
+                    return
+            raise StreamingUnavailable("Stream ended before the command exited")
+        except StreamingUnavailable as e:
+            if received:
+                raise RuntimeError(f"Command output stream was interrupted: {e}")
+            self.logger.debug(f"Streaming over REST unavailable ({e}), trying WebSocket")
+        finally:
+            await messages.aclose()
+
+        result = await self._send_command_ws("run_command_stream", params)
+        if not result.get("success", False) and "Unknown command" in str(result.get("error")):
+            # Server predates streaming commands
+            async for event in super().run_command_stream(command, max_bytes, timeout):
+                yield event
+            return
+        for message in result.get("events", []) if result.get("success", False) else [result]:
+            yield self._command_event(message)
+
+    async def _send_optional_command(self, command: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a command older servers may not know, raising NotImplementedError on those."""
+        result = await self._send_command(command, params)
+        if not result.get("success", False):
+            error = str(result.get("error", f"Failed to run {command}"))
+            if error.startswith("Unknown command") or "not supported" in error:
+                raise NotImplementedError(error)
+            raise RuntimeError(error)
+        return result
+
+    async def create_session(
+        self,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        venv: Optional[str] = None,
+        limits: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        result = await self._send_optional_command(
+            "session_create", {"cwd": cwd, "env": env, "venv": venv, "limits": limits}
+        )
+        return result["session_id"]
+
+    async def session_exec(
+        self, session_id: str, command: str, timeout: Optional[float] = None, keep_state: bool = True
+    ) -> CommandResult:
+        result = await self._send_optional_command(
+            "session_exec",
+            {"session_id": session_id, "command": command, "timeout": timeout, "keep_state": keep_state},
+        )
+        return CommandResult(
+            stdout=result.get("stdout", ""),
+            stderr=result.get("stderr", ""),
+            returncode=result.get("return_code", 0)
+        )
+
+    async def close_session(self, session_id: str) -> None:
+        await self._send_optional_command("session_close", {"session_id": session_id})
+
+    async def python_exec(
+        self,
+        source: str,
+        func_name: str,
+        args: Optional[List[Any]] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+        venv: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        result = await self._send_optional_command(
+            "python_exec",
+            {"source": source, "func_name": func_name, "args": args, "kwargs": kwargs, "venv": venv, "timeout": timeout},
+        )
+        return result["output"]
+
+    @staticmethod
+    def _command_event(message: Dict[str, Any]) -> CommandEvent:
+        if not message.get("success", False):
+            raise RuntimeError(message.get("error", "Failed to run command"))
+        return CommandEvent(
+            type=message["type"],
+            data=message.get("data", ""),
+            returncode=message.get("return_code"),
+            truncated=message.get("truncated", False),
+            timed_out=message.get("timed_out", False),
+        )
+
     # Accessibility Actions
     async def get_accessibility_tree(self) -> Dict[str, Any]:
         """Get the accessibility tree of the current screen."""
@@ -524,7 +979,10 @@ class GenericComputerInterface(BaseComputerInterface):
         log_interval = 500  # Then log every 500th attempt (significantly increased from 30)
         last_warning_time = 0
         min_warning_interval = 30  # Minimum seconds between connection lost warnings
-        min_retry_delay = 0.5  # Minimum delay between connection attempts (500ms)
+        min_retry_delay = 0.5  # Minimum delay between reconnection attempts (500ms)
+        connected_once = False
+        # Poll fast until the server first comes up, then back off for reconnects
+        connect_backoff = Backoff(maximum=1.0)
 
         while not self._closed:
             try:
@@ -534,8 +992,8 @@ class GenericComputerInterface(BaseComputerInterface):
                     try:
                         retry_count += 1
 
-                        # Add a minimum delay between connection attempts to avoid flooding
-                        if retry_count > 1:
+                        # Add a minimum delay between reconnection attempts to avoid flooding
+                        if retry_count > 1 and connected_once:
                             await asyncio.sleep(min_retry_delay)
 
                         # Only log the first attempt at INFO level, then every Nth attempt
@@ -594,7 +1052,8 @@ class GenericComputerInterface(BaseComputerInterface):
                         self._reconnect_delay = 1  # Reset reconnect delay on successful connection
                         self._last_ping = time.time()
                         retry_count = 0  # Reset retry count on successful connection
-                    except (asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                        connected_once = True
+                    except (asyncio.TimeoutError, websockets.exceptions.WebSocketException, OSError) as e:
                         next_retry = self._reconnect_delay
 
                         # Only log the first error at WARNING level, then every Nth attempt
@@ -617,7 +1076,11 @@ class GenericComputerInterface(BaseComputerInterface):
                                 pass
                         self._ws = None
 
-                        # Use exponential backoff for connection retries
+                        if not connected_once:
+                            await connect_backoff.sleep()
+                            continue
+
+                        # Use exponential backoff for reconnection retries
                         await asyncio.sleep(self._reconnect_delay)
                         self._reconnect_delay = min(
                             self._reconnect_delay * 2, self._max_reconnect_delay
@@ -662,33 +1125,18 @@ class GenericComputerInterface(BaseComputerInterface):
                         pass
                 self._ws = None
     
-    async def _ensure_connection(self):
+    async def _ensure_connection(self, timeout: float = 5.0):
         """Ensure WebSocket connection is established."""
         if self._reconnect_task is None or self._reconnect_task.done():
             self._reconnect_task = asyncio.create_task(self._keep_alive())
 
-        retry_count = 0
-        max_retries = 5
-
-        while retry_count < max_retries:
-            try:
-                if self._ws and self._ws.state == websockets.protocol.State.OPEN:
-                    return
-                retry_count += 1
-                await asyncio.sleep(1)
-            except Exception as e:
-                # Only log at ERROR level for the last retry attempt
-                if retry_count == max_retries - 1:
-                    self.logger.error(
-                        f"Persistent connection check error after {retry_count} attempts: {e}"
-                    )
-                else:
-                    self.logger.debug(f"Connection check error (attempt {retry_count}): {e}")
-                retry_count += 1
-                await asyncio.sleep(1)
-                continue
+        async def is_open() -> bool:
+            return bool(self._ws and self._ws.state == websockets.protocol.State.OPEN)
 
-        raise ConnectionError("Failed to establish WebSocket connection after multiple retries")
+        try:
+            await poll_until(is_open, timeout=timeout, initial=0.01, maximum=0.5)
+        except TimeoutError:
+            raise ConnectionError("Failed to establish WebSocket connection after multiple retries")
 
     async def _send_command_ws(self, command: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Send command through WebSocket."""
@@ -783,162 +1231,164 @@ class GenericComputerInterface(BaseComputerInterface):
                 "message": str(e)
             }
 
+    async def _stream_command_rest(self, command: str, params: Optional[Dict] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Send a streaming command through the REST API and yield each event as it arrives.
+
+        Raises:
+            StreamingUnavailable: If the request fails or the server rejects the command
+        """
+        payload = {"command": command, "params": params or {}}
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["X-API-Key"] = self.api_key
+        if self.vm_name:
+            headers["X-Container-Name"] = self.vm_name
+
+        # Streams last as long as the command, so only bound the connection setup
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30)
+        try:
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.post(self.rest_uri, json=payload, headers=headers) as response:
+                    if response.status != 200:
+                        raise StreamingUnavailable(f"HTTP {response.status}: {(await response.text())[:200]}")
+                    buffer = b""
+                    async for data in response.content.iter_any():
+                        buffer += data
+                        *events, buffer = buffer.split(b"\n\n")
+                        for event in events:
+                            if not event.startswith(b"data: "):
+                                raise StreamingUnavailable("Server returned malformed response")
+                            yield json.loads(event[6:])
+        except (aiohttp.ClientError, OSError, json.JSONDecodeError) as e:
+            raise StreamingUnavailable(str(e) or type(e).__name__) from e
+
     async def _send_command(self, command: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Send command using REST API with WebSocket fallback."""
-        # Try REST API first
-        result = await self._send_command_rest(command, params)
-        
-        # If REST failed with "Request failed", try WebSocket as fallback
-        if not result.get("success", True) and (result.get("error") == "Request failed" or result.get("error") == "Server returned malformed response"):
-            self.logger.warning(f"REST API failed for command '{command}', trying WebSocket fallback")
-            try:
-                return await self._send_command_ws(command, params)
-            except Exception as e:
-                self.logger.error(f"WebSocket fallback also failed: {e}")
-                # Return the original REST error
-                return result
-        
-        return result
-
-    async def wait_for_ready(self, timeout: int = 60, interval: float = 1.0):
-        """Wait for Computer API Server to be ready by testing version command."""
+        with get_tracer().start_as_current_span(
+            "computer.command", attributes={KIND: KIND_ENVIRONMENT, "cua.command": command}
+        ) as span:
+            if span.is_recording():
+                span.set_attribute("cua.request.bytes", len(json.dumps({"command": command, "params": params or {}})))
+
+            # Try REST API first
+            result = await self._send_command_rest(command, params)
+
+            # If REST failed with "Request failed", try WebSocket as fallback
+            if not result.get("success", True) and (result.get("error") == "Request failed" or result.get("error") == "Server returned malformed response"):
+                self.logger.warning(f"REST API failed for command '{command}', trying WebSocket fallback")
+                span.set_attribute("cua.fallback", True)
+                try:
+                    result = await self._send_command_ws(command, params)
+                except Exception as e:
+                    # Keep the original REST error
+                    self.logger.error(f"WebSocket fallback also failed: {e}")
 
-        # Check if REST API is available
-        try:
-            result = await self._send_command_rest("version", {})
-            assert result.get("success", True)
-        except Exception as e:
-            self.logger.debug(f"REST API failed for command 'version', trying WebSocket fallback: {e}")
-            try:
-                await self._wait_for_ready_ws(timeout, interval)
-                return
-            except Exception as e:
-                self.logger.debug(f"WebSocket fallback also failed: {e}")
-                raise e
+            span.set_attribute("cua.success", bool(result.get("success", True)))
+            if not result.get("success", True):
+                span.set_attribute("cua.error", str(result.get("message") or result.get("error")))
+            if span.is_recording():
+                span.set_attribute("cua.response.bytes", len(json.dumps(result)))
+            return result
 
-        start_time = time.time()
-        last_error = None
-        attempt_count = 0
-        progress_interval = 10  # Log progress every 10 seconds
-        last_progress_time = start_time
+    async def wait_for_ready(self, timeout: int = 60, interval: float = 1.0, push: bool = True):
+        """Wait for Computer API Server to be ready.
 
-        try:
-            self.logger.info(
-                f"Waiting for Computer API Server to be ready (timeout: {timeout}s)..."
-            )
+        REST and WebSocket probes run in parallel, each polling quickly at first
+        and backing off to ``interval``. The first probe to get a successful
+        get_screen_size response wins.
 
-            # Wait for the server to respond to get_screen_size command
-            while time.time() - start_time < timeout:
-                try:
-                    attempt_count += 1
-                    current_time = time.time()
-
-                    # Log progress periodically without flooding logs
-                    if current_time - last_progress_time >= progress_interval:
-                        elapsed = current_time - start_time
-                        self.logger.info(
-                            f"Still waiting for Computer API Server... (elapsed: {elapsed:.1f}s, attempts: {attempt_count})"
-                        )
-                        last_progress_time = current_time
-
-                    # Test the server with a simple get_screen_size command
-                    result = await self._send_command("get_screen_size")
-                    if result.get("success", False):
-                        elapsed = time.time() - start_time
-                        self.logger.info(
-                            f"Computer API Server is ready (after {elapsed:.1f}s, {attempt_count} attempts)"
-                        )
-                        return  # Server is ready
-                    else:
-                        last_error = result.get("error", "Unknown error")
-                        self.logger.debug(f"Initial connection command failed: {last_error}")
+        Args:
+            timeout: Maximum seconds to wait
+            interval: Maximum delay between probe attempts in seconds
+            push: Also listen for the server's ready notification on /ws/ready.
+                  Servers without that endpoint are ignored.
 
-                except Exception as e:
-                    last_error = e
-                    self.logger.debug(f"Connection attempt {attempt_count} failed: {e}")
+        Raises:
+            TimeoutError: If the server did not become ready within ``timeout``
+        """
+        self.logger.info(f"Waiting for Computer API Server to be ready (timeout: {timeout}s)...")
+        start_time = time.time()
+        owns_keep_alive = self._reconnect_task is None or self._reconnect_task.done()
 
-                # Wait before trying again
-                await asyncio.sleep(interval)
+        probes = {
+            "rest": self._probe_ready_rest(interval),
+            "websocket": self._probe_ready_ws(interval),
+        }
+        if push:
+            probes["push"] = self._probe_ready_push(interval)
 
-            # If we get here, we've timed out
+        try:
+            winner = await first_ready(probes, timeout=timeout)
+        except TimeoutError as e:
             error_msg = f"Could not connect to {self.ip_address} after {timeout} seconds"
-            if last_error:
-                error_msg += f": {str(last_error)}"
+            if e.__cause__ is not None:
+                error_msg += f": {str(e.__cause__)}"
             self.logger.error(error_msg)
             raise TimeoutError(error_msg)
 
-        except Exception as e:
-            if isinstance(e, TimeoutError):
-                raise
-            error_msg = f"Error while waiting for server: {str(e)}"
-            self.logger.error(error_msg)
-            raise RuntimeError(error_msg)
-
-    async def _wait_for_ready_ws(self, timeout: int = 60, interval: float = 1.0):
-        """Wait for WebSocket connection to become available."""
-        start_time = time.time()
-        last_error = None
-        attempt_count = 0
-        progress_interval = 10  # Log progress every 10 seconds
-        last_progress_time = start_time
+        # REST works, so don't keep a WebSocket open that only the probe wanted
+        if winner != "websocket" and owns_keep_alive and self._reconnect_task:
+            self._reconnect_task.cancel()
+            if self._ws:
+                try:
+                    await self._ws.close()
+                except Exception:
+                    pass
+                self._ws = None
 
-        # Disable detailed logging for connection attempts
-        self._log_connection_attempts = False
+        elapsed = time.time() - start_time
+        self.logger.info(f"Computer API Server is ready (after {elapsed:.1f}s, via {winner})")
 
-        try:
-            self.logger.info(
-                f"Waiting for Computer API Server to be ready (timeout: {timeout}s)..."
-            )
+    async def _probe_ready_rest(self, interval: float) -> None:
+        """Poll get_screen_size over REST until it succeeds."""
+        async def check() -> bool:
+            result = await self._send_command_rest("get_screen_size")
+            if not result.get("success", False):
+                self.logger.debug(f"REST readiness check failed: {result.get('error')}")
+                return False
+            return True
 
-            # Start the keep-alive task if it's not already running
-            if self._reconnect_task is None or self._reconnect_task.done():
-                self._reconnect_task = asyncio.create_task(self._keep_alive())
+        await poll_until(check, maximum=interval)
 
-            # Wait for the connection to be established
-            while time.time() - start_time < timeout:
-                try:
-                    attempt_count += 1
-                    current_time = time.time()
-
-                    # Log progress periodically without flooding logs
-                    if current_time - last_progress_time >= progress_interval:
-                        elapsed = current_time - start_time
-                        self.logger.info(
-                            f"Still waiting for Computer API Server... (elapsed: {elapsed:.1f}s, attempts: {attempt_count})"
-                        )
-                        last_progress_time = current_time
+    async def _probe_ready_ws(self, interval: float) -> None:
+        """Connect the WebSocket and poll get_screen_size until it succeeds."""
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._keep_alive())
 
-                    # Check if we have a connection
-                    if self._ws and self._ws.state == websockets.protocol.State.OPEN:
-                        # Test the connection with a simple command
-                        try:
-                            await self._send_command_ws("get_screen_size")
-                            elapsed = time.time() - start_time
-                            self.logger.info(
-                                f"Computer API Server is ready (after {elapsed:.1f}s, {attempt_count} attempts)"
-                            )
-                            return  # Connection is fully working
-                        except Exception as e:
-                            last_error = e
-                            self.logger.debug(f"Connection test failed: {e}")
+        async def check() -> bool:
+            if not (self._ws and self._ws.state == websockets.protocol.State.OPEN):
+                return False
+            result = await self._send_command_ws("get_screen_size")
+            return bool(result.get("success", False))
 
-                    # Wait before trying again
-                    await asyncio.sleep(interval)
+        await poll_until(check, maximum=interval)
 
-                except Exception as e:
-                    last_error = e
-                    self.logger.debug(f"Connection attempt {attempt_count} failed: {e}")
-                    await asyncio.sleep(interval)
+    async def _probe_ready_push(self, interval: float) -> None:
+        """Wait for the server to push a ready notification on /ws/ready.
 
-            # If we get here, we've timed out
-            error_msg = f"Could not connect to {self.ip_address} after {timeout} seconds"
-            if last_error:
-                error_msg += f": {str(last_error)}"
-            self.logger.error(error_msg)
-            raise TimeoutError(error_msg)
-        finally:
-            # Reset to default logging behavior
-            self._log_connection_attempts = False
+        Raises:
+            websockets.exceptions.InvalidHandshake: If the server has no such endpoint
+        """
+        uri = f"{self.ws_uri}/ready"
+        # The handshake is authenticated like REST requests
+        headers = {}
+        if self.api_key:
+            headers["X-API-Key"] = self.api_key
+        if self.vm_name:
+            headers["X-Container-Name"] = self.vm_name
+        backoff = Backoff(maximum=interval)
+        while True:
+            try:
+                async with websockets.connect(uri, additional_headers=headers, close_timeout=1) as ws:
+                    message = json.loads(await ws.recv())
+                    if message.get("type") == "ready":
+                        return
+            except websockets.exceptions.InvalidHandshake:
+                # Older servers reject the path; leave it to the polling probes
+                raise
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException, ValueError) as e:
+                self.logger.debug(f"Ready notification not received yet: {e}")
+            await backoff.sleep()
 
     def close(self):
         """Close WebSocket connection.
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict, List, Any, TypedDict, Union, Literal
+from typing import Dict, List, Any, Optional, TypedDict, Union, Literal
 from dataclasses import dataclass
 
 @dataclass
@@ -13,6 +13,30 @@ class CommandResult:
         self.stderr = stderr
         self.returncode = returncode
 
+@dataclass
+class CommandEvent:
+    """One event of a streamed command: an output chunk, or the exit status.
+
+    ``type`` is "stdout" or "stderr" for output chunks, with the text in
+    ``data``, and "exit" for the final event, which carries ``returncode``.
+    """
+    type: Literal["stdout", "stderr", "exit"]
+    data: str = ""
+    returncode: Optional[int] = None
+    truncated: bool = False
+    timed_out: bool = False
+
+@dataclass
+class SyncResult:
+    """What sync_dir changed on the computer.
+
+    Paths are relative to the synced directories, with "/" separators.
+    """
+    uploaded: List[str]
+    deleted: List[str]
+    unchanged: int
+    bytes_sent: int
+
 # Navigation key literals
 NavigationKey = Literal['pagedown', 'pageup', 'home', 'end', 'left', 'right', 'up', 'down']
 
@@ -0,0 +1,175 @@
+"""
+Mirroring a local directory onto the computer.
+
+Like rsync by default, a file is sent when it is missing on the computer or
+its size or modification time differ; in checksum mode, when its SHA-256
+differs. Everything that changed is sent as one tar stream, which the
+server extracts as it arrives.
+"""
+
+import asyncio
+import hashlib
+import os
+import tarfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+
+# Bytes of tar stream buffered before they are handed to the HTTP client
+TAR_CHUNK_SIZE = 1024 * 1024
+
+# Chunks buffered between the thread writing the tar stream and the upload
+TAR_QUEUE_CHUNKS = 8
+
+# Modification times closer than this are considered equal, as file systems
+# and archive formats store them with different precision
+MTIME_WINDOW = 1.0
+
+
+def _sha256(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(TAR_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def walk_local(root: str, hash: bool = False) -> Dict[str, Dict[str, Any]]:
+    """List a local directory recursively, in the format of the server's ``walk``.
+
+    Returns:
+        Entries by path relative to ``root``, with "/" separators
+    """
+    entries = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in dirnames + filenames:
+            full = os.path.join(dirpath, name)
+            st = os.lstat(full)
+            path = Path(os.path.relpath(full, root)).as_posix()
+            if os.path.islink(full):
+                entries[path] = {"path": path, "type": "symlink", "target": os.readlink(full)}
+            elif os.path.isdir(full):
+                entries[path] = {"path": path, "type": "dir"}
+            elif os.path.isfile(full):
+                entries[path] = {"path": path, "type": "file", "size": st.st_size, "mtime": st.st_mtime}
+                if hash:
+                    entries[path]["sha256"] = _sha256(full)
+    return entries
+
+
+@dataclass
+class SyncPlan:
+    """Paths to delete on the computer, then to send, to make it match the local directory."""
+    upload: List[str] = field(default_factory=list)
+    delete: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    upload_bytes: int = 0
+
+
+def _changed(local: Dict[str, Any], remote: Dict[str, Any], checksum: bool) -> bool:
+    if local["type"] == "symlink":
+        return remote.get("target") != local["target"]
+    if local["type"] == "dir":
+        return False
+    if checksum:
+        return remote.get("sha256") != local["sha256"]
+    return remote["size"] != local["size"] or abs(remote["mtime"] - local["mtime"]) >= MTIME_WINDOW
+
+
+def plan_sync(
+    local: Dict[str, Dict[str, Any]], remote: Dict[str, Dict[str, Any]], checksum: bool = False, delete: bool = False
+) -> SyncPlan:
+    """Compare local and remote listings.
+
+    Remote paths in the way of a local path of another type are always
+    deleted. Other remote paths missing locally are deleted when ``delete``
+    is set. Deleting a directory deletes its contents, so those aren't
+    listed separately.
+    """
+    plan = SyncPlan()
+    for path, entry in local.items():
+        other = remote.get(path)
+        if other is not None and other["type"] != entry["type"]:
+            plan.delete.append(path)
+            other = None
+        if other is None or _changed(entry, other, checksum):
+            plan.upload.append(path)
+            plan.upload_bytes += entry.get("size", 0)
+        else:
+            plan.unchanged += 1
+
+    if delete:
+        plan.delete.extend(path for path in remote if path not in local)
+
+    # Keep only the topmost deleted paths; sorting puts parents first
+    deleted: List[str] = []
+    for path in sorted(set(plan.delete)):
+        if not any(path.startswith(parent + "/") for parent in deleted):
+            deleted.append(path)
+    plan.delete = deleted
+    return plan
+
+
+class _QueueWriter:
+    """A file object for a worker thread, handing what is written to an asyncio queue in large chunks."""
+
+    def __init__(self, chunks: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+        self.chunks = chunks
+        self.loop = loop
+        self.buffer = bytearray()
+        # Set when the consumer stopped reading
+        self.aborted = False
+
+    def write(self, data: bytes) -> int:
+        if self.aborted:
+            raise BrokenPipeError("The tar stream is no longer read")
+        self.buffer += data
+        if len(self.buffer) >= TAR_CHUNK_SIZE:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        if self.buffer:
+            data, self.buffer = bytes(self.buffer), bytearray()
+            asyncio.run_coroutine_threadsafe(self.chunks.put(data), self.loop).result()
+
+
+def _write_tar(root: str, paths: List[str], writer: _QueueWriter) -> None:
+    with tarfile.open(fileobj=writer, mode="w|", format=tarfile.PAX_FORMAT) as archive:
+        for path in paths:
+            archive.add(os.path.join(root, path), arcname=path, recursive=False)
+    writer.flush()
+
+
+async def tar_stream(root: str, paths: List[str]) -> AsyncIterator[bytes]:
+    """Yield a tar archive of ``paths``, relative to ``root``, as it is written.
+
+    The archive is written by a worker thread, which waits while the
+    consumer is behind, so it never has to fit in memory.
+    """
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=TAR_QUEUE_CHUNKS)
+    queue_writer = _QueueWriter(chunks, loop)
+    done = object()
+
+    def write() -> None:
+        try:
+            _write_tar(root, paths, queue_writer)
+        finally:
+            asyncio.run_coroutine_threadsafe(chunks.put(done), loop).result()
+
+    writer = asyncio.create_task(asyncio.to_thread(write))
+    try:
+        while (chunk := await chunks.get()) is not done:
+            yield chunk
+        await writer
+    finally:
+        if not writer.done():
+            # The consumer stopped early: fail the thread's next write and
+            # keep the queue drained so it isn't blocked until then
+            queue_writer.aborted = True
+            while not writer.done():
+                while not chunks.empty():
+                    chunks.get_nowait()
+                await asyncio.sleep(0.01)
+            writer.exception()
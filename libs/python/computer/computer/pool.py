@@ -0,0 +1,399 @@
+"""Warm pool of pre-booted Computer instances."""
+
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Literal, Optional, Set, Union
+
+from .computer import Computer
+from .providers.base import BaseVMProvider, VMProviderType
+
+logger = logging.getLogger(__name__)
+
+RecyclePolicy = Literal["reuse", "restart"]
+
+
+@dataclass(frozen=True)
+class PoolKey:
+    """Identifies interchangeable computers in a pool."""
+    provider_type: str
+    image: str
+    os_type: str
+
+
+@dataclass
+class PoolStats:
+    """Acquisition statistics for a ComputerPool."""
+    hits: int = 0
+    misses: int = 0
+    boots: int = 0
+    boot_failures: int = 0
+    recycled: int = 0
+    discarded: int = 0
+    acquire_latencies: List[float] = field(default_factory=list)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of acquisitions served by an already-booted computer."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.acquire_latencies)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "boots": self.boots,
+            "boot_failures": self.boot_failures,
+            "recycled": self.recycled,
+            "discarded": self.discarded,
+            "acquire_latency_mean": statistics.fmean(latencies) if latencies else None,
+            "acquire_latency_p50": _percentile(latencies, 0.5),
+            "acquire_latency_p95": _percentile(latencies, 0.95),
+        }
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _KeyPool:
+    """Ready computers, pending boots and waiters for one PoolKey."""
+
+    def __init__(self, key: PoolKey):
+        self.key = key
+        self.ready: Deque[Computer] = deque()
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.booting: Set[asyncio.Task] = set()
+
+
+class ComputerPool:
+    """
+    Keeps pre-booted, ready Computer instances per (provider, image, os_type).
+
+    ``acquire()`` hands out a ready computer immediately when one is warm and
+    otherwise waits for the next boot to finish. Every acquire or release tops
+    the pool back up to ``size`` ready computers in the background, so cold
+    starts only happen when demand outruns the pool.
+
+    Example:
+        pool = ComputerPool(size=2, os_type="linux", provider_type="lumier", image="trycua/cua-ubuntu:latest")
+        await pool.start()
+        async with pool.computer() as computer:
+            await computer.interface.screenshot()
+        print(pool.stats.to_dict())
+        await pool.close()
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        provider_type: Union[str, VMProviderType] = VMProviderType.LUME,
+        image: str = "macos-sequoia-cua:latest",
+        os_type: str = "macos",
+        recycle: RecyclePolicy = "restart",
+        reset: Optional[Union[Literal["snapshot"], Callable[[Computer], Awaitable[Any]]]] = None,
+        max_uses: Optional[int] = None,
+        provider_factory: Optional[Callable[[PoolKey], BaseVMProvider]] = None,
+        computer_factory: Optional[Callable[[PoolKey, str], Computer]] = None,
+        name_prefix: str = "cua-pool",
+        **computer_kwargs,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            size: Number of ready computers to keep per key
+            provider_type: Default provider type for acquire()
+            image: Default image for acquire()
+            os_type: Default OS type for acquire()
+            recycle: What to do with a released computer. "reuse" puts it back in the pool
+                     (after ``reset`` if given); "restart" stops it and boots a fresh one.
+            reset: Optional coroutine function run on a released computer before it is reused.
+                   If it raises, the computer is discarded instead. "snapshot" takes a
+                   snapshot of each computer once it has booted and rolls back to it with
+                   Computer.reset() on release.
+            max_uses: If set, discard a computer after this many acquisitions
+            provider_factory: Optional callable returning the VM provider for a new computer,
+                              e.g. a fake BaseVMProvider in tests
+            computer_factory: Optional callable building an unstarted Computer for a key and
+                              VM name. Overrides provider_factory and computer_kwargs.
+            name_prefix: Prefix for generated VM names
+            **computer_kwargs: Additional arguments passed to Computer
+        """
+        if size < 0:
+            raise ValueError("size must be >= 0")
+        self.size = size
+        self.default_key = PoolKey(str(provider_type), image, os_type)
+        self.recycle = recycle
+        self.reset = reset
+        self.max_uses = max_uses
+        self.provider_factory = provider_factory
+        self.computer_factory = computer_factory
+        self.name_prefix = name_prefix
+        self.computer_kwargs = computer_kwargs
+        self.stats = PoolStats()
+
+        self._pools: Dict[PoolKey, _KeyPool] = {}
+        self._leased: Dict[int, PoolKey] = {}
+        self._uses: Dict[int, int] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._closed = False
+
+    def _key(self, provider_type: Optional[Union[str, VMProviderType]], image: Optional[str], os_type: Optional[str]) -> PoolKey:
+        return PoolKey(
+            str(provider_type) if provider_type is not None else self.default_key.provider_type,
+            image or self.default_key.image,
+            os_type or self.default_key.os_type,
+        )
+
+    def _pool(self, key: PoolKey) -> _KeyPool:
+        if key not in self._pools:
+            self._pools[key] = _KeyPool(key)
+        return self._pools[key]
+
+    def _create_computer(self, key: PoolKey) -> Computer:
+        # Image tags can't be part of a VM name; keep names unique per boot
+        name = f"{self.name_prefix}-{key.image.replace(':', '-').replace('/', '-')}-{uuid.uuid4().hex[:8]}"
+        if self.computer_factory is not None:
+            return self.computer_factory(key, name)
+        return Computer(
+            provider_type=key.provider_type,
+            image=key.image,
+            os_type=key.os_type,  # type: ignore[arg-type]
+            name=name,
+            vm_provider=self.provider_factory(key) if self.provider_factory else None,
+            **self.computer_kwargs,
+        )
+
+    async def start(
+        self,
+        provider_type: Optional[Union[str, VMProviderType]] = None,
+        image: Optional[str] = None,
+        os_type: Optional[str] = None,
+        wait: bool = True,
+    ) -> None:
+        """
+        Boot computers for a key up to ``size``.
+
+        Args:
+            provider_type: Provider type, defaults to the pool default
+            image: Image, defaults to the pool default
+            os_type: OS type, defaults to the pool default
+            wait: If True, return once the boots have finished (failed boots are logged)
+        """
+        tasks = self._fill(self._pool(self._key(provider_type, image, os_type)))
+        if wait and tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _fill(self, pool: _KeyPool) -> List[asyncio.Task]:
+        """Start enough boots to cover ``size`` plus any waiting acquirers."""
+        if self._closed:
+            return []
+        waiting = sum(1 for w in pool.waiters if not w.done())
+        missing = self.size + waiting - len(pool.ready) - len(pool.booting)
+        tasks = []
+        for _ in range(max(0, missing)):
+            task = asyncio.create_task(self._boot(pool))
+            pool.booting.add(task)
+            task.add_done_callback(pool.booting.discard)
+            tasks.append(task)
+        return tasks
+
+    async def _boot(self, pool: _KeyPool) -> None:
+        computer = self._create_computer(pool.key)
+        try:
+            await computer.run()
+            if self.reset == "snapshot":
+                await computer.snapshot()
+        except asyncio.CancelledError:
+            await self._stop_quietly(computer)
+            raise
+        except Exception as e:
+            self.stats.boot_failures += 1
+            logger.warning(f"Failed to boot pooled computer for {pool.key}: {e}")
+            # Don't leave an acquirer waiting on a boot that will never come
+            waiter = self._next_waiter(pool)
+            if waiter is not None:
+                waiter.set_exception(e)
+            await self._stop_quietly(computer)
+            return
+        self.stats.boots += 1
+        if self._closed:
+            await self._stop_quietly(computer)
+            return
+        self._deliver(pool, computer)
+
+    def _next_waiter(self, pool: _KeyPool) -> Optional[asyncio.Future]:
+        while pool.waiters:
+            waiter = pool.waiters.popleft()
+            if not waiter.done():
+                return waiter
+        return None
+
+    def _deliver(self, pool: _KeyPool, computer: Computer) -> None:
+        """Hand a ready computer to the oldest waiter, or keep it warm."""
+        waiter = self._next_waiter(pool)
+        if waiter is not None:
+            waiter.set_result(computer)
+        else:
+            pool.ready.append(computer)
+
+    async def acquire(
+        self,
+        provider_type: Optional[Union[str, VMProviderType]] = None,
+        image: Optional[str] = None,
+        os_type: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Computer:
+        """
+        Take a ready computer from the pool.
+
+        Args:
+            provider_type: Provider type, defaults to the pool default
+            image: Image, defaults to the pool default
+            os_type: OS type, defaults to the pool default
+            timeout: Maximum seconds to wait for a computer
+
+        Returns:
+            A running Computer. Give it back with release().
+
+        Raises:
+            RuntimeError: If the pool is closed
+            asyncio.TimeoutError: If no computer became ready within ``timeout``
+        """
+        if self._closed:
+            raise RuntimeError("ComputerPool is closed")
+        key = self._key(provider_type, image, os_type)
+        pool = self._pool(key)
+        started = time.monotonic()
+
+        if pool.ready:
+            computer = pool.ready.popleft()
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+            waiter = asyncio.get_running_loop().create_future()
+            pool.waiters.append(waiter)
+            self._fill(pool)
+            try:
+                computer = await asyncio.wait_for(waiter, timeout)
+            except BaseException:
+                # A computer may have been delivered just as we gave up
+                if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                    self._deliver(pool, waiter.result())
+                raise
+
+        self.stats.acquire_latencies.append(time.monotonic() - started)
+        self._leased[id(computer)] = key
+        self._uses[id(computer)] = self._uses.get(id(computer), 0) + 1
+        self._fill(pool)
+        return computer
+
+    async def release(self, computer: Computer, discard: bool = False) -> None:
+        """
+        Return a computer to the pool.
+
+        Args:
+            computer: Computer obtained from acquire()
+            discard: If True, stop the computer instead of recycling it
+        """
+        key = self._leased.pop(id(computer), None)
+        if key is None:
+            raise ValueError("Computer was not acquired from this pool")
+        pool = self._pool(key)
+
+        reusable = (
+            not discard
+            and not self._closed
+            and self.recycle == "reuse"
+            and (self.max_uses is None or self._uses.get(id(computer), 0) < self.max_uses)
+        )
+        if reusable and self.reset is not None:
+            try:
+                if self.reset == "snapshot":
+                    await computer.reset()
+                else:
+                    await self.reset(computer)
+            except Exception as e:
+                logger.warning(f"Failed to reset pooled computer, discarding it: {e}")
+                reusable = False
+
+        # Boots started while it was leased may have refilled the pool already
+        if reusable and len(pool.ready) >= self.size and not any(not w.done() for w in pool.waiters):
+            reusable = False
+
+        if reusable:
+            self.stats.recycled += 1
+            self._deliver(pool, computer)
+        else:
+            self.stats.discarded += 1
+            self._uses.pop(id(computer), None)
+            self._spawn(self._stop_quietly(computer))
+        self._fill(pool)
+
+    @asynccontextmanager
+    async def computer(
+        self,
+        provider_type: Optional[Union[str, VMProviderType]] = None,
+        image: Optional[str] = None,
+        os_type: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Computer]:
+        """Acquire a computer for the duration of an ``async with`` block."""
+        computer = await self.acquire(provider_type, image, os_type, timeout)
+        try:
+            yield computer
+        except BaseException:
+            # State after a failed task is unknown; don't hand it to the next one
+            await self.release(computer, discard=True)
+            raise
+        await self.release(computer)
+
+    def _spawn(self, coro: Awaitable[Any]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _stop_quietly(self, computer: Computer) -> None:
+        try:
+            await computer.stop()
+        except Exception as e:
+            logger.debug(f"Error stopping pooled computer: {e}")
+
+    @property
+    def available(self) -> int:
+        """Number of ready computers across all keys."""
+        return sum(len(pool.ready) for pool in self._pools.values())
+
+    async def close(self) -> None:
+        """Stop warm computers and pending boots. Leased computers are left to their holders."""
+        self._closed = True
+        boots = [task for pool in self._pools.values() for task in pool.booting]
+        for task in boots:
+            task.cancel()
+        await asyncio.gather(*boots, return_exceptions=True)
+
+        stops = []
+        for pool in self._pools.values():
+            while pool.ready:
+                stops.append(self._stop_quietly(pool.ready.popleft()))
+            while (waiter := self._next_waiter(pool)) is not None:
+                waiter.set_exception(RuntimeError("ComputerPool is closed"))
+        await asyncio.gather(*stops, *self._background, return_exceptions=True)
+
+    async def __aenter__(self) -> "ComputerPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
@@ -1,8 +1,15 @@
 """Base provider interface for VM backends."""
 
 import abc
+import asyncio
+import logging
 from enum import StrEnum
-from typing import Dict, List, Optional, Any, AsyncContextManager
+from typing import Awaitable, Callable, Dict, List, Optional, Any, AsyncContextManager, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Default number of VM operations a bulk call runs at once
+DEFAULT_BULK_CONCURRENCY = 8
 
 
 class VMProviderType(StrEnum):
@@ -11,6 +18,7 @@ class VMProviderType(StrEnum):
     LUMIER = "lumier"
     CLOUD = "cloud"
     WINSANDBOX = "winsandbox"
+    LOCAL_XVFB = "local_xvfb"
     UNKNOWN = "unknown"
 
 
@@ -104,3 +112,157 @@ class BaseVMProvider(AsyncContextManager):
             IP address of the VM when it becomes available
         """
         pass
+
+    def get_api_port(self, name: str) -> Optional[int]:
+        """Get the port the computer server of a VM listens on.
+
+        Providers that run several computer servers on one host override this;
+        the default of None means the standard port.
+
+        Args:
+            name: Name of the VM
+
+        Returns:
+            The computer server port, or None for the default
+        """
+        return None
+
+    @property
+    def supports_snapshots(self) -> bool:
+        """Whether snapshot() and restore() are implemented by this provider."""
+        return False
+
+    async def snapshot(self, name: str, snapshot_name: str, storage: Optional[str] = None) -> Dict[str, Any]:
+        """Save the state of a VM so it can be restored later.
+
+        The VM is left stopped; start it again with run_vm.
+
+        Args:
+            name: Name of the VM to snapshot
+            snapshot_name: Name to save the snapshot under. An existing snapshot
+                          with this name is replaced.
+            storage: Optional storage path override
+
+        Returns:
+            Dictionary with snapshot status and information
+        """
+        raise NotImplementedError(f"The {self.provider_type} provider does not support snapshots")
+
+    async def restore(self, name: str, snapshot_name: str, storage: Optional[str] = None) -> Dict[str, Any]:
+        """Replace a VM's state with a snapshot taken earlier.
+
+        The VM is left stopped; start it again with run_vm.
+
+        Args:
+            name: Name of the VM to restore
+            snapshot_name: Name of the snapshot to restore from
+            storage: Optional storage path override
+
+        Returns:
+            Dictionary with restore status and information
+        """
+        raise NotImplementedError(f"The {self.provider_type} provider does not support snapshots")
+
+    async def delete_snapshot(self, snapshot_name: str, storage: Optional[str] = None) -> Dict[str, Any]:
+        """Delete a snapshot.
+
+        Args:
+            snapshot_name: Name of the snapshot to delete
+            storage: Optional storage path override
+
+        Returns:
+            Dictionary with delete status and information
+        """
+        raise NotImplementedError(f"The {self.provider_type} provider does not support snapshots")
+
+    async def _bulk(
+        self,
+        names: Sequence[str],
+        operation: Callable[[str], Awaitable[Dict[str, Any]]],
+        max_concurrency: int,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run a single-VM operation for many VMs with bounded concurrency.
+
+        Failures are reported per VM rather than raised, so one bad VM does not
+        abort the rest of the batch.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run_one(name: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await operation(name)
+                except Exception as e:
+                    logger.warning(f"Bulk operation failed for VM {name}: {e}")
+                    return {"name": name, "status": "error", "error": str(e)}
+
+        results = await asyncio.gather(*(run_one(name) for name in names))
+        return dict(zip(names, results))
+
+    async def run_vms(
+        self,
+        vms: Sequence[Dict[str, Any]],
+        storage: Optional[str] = None,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run several VMs concurrently.
+
+        Args:
+            vms: VM specs, each with "name", "image" and optional "run_opts" keys
+            storage: Optional storage path override for all VMs
+            max_concurrency: Maximum number of VMs started at once
+
+        Returns:
+            Dictionary mapping each VM name to its run_vm result, or to
+            {"name", "status": "error", "error"} if starting it raised
+        """
+        specs = {vm["name"]: vm for vm in vms}
+        return await self._bulk(
+            list(specs),
+            lambda name: self.run_vm(
+                image=specs[name]["image"],
+                name=name,
+                run_opts=specs[name].get("run_opts") or {},
+                storage=storage,
+            ),
+            max_concurrency,
+        )
+
+    async def stop_vms(
+        self,
+        names: Sequence[str],
+        storage: Optional[str] = None,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Stop several VMs concurrently.
+
+        Args:
+            names: Names of the VMs to stop
+            storage: Optional storage path override for all VMs
+            max_concurrency: Maximum number of VMs stopped at once
+
+        Returns:
+            Dictionary mapping each VM name to its stop_vm result, or to an error entry
+        """
+        return await self._bulk(names, lambda name: self.stop_vm(name, storage=storage), max_concurrency)
+
+    async def get_vms(
+        self,
+        names: Sequence[str],
+        storage: Optional[str] = None,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get information for several VMs.
+
+        The default issues get_vm calls concurrently; providers whose backend
+        can answer for many VMs in one request override this.
+
+        Args:
+            names: Names of the VMs to get information for
+            storage: Optional storage path override for all VMs
+            max_concurrency: Maximum number of concurrent get_vm calls
+
+        Returns:
+            Dictionary mapping each VM name to its get_vm result, or to an error entry
+        """
+        return await self._bulk(names, lambda name: self.get_vm(name, storage=storage), max_concurrency)
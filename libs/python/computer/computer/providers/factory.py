@@ -134,5 +134,23 @@ class VMProviderFactory:
                     "pywinsandbox is required for WinSandboxProvider. "
                     "Please install it with 'pip install -U git+https://github.com/karkason/pywinsandbox.git'"
                 ) from e
+        elif provider_type == VMProviderType.LOCAL_XVFB:
+            try:
+                from .xvfb import LocalXvfbProvider, HAS_XVFB
+                if not HAS_XVFB:
+                    raise ImportError(
+                        "Xvfb is required for LocalXvfbProvider. "
+                        "Please install it with your package manager (e.g. 'apt install xvfb') on a Linux host"
+                    )
+                return LocalXvfbProvider(
+                    verbose=verbose,
+                    **kwargs
+                )
+            except ImportError as e:
+                logger.error(f"Failed to import LocalXvfbProvider: {e}")
+                raise ImportError(
+                    "Xvfb and cua-computer-server are required for LocalXvfbProvider. "
+                    "Please install Xvfb and run 'pip install cua-computer-server'"
+                ) from e
         else:
             raise ValueError(f"Unsupported provider type: {provider_type}")
@@ -1,19 +1,14 @@
-"""Lume VM provider implementation using curl commands.
+"""Lume VM provider implementation using the Lume HTTP API.
 
-This provider uses direct curl commands to interact with the Lume API,
+This provider talks to the Lume API through a shared async HTTP client,
 removing the dependency on the pylume Python package.
 """
 
-import os
-import re
 import asyncio
-import json
 import logging
-import subprocess
-import urllib.parse
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Sequence, Tuple
 
-from ..base import BaseVMProvider, VMProviderType
+from ..base import DEFAULT_BULK_CONCURRENCY, BaseVMProvider, VMProviderType
 from ...logger import Logger, LogLevel
 from ..lume_api import (
     lume_api_get,
@@ -21,18 +16,34 @@ from ..lume_api import (
     lume_api_stop,
     lume_api_update,
     lume_api_pull,
-    HAS_CURL,
+    lume_api_delete,
+    lume_api_config,
+    lume_api_clone,
     parse_memory
 )
+from ..lume_pull import ProgressCallback, PullProgress, RegistryError, prefetch_image, shared_call
+from ..lume_status import DEFAULT_REFRESH_INTERVAL, DEFAULT_STATUS_TTL, LumeStatusCache, get_status_cache
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Hosts where the Lume daemon shares this machine's filesystem
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+# Seconds between progress logs while waiting for a VM's IP address
+PROGRESS_LOG_INTERVAL = 20
+
+
+def _has_valid_ip(vm_info: Dict[str, Any]) -> bool:
+    """Check whether a Lume API VM entry has a usable IP address."""
+    ip = vm_info.get("ipAddress") or vm_info.get("ip_address")
+    return bool(ip) and ip != "unknown" and not ip.startswith("0.0.0.0")
+
 class LumeProvider(BaseVMProvider):
-    """Lume VM provider implementation using direct curl commands.
+    """Lume VM provider implementation using the Lume HTTP API.
     
-    This provider uses curl to interact with the Lume API server,
-    removing the dependency on the pylume Python package.
+    This provider uses a pooled async HTTP client to interact with the Lume
+    API server, removing the dependency on the pylume Python package.
     """
     
     def __init__(
@@ -42,6 +53,8 @@ class LumeProvider(BaseVMProvider):
         storage: Optional[str] = None,
         verbose: bool = False,
         ephemeral: bool = False,
+        status_ttl: float = DEFAULT_STATUS_TTL,
+        status_refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
     ):
         """Initialize the Lume provider.
         
@@ -50,18 +63,17 @@ class LumeProvider(BaseVMProvider):
             host: Host to use for API connections (default: localhost)
             storage: Path to store VM data
             verbose: Enable verbose logging
+            status_ttl: Seconds a VM status read from the Lume API is reused (default: 1)
+            status_refresh_interval: Seconds between shared status refreshes while
+                waiting for a VM's IP address (default: 1)
         """
-        if not HAS_CURL:
-            raise ImportError(
-                "curl is required for LumeProvider. "
-                "Please ensure it is installed and in your PATH."
-            )
-            
         self.host = host
         self.port = port  # Default port for Lume API
         self.storage = storage
         self.verbose = verbose
         self.ephemeral = ephemeral  # If True, VMs will be deleted after stopping
+        self.status_ttl = status_ttl
+        self.status_refresh_interval = status_refresh_interval
         
         # Base API URL for Lume API calls
         self.api_base_url = f"http://{self.host}:{self.port}"
@@ -83,7 +95,7 @@ class LumeProvider(BaseVMProvider):
         # No cleanup needed
         pass
             
-    def _lume_api_get(self, vm_name: str = "", storage: Optional[str] = None, debug: bool = False) -> Dict[str, Any]:
+    async def _lume_api_get(self, vm_name: str = "", storage: Optional[str] = None, debug: bool = False) -> Dict[str, Any]:
         """Get VM information using shared lume_api function.
         
         Args:
@@ -96,7 +108,7 @@ class LumeProvider(BaseVMProvider):
             Dictionary with VM status information parsed from JSON response
         """
         # Use the shared implementation from lume_api module
-        return lume_api_get(
+        return await lume_api_get(
             vm_name=vm_name,
             host=self.host,
             port=self.port,
@@ -105,7 +117,7 @@ class LumeProvider(BaseVMProvider):
             verbose=self.verbose
         )
     
-    def _lume_api_run(self, vm_name: str, run_opts: Dict[str, Any], debug: bool = False) -> Dict[str, Any]:
+    async def _lume_api_run(self, vm_name: str, run_opts: Dict[str, Any], debug: bool = False) -> Dict[str, Any]:
         """Run a VM using shared lume_api function.
         
         Args:
@@ -117,7 +129,7 @@ class LumeProvider(BaseVMProvider):
             Dictionary with API response or error information
         """
         # Use the shared implementation from lume_api module
-        return lume_api_run(
+        return await lume_api_run(
             vm_name=vm_name, 
             host=self.host,
             port=self.port,
@@ -127,7 +139,7 @@ class LumeProvider(BaseVMProvider):
             verbose=self.verbose
         )
     
-    def _lume_api_stop(self, vm_name: str, debug: bool = False) -> Dict[str, Any]:
+    async def _lume_api_stop(self, vm_name: str, debug: bool = False) -> Dict[str, Any]:
         """Stop a VM using shared lume_api function.
         
         Args:
@@ -138,7 +150,7 @@ class LumeProvider(BaseVMProvider):
             Dictionary with API response or error information
         """
         # Use the shared implementation from lume_api module
-        return lume_api_stop(
+        return await lume_api_stop(
             vm_name=vm_name, 
             host=self.host,
             port=self.port,
@@ -147,7 +159,7 @@ class LumeProvider(BaseVMProvider):
             verbose=self.verbose
         )
     
-    def _lume_api_update(self, vm_name: str, update_opts: Dict[str, Any], debug: bool = False) -> Dict[str, Any]:
+    async def _lume_api_update(self, vm_name: str, update_opts: Dict[str, Any], debug: bool = False) -> Dict[str, Any]:
         """Update VM configuration using shared lume_api function.
         
         Args:
@@ -159,7 +171,7 @@ class LumeProvider(BaseVMProvider):
             Dictionary with API response or error information
         """
         # Use the shared implementation from lume_api module
-        return lume_api_update(
+        return await lume_api_update(
             vm_name=vm_name, 
             host=self.host,
             port=self.port,
@@ -169,6 +181,77 @@ class LumeProvider(BaseVMProvider):
             verbose=self.verbose
         )
     
+    def _status_cache(self, storage: Optional[str] = None) -> LumeStatusCache:
+        """Get the status cache shared with other providers using the same daemon and storage."""
+        return get_status_cache(
+            self.host,
+            self.port,
+            storage if storage is not None else self.storage,
+            refresh_interval=self.status_refresh_interval,
+        )
+    
+    def _format_vm_info(self, name: str, vm_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a VM entry from the Lume API into the get_vm result format.
+        
+        Args:
+            name: Name of the VM
+            vm_info: VM details as returned by the Lume API
+            
+        Returns:
+            Dictionary with VM information including status, IP address, etc.
+        """
+        # Process the VM status information
+        vm_status = vm_info.get("status", "unknown")
+        
+        # Check if VM is stopped or not running - don't wait for IP in this case
+        if vm_status == "stopped":
+            logger.info(f"VM {name} is in '{vm_status}' state - not waiting for IP address")
+            # Return the status as-is without waiting for an IP
+            result = {
+                "name": name,
+                "status": vm_status,
+                **vm_info  # Include all original fields from the API response
+            }
+            return result
+        
+        # Handle field name differences between APIs
+        # Some APIs use camelCase, others use snake_case
+        if "vncUrl" in vm_info:
+            vnc_url = vm_info["vncUrl"]
+        elif "vnc_url" in vm_info:
+            vnc_url = vm_info["vnc_url"]
+        else:
+            vnc_url = ""
+            
+        if "ipAddress" in vm_info:
+            ip_address = vm_info["ipAddress"]
+        elif "ip_address" in vm_info:
+            ip_address = vm_info["ip_address"]
+        else:
+            # If no IP address is provided and VM is supposed to be running,
+            # report it as still starting
+            ip_address = None
+            logger.info(f"VM {name} is in '{vm_status}' state but no IP address found - reporting as still starting")
+            
+        logger.info(f"VM {name} status: {vm_status}")
+        
+        # Return the complete status information
+        result = {
+            "name": name,
+            "status": vm_status if vm_status else "running",
+            "ip_address": ip_address,
+            "vnc_url": vnc_url,
+            "api_status": "ok"
+        }
+        
+        # Include all original fields from the API response
+        if isinstance(vm_info, dict):
+            for key, value in vm_info.items():
+                if key not in result:  # Don't override our carefully processed fields
+                    result[key] = value
+                    
+        return result
+
     async def get_vm(self, name: str, storage: Optional[str] = None) -> Dict[str, Any]:
         """Get VM information by name.
         
@@ -184,22 +267,10 @@ class LumeProvider(BaseVMProvider):
             If storage is not provided, the provider's default storage path will be used.
             The storage parameter allows overriding the storage location for this specific call.
         """
-        if not HAS_CURL:
-            logger.error("curl is not available. Cannot get VM status.")
-            return {
-                "name": name,
-                "status": "unavailable",
-                "error": "curl is not available"
-            }
-        
         # First try to get detailed VM info from the API
         try:
-            # Query the Lume API for VM status using the provider's storage_path
-            vm_info = self._lume_api_get(
-                vm_name=name, 
-                storage=storage if storage is not None else self.storage,
-                debug=self.verbose
-            )
+            # Query the Lume API for VM status, reusing a recent or in-flight answer
+            vm_info = await self._status_cache(storage).get_vm(name, max_age=self.status_ttl)
             
             # Check for API errors
             if "error" in vm_info:
@@ -212,57 +283,7 @@ class LumeProvider(BaseVMProvider):
                     "error": vm_info["error"]
                 }
             
-            # Process the VM status information
-            vm_status = vm_info.get("status", "unknown")
-            
-            # Check if VM is stopped or not running - don't wait for IP in this case
-            if vm_status == "stopped":
-                logger.info(f"VM {name} is in '{vm_status}' state - not waiting for IP address")
-                # Return the status as-is without waiting for an IP
-                result = {
-                    "name": name,
-                    "status": vm_status,
-                    **vm_info  # Include all original fields from the API response
-                }
-                return result
-            
-            # Handle field name differences between APIs
-            # Some APIs use camelCase, others use snake_case
-            if "vncUrl" in vm_info:
-                vnc_url = vm_info["vncUrl"]
-            elif "vnc_url" in vm_info:
-                vnc_url = vm_info["vnc_url"]
-            else:
-                vnc_url = ""
-                
-            if "ipAddress" in vm_info:
-                ip_address = vm_info["ipAddress"]
-            elif "ip_address" in vm_info:
-                ip_address = vm_info["ip_address"]
-            else:
-                # If no IP address is provided and VM is supposed to be running,
-                # report it as still starting
-                ip_address = None
-                logger.info(f"VM {name} is in '{vm_status}' state but no IP address found - reporting as still starting")
-                
-            logger.info(f"VM {name} status: {vm_status}")
-            
-            # Return the complete status information
-            result = {
-                "name": name,
-                "status": vm_status if vm_status else "running",
-                "ip_address": ip_address,
-                "vnc_url": vnc_url,
-                "api_status": "ok"
-            }
-            
-            # Include all original fields from the API response
-            if isinstance(vm_info, dict):
-                for key, value in vm_info.items():
-                    if key not in result:  # Don't override our carefully processed fields
-                        result[key] = value
-                        
-            return result
+            return self._format_vm_info(name, vm_info)
             
         except Exception as e:
             logger.error(f"Failed to get VM status: {e}")
@@ -275,10 +296,12 @@ class LumeProvider(BaseVMProvider):
         
     async def list_vms(self) -> List[Dict[str, Any]]:
         """List all available VMs."""
-        result = self._lume_api_get(debug=self.verbose)
+        result = await self._status_cache().list_vms(max_age=self.status_ttl)
         
         # Extract the VMs list from the response
-        if "vms" in result and isinstance(result["vms"], list):
+        if isinstance(result, list):
+            return result
+        elif "vms" in result and isinstance(result["vms"], list):
             return result["vms"]
         elif "error" in result:
             logger.error(f"Error listing VMs: {result['error']}")
@@ -286,6 +309,39 @@ class LumeProvider(BaseVMProvider):
         else:
             return []
         
+    async def get_vms(
+        self,
+        names: Sequence[str],
+        storage: Optional[str] = None,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get information for several VMs with a single list request.
+        
+        Falls back to concurrent get_vm calls if the list request fails.
+        
+        Args:
+            names: Names of the VMs to get information for
+            storage: Optional storage path override for all VMs
+            max_concurrency: Maximum number of concurrent get_vm calls in the fallback
+            
+        Returns:
+            Dictionary mapping each VM name to its get_vm result; VMs missing
+            from the listing are reported as "not_found"
+        """
+        result = await self._status_cache(storage).list_vms(max_age=self.status_ttl)
+        if isinstance(result, dict):
+            if "error" in result:
+                logger.debug(f"Listing VMs failed, querying them one by one: {result['error']}")
+                return await super().get_vms(names, storage=storage, max_concurrency=max_concurrency)
+            result = result.get("vms", [])
+        
+        listed = {vm.get("name"): vm for vm in result if isinstance(vm, dict)}
+        return {
+            name: self._format_vm_info(name, listed[name]) if name in listed
+            else {"name": name, "status": "not_found"}
+            for name in names
+        }
+        
     async def run_vm(self, image: str, name: str, run_opts: Dict[str, Any], storage: Optional[str] = None) -> Dict[str, Any]:
         """Run a VM with the given options.
         
@@ -326,8 +382,7 @@ class LumeProvider(BaseVMProvider):
         # Now run the VM with the given options
         self.logger.info(f"Running VM {name} with options: {run_opts}")
         
-        from ..lume_api import lume_api_run
-        return lume_api_run(
+        result = await lume_api_run(
             vm_name=name,
             host=self.host,
             port=self.port,
@@ -336,6 +391,8 @@ class LumeProvider(BaseVMProvider):
             debug=self.verbose,
             verbose=self.verbose
         )
+        self._status_cache(storage).invalidate(name)
+        return result
         
     async def stop_vm(self, name: str, storage: Optional[str] = None) -> Dict[str, Any]:
         """Stop a running VM.
@@ -351,7 +408,8 @@ class LumeProvider(BaseVMProvider):
             Dictionary with stop status and information
         """
         # Stop the VM first
-        stop_result = self._lume_api_stop(name, debug=self.verbose)
+        stop_result = await self._lume_api_stop(name, debug=self.verbose)
+        self._status_cache(storage).invalidate(name)
         
         # Log ephemeral status for debugging
         self.logger.info(f"Ephemeral mode status: {self.ephemeral}")
@@ -388,16 +446,27 @@ class LumeProvider(BaseVMProvider):
         registry: str = "ghcr.io",
         organization: str = "trycua",
         pull_opts: Optional[Dict[str, Any]] = None,
+        on_progress: Optional[ProgressCallback] = None,
     ) -> Dict[str, Any]:
         """Pull a VM image from the registry.
         
+        When the Lume daemon runs on this host with caching enabled, the image
+        is first downloaded into its cache with parallel, resumable range
+        requests, reporting progress; the daemon then only copies local files.
+        Concurrent pulls of the same image share one download.
+        
         Args:
             name: Name for the VM after pulling
             image: The image name to pull (e.g. 'macos-sequoia-cua:latest')
             storage: Optional storage path to use
             registry: Registry to pull from (default: ghcr.io)
             organization: Organization in registry (default: trycua)
-            pull_opts: Additional options for pulling the VM (optional)
+            pull_opts: Additional options for pulling the VM (optional):
+                - prefetch: Download into the daemon cache first (default: True for a local daemon)
+                - registry_url: Registry base URL, if not https://{registry}
+                - max_concurrency: Maximum concurrent range requests
+                - chunk_size: Layers larger than this many bytes are fetched in parallel ranges
+            on_progress: Optional callback receiving PullProgress events
             
         Returns:
             Dictionary with information about the pulled VM
@@ -410,7 +479,6 @@ class LumeProvider(BaseVMProvider):
             raise ValueError("Image parameter is required for pull_vm")
             
         self.logger.info(f"Pulling VM image '{image}' as '{name}'")
-        self.logger.info("You can check the pull progress using: lume logs -f")
         
         # Set default pull_opts if not provided
         if pull_opts is None:
@@ -419,32 +487,67 @@ class LumeProvider(BaseVMProvider):
         # Log information about the operation
         self.logger.debug(f"Pull storage location: {storage or 'default'}")
         
+        if pull_opts.get("prefetch", self.host in LOCAL_HOSTS):
+            await self._prefetch_image(image, registry, organization, pull_opts, on_progress)
+        
+        if on_progress is not None:
+            on_progress(PullProgress(image=image, phase="importing"))
+        
+        storage = storage if storage is not None else self.storage
         try:
-            # Call the lume_api_pull function from lume_api.py
-            from ..lume_api import lume_api_pull
-            
-            result = lume_api_pull(
-                image=image,
-                name=name,
-                host=self.host,
-                port=self.port,
-                storage=storage if storage is not None else self.storage,
-                registry=registry,
-                organization=organization,
-                debug=self.verbose,
-                verbose=self.verbose
+            # Several computers may need the same VM; let them share one daemon pull
+            result = await shared_call(
+                ("lume_pull", self.host, self.port, image, name, storage),
+                lambda: lume_api_pull(
+                    image=image,
+                    name=name,
+                    host=self.host,
+                    port=self.port,
+                    storage=storage,
+                    registry=registry,
+                    organization=organization,
+                    debug=self.verbose,
+                    verbose=self.verbose
+                ),
             )
+            self._status_cache(storage).invalidate(name)
             
             # Check for errors in the result
             if "error" in result:
                 self.logger.error(f"Failed to pull VM image: {result['error']}")
+                if on_progress is not None:
+                    on_progress(PullProgress(image=image, phase="error", error=result["error"]))
                 return result
                 
             self.logger.info(f"Successfully pulled VM image '{image}' as '{name}'")
+            if on_progress is not None:
+                on_progress(PullProgress(image=image, phase="done"))
             return result
         except Exception as e:
             self.logger.error(f"Failed to pull VM image '{image}': {e}")
             return {"error": f"Failed to pull VM: {str(e)}"}
+    
+    async def _prefetch_image(
+        self,
+        image: str,
+        registry: str,
+        organization: str,
+        pull_opts: Dict[str, Any],
+        on_progress: Optional[ProgressCallback],
+    ) -> None:
+        """Download an image into the daemon's cache, falling back silently to a plain daemon pull."""
+        config = await lume_api_config(self.host, self.port)
+        cache_dir = config.get("cacheDirectory")
+        if "error" in config or not config.get("cachingEnabled") or not cache_dir:
+            self.logger.debug("Lume image cache unavailable; the daemon will download the image itself")
+            return
+        options = {k: pull_opts[k] for k in ("registry_url", "max_concurrency", "chunk_size") if k in pull_opts}
+        try:
+            job = prefetch_image(image, cache_dir, registry, organization, on_progress=on_progress, **options)
+            result = await job.wait()
+            self.logger.info(f"Downloaded {image} into the Lume cache at {result['cache_dir']}")
+        except RegistryError as e:
+            self.logger.warning(f"Prefetching {image} failed, letting the daemon pull it: {e}")
         
     async def delete_vm(self, name: str, storage: Optional[str] = None) -> Dict[str, Any]:
         """Delete a VM permanently.
@@ -459,10 +562,7 @@ class LumeProvider(BaseVMProvider):
         self.logger.info(f"Deleting VM {name}...")
         
         try:
-            # Call the lume_api_delete function we created
-            from ..lume_api import lume_api_delete
-            
-            result = lume_api_delete(
+            result = await lume_api_delete(
                 vm_name=name,
                 host=self.host,
                 port=self.port,
@@ -470,6 +570,7 @@ class LumeProvider(BaseVMProvider):
                 debug=self.verbose,
                 verbose=self.verbose
             )
+            self._status_cache(storage).invalidate(name)
             
             # Check for errors in the result
             if "error" in result:
@@ -484,58 +585,145 @@ class LumeProvider(BaseVMProvider):
     
     async def update_vm(self, name: str, update_opts: Dict[str, Any], storage: Optional[str] = None) -> Dict[str, Any]:
         """Update VM configuration."""
-        return self._lume_api_update(name, update_opts, debug=self.verbose)
-        
+        result = await self._lume_api_update(name, update_opts, debug=self.verbose)
+        self._status_cache(storage).invalidate(name)
+        return result
+
+    @property
+    def supports_snapshots(self) -> bool:
+        """Lume snapshots are stopped clones of the VM."""
+        return True
+
+    async def _exists(self, name: str, storage: Optional[str] = None) -> bool:
+        """Check whether a VM exists, bypassing the status cache."""
+        vm_info = await self._lume_api_get(name, storage=storage)
+        return "error" not in vm_info and vm_info.get("status") != "not_found"
+
+    async def _stop_for_clone(self, name: str, storage: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Stop a VM if it is running, since Lume only clones stopped VMs.
+
+        Unlike stop_vm, this never deletes an ephemeral VM.
+
+        Returns:
+            The stop error, or None if the VM is stopped
+        """
+        vm_info = await self._lume_api_get(name, storage=storage)
+        if vm_info.get("status") != "running":
+            return None
+        result = await lume_api_stop(
+            vm_name=name,
+            host=self.host,
+            port=self.port,
+            storage=storage if storage is not None else self.storage,
+            debug=self.verbose,
+            verbose=self.verbose
+        )
+        self._status_cache(storage).invalidate(name)
+        return result if "error" in result else None
+
+    async def _clone(self, name: str, new_name: str, storage: Optional[str] = None) -> Dict[str, Any]:
+        result = await lume_api_clone(
+            vm_name=name,
+            new_name=new_name,
+            host=self.host,
+            port=self.port,
+            storage=storage if storage is not None else self.storage,
+            debug=self.verbose,
+            verbose=self.verbose
+        )
+        self._status_cache(storage).invalidate(new_name)
+        return result
+
+    async def snapshot(self, name: str, snapshot_name: str, storage: Optional[str] = None) -> Dict[str, Any]:
+        """Save a VM as a stopped clone named ``snapshot_name``.
+
+        The VM is stopped first and left stopped.
+
+        Args:
+            name: Name of the VM to snapshot
+            snapshot_name: Name of the clone. An existing clone with this name is replaced.
+            storage: Optional storage path override
+
+        Returns:
+            Dictionary with snapshot status and information
+        """
+        error = await self._stop_for_clone(name, storage)
+        if error is not None:
+            return error
+        if await self._exists(snapshot_name, storage):
+            result = await self.delete_vm(snapshot_name, storage=storage)
+            if "error" in result:
+                return result
+
+        result = await self._clone(name, snapshot_name, storage)
+        if "error" in result:
+            self.logger.error(f"Failed to snapshot VM {name}: {result['error']}")
+            return result
+        self.logger.info(f"Saved snapshot {snapshot_name} of VM {name}")
+        return {"name": name, "snapshot": snapshot_name, "status": "stopped"}
+
+    async def restore(self, name: str, snapshot_name: str, storage: Optional[str] = None) -> Dict[str, Any]:
+        """Replace a VM with a fresh clone of ``snapshot_name``.
+
+        The snapshot itself is kept, so it can be restored again. The restored
+        VM is left stopped.
+
+        Args:
+            name: Name of the VM to restore
+            snapshot_name: Name of the snapshot to restore from
+            storage: Optional storage path override
+
+        Returns:
+            Dictionary with restore status and information
+        """
+        if not await self._exists(snapshot_name, storage):
+            return {"error": f"Snapshot {snapshot_name} not found", "name": name}
+        if await self._exists(name, storage):
+            error = await self._stop_for_clone(name, storage)
+            if error is not None:
+                return error
+            result = await self.delete_vm(name, storage=storage)
+            if "error" in result:
+                return result
+
+        result = await self._clone(snapshot_name, name, storage)
+        if "error" in result:
+            self.logger.error(f"Failed to restore VM {name}: {result['error']}")
+            return result
+        self.logger.info(f"Restored VM {name} from snapshot {snapshot_name}")
+        return {"name": name, "snapshot": snapshot_name, "status": "stopped"}
+
+    async def delete_snapshot(self, snapshot_name: str, storage: Optional[str] = None) -> Dict[str, Any]:
+        """Delete a snapshot clone."""
+        return await self.delete_vm(snapshot_name, storage=storage)
+
     async def get_ip(self, name: str, storage: Optional[str] = None, retry_delay: int = 2) -> str:
         """Get the IP address of a VM, waiting indefinitely until it's available.
         
         Args:
             name: Name of the VM to get the IP for
             storage: Optional storage path override
-            retry_delay: Delay between retries in seconds (default: 2)
+            retry_delay: Kept for compatibility; status is refreshed every
+                        ``status_refresh_interval`` seconds instead.
             
         Returns:
             IP address of the VM when it becomes available
         """
-        # Track total attempts for logging purposes
-        total_attempts = 0
+        # Wait on the shared status cache: one background refresh serves every
+        # computer waiting on this daemon, instead of each polling it separately
+        cache = self._status_cache(storage)
+        waited = 0
         
-        # Loop indefinitely until we get a valid IP
         while True:
-            total_attempts += 1
-            
-            # Log retry message but not on first attempt
-            if total_attempts > 1:
-                self.logger.info(f"Waiting for VM {name} IP address (attempt {total_attempts})...")
-            
             try:
-                # Get VM information
-                vm_info = await self.get_vm(name, storage=storage)
-                
-                # Check if we got a valid IP
-                ip = vm_info.get("ip_address", None)
-                if ip and ip != "unknown" and not ip.startswith("0.0.0.0"):
-                    self.logger.info(f"Got valid VM IP address: {ip}")
-                    return ip
-                    
-                # Check the VM status
+                vm_info = await cache.wait_for(name, _has_valid_ip, timeout=PROGRESS_LOG_INTERVAL)
+                ip = vm_info.get("ipAddress") or vm_info.get("ip_address")
+                self.logger.info(f"Got valid VM IP address: {ip}")
+                return ip
+            except asyncio.TimeoutError:
+                waited += PROGRESS_LOG_INTERVAL
+                vm_info = await cache.get_vm(name, max_age=self.status_refresh_interval)
                 status = vm_info.get("status", "unknown")
-                
-                # If VM is not running yet, log and wait
-                if status != "running":
-                    self.logger.info(f"VM is not running yet (status: {status}). Waiting...")
-                # If VM is running but no IP yet, wait and retry
-                else:
-                    self.logger.info("VM is running but no valid IP address yet. Waiting...")
-                
-            except Exception as e:
-                self.logger.warning(f"Error getting VM {name} IP: {e}, continuing to wait...")
-                
-            # Wait before next retry
-            await asyncio.sleep(retry_delay)
-            
-            # Add progress log every 10 attempts
-            if total_attempts % 10 == 0:
-                self.logger.info(f"Still waiting for VM {name} IP after {total_attempts} attempts...")
+                self.logger.info(f"Still waiting for VM {name} IP after {waited}s (status: {status})...")
         
 
@@ -1,27 +1,21 @@
 """Shared API utilities for Lume and Lumier providers.
 
 This module contains shared functions for interacting with the Lume API,
-used by both the LumeProvider and LumierProvider classes.
+used by both the LumeProvider and LumierProvider classes. Requests go through
+the shared async client in lume_client, so they never block the event loop.
 """
 
 import logging
 import json
-import subprocess
-import urllib.parse
 from typing import Dict, List, Optional, Any
 
+from .lume_client import LumeAPIError, get_lume_client
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
-# Check if curl is available
-try:
-    subprocess.run(["curl", "--version"], capture_output=True, check=True)
-    HAS_CURL = True
-except (subprocess.SubprocessError, FileNotFoundError):
-    HAS_CURL = False
-
 
-def lume_api_get(
+async def lume_api_get(
     vm_name: str,
     host: str,
     port: int,
@@ -29,10 +23,10 @@ def lume_api_get(
     debug: bool = False,
     verbose: bool = False
 ) -> Dict[str, Any]:
-    """Use curl to get VM information from Lume API.
+    """Get VM information from Lume API.
     
     Args:
-        vm_name: Name of the VM to get info for
+        vm_name: Name of the VM to get info for. If empty, lists all VMs.
         host: API host
         port: API port
         storage: Storage path for the VM
@@ -41,88 +35,68 @@ def lume_api_get(
         
     Returns:
         Dictionary with VM status information parsed from JSON response
+        (or a list of VMs when vm_name is empty)
     """
-    # URL encode the storage parameter for the query
-    encoded_storage = ""
-    storage_param = ""
-    
-    if storage:
-        # First encode the storage path properly
-        encoded_storage = urllib.parse.quote(storage, safe='')
-        storage_param = f"?storage={encoded_storage}"
-        
-    # Construct API URL with encoded storage parameter if needed
-    api_url = f"http://{host}:{port}/lume/vms/{vm_name}{storage_param}"
-        
-    # Construct the curl command with increased timeouts for more reliability
-    # --connect-timeout: Time to establish connection (15 seconds)
-    # --max-time: Maximum time for the whole operation (20 seconds)
-    # -f: Fail silently (no output at all) on server errors
-    # Add single quotes around URL to ensure special characters are handled correctly
-    cmd = ["curl", "--connect-timeout", "15", "--max-time", "20", "-s", "-f", f"'{api_url}'"]
-    
-    # For logging and display, show the properly escaped URL
-    display_cmd = ["curl", "--connect-timeout", "15", "--max-time", "20", "-s", "-f", api_url]
-    
-    # Only print the curl command when debug is enabled
-    display_curl_string = ' '.join(display_cmd)
-    logger.debug(f"Executing API request: {display_curl_string}")
-    
-    # Execute the command - for execution we need to use shell=True to handle URLs with special characters
+    path = f"/lume/vms/{vm_name}" if vm_name else "/lume/vms"
     try:
-        # Use a single string with shell=True for proper URL handling
-        shell_cmd = ' '.join(cmd)
-        result = subprocess.run(shell_cmd, shell=True, capture_output=True, text=True)
+        _, vm_status = await get_lume_client(host, port).request(
+            "GET", path, params={"storage": storage}, timeout=20, connect_timeout=15
+        )
+    except LumeAPIError as e:
+        # Only log at debug level to reduce noise during retries
+        logger.debug(f"API request failed with code {e.curl_code}: {e}")
         
-        # Handle curl exit codes
-        if result.returncode != 0:
-            curl_error = "Unknown error"
-            
-            # Map common curl error codes to helpful messages
-            if result.returncode == 7:
-                curl_error = "Failed to connect to the API server - it might still be starting up"
-            elif result.returncode == 22:
-                curl_error = "HTTP error returned from API server"
-            elif result.returncode == 28:
-                curl_error = "Operation timeout - the API server is taking too long to respond"
-            elif result.returncode == 52:
-                curl_error = "Empty reply from server - the API server is starting but not fully ready yet"
-            elif result.returncode == 56:
-                curl_error = "Network problem during data transfer - check container networking"
-                
-            # Only log at debug level to reduce noise during retries
-            logger.debug(f"API request failed with code {result.returncode}: {curl_error}")
-            
-            # Return a more useful error message
-            return {
-                "error": f"API request failed: {curl_error}",
-                "curl_code": result.returncode,
-                "vm_name": vm_name,
-                "status": "unknown"  # We don't know the actual status due to API error
-            }
-            
-        # Try to parse the response as JSON
-        if result.stdout and result.stdout.strip():
-            try:
-                vm_status = json.loads(result.stdout)
-                if debug or verbose:
-                    logger.info(f"Successfully parsed VM status: {vm_status.get('status', 'unknown')}")
-                return vm_status
-            except json.JSONDecodeError as e:
-                # Return the raw response if it's not valid JSON
-                logger.warning(f"Invalid JSON response: {e}")
-                if "Virtual machine not found" in result.stdout:
-                    return {"status": "not_found", "message": "VM not found in Lume API"}
-                
-                return {"error": f"Invalid JSON response: {result.stdout[:100]}...", "status": "unknown"}
-        else:
-            return {"error": "Empty response from API", "status": "unknown"}
-    except subprocess.SubprocessError as e:
-        logger.error(f"Failed to execute API request: {e}")
-        return {"error": f"Failed to execute API request: {str(e)}", "status": "unknown"}
+        # Return a more useful error message
+        return {
+            "error": f"API request failed: {e}",
+            "curl_code": e.curl_code,
+            "vm_name": vm_name,
+            "status": "unknown"  # We don't know the actual status due to API error
+        }
+    
+    if vm_status is None:
+        return {"error": "Empty response from API", "status": "unknown"}
+    if isinstance(vm_status, str):
+        # The response was not valid JSON
+        logger.warning(f"Invalid JSON response: {vm_status[:100]}")
+        if "Virtual machine not found" in vm_status:
+            return {"status": "not_found", "message": "VM not found in Lume API"}
+        return {"error": f"Invalid JSON response: {vm_status[:100]}...", "status": "unknown"}
+    
+    if (debug or verbose) and isinstance(vm_status, dict):
+        logger.info(f"Successfully parsed VM status: {vm_status.get('status', 'unknown')}")
+    return vm_status
 
 
-def lume_api_run(
+async def _lume_api_post(
+    path: str,
+    host: str,
+    port: int,
+    payload: Dict[str, Any],
+    action: str,
+    success_message: str,
+    timeout: float = 20,
+    connect_timeout: float = 15,
+) -> Dict[str, Any]:
+    """POST to the Lume API and normalize the response into a result dictionary."""
+    try:
+        _, response = await get_lume_client(host, port).request(
+            "POST", path, payload=payload, timeout=timeout, connect_timeout=connect_timeout,
+            raise_for_status=False,
+        )
+    except LumeAPIError as e:
+        logger.warning(f"API {action} request failed with code {e.curl_code}: {e}")
+        return {"error": f"API request failed: {e}", "curl_code": e.curl_code}
+    
+    if response is None:
+        return {"success": True, "message": success_message}
+    if isinstance(response, str):
+        # Return the raw response if it's not valid JSON
+        return {"success": True, "message": success_message, "raw_response": response}
+    return response
+
+
+async def lume_api_run(
     vm_name: str,
     host: str,
     port: int,
@@ -131,7 +105,7 @@ def lume_api_run(
     debug: bool = False,
     verbose: bool = False
 ) -> Dict[str, Any]:
-    """Run a VM using curl.
+    """Run a VM.
     
     Args:
         vm_name: Name of the VM to run
@@ -145,9 +119,6 @@ def lume_api_run(
     Returns:
         Dictionary with API response or error information
     """
-    # Construct API URL
-    api_url = f"http://{host}:{port}/lume/vms/{vm_name}/run"
-    
     # Prepare JSON payload with required parameters
     payload = {}
     
@@ -172,38 +143,14 @@ def lume_api_run(
     # Log the payload for debugging
     logger.debug(f"API payload: {json.dumps(payload, indent=2)}")
     
-    # Construct the curl command
-    cmd = [
-        "curl", "--connect-timeout", "30", "--max-time", "30",
-        "-s", "-X", "POST", "-H", "Content-Type: application/json",
-        "-d", json.dumps(payload),
-        api_url
-    ]
-    
-    # Execute the command
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            logger.warning(f"API request failed with code {result.returncode}: {result.stderr}")
-            return {"error": f"API request failed: {result.stderr}"}
-            
-        # Try to parse the response as JSON
-        if result.stdout and result.stdout.strip():
-            try:
-                response = json.loads(result.stdout)
-                return response
-            except json.JSONDecodeError:
-                # Return the raw response if it's not valid JSON
-                return {"success": True, "message": "VM started successfully", "raw_response": result.stdout}
-        else:
-            return {"success": True, "message": "VM started successfully"}
-    except subprocess.SubprocessError as e:
-        logger.error(f"Failed to execute run request: {e}")
-        return {"error": f"Failed to execute run request: {str(e)}"}
+    return await _lume_api_post(
+        f"/lume/vms/{vm_name}/run", host, port, payload,
+        action="run", success_message="VM started successfully",
+        timeout=30, connect_timeout=30,
+    )
 
 
-def lume_api_stop(
+async def lume_api_stop(
     vm_name: str,
     host: str,
     port: int,
@@ -211,7 +158,7 @@ def lume_api_stop(
     debug: bool = False,
     verbose: bool = False
 ) -> Dict[str, Any]:
-    """Stop a VM using curl.
+    """Stop a VM.
     
     Args:
         vm_name: Name of the VM to stop
@@ -224,51 +171,23 @@ def lume_api_stop(
     Returns:
         Dictionary with API response or error information
     """
-    # Construct API URL
-    api_url = f"http://{host}:{port}/lume/vms/{vm_name}/stop"
-    
     # Prepare JSON payload with required parameters
     payload = {}
     
     # Add storage path if specified
     if storage:
         payload["storage"] = storage
-        
-    # Construct the curl command
-    cmd = [
-        "curl", "--connect-timeout", "15", "--max-time", "20",
-        "-s", "-X", "POST", "-H", "Content-Type: application/json",
-        "-d", json.dumps(payload),
-        api_url
-    ]
     
-    # Execute the command
-    try:
-        if debug or verbose:
-            logger.info(f"Executing: {' '.join(cmd)}")
-            
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            logger.warning(f"API request failed with code {result.returncode}: {result.stderr}")
-            return {"error": f"API request failed: {result.stderr}"}
-            
-        # Try to parse the response as JSON
-        if result.stdout and result.stdout.strip():
-            try:
-                response = json.loads(result.stdout)
-                return response
-            except json.JSONDecodeError:
-                # Return the raw response if it's not valid JSON
-                return {"success": True, "message": "VM stopped successfully", "raw_response": result.stdout}
-        else:
-            return {"success": True, "message": "VM stopped successfully"}
-    except subprocess.SubprocessError as e:
-        logger.error(f"Failed to execute stop request: {e}")
-        return {"error": f"Failed to execute stop request: {str(e)}"}
+    if debug or verbose:
+        logger.info(f"Stopping VM {vm_name} via http://{host}:{port}/lume/vms/{vm_name}/stop")
+    
+    return await _lume_api_post(
+        f"/lume/vms/{vm_name}/stop", host, port, payload,
+        action="stop", success_message="VM stopped successfully",
+    )
 
 
-def lume_api_update(
+async def lume_api_update(
     vm_name: str,
     host: str,
     port: int,
@@ -277,7 +196,7 @@ def lume_api_update(
     debug: bool = False,
     verbose: bool = False
 ) -> Dict[str, Any]:
-    """Update VM settings using curl.
+    """Update VM settings.
     
     Args:
         vm_name: Name of the VM to update
@@ -291,9 +210,6 @@ def lume_api_update(
     Returns:
         Dictionary with API response or error information
     """
-    # Construct API URL
-    api_url = f"http://{host}:{port}/lume/vms/{vm_name}/update"
-    
     # Prepare JSON payload with required parameters
     payload = {}
     
@@ -308,42 +224,17 @@ def lume_api_update(
     # Add storage path if specified
     if storage:
         payload["storage"] = storage
-        
-    # Construct the curl command
-    cmd = [
-        "curl", "--connect-timeout", "15", "--max-time", "20",
-        "-s", "-X", "POST", "-H", "Content-Type: application/json",
-        "-d", json.dumps(payload),
-        api_url
-    ]
     
-    # Execute the command
-    try:
-        if debug:
-            logger.info(f"Executing: {' '.join(cmd)}")
-            
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            logger.warning(f"API request failed with code {result.returncode}: {result.stderr}")
-            return {"error": f"API request failed: {result.stderr}"}
-            
-        # Try to parse the response as JSON
-        if result.stdout and result.stdout.strip():
-            try:
-                response = json.loads(result.stdout)
-                return response
-            except json.JSONDecodeError:
-                # Return the raw response if it's not valid JSON
-                return {"success": True, "message": "VM updated successfully", "raw_response": result.stdout}
-        else:
-            return {"success": True, "message": "VM updated successfully"}
-    except subprocess.SubprocessError as e:
-        logger.error(f"Failed to execute update request: {e}")
-        return {"error": f"Failed to execute update request: {str(e)}"}
+    if debug:
+        logger.info(f"Updating VM {vm_name} with {payload}")
+    
+    return await _lume_api_post(
+        f"/lume/vms/{vm_name}/update", host, port, payload,
+        action="update", success_message="VM updated successfully",
+    )
 
 
-def lume_api_pull(
+async def lume_api_pull(
     image: str,
     name: str,
     host: str,
@@ -354,7 +245,7 @@ def lume_api_pull(
     debug: bool = False,
     verbose: bool = False
 ) -> Dict[str, Any]:
-    """Pull a VM image from a registry using curl.
+    """Pull a VM image from a registry.
     
     Args:
         image: Name/tag of the image to pull
@@ -381,48 +272,27 @@ def lume_api_pull(
     if storage:
         pull_payload["storage"] = storage
     
-    # Construct pull command with proper JSON payload
-    pull_cmd = [
-        "curl"
-    ]
-    
-    if not verbose:
-        pull_cmd.append("-s")
-    
-    pull_cmd.extend([
-        "-X", "POST",
-        "-H", "Content-Type: application/json",
-        "-d", json.dumps(pull_payload),
-        f"http://{host}:{port}/lume/pull"
-    ])
-    
-    logger.debug(f"Executing API request: {' '.join(pull_cmd)}")
+    logger.debug(f"Pulling {image} as {name} via http://{host}:{port}/lume/pull")
     
     try:
-        # Execute pull command
-        result = subprocess.run(pull_cmd, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            error_msg = f"Failed to pull VM {name}: {result.stderr}"
-            logger.error(error_msg)
-            return {"error": error_msg}
-        
-        try:
-            response = json.loads(result.stdout)
-            logger.info(f"Successfully initiated pull for VM {name}")
-            return response
-        except json.JSONDecodeError:
-            if result.stdout:
-                logger.info(f"Pull response: {result.stdout}")
-            return {"success": True, "message": f"Successfully initiated pull for VM {name}"}
-            
-    except subprocess.SubprocessError as e:
-        error_msg = f"Failed to execute pull command: {str(e)}"
+        # Pulls can take a long time; don't apply a total timeout
+        _, response = await get_lume_client(host, port).request(
+            "POST", "/lume/pull", payload=pull_payload, timeout=None, raise_for_status=False,
+        )
+    except LumeAPIError as e:
+        error_msg = f"Failed to pull VM {name}: {e}"
         logger.error(error_msg)
-        return {"error": error_msg}
+        return {"error": error_msg, "curl_code": e.curl_code}
+    
+    if isinstance(response, dict):
+        logger.info(f"Successfully initiated pull for VM {name}")
+        return response
+    if response:
+        logger.info(f"Pull response: {response}")
+    return {"success": True, "message": f"Successfully initiated pull for VM {name}"}
 
 
-def lume_api_delete(
+async def lume_api_delete(
     vm_name: str,
     host: str,
     port: int,
@@ -430,7 +300,7 @@ def lume_api_delete(
     debug: bool = False,
     verbose: bool = False
 ) -> Dict[str, Any]:
-    """Delete a VM using curl.
+    """Delete a VM.
     
     Args:
         vm_name: Name of the VM to delete
@@ -443,74 +313,95 @@ def lume_api_delete(
     Returns:
         Dictionary with API response or error information
     """
-    # URL encode the storage parameter for the query
-    encoded_storage = ""
-    storage_param = ""
-    
-    if storage:
-        # First encode the storage path properly
-        encoded_storage = urllib.parse.quote(storage, safe='')
-        storage_param = f"?storage={encoded_storage}"
-        
-    # Construct API URL with encoded storage parameter if needed
-    api_url = f"http://{host}:{port}/lume/vms/{vm_name}{storage_param}"
+    try:
+        # Deleting can take a long time - use much longer timeouts matching shell implementation
+        _, response = await get_lume_client(host, port).request(
+            "DELETE", f"/lume/vms/{vm_name}", params={"storage": storage},
+            timeout=5000, connect_timeout=6000, raise_for_status=False,
+        )
+    except LumeAPIError as e:
+        # Only log at debug level to reduce noise during retries
+        logger.debug(f"API request failed with code {e.curl_code}: {e}")
         
-    # Construct the curl command for DELETE operation - using much longer timeouts matching shell implementation
-    cmd = ["curl", "--connect-timeout", "6000", "--max-time", "5000", "-s", "-X", "DELETE", f"'{api_url}'"]
-    
-    # For logging and display, show the properly escaped URL
-    display_cmd = ["curl", "--connect-timeout", "6000", "--max-time", "5000", "-s", "-X", "DELETE", api_url]
-    
-    # Only print the curl command when debug is enabled
-    display_curl_string = ' '.join(display_cmd)
-    logger.debug(f"Executing API request: {display_curl_string}")
+        # Return a more useful error message
+        return {
+            "error": f"API request failed: {e}",
+            "curl_code": e.curl_code,
+            "vm_name": vm_name,
+            "storage": storage
+        }
+    
+    if response is None:
+        return {"success": True, "message": "VM deleted successfully"}
+    if isinstance(response, str):
+        # Return the raw response if it's not valid JSON
+        return {"success": True, "message": "VM deleted successfully", "raw_response": response}
+    return response
+
+
+async def lume_api_clone(
+    vm_name: str,
+    new_name: str,
+    host: str,
+    port: int,
+    storage: Optional[str] = None,
+    debug: bool = False,
+    verbose: bool = False
+) -> Dict[str, Any]:
+    """Clone a stopped VM.
+
+    Lume copies the VM directory; on APFS the copy is copy-on-write, so it is
+    fast and costs no extra space until one of the copies is written to.
+
+    Args:
+        vm_name: Name of the VM to clone
+        new_name: Name of the new VM
+        host: API host
+        port: API port
+        storage: Storage path of both VMs
+        debug: Whether to show debug output
+        verbose: Enable verbose logging
+
+    Returns:
+        Dictionary with API response or error information
+    """
+    payload = {"name": vm_name, "newName": new_name}
+    if storage:
+        payload["sourceLocation"] = storage
+        payload["destLocation"] = storage
+
+    if debug or verbose:
+        logger.info(f"Cloning VM {vm_name} to {new_name}")
+
+    result = await _lume_api_post(
+        "/lume/vms/clone", host, port, payload,
+        action="clone", success_message="VM cloned successfully",
+        timeout=600, connect_timeout=15,
+    )
+    # Failures come back as {"message": ...} without the source and destination
+    if "error" not in result and "destination" not in result:
+        return {"error": f"Failed to clone VM {vm_name}: {result.get('message', result)}"}
+    return result
+
+
+async def lume_api_config(host: str, port: int) -> Dict[str, Any]:
+    """Get the Lume daemon settings (home and cache directories, caching flag).
     
-    # Execute the command - for execution we need to use shell=True to handle URLs with special characters
-    try:
-        # Use a single string with shell=True for proper URL handling
-        shell_cmd = ' '.join(cmd)
-        result = subprocess.run(shell_cmd, shell=True, capture_output=True, text=True)
+    Args:
+        host: API host
+        port: API port
         
-        # Handle curl exit codes
-        if result.returncode != 0:
-            curl_error = "Unknown error"
-            
-            # Map common curl error codes to helpful messages
-            if result.returncode == 7:
-                curl_error = "Failed to connect to the API server - it might still be starting up"
-            elif result.returncode == 22:
-                curl_error = "HTTP error returned from API server"
-            elif result.returncode == 28:
-                curl_error = "Operation timeout - the API server is taking too long to respond"
-            elif result.returncode == 52:
-                curl_error = "Empty reply from server - the API server is starting but not fully ready yet"
-            elif result.returncode == 56:
-                curl_error = "Network problem during data transfer - check container networking"
-                
-            # Only log at debug level to reduce noise during retries
-            logger.debug(f"API request failed with code {result.returncode}: {curl_error}")
-            
-            # Return a more useful error message
-            return {
-                "error": f"API request failed: {curl_error}",
-                "curl_code": result.returncode,
-                "vm_name": vm_name,
-                "storage": storage
-            }
-            
-        # Try to parse the response as JSON
-        if result.stdout and result.stdout.strip():
-            try:
-                response = json.loads(result.stdout)
-                return response
-            except json.JSONDecodeError:
-                # Return the raw response if it's not valid JSON
-                return {"success": True, "message": "VM deleted successfully", "raw_response": result.stdout}
-        else:
-            return {"success": True, "message": "VM deleted successfully"}
-    except subprocess.SubprocessError as e:
-        logger.error(f"Failed to execute delete request: {e}")
-        return {"error": f"Failed to execute delete request: {str(e)}"}
+    Returns:
+        Dictionary with the settings, or error information
+    """
+    try:
+        _, response = await get_lume_client(host, port).request("GET", "/lume/config", timeout=20)
+    except LumeAPIError as e:
+        logger.debug(f"API config request failed with code {e.curl_code}: {e}")
+        return {"error": f"API request failed: {e}", "curl_code": e.curl_code}
+    if not isinstance(response, dict):
+        return {"error": "Invalid config response from API"}
+    return response
 
 
 def parse_memory(memory_str: str) -> int:
@@ -0,0 +1,188 @@
+"""Async HTTP client for the Lume API.
+
+A single pooled aiohttp session is shared by every provider talking to the
+same Lume daemon, so status polls reuse keep-alive connections instead of
+forking a curl process per request.
+
+Errors are raised as LumeAPIError subclasses. Each one carries the curl exit
+code the previous curl-based implementation reported for the same failure,
+so callers (and logs) keep the familiar mapping.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Marker for "use the client default" (None disables the timeout)
+_DEFAULT: Any = object()
+
+
+class LumeAPIError(Exception):
+    """Base error for Lume API requests."""
+
+    curl_code: Optional[int] = None
+    description = "Unknown error"
+
+    def __init__(self, message: Optional[str] = None, status: Optional[int] = None, body: Optional[str] = None):
+        self.status = status
+        self.body = body
+        super().__init__(message or self.description)
+
+
+class LumeAPIConnectionError(LumeAPIError):
+    """The API server refused or could not accept the connection (curl 7)."""
+
+    curl_code = 7
+    description = "Failed to connect to the API server - it might still be starting up"
+
+
+class LumeAPIHTTPError(LumeAPIError):
+    """The API server returned an HTTP error status (curl 22)."""
+
+    curl_code = 22
+    description = "HTTP error returned from API server"
+
+
+class LumeAPITimeoutError(LumeAPIError):
+    """The request did not complete in time (curl 28)."""
+
+    curl_code = 28
+    description = "Operation timeout - the API server is taking too long to respond"
+
+
+class LumeAPIEmptyReplyError(LumeAPIError):
+    """The server closed the connection without replying (curl 52)."""
+
+    curl_code = 52
+    description = "Empty reply from server - the API server is starting but not fully ready yet"
+
+
+class LumeAPINetworkError(LumeAPIError):
+    """The connection broke while transferring data (curl 56)."""
+
+    curl_code = 56
+    description = "Network problem during data transfer - check container networking"
+
+
+class LumeAPIClient:
+    """Async client for one Lume API server.
+
+    Use get_lume_client() to obtain the shared instance for a host and port.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 20.0, connect_timeout: float = 15.0):
+        """Initialize the client.
+
+        Args:
+            host: API host
+            port: API port
+            timeout: Default total timeout in seconds for a request
+            connect_timeout: Default timeout in seconds to establish a connection
+        """
+        self.host = host
+        self.port = port
+        self.base_url = f"http://{host}:{port}"
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it for the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            # Sessions are bound to the loop they were created on
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=30),
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = _DEFAULT,
+        connect_timeout: Optional[float] = _DEFAULT,
+        raise_for_status: bool = True,
+    ) -> Tuple[int, Any]:
+        """Send a request to the Lume API.
+
+        Args:
+            method: HTTP method
+            path: Request path, e.g. "/lume/vms/my-vm"
+            params: Query parameters
+            payload: JSON body
+            timeout: Total timeout override in seconds (None for no limit)
+            connect_timeout: Connect timeout override in seconds (None for no limit)
+            raise_for_status: If True, raise LumeAPIHTTPError for 4xx/5xx responses
+
+        Returns:
+            Tuple of (HTTP status, parsed JSON body). Bodies that are not valid JSON are
+            returned as text, and empty bodies as None.
+
+        Raises:
+            LumeAPIError: If the request fails
+        """
+        session = await self._get_session()
+        client_timeout = aiohttp.ClientTimeout(
+            total=self.timeout if timeout is _DEFAULT else timeout,
+            connect=self.connect_timeout if connect_timeout is _DEFAULT else connect_timeout,
+        )
+        query = {k: str(v) for k, v in (params or {}).items() if v is not None}
+        url = f"{self.base_url}{path}"
+        logger.debug(f"Lume API request: {method} {url} params={query} payload={payload}")
+
+        try:
+            async with session.request(method, url, params=query, json=payload, timeout=client_timeout) as response:
+                text = await response.text()
+                status = response.status
+        except aiohttp.ClientConnectorError as e:
+            raise LumeAPIConnectionError() from e
+        except (asyncio.TimeoutError, aiohttp.ServerTimeoutError) as e:
+            raise LumeAPITimeoutError() from e
+        except aiohttp.ServerDisconnectedError as e:
+            raise LumeAPIEmptyReplyError() from e
+        except aiohttp.ClientError as e:
+            raise LumeAPINetworkError(f"{LumeAPINetworkError.description}: {e}") from e
+
+        if raise_for_status and status >= 400:
+            raise LumeAPIHTTPError(status=status, body=text)
+
+        if not text or not text.strip():
+            return status, None
+        try:
+            return status, json.loads(text)
+        except json.JSONDecodeError:
+            return status, text
+
+    async def close(self) -> None:
+        """Close the pooled session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_clients: Dict[Tuple[str, int], LumeAPIClient] = {}
+
+
+def get_lume_client(host: str, port: int) -> LumeAPIClient:
+    """Return the shared client for a Lume API server."""
+    key = (host, int(port))
+    client = _clients.get(key)
+    if client is None:
+        client = _clients[key] = LumeAPIClient(host, int(port))
+    return client
+
+
+async def close_lume_clients() -> None:
+    """Close every shared client session."""
+    for client in list(_clients.values()):
+        await client.close()
@@ -0,0 +1,365 @@
+"""Parallel, resumable VM image pulls into the Lume image cache.
+
+``POST /lume/pull`` downloads a whole image in one opaque request with no
+progress reporting, and an interrupted pull starts over. When the Lume
+daemon runs on this host with caching enabled, it reuses image layers found
+in its cache directory. This module fills that cache directly from the
+registry before asking the daemon to pull, so the daemon only has to copy
+local files.
+
+- Layers download concurrently, and large layers are split into byte ranges
+  fetched in parallel when the registry supports range requests.
+- Partial downloads are kept on disk and resumed with range requests.
+- Progress is reported as ``PullProgress`` events.
+- Concurrent pulls of the same image share one download job.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_CONCURRENCY = 8
+READ_SIZE = 1024 * 1024
+MANIFEST_MEDIA_TYPE = "application/vnd.oci.image.manifest.v1+json"
+
+# Seconds between date origins of Unix time and Swift's Date (2001-01-01)
+_SWIFT_EPOCH_OFFSET = 978307200
+
+# Minimum seconds between progress events while bytes are flowing
+_PROGRESS_INTERVAL = 0.2
+
+
+class RegistryError(Exception):
+    """Error fetching an image from the registry."""
+
+
+@dataclass(frozen=True)
+class PullProgress:
+    """Snapshot of an image pull.
+
+    ``phase`` is one of "resolving", "downloading", "importing", "done" or "error".
+    """
+    image: str
+    phase: str
+    total_bytes: int = 0
+    downloaded_bytes: int = 0
+    layers_total: int = 0
+    layers_done: int = 0
+    error: Optional[str] = None
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Fraction of bytes downloaded, or None before the size is known."""
+        if not self.total_bytes:
+            return None
+        return self.downloaded_bytes / self.total_bytes
+
+
+ProgressCallback = Callable[[PullProgress], None]
+
+
+class PullJob:
+    """A running image download that any number of callers can wait on."""
+
+    def __init__(self, image: str):
+        self.progress = PullProgress(image=image, phase="resolving")
+        self._listeners: List[ProgressCallback] = []
+        self._last_emit = 0.0
+        self._task: Optional["asyncio.Task[Dict[str, Any]]"] = None
+
+    def subscribe(self, callback: ProgressCallback) -> None:
+        """Receive progress events, starting with the current state."""
+        self._listeners.append(callback)
+        callback(self.progress)
+
+    def _update(self, force: bool = False, **changes: Any) -> None:
+        self.progress = replace(self.progress, **changes)
+        now = time.monotonic()
+        if not force and now - self._last_emit < _PROGRESS_INTERVAL:
+            return
+        self._last_emit = now
+        for callback in list(self._listeners):
+            try:
+                callback(self.progress)
+            except Exception as e:
+                logger.debug(f"Pull progress callback failed: {e}")
+
+    def _add_bytes(self, count: int) -> None:
+        self._update(downloaded_bytes=self.progress.downloaded_bytes + count)
+
+    async def wait(self) -> Dict[str, Any]:
+        """Wait for the download to finish.
+
+        Returns:
+            Dictionary with the manifest ID and image cache directory
+
+        Raises:
+            RegistryError: If the download failed
+        """
+        assert self._task is not None
+        return await asyncio.shield(self._task)
+
+
+class ImagePuller:
+    """Downloads images from an OCI registry into the Lume cache layout."""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        registry: str = "ghcr.io",
+        organization: str = "trycua",
+        registry_url: Optional[str] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """Initialize the puller.
+
+        Args:
+            cache_dir: Lume cache directory (``cacheDirectory`` from the Lume config)
+            registry: Registry host (default: ghcr.io)
+            organization: Organization in the registry (default: trycua)
+            registry_url: Base URL of the registry, if not https://{registry}
+            max_concurrency: Maximum number of concurrent range requests
+            chunk_size: Layers larger than this are fetched as parallel byte ranges
+        """
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.registry = registry
+        self.organization = organization
+        self.registry_url = (registry_url or f"https://{registry}").rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.chunk_size = chunk_size
+
+    def image_cache_dir(self, manifest_id: str) -> str:
+        """Directory the Lume daemon looks in for a cached image."""
+        return os.path.join(self.cache_dir, "ghcr", self.organization, manifest_id)
+
+    async def _get_token(self, session: aiohttp.ClientSession, repository: str) -> Optional[str]:
+        """Get an anonymous pull token, or None if the registry does not need one."""
+        url = f"{self.registry_url}/token"
+        params = {"scope": f"repository:{repository}:pull", "service": self.registry}
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status != 200:
+                    return None
+                body = await response.json(content_type=None)
+                return body.get("token") or body.get("access_token")
+        except (aiohttp.ClientError, json.JSONDecodeError):
+            return None
+
+    async def _fetch_manifest(
+        self, session: aiohttp.ClientSession, repository: str, tag: str, headers: Dict[str, str]
+    ) -> Tuple[Dict[str, Any], str]:
+        url = f"{self.registry_url}/v2/{repository}/manifests/{tag}"
+        async with session.get(url, headers={**headers, "Accept": MANIFEST_MEDIA_TYPE}) as response:
+            if response.status != 200:
+                raise RegistryError(f"Fetching manifest for {repository}:{tag} returned {response.status}")
+            body = await response.read()
+            digest = response.headers.get("Docker-Content-Digest") or f"sha256:{hashlib.sha256(body).hexdigest()}"
+        return json.loads(body), digest
+
+    async def _supports_ranges(self, session: aiohttp.ClientSession, url: str, headers: Dict[str, str]) -> bool:
+        async with session.get(url, headers={**headers, "Range": "bytes=0-0"}) as response:
+            return response.status == 206
+
+    async def _download_range(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        headers: Dict[str, str],
+        start: int,
+        end: int,
+        part_path: str,
+        whole: bool,
+        job: PullJob,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        """Download bytes [start, end) into ``part_path``, resuming from what is already there.
+
+        ``whole`` means the range covers the entire blob, so a server that
+        ignores the Range header can still be used.
+        """
+        length = end - start
+        existing = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if existing > length:
+            existing = 0
+        job._add_bytes(existing)
+        if existing == length:
+            if not os.path.exists(part_path):
+                open(part_path, "wb").close()
+            return
+
+        async with semaphore:
+            range_headers = {**headers, "Range": f"bytes={start + existing}-{end - 1}"}
+            async with session.get(url, headers=range_headers) as response:
+                if response.status == 200 and whole:
+                    # Range ignored; the full blob is coming, so start the part over
+                    job._add_bytes(-existing)
+                    existing = 0
+                elif response.status != 206:
+                    raise RegistryError(f"Range request for {url} returned {response.status}")
+                with open(part_path, "ab" if existing else "wb") as f:
+                    async for data in response.content.iter_chunked(READ_SIZE):
+                        await asyncio.to_thread(f.write, data)
+                        job._add_bytes(len(data))
+
+    @staticmethod
+    def _assemble(parts: List[str], target: str, digest: str) -> None:
+        """Concatenate parts into ``target``, verifying the content digest."""
+        algorithm, _, expected = digest.partition(":")
+        hasher = hashlib.new(algorithm)
+        partial = f"{target}.partial"
+        with open(partial, "wb") as out:
+            for part in parts:
+                with open(part, "rb") as f:
+                    while data := f.read(READ_SIZE):
+                        hasher.update(data)
+                        out.write(data)
+        if hasher.hexdigest() != expected:
+            for path in parts + [partial]:
+                os.remove(path)
+            raise RegistryError(f"Digest mismatch for {digest}")
+        os.replace(partial, target)
+        for part in parts:
+            os.remove(part)
+
+    async def _download_layer(
+        self,
+        session: aiohttp.ClientSession,
+        repository: str,
+        layer: Dict[str, Any],
+        directory: str,
+        headers: Dict[str, str],
+        ranges_supported: bool,
+        job: PullJob,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        digest, size = layer["digest"], int(layer["size"])
+        target = os.path.join(directory, digest.replace(":", "_"))
+        if os.path.exists(target) and os.path.getsize(target) == size:
+            job._add_bytes(size)
+        else:
+            chunk = self.chunk_size if ranges_supported else max(size, 1)
+            bounds = [(start, min(start + chunk, size)) for start in range(0, size, chunk)] or [(0, 0)]
+            parts = [f"{target}.part{i}" for i in range(len(bounds))]
+            url = f"{self.registry_url}/v2/{repository}/blobs/{digest}"
+            await asyncio.gather(*(
+                self._download_range(session, url, headers, start, end, part, len(parts) == 1, job, semaphore)
+                for (start, end), part in zip(bounds, parts)
+            ))
+            await asyncio.to_thread(self._assemble, parts, target, digest)
+        job._update(layers_done=job.progress.layers_done + 1, force=True)
+
+    async def run(self, image: str, job: PullJob) -> Dict[str, Any]:
+        """Download ``image`` ("name:tag") into the cache, reporting progress to ``job``."""
+        name, _, tag = image.partition(":")
+        repository = f"{self.organization}/{name}"
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency + 2)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            token = await self._get_token(session, repository)
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            manifest, manifest_digest = await self._fetch_manifest(session, repository, tag or "latest", headers)
+            layers = manifest.get("layers", [])
+            manifest_id = manifest_digest.replace(":", "_")
+            directory = self.image_cache_dir(manifest_id)
+            os.makedirs(directory, exist_ok=True)
+
+            job._update(
+                phase="downloading",
+                total_bytes=sum(int(layer["size"]) for layer in layers),
+                layers_total=len(layers),
+                force=True,
+            )
+            ranges_supported = False
+            if any(int(layer["size"]) > self.chunk_size for layer in layers):
+                first = f"{self.registry_url}/v2/{repository}/blobs/{layers[0]['digest']}"
+                ranges_supported = await self._supports_ranges(session, first, headers)
+
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            await asyncio.gather(*(
+                self._download_layer(session, repository, layer, directory, headers, ranges_supported, job, semaphore)
+                for layer in layers
+            ))
+
+        # Written last: the daemon treats the cache as valid once the manifest and all layers exist
+        with open(os.path.join(directory, "metadata.json"), "w") as f:
+            json.dump({"image": name, "manifestId": manifest_id, "timestamp": time.time() - _SWIFT_EPOCH_OFFSET}, f)
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+        return {"manifest_id": manifest_id, "cache_dir": directory}
+
+
+_jobs: Dict[Tuple[str, str, str, str], PullJob] = {}
+
+
+def prefetch_image(
+    image: str,
+    cache_dir: str,
+    registry: str = "ghcr.io",
+    organization: str = "trycua",
+    on_progress: Optional[ProgressCallback] = None,
+    **options: Any,
+) -> PullJob:
+    """Start downloading an image into the Lume cache, or join a download already running.
+
+    Args:
+        image: Image to pull, e.g. "macos-sequoia-cua:latest"
+        cache_dir: Lume cache directory
+        registry: Registry host
+        organization: Organization in the registry
+        on_progress: Optional callback for progress events
+        **options: Passed to ``ImagePuller`` (registry_url, max_concurrency, chunk_size)
+
+    Returns:
+        The shared job; await ``job.wait()`` for the result
+    """
+    key = (image, os.path.expanduser(cache_dir), registry, organization)
+    job = _jobs.get(key)
+    if job is None:
+        job = PullJob(image)
+        puller = ImagePuller(cache_dir, registry=registry, organization=organization, **options)
+
+        async def run() -> Dict[str, Any]:
+            try:
+                result = await puller.run(image, job)
+                job._update(phase="done", force=True)
+                return result
+            except Exception as e:
+                job._update(phase="error", error=str(e), force=True)
+                if isinstance(e, RegistryError):
+                    raise
+                raise RegistryError(f"Failed to pull {image}: {e}") from e
+            finally:
+                _jobs.pop(key, None)
+
+        job._task = asyncio.ensure_future(run())
+        # Avoid "exception never retrieved" if every waiter is cancelled
+        job._task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        _jobs[key] = job
+    if on_progress is not None:
+        job.subscribe(on_progress)
+    return job
+
+
+_shared_calls: Dict[Tuple[Any, ...], "asyncio.Task[Any]"] = {}
+
+
+async def shared_call(key: Tuple[Any, ...], factory: Callable[[], Awaitable[Any]]) -> Any:
+    """Run ``factory()`` once for all concurrent callers passing the same key."""
+    task = _shared_calls.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _shared_calls[key] = task
+        task.add_done_callback(lambda t: _shared_calls.pop(key, None))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return await asyncio.shield(task)
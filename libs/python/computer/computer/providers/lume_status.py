@@ -0,0 +1,225 @@
+"""Shared VM status cache for the Lume API.
+
+Computer startup polls VM status repeatedly (get_vm, get_ip, wait loops),
+and several Computer instances on one host each poll the same Lume daemon.
+This module keeps one cache per daemon and storage location that:
+
+- serves status lookups younger than a short TTL from memory,
+- coalesces identical in-flight requests into a single HTTP call
+  (singleflight), and
+- while anyone is waiting on a VM, runs a single background ``list_vms``
+  refresh at a fixed cadence and fans each result out to all waiters.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from .lume_api import lume_api_get
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATUS_TTL = 1.0
+DEFAULT_REFRESH_INTERVAL = 1.0
+
+
+class LumeStatusCache:
+    """Per-daemon VM status cache with singleflight requests and a shared refresher."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        storage: Optional[str] = None,
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+    ):
+        """Initialize the cache.
+
+        Args:
+            host: Lume API host
+            port: Lume API port
+            storage: Storage location the cached VMs live in
+            refresh_interval: Seconds between background list refreshes while VMs are being waited on
+        """
+        self.host = host
+        self.port = port
+        self.storage = storage
+        self.refresh_interval = refresh_interval
+        self.stats = {"requests": 0, "coalesced": 0, "hits": 0}
+
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._listed_at: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._changed: Optional[asyncio.Condition] = None
+        self._refresher: Optional["asyncio.Task[None]"] = None
+        self._watchers = 0
+
+    def _bind_loop(self) -> asyncio.Condition:
+        """Reset loop-bound state when used from a new event loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop or self._changed is None:
+            self._loop = loop
+            self._inflight = {}
+            self._changed = asyncio.Condition()
+            self._refresher = None
+            self._watchers = 0
+        return self._changed
+
+    async def _singleflight(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fetch`` once for all concurrent callers using the same key.
+
+        The request runs in its own task, so a caller being cancelled does
+        not cancel it for the others.
+        """
+        self._bind_loop()
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["requests"] += 1
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+
+            def _done(t: "asyncio.Future[Any]") -> None:
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+                if not t.cancelled():
+                    t.exception()  # Mark as retrieved even if every caller went away
+
+            task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+    async def _notify(self) -> None:
+        changed = self._bind_loop()
+        async with changed:
+            changed.notify_all()
+
+    async def _fetch_list(self) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        result = await lume_api_get("", self.host, self.port, storage=self.storage)
+        if isinstance(result, dict):
+            if "error" in result:
+                return result
+            result = result.get("vms", [])
+        now = time.monotonic()
+        self._entries = {
+            vm["name"]: (now, vm) for vm in result if isinstance(vm, dict) and vm.get("name")
+        }
+        self._listed_at = now
+        await self._notify()
+        return result
+
+    async def _fetch_vm(self, name: str) -> Dict[str, Any]:
+        result = await lume_api_get(name, self.host, self.port, storage=self.storage)
+        if "error" not in result and result.get("status") != "not_found":
+            self._entries[name] = (time.monotonic(), result)
+            await self._notify()
+        return result
+
+    async def list_vms(self, max_age: float = DEFAULT_STATUS_TTL) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """List VMs, reusing a listing younger than ``max_age`` seconds.
+
+        Returns:
+            List of VM entries, or the Lume API error dictionary if listing failed
+        """
+        if self._listed_at is not None and time.monotonic() - self._listed_at <= max_age:
+            self.stats["hits"] += 1
+            return [dict(info) for _, info in self._entries.values()]
+        return await self._singleflight("list", self._fetch_list)
+
+    async def get_vm(self, name: str, max_age: float = DEFAULT_STATUS_TTL) -> Dict[str, Any]:
+        """Get a VM's status, reusing an entry younger than ``max_age`` seconds.
+
+        Returns:
+            VM entry as returned by the Lume API, or an error dictionary
+        """
+        entry = self._entries.get(name)
+        if entry is not None and time.monotonic() - entry[0] <= max_age:
+            self.stats["hits"] += 1
+            return dict(entry[1])
+        return await self._singleflight(f"vm:{name}", lambda: self._fetch_vm(name))
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop cached status for one VM, or for all VMs if ``name`` is None."""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+        self._listed_at = None
+
+    async def _refresh_loop(self) -> None:
+        while self._watchers > 0:
+            try:
+                result = await self._singleflight("list", self._fetch_list)
+                if isinstance(result, dict) and "error" in result:
+                    logger.debug(f"Background VM status refresh failed: {result['error']}")
+            except Exception as e:
+                logger.debug(f"Background VM status refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+        self._refresher = None
+
+    async def wait_for(
+        self,
+        name: str,
+        predicate: Callable[[Dict[str, Any]], bool],
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Wait until ``predicate`` holds for a VM's status.
+
+        All waiters on this cache share one background list refresh, which
+        runs only while someone is waiting.
+
+        Args:
+            name: Name of the VM
+            predicate: Called with each new VM entry; return True to stop waiting
+            timeout: Maximum seconds to wait, or None to wait forever
+
+        Returns:
+            The VM entry that satisfied ``predicate``
+
+        Raises:
+            asyncio.TimeoutError: If ``predicate`` did not hold within ``timeout``
+        """
+        changed = self._bind_loop()
+        self._watchers += 1
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+        # Ignore entries older than one refresh, e.g. from before the VM was restarted
+        oldest = time.monotonic() - self.refresh_interval
+
+        async def wait() -> Dict[str, Any]:
+            async with changed:
+                while True:
+                    entry = self._entries.get(name)
+                    if entry is not None and entry[0] >= oldest and predicate(entry[1]):
+                        return dict(entry[1])
+                    await changed.wait()
+
+        try:
+            return await asyncio.wait_for(wait(), timeout)
+        finally:
+            self._watchers -= 1
+
+
+_caches: Dict[Tuple[str, int, Optional[str]], LumeStatusCache] = {}
+
+
+def get_status_cache(
+    host: str,
+    port: int,
+    storage: Optional[str] = None,
+    refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+) -> LumeStatusCache:
+    """Return the status cache shared by all providers using this daemon and storage.
+
+    If several providers ask for different refresh intervals, the shortest one is used.
+    """
+    key = (host, port, storage)
+    cache = _caches.get(key)
+    if cache is None:
+        cache = _caches[key] = LumeStatusCache(host, port, storage, refresh_interval)
+    else:
+        cache.refresh_interval = min(cache.refresh_interval, refresh_interval)
+    return cache
@@ -0,0 +1,319 @@
+"""Async client for the Docker Engine HTTP API.
+
+LumierProvider used to shell out to the docker CLI with blocking
+subprocess calls. This client talks to the Engine API over the Docker
+socket with a pooled aiohttp session instead, so status polls from many
+computers in one process run concurrently without blocking the event loop.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import struct
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DOCKER_HOST = "unix:///var/run/docker.sock"
+API_VERSION = "v1.41"
+
+
+class DockerAPIError(Exception):
+    """Error returned by the Docker Engine API."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        self.status = status
+        super().__init__(message)
+
+
+def docker_host() -> str:
+    """Return the Docker endpoint from DOCKER_HOST, defaulting to the local socket."""
+    return os.environ.get("DOCKER_HOST") or DEFAULT_DOCKER_HOST
+
+
+def docker_available(host: Optional[str] = None) -> bool:
+    """Cheaply check whether Docker looks usable, without contacting the daemon."""
+    host = host or docker_host()
+    if host.startswith("unix://"):
+        return os.path.exists(urlparse(host).path) or shutil.which("docker") is not None
+    return True
+
+
+def _split_image(image: str) -> Tuple[str, str]:
+    """Split "repo:tag" into (repo, tag), ignoring registry ports."""
+    name, sep, tag = image.rpartition(":")
+    if not sep or "/" in tag:
+        return image, "latest"
+    return name, tag
+
+
+class AsyncDockerClient:
+    """Minimal async Docker Engine API client covering what LumierProvider needs."""
+
+    def __init__(self, host: Optional[str] = None, timeout: float = 30.0):
+        """Initialize the client.
+
+        Args:
+            host: Docker endpoint, e.g. "unix:///var/run/docker.sock" or "tcp://127.0.0.1:2375".
+                  Defaults to DOCKER_HOST or the local socket.
+            timeout: Default total timeout in seconds for non-streaming requests
+        """
+        self.host = host or docker_host()
+        self.timeout = timeout
+        parsed = urlparse(self.host)
+        if parsed.scheme == "unix":
+            self._socket_path: Optional[str] = parsed.path
+            self._base_url = f"http://docker/{API_VERSION}"
+        elif parsed.scheme in ("tcp", "http", "https"):
+            self._socket_path = None
+            scheme = "https" if parsed.scheme == "https" else "http"
+            self._base_url = f"{scheme}://{parsed.netloc}/{API_VERSION}"
+        else:
+            raise ValueError(f"Unsupported Docker host: {self.host}")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            if self._socket_path:
+                connector: aiohttp.BaseConnector = aiohttp.UnixConnector(path=self._socket_path, limit=32)
+            else:
+                connector = aiohttp.TCPConnector(limit=32)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+        return self._session
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        ok_statuses: Tuple[int, ...] = (),
+    ) -> Tuple[int, Any]:
+        """Send a request and return (status, parsed body).
+
+        Raises:
+            DockerAPIError: On connection failure or an error status not in ``ok_statuses``
+        """
+        session = await self._get_session()
+        try:
+            async with session.request(
+                method,
+                f"{self._base_url}{path}",
+                params=params,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            ) as response:
+                text = await response.text()
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise DockerAPIError(f"Cannot reach Docker at {self.host}: {e}") from e
+
+        try:
+            body = json.loads(text) if text.strip() else None
+        except json.JSONDecodeError:
+            body = text
+        if status >= 400 and status not in ok_statuses:
+            message = body.get("message") if isinstance(body, dict) else body
+            raise DockerAPIError(message or f"Docker API returned {status}", status=status)
+        return status, body
+
+    async def ping(self) -> bool:
+        """Return True if the daemon responds."""
+        try:
+            await self._request("GET", "/_ping")
+            return True
+        except DockerAPIError:
+            return False
+
+    async def find_container(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the container summary (as listed by ``docker ps -a``) for an exact name."""
+        _, containers = await self._request(
+            "GET",
+            "/containers/json",
+            params={"all": "1", "filters": json.dumps({"name": [name]})},
+        )
+        # The name filter matches substrings; keep the exact match only
+        for container in containers or []:
+            if f"/{name}" in container.get("Names", []):
+                return container
+        return None
+
+    async def container_status(self, name: str) -> str:
+        """Return the human-readable status (e.g. "Up 5 minutes"), or "" if there's no such container."""
+        container = await self.find_container(name)
+        return container.get("Status", "") if container else ""
+
+    async def container_statuses(self, names: List[str]) -> Dict[str, str]:
+        """Return the status of several containers with a single list request.
+
+        Names without a container map to "".
+        """
+        if not names:
+            return {}
+        _, containers = await self._request(
+            "GET",
+            "/containers/json",
+            params={"all": "1", "filters": json.dumps({"name": list(names)})},
+        )
+        statuses = dict.fromkeys(names, "")
+        for container in containers or []:
+            for container_name in container.get("Names", []):
+                if container_name.lstrip("/") in statuses:
+                    statuses[container_name.lstrip("/")] = container.get("Status", "")
+        return statuses
+
+    async def image_exists(self, image: str) -> bool:
+        status, _ = await self._request("GET", f"/images/{image}/json", ok_statuses=(404,))
+        return status != 404
+
+    async def pull_image(self, image: str) -> None:
+        """Pull an image, waiting for the pull to finish."""
+        repo, tag = _split_image(image)
+        session = await self._get_session()
+        try:
+            async with session.post(
+                f"{self._base_url}/images/create",
+                params={"fromImage": repo, "tag": tag},
+                timeout=aiohttp.ClientTimeout(total=None),
+            ) as response:
+                if response.status >= 400:
+                    raise DockerAPIError(await response.text(), status=response.status)
+                # Progress is streamed as JSON lines; errors arrive in-band
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if "error" in event:
+                        raise DockerAPIError(event["error"])
+        except aiohttp.ClientError as e:
+            raise DockerAPIError(f"Cannot reach Docker at {self.host}: {e}") from e
+
+    async def run_container(
+        self,
+        image: str,
+        name: str,
+        env: Optional[Dict[str, str]] = None,
+        ports: Optional[Dict[int, int]] = None,
+        binds: Optional[List[str]] = None,
+    ) -> str:
+        """Create and start a container, pulling the image if needed (like ``docker run -d``).
+
+        Args:
+            image: Image to run
+            name: Container name
+            env: Environment variables
+            ports: Mapping of container port to host port
+            binds: Volume binds in "host_path:container_path" form
+
+        Returns:
+            The new container ID
+        """
+        ports = ports or {}
+        config = {
+            "Image": image,
+            "Env": [f"{k}={v}" for k, v in (env or {}).items()],
+            "ExposedPorts": {f"{port}/tcp": {} for port in ports},
+            "HostConfig": {
+                "Binds": binds or [],
+                "PortBindings": {
+                    f"{port}/tcp": [{"HostPort": str(host_port)}] for port, host_port in ports.items()
+                },
+            },
+        }
+        status, body = await self._request(
+            "POST", "/containers/create", params={"name": name}, payload=config, ok_statuses=(404,)
+        )
+        if status == 404:
+            logger.info(f"Image {image} not found locally, pulling it...")
+            await self.pull_image(image)
+            _, body = await self._request("POST", "/containers/create", params={"name": name}, payload=config)
+        container_id = body["Id"]
+        await self._request("POST", f"/containers/{container_id}/start")
+        return container_id
+
+    async def stop_container(self, name: str, timeout: int = 10) -> bool:
+        """Stop a container. Returns False if it does not exist."""
+        status, _ = await self._request(
+            "POST", f"/containers/{name}/stop", params={"t": str(timeout)}, ok_statuses=(304, 404)
+        )
+        return status != 404
+
+    async def remove_container(self, name: str, force: bool = True) -> bool:
+        """Remove a container. Returns False if it does not exist."""
+        status, _ = await self._request(
+            "DELETE", f"/containers/{name}", params={"force": "1" if force else "0"}, ok_statuses=(404,)
+        )
+        return status != 404
+
+    async def stats(self, name: str) -> Dict[str, Any]:
+        """Return a single resource usage sample for a container (like ``docker stats --no-stream``)."""
+        _, body = await self._request("GET", f"/containers/{name}/stats", params={"stream": "0"})
+        return body or {}
+
+    async def logs(self, name: str, tail: int = 100) -> str:
+        """Return the last ``tail`` lines of a container's stdout and stderr."""
+        return "".join([line async for line in self.follow_logs(name, tail=tail, follow=False)])
+
+    async def follow_logs(self, name: str, tail: int = 30, follow: bool = True) -> AsyncIterator[str]:
+        """Yield log output of a container as it is produced.
+
+        Raises:
+            DockerAPIError: If the container does not exist
+        """
+        session = await self._get_session()
+        params = {"stdout": "1", "stderr": "1", "tail": str(tail), "follow": "1" if follow else "0"}
+        try:
+            async with session.get(
+                f"{self._base_url}/containers/{name}/logs",
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=None if follow else self.timeout),
+            ) as response:
+                if response.status >= 400:
+                    raise DockerAPIError(await response.text(), status=response.status)
+                async for chunk in _demux_logs(response.content):
+                    yield chunk
+        except aiohttp.ClientError as e:
+            raise DockerAPIError(f"Cannot reach Docker at {self.host}: {e}") from e
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+async def _demux_logs(stream: aiohttp.StreamReader) -> AsyncIterator[str]:
+    """Decode Docker's multiplexed log stream (8-byte frame headers) into text.
+
+    Containers started with a TTY send raw output without frame headers.
+    """
+    first = await stream.read(1)
+    if not first:
+        return
+    if first[0] not in (0, 1, 2):
+        pending = first
+        async for chunk in stream.iter_any():
+            yield (pending + chunk).decode(errors="replace")
+            pending = b""
+        if pending:
+            yield pending.decode(errors="replace")
+        return
+
+    header = first + await stream.readexactly(7)
+    while True:
+        size = struct.unpack(">I", header[4:8])[0]
+        yield (await stream.readexactly(size)).decode(errors="replace")
+        try:
+            header = await stream.readexactly(8)
+        except asyncio.IncompleteReadError:
+            return
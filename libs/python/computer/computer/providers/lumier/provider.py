@@ -2,36 +2,34 @@
 Lumier VM provider implementation.
 
 This provider uses Docker containers running the Lumier image to create
-macOS and Linux VMs. It handles VM lifecycle operations through Docker
-commands and container management.
+macOS and Linux VMs. It handles VM lifecycle operations through the Docker
+Engine API and container management.
 """
 
 import logging
 import os
 import json
 import asyncio
-from typing import Dict, List, Optional, Any
-import subprocess
+from typing import Dict, List, Optional, Any, Sequence
 import time
 import re
 
-from ..base import BaseVMProvider, VMProviderType
+from ..base import DEFAULT_BULK_CONCURRENCY, BaseVMProvider, VMProviderType
+from ...readiness import Backoff
 from ..lume_api import (
     lume_api_get,
     lume_api_run,
     lume_api_stop,
     lume_api_update
 )
+from ..lume_client import LumeAPIError, get_lume_client
+from .docker_client import AsyncDockerClient, DockerAPIError, docker_available
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
-# Check if Docker is available
-try:
-    subprocess.run(["docker", "--version"], capture_output=True, check=True)
-    HAS_LUMIER = True
-except (subprocess.SubprocessError, FileNotFoundError):
-    HAS_LUMIER = False
+# Check if Docker is available (without blocking on the daemon at import time)
+HAS_LUMIER = docker_available()
 
 
 class LumierProvider(BaseVMProvider):
@@ -52,6 +50,7 @@ class LumierProvider(BaseVMProvider):
         verbose: bool = False,
         ephemeral: bool = False,
         noVNC_port: Optional[int] = 8006,
+        docker_host: Optional[str] = None,
     ):
         """Initialize the Lumier VM Provider.
         
@@ -64,6 +63,8 @@ class LumierProvider(BaseVMProvider):
             verbose: Enable verbose logging
             ephemeral: Use ephemeral (temporary) storage
             noVNC_port: Specific port for noVNC interface (default: 8006)
+            docker_host: Docker endpoint, e.g. "unix:///var/run/docker.sock". Defaults to
+                         DOCKER_HOST or the local Docker socket.
         """
         self.host = host
         # Always ensure api_port has a valid value (7777 is the default)
@@ -83,6 +84,9 @@ class LumierProvider(BaseVMProvider):
         self.verbose = verbose
         self._container_id = None
         self._api_url = None  # Will be set after container starts
+        self._docker = AsyncDockerClient(docker_host)
+        self._docker_available = docker_available(docker_host)
+        self._log_task: Optional[asyncio.Task] = None
         
     @property
     def provider_type(self) -> VMProviderType:
@@ -117,33 +121,6 @@ class LumierProvider(BaseVMProvider):
         logger.warning(f"Could not parse memory string '{memory_str}', using 8GB default")
         return 8192  # Default to 8GB
     
-    # Helper methods for interacting with the Lumier API through curl
-    # These methods handle the various VM operations via API calls
-    
-    def _get_curl_error_message(self, return_code: int) -> str:
-        """Get a descriptive error message for curl return codes.
-        
-        Args:
-            return_code: The curl return code
-            
-        Returns:
-            A descriptive error message
-        """
-        # Map common curl error codes to helpful messages
-        if return_code == 7:
-            return "Failed to connect - API server is starting up"
-        elif return_code == 22:
-            return "HTTP error returned from API server"
-        elif return_code == 28:
-            return "Operation timeout - API server is slow to respond"
-        elif return_code == 52:
-            return "Empty reply from server - API is starting but not ready"
-        elif return_code == 56:
-            return "Network problem during data transfer"
-        else:
-            return f"Unknown curl error code: {return_code}"
-
-    
     async def get_vm(self, name: str, storage: Optional[str] = None) -> Dict[str, Any]:
         """Get VM information by name.
         
@@ -155,7 +132,7 @@ class LumierProvider(BaseVMProvider):
         Returns:
             Dictionary with VM information including status, IP address, etc.
         """
-        if not HAS_LUMIER:
+        if not self._docker_available:
             logger.error("Docker is not available. Cannot get VM status.")
             return {
                 "name": name,
@@ -168,9 +145,7 @@ class LumierProvider(BaseVMProvider):
         
         try:
             # Check if the container exists and is running
-            check_cmd = ["docker", "ps", "-a", "--filter", f"name={name}", "--format", "{{.Status}}"]
-            check_result = subprocess.run(check_cmd, capture_output=True, text=True)
-            container_status = check_result.stdout.strip()
+            container_status = await self._docker.container_status(name)
             
             if not container_status:
                 logger.info(f"Container {name} does not exist. Will create when run_vm is called.")
@@ -195,7 +170,7 @@ class LumierProvider(BaseVMProvider):
             logger.info(f"Container {name} is running. Getting VM status from API.")
             
             # Use the shared lume_api_get function directly
-            vm_info = lume_api_get(
+            vm_info = await lume_api_get(
                 vm_name=name,
                 host=self.host,
                 port=self.api_port,
@@ -250,7 +225,7 @@ class LumierProvider(BaseVMProvider):
                 "container_status": container_status,
                 **vm_info  # Include all fields from the API response
             }
-        except subprocess.SubprocessError as e:
+        except DockerAPIError as e:
             logger.error(f"Failed to check container status: {e}")
             return {
                 "name": name,
@@ -270,6 +245,44 @@ class LumierProvider(BaseVMProvider):
             logger.error(f"Failed to list VMs: {e}")
             return []
     
+    async def get_vms(
+        self,
+        names: Sequence[str],
+        storage: Optional[str] = None,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get information for several VMs, listing their containers in one Docker request.
+        
+        Only VMs whose container is running are queried further through the
+        Lumier API, one at a time since they share this provider's API port.
+        
+        Args:
+            names: Names of the VMs to get information for
+            storage: Optional storage path override for all VMs
+            max_concurrency: Unused; running VMs are queried sequentially
+            
+        Returns:
+            Dictionary mapping each VM name to its get_vm result
+        """
+        if not self._docker_available:
+            return await super().get_vms(names, storage=storage, max_concurrency=1)
+        try:
+            statuses = await self._docker.container_statuses(list(names))
+        except DockerAPIError as e:
+            logger.debug(f"Listing containers failed, querying them one by one: {e}")
+            return await super().get_vms(names, storage=storage, max_concurrency=1)
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        running = [name for name, status in statuses.items() if status.startswith("Up")]
+        for name in names:
+            status = statuses.get(name, "")
+            if not status:
+                results[name] = {"name": name, "status": "not_found", "message": "Container doesn't exist yet"}
+            elif name not in running:
+                results[name] = {"name": name, "status": "stopped", "container_status": status}
+        results.update(await self._bulk(running, lambda name: self.get_vm(name, storage=storage), 1))
+        return {name: results[name] for name in names}
+    
     async def run_vm(self, image: str, name: str, run_opts: Dict[str, Any], storage: Optional[str] = None) -> Dict[str, Any]:
         """Run a VM with the given options.
         
@@ -289,22 +302,17 @@ class LumierProvider(BaseVMProvider):
         try:
             # First, check if container already exists and remove it
             try:
-                check_cmd = ["docker", "ps", "-a", "--filter", f"name={self.container_name}", "--format", "{{.ID}}"]
-                check_result = subprocess.run(check_cmd, capture_output=True, text=True)
-                existing_container = check_result.stdout.strip()
-                
-                if existing_container:
+                if await self._docker.find_container(self.container_name):
                     logger.info(f"Removing existing container: {self.container_name}")
-                    remove_cmd = ["docker", "rm", "-f", self.container_name]
-                    subprocess.run(remove_cmd, check=True)
-            except subprocess.CalledProcessError as e:
+                    await self._docker.remove_container(self.container_name, force=True)
+            except DockerAPIError as e:
                 logger.warning(f"Error removing existing container: {e}")
                 # Continue anyway, next steps will fail if there's a real problem
             
-            # Prepare the Docker run command
-            cmd = ["docker", "run", "-d", "--name", self.container_name]
-            
-            cmd.extend(["-p", f"{self.vnc_port}:8006"])
+            # Prepare the container configuration
+            ports = {8006: self.vnc_port}
+            binds = []
+            env = {}
             logger.debug(f"Using specified noVNC_port: {self.vnc_port}")
                 
             # Set API URL using the API port
@@ -320,10 +328,8 @@ class LumierProvider(BaseVMProvider):
                 os.makedirs(storage_dir, exist_ok=True)
                 
                 # Add volume mount for storage
-                cmd.extend([
-                    "-v", f"{storage_dir}:/storage", 
-                    "-e", f"HOST_STORAGE_PATH={storage_dir}"
-                ])
+                binds.append(f"{storage_dir}:/storage")
+                env["HOST_STORAGE_PATH"] = storage_dir
                 logger.debug(f"Using persistent storage at: {storage_dir}")
             
             # Add shared folder volume mount if shared_path is specified
@@ -333,10 +339,8 @@ class LumierProvider(BaseVMProvider):
                 os.makedirs(shared_dir, exist_ok=True)
                 
                 # Add volume mount for shared folder
-                cmd.extend([
-                    "-v", f"{shared_dir}:/shared",
-                    "-e", f"HOST_SHARED_PATH={shared_dir}"
-                ])
+                binds.append(f"{shared_dir}:/shared")
+                env["HOST_SHARED_PATH"] = shared_dir
                 logger.debug(f"Using shared folder at: {shared_dir}")
             
             # Add environment variables
@@ -350,12 +354,12 @@ class LumierProvider(BaseVMProvider):
             else:
                 vm_image = f"ghcr.io/trycua/{self.image}"
 
-            cmd.extend([
-                "-e", f"VM_NAME={self.container_name}",
-                "-e", f"VERSION={vm_image}",
-                "-e", f"CPU_CORES={run_opts.get('cpu', '4')}",
-                "-e", f"RAM_SIZE={memory_mb}",
-            ])
+            env.update({
+                "VM_NAME": self.container_name,
+                "VERSION": vm_image,
+                "CPU_CORES": str(run_opts.get('cpu', '4')),
+                "RAM_SIZE": str(memory_mb),
+            })
             
             # Specify the Lumier image with the full image name
             lumier_image = "trycua/lumier:latest"
@@ -363,29 +367,33 @@ class LumierProvider(BaseVMProvider):
             # First check if the image exists locally
             try:
                 logger.debug(f"Checking if Docker image {lumier_image} exists locally...")
-                check_image_cmd = ["docker", "image", "inspect", lumier_image]
-                subprocess.run(check_image_cmd, capture_output=True, check=True)
-                logger.debug(f"Docker image {lumier_image} found locally.")
-            except subprocess.CalledProcessError:
-                # Image doesn't exist locally
-                logger.warning(f"\nWARNING: Docker image {lumier_image} not found locally.")
-                logger.warning("The system will attempt to pull it from Docker Hub, which may fail if you have network connectivity issues.")
-                logger.warning("If the Docker pull fails, you may need to manually pull the image first with:")
-                logger.warning(f"  docker pull {lumier_image}\n")
-            
-            # Add the image to the command
-            cmd.append(lumier_image)
-            
-            # Print the Docker command for debugging
-            logger.debug(f"DOCKER COMMAND: {' '.join(cmd)}")
+                if await self._docker.image_exists(lumier_image):
+                    logger.debug(f"Docker image {lumier_image} found locally.")
+                else:
+                    # Image doesn't exist locally
+                    logger.warning(f"\nWARNING: Docker image {lumier_image} not found locally.")
+                    logger.warning("The system will attempt to pull it from Docker Hub, which may fail if you have network connectivity issues.")
+                    logger.warning("If the Docker pull fails, you may need to manually pull the image first with:")
+                    logger.warning(f"  docker pull {lumier_image}\n")
+            except DockerAPIError as e:
+                logger.warning(f"Could not check for Docker image {lumier_image}: {e}")
+            
+            # Print the container configuration for debugging
+            logger.debug(f"DOCKER RUN: image={lumier_image} name={self.container_name} ports={ports} binds={binds} env={env}")
             
             # Run the container with improved error handling
             try:
-                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            except subprocess.CalledProcessError as e:
-                if "no route to host" in str(e.stderr).lower() or "failed to resolve reference" in str(e.stderr).lower():
+                await self._docker.run_container(
+                    lumier_image,
+                    self.container_name,
+                    env=env,
+                    ports=ports,
+                    binds=binds,
+                )
+            except DockerAPIError as e:
+                if "no route to host" in str(e).lower() or "failed to resolve reference" in str(e).lower():
                     error_msg = (f"Network error while trying to pull Docker image '{lumier_image}'\n"
-                                f"Error: {e.stderr}\n\n"
+                                f"Error: {e}\n\n"
                                 f"SOLUTION: Please try one of the following:\n"
                                 f"1. Check your internet connection\n"
                                 f"2. Pull the image manually with: docker pull {lumier_image}\n"
@@ -398,42 +406,10 @@ class LumierProvider(BaseVMProvider):
             logger.debug("Container started, checking VM status...")
             logger.debug("NOTE: This may take some time while the VM image is being pulled and initialized")
             
-            # Start a background thread to show container logs in real-time
-            import threading
-            
-            def show_container_logs():
-                # Give the container a moment to start generating logs
-                time.sleep(1)
-                logger.debug(f"\n---- CONTAINER LOGS FOR '{name}' (LIVE) ----")
-                logger.debug("Showing logs as they are generated. Press Ctrl+C to stop viewing logs...\n")
-                
-                try:
-                    # Use docker logs with follow option
-                    log_cmd = ["docker", "logs", "--tail", "30", "--follow", name]
-                    process = subprocess.Popen(log_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, 
-                                              text=True, bufsize=1, universal_newlines=True)
-                    
-                    # Read and print logs line by line
-                    for line in process.stdout:
-                        logger.debug(line, end='')
-                        
-                        # Break if process has exited
-                        if process.poll() is not None:
-                            break
-                except Exception as e:
-                    logger.error(f"\nError showing container logs: {e}")
-                    if self.verbose:
-                        logger.error(f"Error in log streaming thread: {e}")
-                finally:
-                    logger.debug("\n---- LOG STREAMING ENDED ----")
-                    # Make sure process is terminated
-                    if 'process' in locals() and process.poll() is None:
-                        process.terminate()
-            
-            # Start log streaming in a background thread if verbose mode is enabled
-            log_thread = threading.Thread(target=show_container_logs)
-            log_thread.daemon = True  # Thread will exit when main program exits
-            log_thread.start()
+            # Stream container logs at debug level in the background
+            if self._log_task is not None:
+                self._log_task.cancel()
+            self._log_task = asyncio.create_task(self._stream_container_logs(name))
             
             # Skip waiting for container readiness and just poll get_vm directly
             # Poll the get_vm method indefinitely until the VM is ready with an IP address
@@ -548,10 +524,25 @@ class LumierProvider(BaseVMProvider):
                         logger.warning(f"Multiple connection errors, waiting {error_delay}s before next attempt...")
                         await asyncio.sleep(error_delay)
         
-        except subprocess.CalledProcessError as e:
-            error_msg = f"Failed to start Lumier container: {e.stderr if hasattr(e, 'stderr') else str(e)}"
+        except DockerAPIError as e:
+            error_msg = f"Failed to start Lumier container: {e}"
             logger.error(error_msg)
             raise RuntimeError(error_msg)
+
+    async def _stream_container_logs(self, name: str) -> None:
+        """Log container output at debug level as it is generated."""
+        # Give the container a moment to start generating logs
+        await asyncio.sleep(1)
+        logger.debug(f"\n---- CONTAINER LOGS FOR '{name}' (LIVE) ----")
+        try:
+            async for chunk in self._docker.follow_logs(name, tail=30):
+                for line in chunk.splitlines():
+                    logger.debug(line)
+        except DockerAPIError as e:
+            if self.verbose:
+                logger.error(f"Error in log streaming task: {e}")
+        finally:
+            logger.debug("\n---- LOG STREAMING ENDED ----")
         
     async def _wait_for_container_ready(self, container_name: str, timeout: int = 90) -> bool:
         """Wait for the Lumier container to be fully ready with a valid API response.
@@ -570,12 +561,13 @@ class LumierProvider(BaseVMProvider):
         
         logger.debug(f"Waiting for container {container_name} to be ready (timeout: {timeout}s)...")
         
+        lume = get_lume_client(self.host, self.api_port)
+        backoff = Backoff(maximum=3.0)
+        
         while time.time() - start_time < timeout:
             # Check if container is running
             try:
-                check_cmd = ["docker", "ps", "--filter", f"name={container_name}", "--format", "{{.Status}}"]
-                result = subprocess.run(check_cmd, capture_output=True, text=True, check=True)
-                container_status = result.stdout.strip()
+                container_status = await self._docker.container_status(container_name)
                 
                 if container_status and container_status.startswith("Up"):
                     container_running = True
@@ -583,66 +575,38 @@ class LumierProvider(BaseVMProvider):
                 else:
                     logger.warning(f"Container {container_name} not yet running, status: {container_status}")
                     # container is not running yet, wait and try again
-                    await asyncio.sleep(2)  # Longer sleep to give Docker time
+                    await backoff.sleep()
                     continue
-            except subprocess.CalledProcessError as e:
+            except DockerAPIError as e:
                 logger.warning(f"Error checking container status: {e}")
-                await asyncio.sleep(2)
+                await backoff.sleep()
                 continue
                 
             # Container is running, check if API is responsive
             try:
                 # First check the health endpoint
-                api_url = f"http://{self.host}:{self.api_port}/health"
-                logger.info(f"Checking API health at: {api_url}")
+                logger.info(f"Checking API health at: {lume.base_url}/health")
+                _, health = await lume.request("GET", "/health", timeout=10, connect_timeout=5, raise_for_status=False)
                 
-                # Use longer timeout for API health check since it may still be initializing
-                curl_cmd = ["curl", "-s", "--connect-timeout", "5", "--max-time", "10", api_url]
-                result = subprocess.run(curl_cmd, capture_output=True, text=True)
+                if health and "ok" in str(health).lower():
+                    api_ready = True
+                    logger.info(f"API is ready at {lume.base_url}/health")
+                    break
                 
-                if result.returncode == 0 and "ok" in result.stdout.lower():
+                # API health check failed, now let's check if the VM status endpoint is responsive
+                # This covers cases where the health endpoint isn't implemented but the VM API is working
+                params = {"storage": self.storage} if self.storage else None
+                _, vm_body = await lume.request(
+                    "GET", f"/lume/vms/{container_name}", params=params, timeout=10, connect_timeout=5,
+                    raise_for_status=False,
+                )
+                if vm_body:
+                    # VM API responded with something - consider the API ready
                     api_ready = True
-                    logger.info(f"API is ready at {api_url}")
+                    logger.info(f"VM API is ready at {lume.base_url}/lume/vms/{container_name}")
                     break
-                else:
-                    # API health check failed, now let's check if the VM status endpoint is responsive
-                    # This covers cases where the health endpoint isn't implemented but the VM API is working
-                    vm_api_url = f"http://{self.host}:{self.api_port}/lume/vms/{container_name}"
-                    if self.storage:
-                        import urllib.parse
-                        encoded_storage = urllib.parse.quote_plus(self.storage)
-                        vm_api_url += f"?storage={encoded_storage}"
-                        
-                    curl_vm_cmd = ["curl", "-s", "--connect-timeout", "5", "--max-time", "10", vm_api_url]
-                    vm_result = subprocess.run(curl_vm_cmd, capture_output=True, text=True)
-                    
-                    if vm_result.returncode == 0 and vm_result.stdout.strip():
-                        # VM API responded with something - consider the API ready
-                        api_ready = True
-                        logger.info(f"VM API is ready at {vm_api_url}")
-                        break
-                    else:
-                        curl_code = result.returncode
-                        if curl_code == 0:
-                            curl_code = vm_result.returncode
-                            
-                        # Map common curl error codes to helpful messages
-                        if curl_code == 7:
-                            curl_error = "Failed to connect - API server is starting up"
-                        elif curl_code == 22:
-                            curl_error = "HTTP error returned from API server"
-                        elif curl_code == 28:
-                            curl_error = "Operation timeout - API server is slow to respond"
-                        elif curl_code == 52:
-                            curl_error = "Empty reply from server - API is starting but not ready"
-                        elif curl_code == 56:
-                            curl_error = "Network problem during data transfer"
-                        else:
-                            curl_error = f"Unknown curl error code: {curl_code}"
-                            
-                        logger.info(f"API not ready yet: {curl_error}")
-            except subprocess.SubprocessError as e:
-                logger.warning(f"Error checking API status: {e}")
+            except LumeAPIError as e:
+                logger.info(f"API not ready yet: {e}")
                 
             # If the container is running but API is not ready, that's OK - we'll just wait
             # a bit longer before checking again, as the container may still be initializing
@@ -650,7 +614,7 @@ class LumierProvider(BaseVMProvider):
             if int(elapsed_seconds) % 5 == 0:  # Only print status every 5 seconds to reduce verbosity
                 logger.debug(f"Waiting for API to initialize... ({elapsed_seconds:.1f}s / {timeout}s)")
             
-            await asyncio.sleep(3)  # Longer sleep between API checks
+            await backoff.sleep()
         
         # Handle timeout - if the container is running but API is not ready, that's not
         # necessarily an error - the API might just need more time to start up
@@ -668,45 +632,38 @@ class LumierProvider(BaseVMProvider):
 
     async def stop_vm(self, name: str, storage: Optional[str] = None) -> Dict[str, Any]:
         """Stop a running VM by stopping the Lumier container."""
+        if self._log_task is not None:
+            self._log_task.cancel()
+            self._log_task = None
         try:
-            # Use Docker commands to stop the container directly
-            if hasattr(self, '_container_id') and self._container_id:
+            # Use the Docker API to stop the container directly
+            container_id = self._container_id
+            if not container_id:
+                # Try to find the container by name
+                container = await self._docker.find_container(self.container_name)
+                container_id = container["Id"][:12] if container else None
+                if container_id:
+                    logger.info(f"Found container ID: {container_id}")
+                    
+            if container_id:
                 logger.info(f"Stopping Lumier container: {self.container_name}")
-                cmd = ["docker", "stop", self.container_name]
-                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-                logger.info(f"Container stopped: {result.stdout.strip()}")
+                await self._docker.stop_container(self.container_name)
+                logger.info(f"Container stopped: {self.container_name}")
                 
                 # Return minimal status info
                 return {
                     "name": name,
                     "status": "stopped",
-                    "container_id": self._container_id,
+                    "container_id": container_id,
                 }
             else:
-                # Try to find the container by name
-                check_cmd = ["docker", "ps", "-a", "--filter", f"name={self.container_name}", "--format", "{{.ID}}"]
-                check_result = subprocess.run(check_cmd, capture_output=True, text=True)
-                container_id = check_result.stdout.strip()
-                
-                if container_id:
-                    logger.info(f"Found container ID: {container_id}")
-                    cmd = ["docker", "stop", self.container_name]
-                    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-                    logger.info(f"Container stopped: {result.stdout.strip()}")
-                    
-                    return {
-                        "name": name,
-                        "status": "stopped",
-                        "container_id": container_id,
-                    }
-                else:
-                    logger.warning(f"No container found with name {self.container_name}")
-                    return {
-                        "name": name,
-                        "status": "unknown",
-                    }
-        except subprocess.CalledProcessError as e:
-            error_msg = f"Failed to stop container: {e.stderr if hasattr(e, 'stderr') else str(e)}"
+                logger.warning(f"No container found with name {self.container_name}")
+                return {
+                    "name": name,
+                    "status": "unknown",
+                }
+        except DockerAPIError as e:
+            error_msg = f"Failed to stop container: {e}"
             logger.error(error_msg)
             raise RuntimeError(f"Failed to stop Lumier container: {error_msg}")
             
@@ -733,7 +690,7 @@ class LumierProvider(BaseVMProvider):
             If follow=True, this function will continuously stream logs until timeout
             or until interrupted. The output will be printed to console in real-time.
         """
-        if not HAS_LUMIER:
+        if not self._docker_available:
             error_msg = "Docker is not available. Cannot get container logs."
             logger.error(error_msg)
             return error_msg
@@ -741,13 +698,9 @@ class LumierProvider(BaseVMProvider):
         # Make sure we have a container name
         container_name = name
         
-        # Check if the container exists and is running
+        # Check if the container exists
         try:
-            # Check if the container exists
-            inspect_cmd = ["docker", "container", "inspect", container_name]
-            result = subprocess.run(inspect_cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
+            if await self._docker.find_container(container_name) is None:
                 error_msg = f"Container '{container_name}' does not exist or is not accessible"
                 logger.error(error_msg)
                 return error_msg
@@ -756,67 +709,39 @@ class LumierProvider(BaseVMProvider):
             logger.error(error_msg)
             return error_msg
         
-        # Base docker logs command
-        log_cmd = ["docker", "logs"]
-        
-        # Add tail parameter to limit the number of lines
-        log_cmd.extend(["--tail", str(num_lines)])
-        
         # Handle follow mode with or without timeout
         if follow:
-            log_cmd.append("--follow")
-            
             if timeout is not None:
-                # For follow mode with timeout, we'll run the command and handle the timeout
-                log_cmd.append(container_name)
                 logger.info(f"Following logs for container '{container_name}' with timeout {timeout}s")
-                logger.info(f"\n---- CONTAINER LOGS FOR '{container_name}' (LIVE) ----")
-                logger.info(f"Press Ctrl+C to stop following logs\n")
-                
-                try:
-                    # Run with timeout
-                    process = subprocess.Popen(log_cmd, text=True)
-                    
-                    # Wait for the specified timeout
-                    if timeout:
-                        try:
-                            process.wait(timeout=timeout)
-                        except subprocess.TimeoutExpired:
-                            process.terminate()  # Stop after timeout
-                            logger.info(f"\n---- LOG FOLLOWING STOPPED (timeout {timeout}s reached) ----")
-                    else:
-                        # Without timeout, wait for user interruption
-                        process.wait()
-                        
-                    return "Logs were displayed to console in follow mode"
-                except KeyboardInterrupt:
-                    process.terminate()
-                    logger.info("\n---- LOG FOLLOWING STOPPED (user interrupted) ----")
-                    return "Logs were displayed to console in follow mode (interrupted)"
             else:
-                # For follow mode without timeout, we'll print a helpful message
-                log_cmd.append(container_name)
                 logger.info(f"Following logs for container '{container_name}' indefinitely")
-                logger.info(f"\n---- CONTAINER LOGS FOR '{container_name}' (LIVE) ----")
-                logger.info(f"Press Ctrl+C to stop following logs\n")
-                
-                try:
-                    # Run the command and let it run until interrupted
-                    process = subprocess.Popen(log_cmd, text=True)
-                    process.wait()  # Wait indefinitely (until user interrupts)
-                    return "Logs were displayed to console in follow mode"
-                except KeyboardInterrupt:
-                    process.terminate()
-                    logger.info("\n---- LOG FOLLOWING STOPPED (user interrupted) ----")
-                    return "Logs were displayed to console in follow mode (interrupted)"
+            logger.info(f"\n---- CONTAINER LOGS FOR '{container_name}' (LIVE) ----")
+            logger.info(f"Press Ctrl+C to stop following logs\n")
+            
+            async def print_logs():
+                async for chunk in self._docker.follow_logs(container_name, tail=num_lines):
+                    print(chunk, end="", flush=True)
+            
+            try:
+                # A timeout of 0 or None follows until interrupted
+                await asyncio.wait_for(print_logs(), timeout=timeout or None)
+                return "Logs were displayed to console in follow mode"
+            except asyncio.TimeoutError:
+                logger.info(f"\n---- LOG FOLLOWING STOPPED (timeout {timeout}s reached) ----")
+                return "Logs were displayed to console in follow mode"
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                logger.info("\n---- LOG FOLLOWING STOPPED (user interrupted) ----")
+                return "Logs were displayed to console in follow mode (interrupted)"
+            except DockerAPIError as e:
+                error_msg = f"Error getting logs: {e}"
+                logger.error(error_msg)
+                return error_msg
         else:
             # For non-follow mode, capture and return the logs as a string
-            log_cmd.append(container_name)
             logger.info(f"Getting {num_lines} log lines for container '{container_name}'")
             
             try:
-                result = subprocess.run(log_cmd, capture_output=True, text=True, check=True)
-                logs = result.stdout
+                logs = await self._docker.logs(container_name, tail=num_lines)
                 
                 # Only print header and logs if there's content
                 if logs.strip():
@@ -827,8 +752,8 @@ class LumierProvider(BaseVMProvider):
                     logger.info(f"\nNo logs available for container '{container_name}'")
                     
                 return logs
-            except subprocess.CalledProcessError as e:
-                error_msg = f"Error getting logs: {e.stderr}"
+            except DockerAPIError as e:
+                error_msg = f"Error getting logs: {e}"
                 logger.error(error_msg)
                 return error_msg
             except Exception as e:
@@ -842,7 +767,8 @@ class LumierProvider(BaseVMProvider):
         Args:
             name: Name of the VM to get the IP for
             storage: Optional storage path override
-            retry_delay: Delay between retries in seconds (default: 2)
+            retry_delay: Maximum delay between retries in seconds (default: 2). Polling
+                        starts much faster and backs off to this interval.
             
         Returns:
             IP address of the VM when it becomes available
@@ -852,6 +778,7 @@ class LumierProvider(BaseVMProvider):
         
         # Track total attempts for logging purposes
         total_attempts = 0
+        backoff = Backoff(maximum=retry_delay)
         
         # Loop indefinitely until we get a valid IP
         while True:
@@ -859,7 +786,7 @@ class LumierProvider(BaseVMProvider):
             
             # Log retry message but not on first attempt
             if total_attempts > 1:
-                logger.info(f"Waiting for VM {name} IP address (attempt {total_attempts})...")
+                logger.debug(f"Waiting for VM {name} IP address (attempt {total_attempts})...")
             
             try:
                 # Get VM information
@@ -893,7 +820,7 @@ class LumierProvider(BaseVMProvider):
                 logger.warning(f"Error getting VM {name} IP: {e}, continuing to wait...")
                 
             # Wait before next retry
-            await asyncio.sleep(retry_delay)
+            await backoff.sleep()
             
             # Add progress log every 10 attempts
             if total_attempts % 10 == 0:
@@ -927,12 +854,15 @@ class LumierProvider(BaseVMProvider):
             if hasattr(self, '_container_id') and self._container_id:
                 logger.info(f"Stopping Lumier container on context exit: {self.container_name}")
                 try:
-                    cmd = ["docker", "stop", self.container_name]
-                    subprocess.run(cmd, capture_output=True, text=True, check=True)
+                    await self._docker.stop_container(self.container_name)
                     logger.info(f"Container stopped during context exit: {self.container_name}")
-                except subprocess.CalledProcessError as e:
-                    logger.warning(f"Failed to stop container during cleanup: {e.stderr}")
+                except DockerAPIError as e:
+                    logger.warning(f"Failed to stop container during cleanup: {e}")
                     # Don't raise an exception here, we want to continue with cleanup
+            if self._log_task is not None:
+                self._log_task.cancel()
+                self._log_task = None
+            await self._docker.close()
         except Exception as e:
             logger.error(f"Error during LumierProvider cleanup: {e}")
             # We don't want to suppress the original exception if there was one
@@ -1,12 +1,12 @@
 """Windows Sandbox VM provider implementation using pywinsandbox."""
 
 import os
-import asyncio
 import logging
 import time
 from typing import Dict, Any, Optional, List
 
 from ..base import BaseVMProvider, VMProviderType
+from ...readiness import Backoff
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -378,12 +378,14 @@ class WinSandboxProvider(BaseVMProvider):
         Args:
             name: Name of the VM to get the IP for
             storage: Ignored for Windows Sandbox
-            retry_delay: Delay between retries in seconds (default: 2)
+            retry_delay: Maximum delay between retries in seconds (default: 2). Polling
+                        starts much faster and backs off to this interval.
             
         Returns:
             IP address of the VM when it becomes available
         """
         total_attempts = 0
+        backoff = Backoff(maximum=retry_delay)
         
         # Loop indefinitely until we get a valid IP
         while True:
@@ -391,7 +393,7 @@ class WinSandboxProvider(BaseVMProvider):
             
             # Log retry message but not on first attempt
             if total_attempts > 1:
-                self.logger.info(f"Waiting for Windows Sandbox {name} IP address (attempt {total_attempts})...")
+                self.logger.debug(f"Waiting for Windows Sandbox {name} IP address (attempt {total_attempts})...")
             
             try:
                 # Get VM information
@@ -417,7 +419,7 @@ class WinSandboxProvider(BaseVMProvider):
                 self.logger.warning(f"Error getting Windows Sandbox {name} IP: {e}, continuing to wait...")
                 
             # Wait before next retry
-            await asyncio.sleep(retry_delay)
+            await backoff.sleep()
             
             # Add progress log every 10 attempts
             if total_attempts % 10 == 0:
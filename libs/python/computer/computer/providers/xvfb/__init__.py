@@ -0,0 +1,11 @@
+"""Local Xvfb provider for CUA Computer."""
+
+import shutil
+import sys
+
+# Sessions need a Linux host with an Xvfb binary
+HAS_XVFB = sys.platform.startswith("linux") and shutil.which("Xvfb") is not None
+
+from .provider import LocalXvfbProvider
+
+__all__ = ["LocalXvfbProvider", "HAS_XVFB"]
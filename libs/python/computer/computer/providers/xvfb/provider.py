@@ -0,0 +1,442 @@
+"""
+Local Xvfb provider implementation.
+
+This provider runs computer sessions directly on a Linux host instead of in
+VMs or containers. Each session is a virtual X display (Xvfb) plus its own
+computer server process bound to a distinct port, so dozens of sessions can
+share one machine at a fraction of the memory and startup cost of a VM.
+Sessions can optionally be pinned to CPUs and placed in cgroup v2 groups
+with CPU and memory limits.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import socket
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from ..base import BaseVMProvider, VMProviderType
+from ...readiness import Backoff
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DISPLAY = {"width": 1024, "height": 768}
+
+
+@dataclass
+class _Session:
+    """Processes and resources belonging to one running session."""
+    name: str
+    display: int
+    port: int
+    xvfb: asyncio.subprocess.Process
+    server: Optional[asyncio.subprocess.Process] = None
+    cpus: Optional[List[int]] = None
+    cgroup: Optional[str] = None
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def processes(self) -> List[asyncio.subprocess.Process]:
+        return [p for p in (self.server, self.xvfb) if p is not None]
+
+    @property
+    def alive(self) -> bool:
+        return all(p.returncode is None for p in self.processes)
+
+
+def _parse_memory(memory: Any) -> Optional[int]:
+    """Convert a memory size like "4GB", "512MB" or a number of MB to bytes."""
+    if memory is None:
+        return None
+    if isinstance(memory, (int, float)):
+        return int(memory * 1024 * 1024)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)B?\s*", str(memory).upper())
+    if not match:
+        raise ValueError(f"Invalid memory size: {memory}")
+    value, unit = match.groups()
+    return int(float(value) * 1024 ** " KMGT".index(unit or " "))
+
+
+def _rss_bytes(pid: int) -> int:
+    """Resident memory of a process in bytes, or 0 if it has exited."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        pass
+    return 0
+
+
+def _port_free(host: str, port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind((host, port))
+            return True
+        except OSError:
+            return False
+
+
+class LocalXvfbProvider(BaseVMProvider):
+    """
+    Local Xvfb provider implementation.
+
+    Runs one Xvfb display and one computer server per session on the local
+    Linux host. Requires Xvfb and the cua-computer-server package to be
+    installed on the host.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        base_port: int = 8100,
+        python_executable: Optional[str] = None,
+        xvfb_path: Optional[str] = None,
+        cpu_affinity: Optional[Sequence[int]] = None,
+        cpus_per_session: int = 0,
+        cgroup_root: Optional[str] = None,
+        cpu: Optional[float] = None,
+        memory: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        startup_timeout: float = 30.0,
+        verbose: bool = False,
+        **kwargs,
+    ):
+        """Initialize the local Xvfb provider.
+
+        Args:
+            host: Address the computer servers bind to (default: 127.0.0.1)
+            base_port: First port to try for computer servers; each session takes the next free one
+            python_executable: Python interpreter with cua-computer-server installed
+                (default: the current interpreter)
+            xvfb_path: Path to the Xvfb binary (default: looked up on PATH)
+            cpu_affinity: CPUs sessions may run on (default: all CPUs)
+            cpus_per_session: If > 0, pin each session to its own slice of this many CPUs
+                from ``cpu_affinity``, assigned round-robin. If 0, sessions share all of them.
+            cgroup_root: Writable cgroup v2 directory (e.g. a systemd-delegated slice). If set,
+                each session gets a child group with limits from the "cpu" and "memory" run options.
+            cpu: Default CPU limit per session in cores, used with ``cgroup_root``
+            memory: Default memory limit per session (e.g. "2GB"), used with ``cgroup_root``
+            env: Extra environment variables for the computer server processes
+            startup_timeout: Seconds to wait for Xvfb to accept connections
+            verbose: Enable verbose logging, including Xvfb and server output
+        """
+        self.host = host
+        self.base_port = base_port
+        self.python_executable = python_executable or sys.executable
+        self.xvfb_path = xvfb_path or shutil.which("Xvfb") or "Xvfb"
+        self.cpu_affinity = list(cpu_affinity) if cpu_affinity is not None else None
+        self.cpus_per_session = cpus_per_session
+        self.cgroup_root = cgroup_root
+        self.limits = {"cpu": cpu, "memory": memory}
+        self.env = env or {}
+        self.startup_timeout = startup_timeout
+        self.verbose = verbose
+        if verbose:
+            logger.setLevel(logging.DEBUG)
+
+        self._sessions: Dict[str, _Session] = {}
+        self._lock = asyncio.Lock()
+        self._reserved_ports: Set[int] = set()
+        self._next_slice = 0
+
+    @property
+    def provider_type(self) -> VMProviderType:
+        """Return the provider type."""
+        return VMProviderType.LOCAL_XVFB
+
+    async def __aenter__(self):
+        """Enter async context manager."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Stop all sessions started by this provider."""
+        await asyncio.gather(*(self.stop_vm(name) for name in list(self._sessions)), return_exceptions=True)
+
+    def _session_info(self, session: _Session) -> Dict[str, Any]:
+        status = "running" if session.alive else "stopped"
+        return {
+            "name": session.name,
+            "status": status,
+            "ip_address": self.host if status == "running" else None,
+            "api_port": session.port,
+            "display": f":{session.display}",
+            "pids": [p.pid for p in session.processes],
+            "cpus": session.cpus,
+            "cgroup": session.cgroup,
+            "memory_rss_mb": round(sum(_rss_bytes(p.pid) for p in session.processes) / (1024 * 1024), 1),
+            "uptime": round(time.monotonic() - session.started_at, 1),
+        }
+
+    async def get_vm(self, name: str, storage: Optional[str] = None) -> Dict[str, Any]:
+        """Get session information by name.
+
+        Args:
+            name: Name of the session
+            storage: Ignored; sessions have no disk image
+
+        Returns:
+            Dictionary with session status, address, port and resident memory
+        """
+        session = self._sessions.get(name)
+        if session is None:
+            return {"name": name, "status": "not_found"}
+        return self._session_info(session)
+
+    async def list_vms(self) -> List[Dict[str, Any]]:
+        """List all sessions started by this provider."""
+        return [self._session_info(session) for session in self._sessions.values()]
+
+    def get_api_port(self, name: str) -> Optional[int]:
+        """Get the computer server port of a session."""
+        session = self._sessions.get(name)
+        return session.port if session else None
+
+    def _allocate_port(self) -> int:
+        used = {session.port for session in self._sessions.values()} | self._reserved_ports
+        port = self.base_port
+        while port in used or not _port_free(self.host, port):
+            port += 1
+            if port > 65535:
+                raise RuntimeError(f"No free port at or above {self.base_port}")
+        return port
+
+    def _allocate_cpus(self) -> Optional[List[int]]:
+        cpus = self.cpu_affinity
+        if self.cpus_per_session <= 0:
+            return cpus
+        if cpus is None:
+            cpus = sorted(os.sched_getaffinity(0))
+        slices = max(1, len(cpus) // self.cpus_per_session)
+        index = self._next_slice % slices
+        self._next_slice += 1
+        return cpus[index * self.cpus_per_session:(index + 1) * self.cpus_per_session]
+
+    def _create_cgroup(self, name: str, limits: Dict[str, Any]) -> Optional[str]:
+        if not self.cgroup_root:
+            return None
+        path = os.path.join(self.cgroup_root, f"cua-{name}")
+        try:
+            os.makedirs(path, exist_ok=True)
+            cpu = limits.get("cpu")
+            if cpu:
+                with open(os.path.join(path, "cpu.max"), "w") as f:
+                    f.write(f"{int(float(cpu) * 100000)} 100000")
+            memory = _parse_memory(limits.get("memory"))
+            if memory:
+                with open(os.path.join(path, "memory.max"), "w") as f:
+                    f.write(str(memory))
+            return path
+        except OSError as e:
+            logger.warning(f"Could not set up cgroup {path}, running without limits: {e}")
+            return None
+
+    def _confine(self, pid: int, session: _Session) -> None:
+        """Apply the session's CPU pinning and cgroup to a process."""
+        if session.cpus:
+            try:
+                os.sched_setaffinity(pid, session.cpus)
+            except OSError as e:
+                logger.warning(f"Could not pin process {pid} to CPUs {session.cpus}: {e}")
+        if session.cgroup:
+            try:
+                with open(os.path.join(session.cgroup, "cgroup.procs"), "w") as f:
+                    f.write(str(pid))
+            except OSError as e:
+                logger.warning(f"Could not move process {pid} into {session.cgroup}: {e}")
+
+    async def _start_xvfb(self, width: int, height: int) -> Tuple[asyncio.subprocess.Process, int]:
+        """Start Xvfb on a free display and wait until it accepts connections.
+
+        Xvfb picks the display itself and reports it on ``-displayfd`` once
+        it is ready, which avoids both display-number races and polling.
+        """
+        read_fd, write_fd = os.pipe()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.xvfb_path,
+                "-displayfd", str(write_fd),
+                "-screen", "0", f"{width}x{height}x24",
+                "-nolisten", "tcp",
+                pass_fds=(write_fd,),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=None if self.verbose else asyncio.subprocess.DEVNULL,
+                stderr=None if self.verbose else asyncio.subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError:
+            os.close(read_fd)
+            raise
+        finally:
+            os.close(write_fd)
+
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(read_fd, "rb")
+        )
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.startup_timeout)
+        except asyncio.TimeoutError:
+            line = b""
+        finally:
+            transport.close()
+
+        if not line.strip().isdigit():
+            await self._terminate(process)
+            raise RuntimeError(f"Xvfb did not start (exit code {process.returncode})")
+        return process, int(line)
+
+    async def run_vm(self, image: str, name: str, run_opts: Dict[str, Any], storage: Optional[str] = None) -> Dict[str, Any]:
+        """Start a session: an Xvfb display and a computer server bound to it.
+
+        Args:
+            image: Ignored; sessions run the host's own desktop environment
+            name: Name of the session
+            run_opts: Run options. Supports "display" ({"width", "height"}) and,
+                with ``cgroup_root``, "cpu" (cores) and "memory" (e.g. "2GB").
+            storage: Ignored; sessions have no disk image
+
+        Returns:
+            Dictionary with session information
+        """
+        async with self._lock:
+            existing = self._sessions.get(name)
+            if existing is not None:
+                if existing.alive:
+                    logger.info(f"Session {name} is already running")
+                    return self._session_info(existing)
+                await self._cleanup(existing)
+
+            port = self._allocate_port()
+            cpus = self._allocate_cpus()
+            self._reserved_ports.add(port)
+
+        # Start the display outside the lock so bulk starts run concurrently
+        display = {**DEFAULT_DISPLAY, **(run_opts.get("display") or {})}
+        limits = {k: run_opts.get(k) or v for k, v in self.limits.items()}
+        try:
+            cgroup = self._create_cgroup(name, limits)
+            xvfb, display_number = await self._start_xvfb(int(display["width"]), int(display["height"]))
+        finally:
+            self._reserved_ports.discard(port)
+        session = _Session(name=name, display=display_number, port=port, xvfb=xvfb, cpus=cpus, cgroup=cgroup)
+        self._sessions[name] = session
+        self._confine(xvfb.pid, session)
+
+        env = {**os.environ, **self.env, "DISPLAY": f":{display_number}"}
+        try:
+            session.server = await asyncio.create_subprocess_exec(
+                self.python_executable, "-m", "computer_server",
+                "--host", self.host,
+                "--port", str(port),
+                "--log-level", "debug" if self.verbose else "warning",
+                env=env,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=None if self.verbose else asyncio.subprocess.DEVNULL,
+                stderr=None if self.verbose else asyncio.subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError as e:
+            await self._cleanup(session)
+            raise RuntimeError(f"Failed to start computer server for {name}: {e}") from e
+        self._confine(session.server.pid, session)
+
+        logger.info(f"Started session {name} on display :{display_number}, computer server port {port}")
+        return self._session_info(session)
+
+    async def _terminate(self, process: asyncio.subprocess.Process, timeout: float = 5.0) -> None:
+        if process.returncode is not None:
+            return
+        try:
+            process.terminate()
+            await asyncio.wait_for(process.wait(), timeout)
+        except ProcessLookupError:
+            pass
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    async def _cleanup(self, session: _Session) -> None:
+        await asyncio.gather(*(self._terminate(p) for p in session.processes))
+        if session.cgroup:
+            try:
+                os.rmdir(session.cgroup)
+            except OSError as e:
+                logger.debug(f"Could not remove cgroup {session.cgroup}: {e}")
+        if self._sessions.get(session.name) is session:
+            del self._sessions[session.name]
+
+    async def stop_vm(self, name: str, storage: Optional[str] = None) -> Dict[str, Any]:
+        """Stop a session, terminating its computer server and Xvfb display.
+
+        Args:
+            name: Name of the session
+            storage: Ignored; sessions have no disk image
+
+        Returns:
+            Dictionary with the session's stop status
+        """
+        session = self._sessions.get(name)
+        if session is None:
+            return {"name": name, "status": "not_found"}
+        await self._cleanup(session)
+        logger.info(f"Stopped session {name}")
+        return {"name": name, "status": "stopped"}
+
+    async def update_vm(self, name: str, update_opts: Dict[str, Any], storage: Optional[str] = None) -> Dict[str, Any]:
+        """Update the cgroup limits of a running session.
+
+        Args:
+            name: Name of the session
+            update_opts: "cpu" and/or "memory" limits; requires ``cgroup_root``
+            storage: Ignored; sessions have no disk image
+
+        Returns:
+            Dictionary with session information
+        """
+        session = self._sessions.get(name)
+        if session is None:
+            return {"name": name, "status": "not_found"}
+        if not session.cgroup:
+            logger.warning("Updating a session requires cgroup_root; ignoring update")
+        else:
+            self._create_cgroup(name, update_opts)
+        return self._session_info(session)
+
+    async def get_ip(self, name: str, storage: Optional[str] = None, retry_delay: int = 2) -> str:
+        """Wait until a session's computer server accepts connections and return its address.
+
+        Args:
+            name: Name of the session
+            storage: Ignored; sessions have no disk image
+            retry_delay: Maximum delay between connection attempts in seconds
+
+        Returns:
+            Address the computer server is bound to; use ``get_api_port`` for its port
+
+        Raises:
+            RuntimeError: If the session does not exist or one of its processes exited
+        """
+        backoff = Backoff(maximum=retry_delay)
+        while True:
+            session = self._sessions.get(name)
+            if session is None:
+                raise RuntimeError(f"Session {name} not found")
+            if not session.alive:
+                codes = {p.pid: p.returncode for p in session.processes}
+                raise RuntimeError(f"Session {name} exited (exit codes by pid: {codes})")
+            try:
+                _, writer = await asyncio.open_connection(self.host, session.port)
+                writer.close()
+                await writer.wait_closed()
+                return self.host
+            except OSError:
+                logger.debug(f"Computer server for {name} not accepting connections yet")
+            await backoff.sleep()
@@ -0,0 +1,165 @@
+"""Readiness helpers for computer startup.
+
+Startup waits on several stages (VM provisioning, IP assignment, the
+computer server coming up). Polling each stage at a fixed interval rounds
+its readiness up to that interval, so these helpers poll fast at first and
+back off to a capped interval instead.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+# Startup phases recorded by Computer.run, in order
+STARTUP_PHASES = ("provision", "ip", "server", "first_screenshot")
+
+
+class Backoff:
+    """Exponential delays starting at ``initial`` and capped at ``maximum``."""
+
+    def __init__(self, initial: float = 0.025, maximum: float = 1.0, factor: float = 2.0):
+        self.initial = initial
+        self.maximum = max(maximum, initial)
+        self.factor = factor
+        self._next = initial
+
+    def next(self) -> float:
+        """Return the next delay and advance."""
+        delay = self._next
+        self._next = min(self._next * self.factor, self.maximum)
+        return delay
+
+    def reset(self) -> None:
+        """Start again from the initial delay."""
+        self._next = self.initial
+
+    async def sleep(self) -> None:
+        """Sleep for the next delay."""
+        await asyncio.sleep(self.next())
+
+
+async def poll_until(
+    check: Callable[[], Awaitable[bool]],
+    timeout: Optional[float] = None,
+    initial: float = 0.025,
+    maximum: float = 1.0,
+) -> None:
+    """
+    Call ``check`` until it returns True, backing off between attempts.
+
+    Exceptions raised by ``check`` count as a failed attempt.
+
+    Args:
+        check: Coroutine function returning True once ready
+        timeout: Maximum seconds to wait, or None to wait forever
+        initial: First delay between attempts in seconds
+        maximum: Maximum delay between attempts in seconds
+
+    Raises:
+        TimeoutError: If ``check`` did not succeed within ``timeout``. The last
+            exception raised by ``check``, if any, is chained.
+    """
+    backoff = Backoff(initial, maximum)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    last_error: Optional[BaseException] = None
+    while True:
+        try:
+            if await check():
+                return
+        except Exception as e:
+            last_error = e
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Not ready after {timeout} seconds") from last_error
+            await asyncio.sleep(min(backoff.next(), remaining))
+        else:
+            await backoff.sleep()
+
+
+async def first_ready(probes: Dict[str, Awaitable[Any]], timeout: Optional[float] = None) -> str:
+    """
+    Run readiness probes concurrently and return as soon as one succeeds.
+
+    A probe succeeds when its awaitable returns; the others are cancelled.
+    A probe that raises is dropped, and the wait fails only once every probe
+    has failed or the timeout expires.
+
+    Args:
+        probes: Awaitables keyed by probe name
+        timeout: Maximum seconds to wait, or None to wait forever
+
+    Returns:
+        Name of the probe that succeeded first
+
+    Raises:
+        TimeoutError: If no probe succeeded. The last probe error, if any, is chained.
+    """
+    tasks = {asyncio.ensure_future(probe): name for name, probe in probes.items()}
+    pending = set(tasks)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    last_error: Optional[BaseException] = None
+    try:
+        while pending:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                if task.cancelled():
+                    continue
+                if task.exception() is None:
+                    return tasks[task]
+                last_error = task.exception()
+        raise TimeoutError(f"Not ready after {timeout} seconds") from last_error
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+@dataclass
+class StartupTimings:
+    """Per-phase wall-clock durations of a computer startup, in seconds."""
+    phases: Dict[str, float] = field(default_factory=dict)
+    started_at: Optional[float] = None
+    ready_at: Optional[float] = None
+
+    def start(self) -> None:
+        """Begin a new startup, clearing previous timings."""
+        self.phases.clear()
+        self.started_at = time.monotonic()
+        self.ready_at = None
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Record the duration of a phase, keeping the first value recorded."""
+        self.phases.setdefault(phase, seconds)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as phase ``name``."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, time.monotonic() - started)
+
+    def mark_ready(self) -> None:
+        """Mark the computer as ready for use."""
+        self.ready_at = time.monotonic()
+
+    @property
+    def total(self) -> Optional[float]:
+        """Seconds from start until the computer was ready."""
+        if self.started_at is None or self.ready_at is None:
+            return None
+        return self.ready_at - self.started_at
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        result: Dict[str, Optional[float]] = {name: self.phases.get(name) for name in STARTUP_PHASES}
+        result.update({k: v for k, v in self.phases.items() if k not in result})
+        result["total"] = self.total
+        return result
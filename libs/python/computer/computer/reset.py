@@ -0,0 +1,188 @@
+"""Fast reset of a reused computer to a saved state.
+
+Pools that hand the same computer to one task after another need to undo
+whatever the previous task changed. Rebooting from the image takes tens of
+seconds, so ``Computer.snapshot()`` saves a restore point once and
+``Computer.reset()`` returns to it:
+
+- Providers that support snapshots (``BaseVMProvider.supports_snapshots``)
+  save and restore the whole VM, e.g. Lume clones the stopped VM.
+- Otherwise, or when only some directories can change, the files under a set
+  of known directories are captured through the computer's file API and
+  rolled back: new files are deleted and changed files rewritten.
+"""
+
+import asyncio
+import posixpath
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Literal, Sequence, Set, Tuple
+
+if TYPE_CHECKING:
+    from .interface.base import BaseComputerInterface
+
+ResetMethod = Literal["provider", "files"]
+
+# Directories rolled back by default when the provider has no snapshots
+DEFAULT_RESET_PATHS = ("~/Desktop", "~/Documents", "~/Downloads")
+
+# Largest total file size a file snapshot keeps in memory
+DEFAULT_MAX_SNAPSHOT_BYTES = 256 * 1024 * 1024
+
+# File API requests issued at once while capturing or rolling back
+FILE_CONCURRENCY = 8
+
+
+@dataclass
+class ResetResult:
+    """How a computer was reset and how long each step took, in seconds."""
+    method: ResetMethod
+    phases: Dict[str, float] = field(default_factory=dict)
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as phase ``name``."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.monotonic() - started
+
+    @property
+    def total(self) -> float:
+        """Seconds spent on the whole reset."""
+        return sum(self.phases.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"method": self.method, **self.phases, "total": self.total, **self.details}
+
+
+async def _gather_limited(calls: Sequence[Any]) -> List[Any]:
+    """Await coroutines with at most FILE_CONCURRENCY running at once."""
+    semaphore = asyncio.Semaphore(FILE_CONCURRENCY)
+
+    async def run(call: Any) -> Any:
+        async with semaphore:
+            return await call
+
+    return await asyncio.gather(*(run(call) for call in calls))
+
+
+async def _walk(interface: "BaseComputerInterface", root: str) -> Tuple[Set[str], Set[str]]:
+    """List every file and directory under ``root``, including ``root`` itself.
+
+    Returns:
+        (files, directories); both empty if ``root`` does not exist
+    """
+    files: Set[str] = set()
+    directories: Set[str] = set()
+    if not await interface.directory_exists(root):
+        return files, directories
+
+    pending = [root]
+    while pending:
+        directories.update(pending)
+        listings = await _gather_limited([interface.list_dir(path) for path in pending])
+        entries = [posixpath.join(path, entry) for path, listing in zip(pending, listings) for entry in listing]
+        is_dir = await _gather_limited([interface.directory_exists(path) for path in entries])
+        pending = [path for path, d in zip(entries, is_dir) if d]
+        files.update(path for path, d in zip(entries, is_dir) if not d)
+    return files, directories
+
+
+class FileSnapshot:
+    """Contents of a set of directories, captured through the computer's file API."""
+
+    def __init__(self, roots: Sequence[str], files: Dict[str, bytes], directories: Set[str]):
+        self.roots = list(roots)
+        self.files = files
+        self.directories = directories
+
+    @property
+    def size(self) -> int:
+        """Total bytes of file content held by the snapshot."""
+        return sum(len(content) for content in self.files.values())
+
+    @classmethod
+    async def capture(
+        cls,
+        interface: "BaseComputerInterface",
+        roots: Sequence[str] = DEFAULT_RESET_PATHS,
+        max_bytes: int = DEFAULT_MAX_SNAPSHOT_BYTES,
+    ) -> "FileSnapshot":
+        """Read every file under ``roots``.
+
+        Roots that don't exist are recorded as absent and removed again on restore.
+
+        Args:
+            interface: Interface of the computer to capture
+            roots: Directories to capture
+            max_bytes: Maximum total size of the captured files
+
+        Raises:
+            ValueError: If the files under ``roots`` are larger than ``max_bytes``
+        """
+        files: Set[str] = set()
+        directories: Set[str] = set()
+        for root in roots:
+            root_files, root_dirs = await _walk(interface, root)
+            files |= root_files
+            directories |= root_dirs
+
+        paths = sorted(files)
+        sizes = await _gather_limited([interface.get_file_size(path) for path in paths])
+        if sum(sizes) > max_bytes:
+            raise ValueError(
+                f"Files under {list(roots)} total {sum(sizes)} bytes, more than the {max_bytes} "
+                "a file snapshot keeps; snapshot fewer directories or use a provider with snapshots"
+            )
+        contents = await _gather_limited([interface.read_bytes(path) for path in paths])
+        return cls(roots, dict(zip(paths, contents)), directories)
+
+    async def restore(self, interface: "BaseComputerInterface") -> Dict[str, int]:
+        """Roll the directories back to their captured contents.
+
+        Files and directories created since the capture are deleted, and
+        missing or changed files are written back. Unchanged files are only
+        read, not rewritten.
+
+        Returns:
+            Counts of deleted, created and rewritten entries
+        """
+        files: Set[str] = set()
+        directories: Set[str] = set()
+        for root in self.roots:
+            root_files, root_dirs = await _walk(interface, root)
+            files |= root_files
+            directories |= root_dirs
+
+        extra_files = sorted(files - set(self.files))
+        extra_dirs = sorted(directories - self.directories, key=lambda p: p.count("/"), reverse=True)
+        await _gather_limited([interface.delete_file(path) for path in extra_files])
+        # Deepest first, so every directory is empty by the time it is deleted
+        for path in extra_dirs:
+            await interface.delete_dir(path)
+
+        missing_dirs = sorted(self.directories - directories, key=lambda p: p.count("/"))
+        for path in missing_dirs:
+            await interface.create_dir(path)
+
+        async def changed(path: str) -> bool:
+            if path not in files:
+                return True
+            expected = self.files[path]
+            if await interface.get_file_size(path) != len(expected):
+                return True
+            return await interface.read_bytes(path) != expected
+
+        paths = sorted(self.files)
+        stale = [path for path, c in zip(paths, await _gather_limited([changed(p) for p in paths])) if c]
+        await _gather_limited([interface.write_bytes(path, self.files[path]) for path in stale])
+        return {
+            "deleted": len(extra_files) + len(extra_dirs),
+            "created": len(missing_dirs),
+            "rewritten": len(stale),
+        }
+
@@ -0,0 +1,114 @@
+"""Shared fixtures for the computer tests."""
+
+import inspect
+import json
+from contextlib import aclosing
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pytest
+from aiohttp import WSMsgType, web
+
+from computer.interface.generic import GenericComputerInterface
+
+# (method, path, handler) of an extra HTTP route
+Route = Tuple[str, str, Callable[[web.Request], Any]]
+
+
+def sse(payload: Dict[str, Any]) -> str:
+    """Encode a /cmd response event the way the computer server does."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+class FakeComputerServer:
+    """A computer server on a free local port, with the commands a test gives it.
+
+    Each handler is called with the command's params and returns the result,
+    which is sent with "success": True, or an async iterator of events, which
+    are streamed. Commands without a handler are rejected like unknown ones.
+    """
+
+    def __init__(
+        self,
+        handlers: Optional[Dict[str, Callable[..., Any]]] = None,
+        routes: Iterable[Route] = (),
+        websocket: bool = False,
+        **runner_kwargs,
+    ):
+        self.handlers = dict(handlers or {})
+        # Names of the commands received, in order
+        self.commands: List[str] = []
+        self.port: Optional[int] = None
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/cmd", self.cmd)
+        if websocket:
+            app.router.add_get("/ws", self.ws)
+        for method, path, handler in routes:
+            app.router.add_route(method, path, handler)
+        self.runner = web.AppRunner(app, **runner_kwargs)
+
+    async def start(self) -> None:
+        await self.runner.setup()
+        # Port 0 lets the OS pick a free port, so parallel runs can't collide
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        self.port = self.runner.addresses[0][1]
+
+    async def close(self) -> None:
+        await self.runner.cleanup()
+
+    def interface(self) -> GenericComputerInterface:
+        return GenericComputerInterface("127.0.0.1", api_port=self.port)
+
+    async def _call(self, command: str, params: Dict[str, Any]) -> Any:
+        result = self.handlers[command](**params)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def cmd(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        command, params = body["command"], body.get("params") or {}
+        self.commands.append(command)
+        if command not in self.handlers:
+            return web.json_response({"detail": f"Unknown command: {command}"}, status=400)
+        result = await self._call(command, params)
+        if not hasattr(result, "__aiter__"):
+            return web.Response(text=sse({"success": True, **result}))
+
+        response = web.StreamResponse()
+        await response.prepare(request)
+        async with aclosing(result) as events:
+            async for event in events:
+                await response.write(sse({"success": True, **event}).encode())
+        return response
+
+    async def ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            body = json.loads(msg.data)
+            command = body["command"]
+            self.commands.append(command)
+            result = await self._call(command, body.get("params") or {}) if command in self.handlers else None
+            if result is None or hasattr(result, "__aiter__"):
+                await ws.send_json({"success": False, "error": f"Unknown command: {command}"})
+            else:
+                await ws.send_json({"success": True, **result})
+        return ws
+
+
+@pytest.fixture
+async def make_server():
+    """Start FakeComputerServers, stopping them when the test ends."""
+    servers = []
+
+    async def make(*args, **kwargs) -> FakeComputerServer:
+        server = FakeComputerServer(*args, **kwargs)
+        await server.start()
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        await server.close()
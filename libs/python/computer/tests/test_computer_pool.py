@@ -0,0 +1,235 @@
+"""Tests for ComputerPool, with a fake VM provider and a stub computer server."""
+
+import asyncio
+import itertools
+import json
+
+import pytest
+from aiohttp import web
+
+from computer.pool import ComputerPool
+from computer.providers.base import BaseVMProvider, VMProviderType
+
+_ports = itertools.count(17890)
+
+
+class FakeProvider(BaseVMProvider):
+    """Provider whose VMs all share one local computer server."""
+
+    def __init__(self, api_port, events, failures):
+        self.api_port = api_port
+        self.events = events
+        self.failures = failures
+
+    @property
+    def provider_type(self):
+        return VMProviderType.UNKNOWN
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def get_vm(self, name, storage=None):
+        return {"name": name, "status": "stopped"}
+
+    async def list_vms(self):
+        return []
+
+    async def run_vm(self, image, name, run_opts, storage=None):
+        if self.failures:
+            self.failures.pop()
+            raise RuntimeError("no capacity")
+        self.events.append(("run", name))
+        return {"name": name, "status": "running"}
+
+    async def stop_vm(self, name, storage=None):
+        self.events.append(("stop", name))
+        return {"name": name, "status": "stopped"}
+
+    async def update_vm(self, name, update_opts, storage=None):
+        return {}
+
+    async def get_ip(self, name, storage=None, retry_delay=2):
+        return "127.0.0.1"
+
+    def get_api_port(self, name):
+        return self.api_port
+
+
+async def _cmd(request):
+    return web.Response(text="data: " + json.dumps({"success": True, "size": {"width": 1024, "height": 768}}))
+
+
+@pytest.fixture
+async def server_port():
+    app = web.Application()
+    app.router.add_post("/cmd", _cmd)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = next(_ports)
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    yield port
+    await runner.cleanup()
+
+
+@pytest.fixture
+async def make_pool(server_port):
+    pools = []
+
+    def make(fail_boots=0, **kwargs):
+        events = []
+        # Shared by every provider the pool creates, so the next boots fail
+        failures = [True] * fail_boots
+        pool = ComputerPool(
+            provider_type="fake",
+            image="fake:latest",
+            os_type="linux",
+            provider_factory=lambda key: FakeProvider(server_port, events, failures),
+            **kwargs,
+        )
+        pool.events = events
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        await pool.close()
+
+def _names(events, kind):
+    return [name for event, name in events if event == kind]
+
+
+async def _settle(pool):
+    """Wait for background boots and stops to finish."""
+    for _ in range(100):
+        tasks = [task for key_pool in pool._pools.values() for task in key_pool.booting] + list(pool._background)
+        if not tasks:
+            return
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def test_start_pre_boots_the_pool(make_pool):
+    pool = make_pool(size=2)
+    await pool.start()
+    assert pool.available == 2
+    assert pool.stats.boots == 2
+    assert len(_names(pool.events, "run")) == 2
+
+    computer = await pool.acquire()
+    assert pool.stats.hits == 1 and pool.stats.misses == 0
+    assert computer.config.name in _names(pool.events, "run")
+    assert computer.config.name.startswith("cua-pool-fake-latest-")
+
+    # The pool tops itself back up in the background
+    await _settle(pool)
+    assert pool.available == 2
+
+
+async def test_acquire_waits_for_a_boot_when_cold(make_pool):
+    pool = make_pool(size=1)
+    computer = await pool.acquire(timeout=30)
+    assert pool.stats.misses == 1
+    assert await computer.interface.get_screen_size() == {"width": 1024, "height": 768}
+
+
+async def test_released_computers_are_reset_and_reused(make_pool):
+    resets = []
+
+    async def reset(computer):
+        resets.append(computer.config.name)
+
+    pool = make_pool(size=2, recycle="reuse", reset=reset)
+    await pool.start()
+    computer = await pool.acquire()
+    # Released while the pool is still short, so it goes back in
+    await pool.release(computer)
+    assert resets == [computer.config.name]
+    assert pool.stats.recycled == 1
+    assert computer in pool._pools[pool.default_key].ready
+    assert computer.config.name not in _names(pool.events, "stop")
+
+
+async def test_released_computer_goes_to_a_waiting_acquirer(make_pool):
+    pool = make_pool(size=1, recycle="reuse")
+    await pool.start()
+    first = await pool.acquire()
+    await _settle(pool)
+    second = await pool.acquire()
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0)
+    assert pool.stats.misses == 1
+
+    await pool.release(first)
+    assert await asyncio.wait_for(waiter, 30) is first
+    assert pool.stats.recycled == 1
+    await pool.release(first)
+    await pool.release(second)
+
+
+async def test_surplus_released_computers_are_stopped(make_pool):
+    pool = make_pool(size=1, recycle="reuse")
+    await pool.start()
+    computer = await pool.acquire()
+    await _settle(pool)
+    await pool.release(computer)
+    await _settle(pool)
+    assert pool.stats.discarded == 1
+    assert _names(pool.events, "stop") == [computer.config.name]
+
+
+async def test_restart_policy_replaces_released_computers(make_pool):
+    pool = make_pool(size=1, recycle="restart")
+    await pool.start()
+    computer = await pool.acquire()
+    await pool.release(computer)
+    await _settle(pool)
+    assert computer.config.name in _names(pool.events, "stop")
+    assert pool.available == 1
+    assert (await pool.acquire()) is not computer
+
+
+async def test_broken_session_is_replaced(make_pool):
+    pool = make_pool(size=1, recycle="reuse")
+    await pool.start()
+
+    with pytest.raises(RuntimeError, match="task failed"):
+        async with pool.computer() as broken:
+            raise RuntimeError("task failed")
+    await _settle(pool)
+    assert broken.config.name in _names(pool.events, "stop")
+    assert pool.stats.discarded == 1
+
+    async with pool.computer() as computer:
+        assert computer is not broken
+
+
+async def test_failed_boot_fails_the_waiter_and_later_boots_recover(make_pool):
+    pool = make_pool(size=1, fail_boots=1)
+    with pytest.raises(RuntimeError, match="no capacity"):
+        await pool.acquire(timeout=30)
+    assert pool.stats.boot_failures == 1
+
+    computer = await pool.acquire(timeout=30)
+    assert computer.config.name in _names(pool.events, "run")
+
+
+async def test_close_stops_warm_computers_and_pending_waiters(make_pool):
+    pool = make_pool(size=2)
+    await pool.start()
+    leased = await pool.acquire()
+    await _settle(pool)
+    warm = list(pool._pools[pool.default_key].ready)
+
+    await pool.close()
+    assert pool.available == 0
+    assert sorted(_names(pool.events, "stop")) == sorted(computer.config.name for computer in warm)
+    # Leased computers are left to their holders
+    assert leased.config.name not in _names(pool.events, "stop")
+
+    with pytest.raises(RuntimeError, match="closed"):
+        await pool.acquire()
+    await pool.release(leased)
+    await _settle(pool)
+    assert leased.config.name in _names(pool.events, "stop")
@@ -0,0 +1,182 @@
+"""Tests for streaming file transfer between the interface and the computer server."""
+
+import base64
+import hashlib
+import os
+
+import pytest
+from aiohttp import web
+
+
+def get_file_size(path):
+    return {"size": os.path.getsize(path)}
+
+
+def file_hash(path, offset, length):
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    return {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+
+
+def read_bytes(path, offset, length):
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length) if length is not None else f.read()
+    return {"content_b64": base64.b64encode(data).decode()}
+
+
+def write_bytes(path, content_b64, append):
+    with open(path, "ab" if append else "wb") as f:
+        f.write(base64.b64decode(content_b64))
+    return {}
+
+
+FILE_COMMANDS = {
+    "get_file_size": get_file_size,
+    "file_hash": file_hash,
+    "read_bytes": read_bytes,
+    "write_bytes": write_bytes,
+}
+
+
+class FileEndpoints:
+    """The /files endpoints of a computer server, optionally dropping connections."""
+
+    def __init__(self):
+        # Bytes sent or received before a transfer's connection is dropped, once
+        self.drop_download_after = None
+        self.drop_upload_after = None
+        # Contents the downloaded file is replaced with after the drop
+        self.replace_after_drop = None
+        self.ranges = []
+
+    def routes(self):
+        return [("GET", "/files", self.download), ("PUT", "/files", self.upload)]
+
+    async def download(self, request):
+        path = request.query["path"]
+        with open(path, "rb") as f:
+            data = f.read()
+        etag = f'"{len(data)}"'
+        self.ranges.append(request.headers.get("Range"))
+
+        status, first = 200, 0
+        if "Range" in request.headers and request.headers.get("If-Range", etag) == etag:
+            first, last = request.headers["Range"][len("bytes="):].split("-")
+            status, first = 206, int(first)
+            data = data[first:int(last) + 1] if last else data[first:]
+
+        response = web.StreamResponse(status=status, headers={"ETag": etag})
+        response.content_length = len(data)
+        await response.prepare(request)
+        if self.drop_download_after is not None:
+            cut, self.drop_download_after = self.drop_download_after, None
+            await response.write(data[:cut])
+            request.transport.abort()
+            if self.replace_after_drop is not None:
+                with open(path, "wb") as f:
+                    f.write(self.replace_after_drop)
+            return response
+        await response.write(data)
+        return response
+
+    async def upload(self, request):
+        path, offset = request.query["path"], int(request.query.get("offset", 0))
+        mode = "ab" if request.query.get("append") == "true" else "r+b" if offset else "wb"
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, mode) as f:
+            if offset:
+                f.seek(offset)
+                f.truncate()
+            async for chunk in request.content.iter_chunked(64 * 1024):
+                if self.drop_upload_after is not None and size + len(chunk) > self.drop_upload_after:
+                    f.write(chunk[: self.drop_upload_after - size])
+                    self.drop_upload_after = None
+                    request.transport.abort()
+                    return web.Response()
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        return web.json_response({"success": True, "size": size, "sha256": digest.hexdigest()})
+
+
+@pytest.fixture
+def files():
+    return FileEndpoints()
+
+
+@pytest.fixture
+async def server(make_server, files):
+    return await make_server(FILE_COMMANDS, files.routes())
+
+
+@pytest.fixture
+def data():
+    return os.urandom(3 * 1024 * 1024 + 777)
+
+
+async def test_read_and_write_use_the_file_endpoints(server, tmp_path, data):
+    interface = server.interface()
+    path = str(tmp_path / "blob")
+
+    await interface.write_bytes(path, data)
+    await interface.write_bytes(path, b"tail", append=True)
+    assert (tmp_path / "blob").read_bytes() == data + b"tail"
+
+    assert await interface.read_bytes(path) == data + b"tail"
+    assert await interface.read_bytes(path, offset=10, length=5) == data[10:15]
+    assert await interface.read_bytes(path, offset=len(data) + 10) == b""
+    # The only command was looking up the size to append to
+    assert server.commands == ["get_file_size"]
+
+
+async def test_interrupted_download_resumes(server, files, tmp_path, data):
+    interface = server.interface()
+    (tmp_path / "blob").write_bytes(data)
+    files.drop_download_after = 1024 * 1024
+
+    local = tmp_path / "copy"
+    await interface.download_file(str(tmp_path / "blob"), str(local))
+
+    assert local.read_bytes() == data
+    # Resumed from the bytes that reached the client before the abort
+    first, resumed = files.ranges
+    assert first is None
+    assert resumed is None or int(resumed[len("bytes="):-1]) <= 1024 * 1024
+    assert server.commands == ["file_hash"]
+
+
+async def test_download_fails_if_the_file_changes(server, files, tmp_path, data):
+    interface = server.interface()
+    (tmp_path / "blob").write_bytes(data)
+    files.drop_download_after = 1000
+    files.replace_after_drop = b"new contents"
+
+    with pytest.raises(RuntimeError, match="changed"):
+        await interface.read_bytes(str(tmp_path / "blob"))
+
+
+async def test_interrupted_upload_resumes_and_is_verified(server, files, tmp_path, data):
+    interface = server.interface()
+    source = tmp_path / "source"
+    source.write_bytes(data)
+    files.drop_upload_after = 1024 * 1024 + 5
+
+    await interface.upload_file(str(source), str(tmp_path / "copy"))
+
+    assert (tmp_path / "copy").read_bytes() == data
+    # The bytes from the interrupted request are checked separately
+    assert server.commands == ["get_file_size", "file_hash"]
+
+
+async def test_servers_without_file_endpoints_fall_back_to_commands(make_server, tmp_path, data):
+    server = await make_server(FILE_COMMANDS)
+    interface = server.interface()
+    path = str(tmp_path / "blob")
+    await interface.write_bytes(path, data)
+    assert await interface.read_bytes(path) == data
+    assert not interface._file_endpoints
+    assert server.commands[0] == "write_bytes"
+    assert "read_bytes" in server.commands
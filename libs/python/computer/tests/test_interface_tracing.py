@@ -0,0 +1,60 @@
+"""Tests for the tracing spans around interface commands."""
+
+import json
+
+import pytest
+
+from core import tracing
+from computer.utils import encode_base64_image
+
+
+@pytest.fixture
+def exporter():
+    exporter = tracing.InMemorySpanExporter()
+    tracing.set_tracer(tracing.Tracer(exporter))
+    yield exporter
+    tracing.set_tracer(None)
+
+
+@pytest.fixture
+async def server(make_server):
+    png = b"\x89PNG\r\n\x1a\n" + b"\0" * 100
+    return await make_server({
+        "screenshot": lambda: {"image_data": encode_base64_image(png)},
+        "get_file_size": lambda path: {"size": 42},
+    })
+
+
+async def test_commands_are_traced(server, exporter):
+    interface = server.interface()
+    with tracing.get_tracer().start_as_current_span("agent.run"):
+        assert await interface.get_file_size("/tmp/x") == 42
+        await interface.screenshot()
+
+    spans = exporter.get_finished_spans()
+    by_id = {span.span_id: span for span in spans}
+    commands = [span for span in spans if span.name == "computer.command"]
+    assert [span.attributes["cua.command"] for span in commands] == ["get_file_size", "screenshot"]
+    assert all(span.attributes[tracing.KIND] == tracing.KIND_ENVIRONMENT for span in commands)
+    assert all(by_id[span.parent_id].name == "agent.run" for span in commands)
+    assert all(span.attributes["cua.success"] for span in commands)
+    assert commands[1].attributes["cua.request.bytes"] == len(json.dumps({"command": "screenshot", "params": {}}))
+    assert commands[1].attributes["cua.response.bytes"] > 100
+    assert sum(span.name == "computer.decode_image" for span in spans) == 1
+
+    report = tracing.latency_report(spans)
+    assert report.environment == pytest.approx(sum(span.duration for span in commands))
+
+
+async def test_failed_commands_record_the_error(server, exporter, monkeypatch):
+    async def no_websocket(command, params=None):
+        raise ConnectionError("WebSocket connection is not established")
+
+    interface = server.interface()
+    # The server rejects unknown commands, and the WebSocket fallback fails too
+    monkeypatch.setattr(interface, "_send_command_ws", no_websocket)
+    result = await interface._send_command("version")
+    assert not result["success"]
+    (span,) = exporter.get_finished_spans()
+    assert span.attributes["cua.success"] is False
+    assert "cua.error" in span.attributes
@@ -0,0 +1,23 @@
+"""Importing the package must not load the interface clients or PIL."""
+
+import os
+import subprocess
+import sys
+
+
+def test_import_computer_is_lazy():
+    probe = (
+        "import sys, computer\n"
+        "print(','.join(m for m in ('aiohttp', 'websockets', 'PIL', 'computer.interface') if m in sys.modules))\n"
+        "print(computer.Computer.__name__)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        check=True,
+    )
+    eager, name = result.stdout.splitlines()[-2:]
+    assert eager == ""
+    assert name == "Computer"
@@ -0,0 +1,185 @@
+"""Tests for the Lume API client, against a stub Lume server."""
+
+import asyncio
+import itertools
+import socket
+
+import pytest
+from aiohttp import web
+
+from computer.providers.lume_api import lume_api_get
+from computer.providers.lume_client import (
+    LumeAPIClient,
+    LumeAPIConnectionError,
+    LumeAPIEmptyReplyError,
+    LumeAPIHTTPError,
+    LumeAPINetworkError,
+    LumeAPITimeoutError,
+    close_lume_clients,
+)
+
+_ports = itertools.count(17870)
+
+
+class StubLume:
+    """Lume API with one route per kind of response."""
+
+    def __init__(self):
+        self.requests = []
+        app = web.Application()
+        app.router.add_get("/lume/vms/{name}", self.get_vm)
+        app.router.add_post("/lume/vms/{name}/run", self.run_vm)
+        app.router.add_get("/text", self.text)
+        app.router.add_get("/empty", self.empty)
+        app.router.add_get("/slow", self.slow)
+        self.runner = web.AppRunner(app)
+
+    async def get_vm(self, request):
+        self.requests.append((request.path, dict(request.query)))
+        name = request.match_info["name"]
+        if name == "missing":
+            return web.Response(status=404, text="Virtual machine not found")
+        return web.json_response({"name": name, "status": "running"})
+
+    async def run_vm(self, request):
+        self.requests.append((request.path, await request.json()))
+        return web.json_response({"started": True}, status=202)
+
+    async def text(self, request):
+        return web.Response(text="Virtual machine not found")
+
+    async def empty(self, request):
+        return web.Response()
+
+    async def slow(self, request):
+        await asyncio.sleep(1)
+        return web.json_response({})
+
+
+class RawServer:
+    """TCP server that answers every connection with raw bytes, then closes it."""
+
+    def __init__(self, reply: bytes):
+        self.reply = reply
+
+    async def handle(self, reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(self.reply)
+        await writer.drain()
+        writer.close()
+
+    async def __aenter__(self):
+        self.port = next(_ports)
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", self.port)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+@pytest.fixture
+async def lume():
+    server = StubLume()
+    server.port = next(_ports)
+    await server.runner.setup()
+    await web.TCPSite(server.runner, "127.0.0.1", server.port).start()
+    yield server
+    await server.runner.cleanup()
+
+
+@pytest.fixture
+async def client(lume):
+    client = LumeAPIClient("127.0.0.1", lume.port)
+    yield client
+    await client.close()
+
+
+def _unused_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def test_json_text_and_empty_bodies(client, lume):
+    assert await client.request("GET", "/lume/vms/vm1", params={"storage": "ssd", "unset": None}) == (
+        200,
+        {"name": "vm1", "status": "running"},
+    )
+    assert lume.requests == [("/lume/vms/vm1", {"storage": "ssd"})]
+    assert await client.request("GET", "/text") == (200, "Virtual machine not found")
+    assert await client.request("GET", "/empty") == (200, None)
+
+
+async def test_json_payload(client, lume):
+    assert await client.request("POST", "/lume/vms/vm1/run", payload={"noDisplay": True}) == (202, {"started": True})
+    assert lume.requests == [("/lume/vms/vm1/run", {"noDisplay": True})]
+
+
+async def test_http_error(client):
+    with pytest.raises(LumeAPIHTTPError) as info:
+        await client.request("GET", "/lume/vms/missing")
+    assert info.value.curl_code == 22
+    assert info.value.status == 404
+    assert info.value.body == "Virtual machine not found"
+
+    # Callers that handle the status themselves get the body back
+    assert await client.request("GET", "/lume/vms/missing", raise_for_status=False) == (
+        404,
+        "Virtual machine not found",
+    )
+
+
+async def test_timeout(client):
+    with pytest.raises(LumeAPITimeoutError) as info:
+        await client.request("GET", "/slow", timeout=0.2)
+    assert info.value.curl_code == 28
+
+
+async def test_connection_refused():
+    client = LumeAPIClient("127.0.0.1", _unused_port())
+    try:
+        with pytest.raises(LumeAPIConnectionError) as info:
+            await client.request("GET", "/lume/vms")
+        assert info.value.curl_code == 7
+    finally:
+        await client.close()
+
+
+async def test_empty_reply():
+    async with RawServer(b"") as server:
+        client = LumeAPIClient("127.0.0.1", server.port)
+        try:
+            with pytest.raises(LumeAPIEmptyReplyError) as info:
+                await client.request("GET", "/lume/vms")
+            assert info.value.curl_code == 52
+        finally:
+            await client.close()
+
+
+async def test_connection_lost_mid_body():
+    reply = b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 100\r\n\r\n{\"name\":"
+    async with RawServer(reply) as server:
+        client = LumeAPIClient("127.0.0.1", server.port)
+        try:
+            with pytest.raises(LumeAPINetworkError) as info:
+                await client.request("GET", "/lume/vms")
+            assert info.value.curl_code == 56
+        finally:
+            await client.close()
+
+
+@pytest.fixture
+async def shared_clients():
+    yield
+    await close_lume_clients()
+
+
+async def test_lume_api_get_reports_curl_codes(lume, shared_clients):
+    assert await lume_api_get("vm1", "127.0.0.1", lume.port) == {"name": "vm1", "status": "running"}
+
+    missing = await lume_api_get("missing", "127.0.0.1", lume.port)
+    assert missing["curl_code"] == 22 and missing["status"] == "unknown"
+
+    refused = await lume_api_get("vm1", "127.0.0.1", _unused_port())
+    assert refused["curl_code"] == 7
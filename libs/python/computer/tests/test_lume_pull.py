@@ -0,0 +1,139 @@
+"""Tests for parallel, resumable image pulls, against a local stub registry."""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+
+import pytest
+from aiohttp import web
+
+from computer.providers.lume_pull import ImagePuller, PullJob, RegistryError, prefetch_image
+
+ORG = "trycua"
+IMAGE = "macos-test"
+
+
+def _blob(size, seed):
+    return bytes((i * seed) % 251 for i in range(size))
+
+
+class StubRegistry:
+    """OCI distribution API serving one image, with Range support."""
+
+    def __init__(self, layer_sizes=(300_000, 50_000, 0)):
+        self.blobs = {}
+        layers = []
+        for seed, size in enumerate(layer_sizes, start=3):
+            data = _blob(size, seed)
+            digest = f"sha256:{hashlib.sha256(data).hexdigest()}"
+            self.blobs[digest] = data
+            layers.append({"mediaType": "application/octet-stream", "digest": digest, "size": size})
+        self.manifest = {"schemaVersion": 2, "mediaType": "application/vnd.oci.image.manifest.v1+json",
+                         "config": None, "layers": layers}
+        self.manifest_digest = "sha256:" + "ab" * 32
+        self.blob_requests = []
+        self.served_bytes = 0
+        self.fail_after = None
+        app = web.Application()
+        app.router.add_get("/token", self.token)
+        app.router.add_get(f"/v2/{ORG}/{IMAGE}/manifests/{{tag}}", self.get_manifest)
+        app.router.add_get(f"/v2/{ORG}/{IMAGE}/blobs/{{digest}}", self.get_blob)
+        self.runner = web.AppRunner(app)
+
+    async def token(self, request):
+        return web.json_response({"token": "anonymous"})
+
+    async def get_manifest(self, request):
+        assert request.headers["Authorization"] == "Bearer anonymous"
+        return web.json_response(self.manifest, headers={"Docker-Content-Digest": self.manifest_digest})
+
+    async def get_blob(self, request):
+        data = self.blobs[request.match_info["digest"]]
+        match = re.fullmatch(r"bytes=(\d+)-(\d+)?", request.headers.get("Range", ""))
+        self.blob_requests.append(request.headers.get("Range"))
+        if match is None:
+            body, status = data, 200
+        else:
+            start = int(match.group(1))
+            end = int(match.group(2)) + 1 if match.group(2) else len(data)
+            body, status = data[start:end], 206
+        if self.fail_after is not None:
+            # Drop the connection partway through to simulate an interrupted pull
+            response = web.StreamResponse(status=status, headers={"Content-Length": str(len(body))})
+            await response.prepare(request)
+            await response.write(body[:self.fail_after])
+            self.served_bytes += min(len(body), self.fail_after)
+            request.transport.close()
+            return response
+        self.served_bytes += len(body)
+        await asyncio.sleep(0.01)
+        return web.Response(body=body, status=status)
+
+
+@pytest.fixture
+async def registry():
+    server = StubRegistry()
+    await server.runner.setup()
+    await web.TCPSite(server.runner, "127.0.0.1", 0).start()
+    server.url = f"http://127.0.0.1:{server.runner.addresses[0][1]}"
+    yield server
+    await server.runner.cleanup()
+
+
+def _puller(registry, cache_dir, **kwargs):
+    return ImagePuller(str(cache_dir), registry_url=registry.url, **kwargs)
+
+
+async def test_pull_writes_lume_cache_layout(registry, tmp_path):
+    events = []
+    job = PullJob(f"{IMAGE}:latest")
+    job.subscribe(events.append)
+    result = await _puller(registry, tmp_path, chunk_size=64_000).run(f"{IMAGE}:latest", job)
+
+    directory = tmp_path / "ghcr" / ORG / registry.manifest_digest.replace(":", "_")
+    assert result == {"manifest_id": registry.manifest_digest.replace(":", "_"), "cache_dir": str(directory)}
+    for digest, data in registry.blobs.items():
+        assert (directory / digest.replace(":", "_")).read_bytes() == data
+    assert json.loads((directory / "manifest.json").read_text())["layers"] == registry.manifest["layers"]
+    assert json.loads((directory / "metadata.json").read_text())["image"] == IMAGE
+    assert not [p for p in os.listdir(directory) if ".part" in p]
+
+    # The 300 KB layer was split into parallel 64 KB ranges
+    assert sum(1 for r in registry.blob_requests if r and r != "bytes=0-0") >= 5
+    assert events[-1].layers_done == 3
+    assert events[-1].downloaded_bytes == events[-1].total_bytes == 350_000
+
+
+async def test_interrupted_pull_resumes(registry, tmp_path):
+    registry.fail_after = 20_000
+    with pytest.raises(Exception):
+        await _puller(registry, tmp_path, chunk_size=10**9).run(f"{IMAGE}:latest", PullJob(IMAGE))
+    interrupted = registry.served_bytes
+
+    registry.fail_after = None
+    registry.served_bytes = 0
+    await _puller(registry, tmp_path, chunk_size=10**9).run(f"{IMAGE}:latest", PullJob(IMAGE))
+
+    # Only the bytes missing after the interruption were downloaded again
+    assert interrupted > 0
+    assert registry.served_bytes == 350_000 - interrupted
+
+
+async def test_corrupt_layer_is_rejected(registry, tmp_path):
+    digest = next(iter(registry.blobs))
+    registry.blobs[digest] = b"x" * len(registry.blobs[digest])
+    with pytest.raises(RegistryError, match="Digest mismatch"):
+        await _puller(registry, tmp_path).run(f"{IMAGE}:latest", PullJob(IMAGE))
+
+
+async def test_concurrent_pulls_share_one_job(registry, tmp_path):
+    first = prefetch_image(f"{IMAGE}:latest", str(tmp_path), registry_url=registry.url)
+    second = prefetch_image(f"{IMAGE}:latest", str(tmp_path), registry_url=registry.url)
+    assert first is second
+
+    results = await asyncio.gather(first.wait(), second.wait())
+    assert results[0] == results[1]
+    assert first.progress.phase == "done"
+    assert registry.served_bytes == 350_000
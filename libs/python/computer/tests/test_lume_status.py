@@ -0,0 +1,94 @@
+"""Tests for the shared Lume VM status cache, against a fake Lume API."""
+
+import asyncio
+import itertools
+
+import pytest
+from aiohttp import web
+
+from computer.providers.lume.provider import LumeProvider
+from computer.providers.lume_status import get_status_cache
+
+REQUEST_DELAY = 0.05
+_ports = itertools.count(17810)
+
+
+class FakeLume:
+    """Lume API whose VMs get an IP address after a number of list requests."""
+
+    def __init__(self, ip_after_lists=3):
+        self.requests = []
+        self.ip_after_lists = ip_after_lists
+        self.vms = {name: {"name": name, "status": "starting"} for name in ("vm1", "vm2", "vm3")}
+        app = web.Application()
+        app.router.add_get("/lume/vms", self.list_vms)
+        app.router.add_get("/lume/vms/{name}", self.get_vm)
+        self.runner = web.AppRunner(app)
+
+    def _advance(self):
+        lists = sum(1 for path in self.requests if path == "/lume/vms")
+        if lists >= self.ip_after_lists:
+            for i, vm in enumerate(self.vms.values()):
+                vm.update(status="running", ipAddress=f"192.168.64.{i + 2}")
+
+    async def list_vms(self, request):
+        self.requests.append(request.path)
+        await asyncio.sleep(REQUEST_DELAY)
+        self._advance()
+        return web.json_response(list(self.vms.values()))
+
+    async def get_vm(self, request):
+        self.requests.append(request.path)
+        await asyncio.sleep(REQUEST_DELAY)
+        vm = self.vms.get(request.match_info["name"])
+        if vm is None:
+            return web.Response(status=404, text="Virtual machine not found")
+        return web.json_response(vm)
+
+
+@pytest.fixture
+async def lume():
+    server = FakeLume()
+    server.port = next(_ports)
+    await server.runner.setup()
+    await web.TCPSite(server.runner, "127.0.0.1", server.port).start()
+    yield server
+    await server.runner.cleanup()
+
+
+def _provider(lume, **kwargs):
+    return LumeProvider(host="127.0.0.1", port=lume.port, **kwargs)
+
+
+async def test_concurrent_get_vm_requests_are_coalesced(lume):
+    providers = [_provider(lume) for _ in range(5)]
+    results = await asyncio.gather(*(p.get_vm("vm1") for p in providers))
+
+    assert all(r["status"] == "starting" for r in results)
+    assert lume.requests == ["/lume/vms/vm1"]
+
+    # Within the TTL the cached status is reused
+    await providers[0].get_vm("vm1")
+    assert len(lume.requests) == 1
+
+
+async def test_waiters_share_one_background_refresh(lume):
+    providers = [_provider(lume, status_refresh_interval=0.05) for _ in range(3)]
+    ips = await asyncio.wait_for(
+        asyncio.gather(*(p.get_ip(f"vm{i + 1}") for i, p in enumerate(providers))), timeout=5
+    )
+
+    assert ips == ["192.168.64.2", "192.168.64.3", "192.168.64.4"]
+    # Three computers waiting on one daemon cost one list request per refresh
+    assert set(lume.requests) == {"/lume/vms"}
+    assert len(lume.requests) <= lume.ip_after_lists + 1
+
+
+async def test_invalidate_drops_cached_status(lume):
+    provider = _provider(lume, status_ttl=60)
+    assert (await provider.get_vm("vm2"))["status"] == "starting"
+    lume.vms["vm2"]["status"] = "stopped"
+    assert (await provider.get_vm("vm2"))["status"] == "starting"
+
+    get_status_cache("127.0.0.1", lume.port).invalidate("vm2")
+    assert (await provider.get_vm("vm2"))["status"] == "stopped"
@@ -0,0 +1,170 @@
+"""Tests for the async Docker layer of the Lumier provider, against a fake Docker socket."""
+
+import asyncio
+import json
+import os
+import struct
+import tempfile
+import time
+
+import pytest
+from aiohttp import web
+
+from computer.providers.lumier.docker_client import AsyncDockerClient
+from computer.providers.lumier.provider import LumierProvider
+
+LIST_DELAY = 0.2
+
+
+class FakeDocker:
+    """In-memory Docker Engine API served over a Unix socket."""
+
+    def __init__(self):
+        self.containers = {}
+        self.images = {"trycua/lumier:latest"}
+        self.pulls = []
+        app = web.Application()
+        app.router.add_get("/v1.41/_ping", self.ping)
+        app.router.add_get("/v1.41/containers/json", self.list_containers)
+        app.router.add_post("/v1.41/containers/create", self.create)
+        app.router.add_post("/v1.41/containers/{name}/start", self.start)
+        app.router.add_post("/v1.41/containers/{name}/stop", self.stop)
+        app.router.add_delete("/v1.41/containers/{name}", self.remove)
+        app.router.add_get("/v1.41/containers/{name}/logs", self.logs)
+        app.router.add_get("/v1.41/images/{image:.+}/json", self.inspect_image)
+        app.router.add_post("/v1.41/images/create", self.pull)
+        self.runner = web.AppRunner(app)
+
+    async def start_server(self, path):
+        await self.runner.setup()
+        await web.UnixSite(self.runner, path).start()
+
+    def _find(self, name):
+        for container in self.containers.values():
+            if container["Id"] == name or container["Names"] == [f"/{name}"]:
+                return container
+        return None
+
+    async def ping(self, request):
+        return web.Response(text="OK")
+
+    async def list_containers(self, request):
+        # Slow enough that serialized status polls would be obvious
+        await asyncio.sleep(LIST_DELAY)
+        names = json.loads(request.query.get("filters", "{}")).get("name", [""])
+        return web.json_response(
+            [c for c in self.containers.values() if any(n in c["Names"][0] for n in names)]
+        )
+
+    async def create(self, request):
+        body = await request.json()
+        if body["Image"] not in self.images:
+            return web.json_response({"message": "No such image"}, status=404)
+        name = request.query["name"]
+        container = {"Id": f"{len(self.containers):064d}", "Names": [f"/{name}"], "Status": "Created", "Config": body}
+        self.containers[name] = container
+        return web.json_response({"Id": container["Id"]}, status=201)
+
+    async def start(self, request):
+        container = self._find(request.match_info["name"])
+        if container is None:
+            return web.json_response({"message": "No such container"}, status=404)
+        container["Status"] = "Up 1 second"
+        return web.Response(status=204)
+
+    async def stop(self, request):
+        container = self._find(request.match_info["name"])
+        if container is None:
+            return web.json_response({"message": "No such container"}, status=404)
+        container["Status"] = "Exited (0) 1 second ago"
+        return web.Response(status=204)
+
+    async def remove(self, request):
+        container = self._find(request.match_info["name"])
+        if container is None:
+            return web.json_response({"message": "No such container"}, status=404)
+        del self.containers[container["Names"][0][1:]]
+        return web.Response(status=204)
+
+    async def logs(self, request):
+        if self._find(request.match_info["name"]) is None:
+            return web.json_response({"message": "No such container"}, status=404)
+        frames = b""
+        for stream, text in ((1, b"booting\n"), (2, b"warning\n"), (1, b"ready\n")):
+            frames += struct.pack(">BxxxI", stream, len(text)) + text
+        return web.Response(body=frames)
+
+    async def inspect_image(self, request):
+        if request.match_info["image"] not in self.images:
+            return web.json_response({"message": "No such image"}, status=404)
+        return web.json_response({"Id": "sha256:abc"})
+
+    async def pull(self, request):
+        image = f"{request.query['fromImage']}:{request.query['tag']}"
+        self.pulls.append(image)
+        self.images.add(image)
+        return web.Response(text=json.dumps({"status": "Downloaded"}) + "\n")
+
+
+@pytest.fixture
+async def fake_docker():
+    socket_dir = tempfile.mkdtemp(prefix="fake-docker-")
+    path = os.path.join(socket_dir, "docker.sock")
+    server = FakeDocker()
+    await server.start_server(path)
+    server.host = f"unix://{path}"
+    yield server
+    await server.runner.cleanup()
+
+
+async def test_run_stop_and_logs(fake_docker):
+    client = AsyncDockerClient(fake_docker.host)
+    assert await client.ping()
+
+    await client.run_container("other/image:1.0", "vm1", env={"A": "1"}, ports={8006: 8007})
+    assert fake_docker.pulls == ["other/image:1.0"]
+    assert fake_docker.containers["vm1"]["Config"]["HostConfig"]["PortBindings"] == {
+        "8006/tcp": [{"HostPort": "8007"}]
+    }
+    assert (await client.container_status("vm1")).startswith("Up")
+    assert await client.container_status("vm") == ""
+
+    assert await client.logs("vm1") == "booting\nwarning\nready\n"
+
+    assert await client.stop_container("vm1")
+    assert not (await client.container_status("vm1")).startswith("Up")
+    assert await client.remove_container("vm1")
+    assert not await client.remove_container("vm1")
+    await client.close()
+
+
+async def test_status_queries_run_concurrently(fake_docker):
+    client = AsyncDockerClient(fake_docker.host)
+    for i in range(8):
+        await client.run_container("trycua/lumier:latest", f"vm{i}")
+
+    started = time.monotonic()
+    statuses = await asyncio.gather(*(client.container_status(f"vm{i}") for i in range(8)))
+    elapsed = time.monotonic() - started
+
+    assert all(status.startswith("Up") for status in statuses)
+    assert elapsed < LIST_DELAY * 4
+    await client.close()
+
+
+async def test_provider_get_and_stop_vm(fake_docker):
+    provider = LumierProvider(docker_host=fake_docker.host)
+    provider.container_name = "missing"
+    assert (await provider.get_vm("missing"))["status"] == "not_found"
+
+    client = AsyncDockerClient(fake_docker.host)
+    await client.run_container("trycua/lumier:latest", "vm1")
+    await client.stop_container("vm1")
+    await client.close()
+
+    vm = await provider.get_vm("vm1")
+    assert vm["status"] == "stopped"
+    vms = await provider.get_vms(["vm1", "missing"])
+    assert [vms["vm1"]["status"], vms["missing"]["status"]] == ["stopped", "not_found"]
+    assert (await provider.stop_vm("vm1"))["status"] == "stopped"
+    await provider.__aexit__(None, None, None)
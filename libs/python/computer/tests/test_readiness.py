@@ -0,0 +1,106 @@
+"""Tests for the startup readiness helpers."""
+
+import asyncio
+import types
+
+import pytest
+
+from computer import readiness
+from computer.readiness import Backoff, first_ready, poll_until
+
+
+class FakeClock:
+    """Monotonic clock that only moves when readiness sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    # Patch the module's view of time and sleep only; the event loop keeps the real clock
+    monkeypatch.setattr(readiness, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(readiness, "asyncio", types.SimpleNamespace(sleep=clock.sleep))
+    return clock
+
+
+def test_backoff_doubles_up_to_the_cap_and_resets():
+    backoff = Backoff(initial=0.1, maximum=1.0)
+    assert [backoff.next() for _ in range(6)] == pytest.approx([0.1, 0.2, 0.4, 0.8, 1.0, 1.0])
+    backoff.reset()
+    assert backoff.next() == 0.1
+    # The cap never undercuts the first delay
+    assert Backoff(initial=2.0, maximum=1.0).next() == 2.0
+
+
+async def test_backoff_sleep(clock):
+    backoff = Backoff(initial=0.5, maximum=1.0, factor=3)
+    await backoff.sleep()
+    await backoff.sleep()
+    assert clock.sleeps == [0.5, 1.0]
+
+
+async def test_poll_until_backs_off_between_failed_checks(clock):
+    attempts = []
+
+    async def check():
+        attempts.append(clock.now)
+        if len(attempts) == 2:
+            raise OSError("connection refused")
+        return len(attempts) == 5
+
+    await poll_until(check, initial=0.1, maximum=0.5)
+    assert len(attempts) == 5
+    assert clock.sleeps == pytest.approx([0.1, 0.2, 0.4, 0.5])
+
+
+async def test_poll_until_times_out_with_the_last_error(clock):
+    async def check():
+        raise OSError("connection refused")
+
+    with pytest.raises(TimeoutError) as info:
+        await poll_until(check, timeout=1.0, initial=0.25, maximum=0.5)
+    assert isinstance(info.value.__cause__, OSError)
+    # The last sleep is cut short so the timeout is not overshot
+    assert clock.sleeps == pytest.approx([0.25, 0.5, 0.25])
+    assert clock.now == pytest.approx(1.0)
+
+
+async def test_first_ready_returns_the_first_success_and_cancels_the_rest():
+    cancelled = []
+
+    async def probe(delay, fail=False):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        if fail:
+            raise OSError("refused")
+
+    winner = await first_ready({"fails": probe(0, fail=True), "fast": probe(0.01), "slow": probe(10)}, timeout=5)
+    assert winner == "fast"
+    assert cancelled == [10]
+
+
+async def test_first_ready_fails_once_every_probe_failed():
+    async def fail(message):
+        raise OSError(message)
+
+    with pytest.raises(TimeoutError) as info:
+        await first_ready({"rest": fail("rest"), "websocket": fail("websocket")})
+    assert isinstance(info.value.__cause__, OSError)
+
+
+async def test_first_ready_times_out():
+    with pytest.raises(TimeoutError):
+        await first_ready({"never": asyncio.sleep(10)}, timeout=0.05)
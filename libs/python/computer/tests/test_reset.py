@@ -0,0 +1,167 @@
+"""Tests for file rollback and Lume clone snapshots used by Computer.reset()."""
+
+import itertools
+import os
+import shutil
+
+import pytest
+from aiohttp import web
+
+from computer.providers.lume.provider import LumeProvider
+from computer.reset import FileSnapshot
+
+_ports = itertools.count(17850)
+
+
+class LocalFiles:
+    """The file API subset FileSnapshot uses, backed by the local filesystem."""
+
+    def __init__(self):
+        self.writes = []
+
+    async def directory_exists(self, path):
+        return os.path.isdir(path)
+
+    async def list_dir(self, path):
+        return os.listdir(path)
+
+    async def get_file_size(self, path):
+        return os.path.getsize(path)
+
+    async def read_bytes(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    async def write_bytes(self, path, content):
+        self.writes.append(path)
+        with open(path, "wb") as f:
+            f.write(content)
+
+    async def delete_file(self, path):
+        os.unlink(path)
+
+    async def delete_dir(self, path):
+        os.rmdir(path)
+
+    async def create_dir(self, path):
+        os.makedirs(path, exist_ok=True)
+
+
+def _tree(root):
+    result = {}
+    for directory, dirs, files in os.walk(root):
+        for d in dirs:
+            result[os.path.relpath(os.path.join(directory, d), root)] = None
+        for f in files:
+            with open(os.path.join(directory, f), "rb") as fh:
+                result[os.path.relpath(os.path.join(directory, f), root)] = fh.read()
+    return result
+
+
+async def test_file_snapshot_rolls_back_changes(tmp_path):
+    docs = tmp_path / "Documents"
+    (docs / "notes").mkdir(parents=True)
+    (docs / "keep.txt").write_bytes(b"unchanged")
+    (docs / "edit.txt").write_bytes(b"original")
+    (docs / "notes" / "a.md").write_bytes(b"# a")
+    (docs / "gone").mkdir()
+    (docs / "gone" / "b.bin").write_bytes(bytes(range(256)))
+    before = _tree(tmp_path)
+
+    files = LocalFiles()
+    snapshot = await FileSnapshot.capture(files, [str(docs), str(tmp_path / "Downloads")])
+    assert len(snapshot.files) == 4
+
+    (docs / "edit.txt").write_bytes(b"changed!")
+    (docs / "new.txt").write_bytes(b"new")
+    (docs / "notes" / "deep" / "er").mkdir(parents=True)
+    (docs / "notes" / "deep" / "er" / "c").write_bytes(b"c")
+    shutil.rmtree(docs / "gone")
+    (docs / "notes" / "a.md").unlink()
+    (docs / "notes" / "a.md").mkdir()
+    (tmp_path / "Downloads").mkdir()
+    (tmp_path / "Downloads" / "setup.dmg").write_bytes(b"dmg")
+
+    counts = await snapshot.restore(files)
+
+    assert _tree(tmp_path) == before
+    # Only missing or changed files are written back
+    assert sorted(os.path.basename(p) for p in files.writes) == ["a.md", "b.bin", "edit.txt"]
+    assert counts["rewritten"] == 3
+
+
+async def test_file_snapshot_size_limit(tmp_path):
+    (tmp_path / "big").write_bytes(b"x" * 1000)
+    with pytest.raises(ValueError, match="more than"):
+        await FileSnapshot.capture(LocalFiles(), [str(tmp_path)], max_bytes=999)
+
+
+class FakeLume:
+    """Lume API with run, stop, clone and delete on in-memory VMs."""
+
+    def __init__(self):
+        self.vms = {"vm": {"name": "vm", "status": "running", "disk": "base"}}
+        self.calls = []
+        app = web.Application()
+        app.router.add_get("/lume/vms/{name}", self.get_vm)
+        app.router.add_post("/lume/vms/clone", self.clone)
+        app.router.add_post("/lume/vms/{name}/stop", self.stop)
+        app.router.add_delete("/lume/vms/{name}", self.delete)
+        self.runner = web.AppRunner(app)
+
+    async def get_vm(self, request):
+        vm = self.vms.get(request.match_info["name"])
+        if vm is None:
+            return web.Response(status=404, text="Virtual machine not found")
+        return web.json_response(vm)
+
+    async def clone(self, request):
+        body = await request.json()
+        self.calls.append(("clone", body["name"], body["newName"]))
+        source = self.vms.get(body["name"])
+        if source is None or source["status"] == "running" or body["newName"] in self.vms:
+            return web.json_response({"message": "Cannot clone"}, status=400)
+        self.vms[body["newName"]] = {**source, "name": body["newName"]}
+        return web.json_response({"message": "VM cloned successfully", "source": body["name"],
+                                  "destination": body["newName"]})
+
+    async def stop(self, request):
+        self.calls.append(("stop", request.match_info["name"]))
+        self.vms[request.match_info["name"]]["status"] = "stopped"
+        return web.json_response({"message": "VM stopped successfully"})
+
+    async def delete(self, request):
+        self.calls.append(("delete", request.match_info["name"]))
+        del self.vms[request.match_info["name"]]
+        return web.Response(status=200)
+
+
+@pytest.fixture
+async def lume():
+    server = FakeLume()
+    server.port = next(_ports)
+    await server.runner.setup()
+    await web.TCPSite(server.runner, "127.0.0.1", server.port).start()
+    yield server
+    await server.runner.cleanup()
+
+
+async def test_lume_snapshot_and_restore_use_clones(lume):
+    provider = LumeProvider(host="127.0.0.1", port=lume.port, status_ttl=0)
+    assert provider.supports_snapshots
+
+    result = await provider.snapshot("vm", "vm-snapshot")
+    assert result == {"name": "vm", "snapshot": "vm-snapshot", "status": "stopped"}
+    assert lume.calls == [("stop", "vm"), ("clone", "vm", "vm-snapshot")]
+
+    lume.vms["vm"].update(status="running", disk="dirty")
+    lume.calls.clear()
+    result = await provider.restore("vm", "vm-snapshot")
+    assert result["status"] == "stopped"
+    assert lume.calls == [("stop", "vm"), ("delete", "vm"), ("clone", "vm-snapshot", "vm")]
+    assert lume.vms["vm"]["disk"] == "base"
+    # The snapshot survives, so the VM can be reset again
+    assert "vm-snapshot" in lume.vms
+
+    await provider.delete_snapshot("vm-snapshot")
+    assert "error" in await provider.restore("vm", "vm-snapshot")
@@ -0,0 +1,97 @@
+"""Tests for streaming command output from the computer server to the interface."""
+
+import asyncio
+from contextlib import aclosing
+
+import pytest
+
+
+class CommandStream:
+    """A scripted run_command_stream; "wait" holds the stream until ``release`` is set."""
+
+    def __init__(self):
+        self.events = []
+        self.release = asyncio.Event()
+        self.closed = asyncio.Event()
+
+    async def run_command_stream(self, command, **kwargs):
+        try:
+            for event in self.events:
+                if event == "wait":
+                    await self.release.wait()
+                    continue
+                yield event
+        finally:
+            self.closed.set()
+
+
+def run_command(command, **kwargs):
+    return {"stdout": "all at once\n", "stderr": "", "return_code": 0}
+
+
+@pytest.fixture
+def stream():
+    stream = CommandStream()
+    yield stream
+    stream.release.set()
+
+
+@pytest.fixture
+async def server(make_server, stream):
+    handlers = {"run_command": run_command, "run_command_stream": stream.run_command_stream}
+    # Cancel the handler when the client disconnects, as the real server does
+    return await make_server(handlers, websocket=True, handler_cancellation=True)
+
+
+async def test_output_arrives_before_the_command_exits(server, stream):
+    stream.events = [
+        {"type": "stdout", "data": "step 1\n"},
+        "wait",
+        {"type": "stderr", "data": "warning\n"},
+        {"type": "exit", "return_code": 2, "truncated": True, "timed_out": False},
+    ]
+    interface = server.interface()
+
+    async with aclosing(interface.run_command_stream("build", max_bytes=10)) as events:
+        first = await anext(events)
+        assert (first.type, first.data) == ("stdout", "step 1\n")
+        # The server is still holding back the rest of the output
+        assert not stream.closed.is_set()
+        stream.release.set()
+        rest = [event async for event in events]
+
+    assert [(e.type, e.data) for e in rest] == [("stderr", "warning\n"), ("exit", "")]
+    assert rest[-1].returncode == 2
+    assert rest[-1].truncated
+
+
+async def test_closing_the_iterator_drops_the_stream(server, stream):
+    stream.events = [{"type": "stdout", "data": "x" * 100_000}, "wait"]
+    interface = server.interface()
+
+    async with aclosing(interface.run_command_stream("yes")) as events:
+        assert len((await anext(events)).data) == 100_000
+
+    await asyncio.wait_for(stream.closed.wait(), 5)
+
+
+async def test_error_event_raises(server, stream):
+    stream.events = [{"success": False, "error": "No such shell"}]
+    interface = server.interface()
+
+    with pytest.raises(RuntimeError, match="No such shell"):
+        async for _ in interface.run_command_stream("x"):
+            pass
+
+
+async def test_servers_without_streaming_fall_back_to_run_command(make_server):
+    server = await make_server({"run_command": run_command}, websocket=True)
+    interface = server.interface()
+    events = [event async for event in interface.run_command_stream("ls")]
+    assert [(e.type, e.data, e.returncode) for e in events] == [
+        ("stdout", "all at once\n", None),
+        ("exit", "", 0),
+    ]
+    websocket = interface._ws
+    interface.force_close()
+    await websocket.close()
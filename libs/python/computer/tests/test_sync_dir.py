@@ -0,0 +1,134 @@
+"""Tests for syncing a local directory to the computer."""
+
+import io
+import os
+import tarfile
+
+import pytest
+from aiohttp import web
+
+from computer.interface import sync
+
+
+def directory_exists(path):
+    return {"exists": os.path.isdir(path)}
+
+
+def create_dir(path):
+    os.makedirs(path, exist_ok=True)
+    return {}
+
+
+def walk(path, hash):
+    entries = sync.walk_local(path, hash)
+    return {"entries": sorted(entries.values(), key=lambda entry: entry["path"])}
+
+
+def delete_paths(paths):
+    for path in paths:
+        if os.path.isdir(path) and not os.path.islink(path):
+            for dirpath, dirnames, filenames in os.walk(path, topdown=False):
+                for name in filenames:
+                    os.unlink(os.path.join(dirpath, name))
+                os.rmdir(dirpath)
+        else:
+            os.unlink(path)
+    return {}
+
+
+@pytest.fixture
+def archives():
+    """Member names of each archive the server received."""
+    return []
+
+
+@pytest.fixture
+async def server(make_server, archives):
+    async def upload_archive(request):
+        data = await request.read()
+        with tarfile.open(fileobj=io.BytesIO(data), mode="r|") as archive:
+            names = []
+            for member in archive:
+                names.append(member.name)
+                archive.extract(member, request.query["path"], filter="data")
+        archives.append(names)
+        return web.json_response({"success": True, "files": len(names), "bytes": 0})
+
+    handlers = {"directory_exists": directory_exists, "create_dir": create_dir, "walk": walk, "delete_paths": delete_paths}
+    return await make_server(handlers, [("PUT", "/files/archive", upload_archive)])
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    (root / "src/pkg").mkdir(parents=True)
+    (root / "src/pkg/mod.py").write_text("x = 1\n")
+    (root / "README").write_text("hello")
+    (root / "empty").mkdir()
+    os.symlink("README", root / "link")
+    return root
+
+
+async def test_sync_sends_only_what_changed(server, archives, project, tmp_path):
+    interface = server.interface()
+    remote = tmp_path / "remote"
+
+    result = await interface.sync_dir(str(project), str(remote))
+    assert sorted(result.uploaded) == ["README", "empty", "link", "src", "src/pkg", "src/pkg/mod.py"]
+    assert (remote / "src/pkg/mod.py").read_text() == "x = 1\n"
+    assert (remote / "empty").is_dir()
+    assert os.readlink(remote / "link") == "README"
+    assert result.bytes_sent == 11
+
+    # Modification times were copied, so nothing is sent again
+    result = await interface.sync_dir(str(project), str(remote))
+    assert (result.uploaded, result.unchanged) == ([], 6)
+    assert len(archives) == 1
+
+    (project / "README").write_text("hello, world")
+    (project / "new.txt").write_text("new")
+    result = await interface.sync_dir(str(project), str(remote))
+    assert sorted(result.uploaded) == ["README", "new.txt"]
+    assert archives[-1] == result.uploaded
+    assert (remote / "README").read_text() == "hello, world"
+
+
+async def test_sync_deletes_extra_and_conflicting_paths(server, project, tmp_path):
+    interface = server.interface()
+    remote = tmp_path / "remote"
+    (remote / "stale/deep").mkdir(parents=True)
+    (remote / "stale/deep/old.txt").write_text("old")
+    # A directory where the local tree has a file
+    (remote / "README").mkdir()
+
+    result = await interface.sync_dir(str(project), str(remote))
+    assert result.deleted == ["README"]
+    assert (remote / "README").read_text() == "hello"
+    assert (remote / "stale/deep/old.txt").exists()
+
+    result = await interface.sync_dir(str(project), str(remote), delete=True)
+    assert result.deleted == ["stale"]
+    assert not (remote / "stale").exists()
+
+
+async def test_checksum_mode_ignores_modification_times(server, project, tmp_path):
+    interface = server.interface()
+    remote = tmp_path / "remote"
+    await interface.sync_dir(str(project), str(remote))
+
+    os.utime(project / "README", (0, 0))
+    result = await interface.sync_dir(str(project), str(remote), checksum=True)
+    assert result.uploaded == []
+
+    (remote / "README").write_text("HELLO")
+    os.utime(remote / "README", (os.path.getmtime(project / "README"),) * 2)
+    result = await interface.sync_dir(str(project), str(remote))
+    assert result.uploaded == []
+    result = await interface.sync_dir(str(project), str(remote), checksum=True)
+    assert result.uploaded == ["README"]
+
+
+def test_plan_keeps_only_topmost_deletions():
+    remote = {path: {"path": path, "type": "dir"} for path in ["a", "a/b", "a/b/c", "ab"]}
+    plan = sync.plan_sync({}, remote, delete=True)
+    assert plan.delete == ["a", "ab"]
@@ -0,0 +1,48 @@
+"""Tests for running venv commands in the computer server's shell sessions."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from computer import Computer
+
+sessions = pytest.importorskip("computer_server.handlers.sessions")
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="sessions need a POSIX shell")
+
+
+@pytest.fixture
+async def computer(make_server, tmp_path, monkeypatch):
+    # venv helpers use ~/.venvs on the computer, which is this machine here
+    monkeypatch.setenv("HOME", str(tmp_path))
+    subprocess.run([sys.executable, "-m", "venv", "--without-pip", str(tmp_path / ".venvs" / "demo")], check=True)
+
+    handler = sessions.SessionHandler()
+    server = await make_server({
+        "session_create": handler.session_create,
+        "session_exec": handler.session_exec,
+        "session_close": handler.session_close,
+    })
+    computer = Computer(use_host_computer_server=True)
+    computer._interface = server.interface()
+    yield computer
+    await computer._close_venv_sessions()
+    assert not handler.sessions
+
+
+async def test_exit_sets_the_return_code(computer, tmp_path):
+    result = await computer.venv_cmd("demo", "echo hi; exit 3")
+    assert (result.stdout, result.returncode) == ("hi\n", 3)
+
+    # The session survived and the venv is still active
+    result = await computer.venv_cmd("demo", "command -v python")
+    assert result.stdout.strip() == str(tmp_path / ".venvs" / "demo" / "bin" / "python")
+
+
+async def test_directory_and_environment_do_not_leak_between_calls(computer, tmp_path):
+    await computer.venv_cmd("demo", "mkdir -p work && cd work && export COUNT=1 && set -e")
+    result = await computer.venv_cmd("demo", 'pwd; echo "count=$COUNT"; false; echo still here')
+    assert result.stdout == f"{tmp_path}\ncount=\nstill here\n"
+    assert len(computer._venv_sessions) == 1
@@ -0,0 +1,99 @@
+"""Tests for the local Xvfb provider, using stand-in Xvfb and computer server executables."""
+
+import os
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from computer.providers.base import VMProviderType
+from computer.providers.xvfb import LocalXvfbProvider
+
+FAKE_XVFB = """
+import os, sys, time
+fd = int(sys.argv[sys.argv.index("-displayfd") + 1])
+os.write(fd, b"%d\\n" % (os.getpid() % 1000))
+os.close(fd)
+time.sleep(60)
+"""
+
+FAKE_SERVER = """
+import socket, sys
+port = int(sys.argv[sys.argv.index("--port") + 1])
+server = socket.create_server((sys.argv[sys.argv.index("--host") + 1], port))
+while True:
+    server.accept()[0].close()
+"""
+
+
+def _script(directory, name, body):
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(f"#!{sys.executable}\n" + textwrap.dedent(body))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+@pytest.fixture
+def provider(tmp_path):
+    return LocalXvfbProvider(
+        base_port=18100,
+        xvfb_path=_script(tmp_path, "Xvfb", FAKE_XVFB),
+        python_executable=_script(tmp_path, "python", FAKE_SERVER),
+        cpus_per_session=1,
+    )
+
+
+async def test_sessions_get_distinct_ports_and_displays(provider):
+    async with provider:
+        assert provider.provider_type == VMProviderType.LOCAL_XVFB
+        first = await provider.run_vm("ignored", "s1", {"display": {"width": 800, "height": 600}})
+        second = await provider.run_vm("ignored", "s2", {})
+
+        assert first["status"] == second["status"] == "running"
+        assert first["api_port"] != second["api_port"]
+        assert first["display"] != second["display"]
+        assert await provider.get_ip("s1", retry_delay=1) == "127.0.0.1"
+        assert provider.get_api_port("s2") == second["api_port"]
+        assert len(await provider.list_vms()) == 2
+
+        pid = first["pids"][0]
+        assert os.sched_getaffinity(pid) == set(first["cpus"])
+
+        assert (await provider.stop_vm("s1"))["status"] == "stopped"
+        assert (await provider.get_vm("s1"))["status"] == "not_found"
+    assert await provider.list_vms() == []
+
+
+async def test_get_ip_fails_fast_when_server_exits(tmp_path):
+    provider = LocalXvfbProvider(
+        base_port=18200,
+        xvfb_path=_script(tmp_path, "Xvfb", FAKE_XVFB),
+        python_executable=_script(tmp_path, "python", "import sys; sys.exit(3)"),
+    )
+    async with provider:
+        await provider.run_vm("ignored", "broken", {})
+        with pytest.raises(RuntimeError, match="exited"):
+            await provider.get_ip("broken", retry_delay=1)
+
+
+async def test_bulk_operations_report_per_vm_results(provider):
+    async with provider:
+        results = await provider.run_vms(
+            [{"name": f"bulk{i}", "image": "ignored"} for i in range(4)], max_concurrency=2
+        )
+        assert [r["status"] for r in results.values()] == ["running"] * 4
+        assert len({r["api_port"] for r in results.values()}) == 4
+
+        info = await provider.get_vms(["bulk0", "missing"])
+        assert info["bulk0"]["status"] == "running"
+        assert info["missing"]["status"] == "not_found"
+
+        stopped = await provider.stop_vms(list(results))
+        assert all(r["status"] == "stopped" for r in stopped.values())
+
+    broken = LocalXvfbProvider(xvfb_path="/nonexistent/Xvfb")
+    results = await broken.run_vms([{"name": "a", "image": "ignored"}, {"name": "b", "image": "ignored"}])
+    assert [r["status"] for r in results.values()] == ["error", "error"]
+    assert "Xvfb" in results["a"]["error"]
@@ -1,4 +1,8 @@
-"""Telemetry client using PostHog for collecting anonymous usage data."""
+"""Telemetry client using PostHog for collecting anonymous usage data.
+
+Events are sent to PostHog's batch endpoint by a background TelemetryWorker,
+so recording an event never waits on the network.
+"""
 
 from __future__ import annotations
 
@@ -10,11 +14,17 @@ import time
 import uuid
 import sys
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-import posthog
 from core import __version__
+from core.telemetry.worker import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_FLUSH_INTERVAL,
+    DEFAULT_MAX_QUEUE_SIZE,
+    TelemetryWorker,
+)
 
 logger = logging.getLogger("core.telemetry")
 
@@ -27,6 +37,9 @@ TELEMETRY_SAMPLE_RATE = 100  # 100% sampling rate (was 5%)
 PUBLIC_POSTHOG_API_KEY = "phc_eSkLnbLxsnYFaXksif1ksbrNzYlJShr35miFLDppF14"
 PUBLIC_POSTHOG_HOST = "https://eu.i.posthog.com"
 
+# Seconds to wait for PostHog to accept a batch
+SEND_TIMEOUT = 10.0
+
 
 @dataclass
 class TelemetryConfig:
@@ -34,6 +47,10 @@ class TelemetryConfig:
 
     enabled: bool = True  # Default to enabled (opt-out)
     sample_rate: float = TELEMETRY_SAMPLE_RATE
+    host: str = PUBLIC_POSTHOG_HOST
+    batch_size: int = DEFAULT_BATCH_SIZE
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE
 
     @classmethod
     def from_env(cls) -> TelemetryConfig:
@@ -48,6 +65,12 @@ class TelemetryConfig:
         return cls(
             enabled=not telemetry_disabled,
             sample_rate=float(os.environ.get("CUA_TELEMETRY_SAMPLE_RATE", TELEMETRY_SAMPLE_RATE)),
+            host=os.environ.get("CUA_TELEMETRY_HOST", PUBLIC_POSTHOG_HOST),
+            batch_size=int(os.environ.get("CUA_TELEMETRY_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+            flush_interval=float(
+                os.environ.get("CUA_TELEMETRY_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+            ),
+            max_queue_size=int(os.environ.get("CUA_TELEMETRY_QUEUE_SIZE", DEFAULT_MAX_QUEUE_SIZE)),
         )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -55,6 +78,10 @@ class TelemetryConfig:
         return {
             "enabled": self.enabled,
             "sample_rate": self.sample_rate,
+            "host": self.host,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "max_queue_size": self.max_queue_size,
         }
 
 
@@ -75,12 +102,16 @@ def get_posthog_config() -> dict:
 class PostHogTelemetryClient:
     """Collects and reports telemetry data via PostHog."""
 
-    def __init__(self):
-        """Initialize PostHog telemetry client."""
-        self.config = TelemetryConfig.from_env()
+    def __init__(self, config: Optional[TelemetryConfig] = None):
+        """Initialize PostHog telemetry client.
+
+        Args:
+            config: Telemetry configuration, loaded from the environment by default
+        """
+        self.config = config or TelemetryConfig.from_env()
         self.installation_id = self._get_or_create_installation_id()
         self.initialized = False
-        self.queued_events: List[Dict[str, Any]] = []
+        self.worker: Optional[TelemetryWorker] = None
         self.start_time = time.time()
 
         # Log telemetry status on startup
@@ -92,7 +123,7 @@ class PostHogTelemetryClient:
             logger.info("Telemetry disabled")
 
     def _initialize_posthog(self) -> bool:
-        """Initialize the PostHog client with configuration.
+        """Set up the background worker that sends events to PostHog.
 
         Returns:
             bool: True if initialized successfully, False otherwise
@@ -101,73 +132,76 @@ class PostHogTelemetryClient:
             return True
 
         posthog_config = get_posthog_config()
+        self.api_key = posthog_config["api_key"]
+        self.host = self.config.host.rstrip("/")
 
         try:
-            # Initialize the PostHog client
-            posthog.api_key = posthog_config["api_key"]
-            posthog.host = posthog_config["host"]
-
-            # Configure the client
-            posthog.debug = os.environ.get("CUA_TELEMETRY_DEBUG", "").lower() == "on"
-            posthog.disabled = not self.config.enabled
-
-            # Log telemetry status
-            if not posthog.disabled:
-                logger.info(
-                    f"Initializing PostHog telemetry with installation ID: {self.installation_id}"
-                )
-                if posthog.debug:
-                    logger.debug(f"PostHog API Key: {posthog.api_key}")
-                    logger.debug(f"PostHog Host: {posthog.host}")
-            else:
-                logger.info("PostHog telemetry is disabled")
+            self.worker = TelemetryWorker(
+                self._send_batch,
+                max_queue_size=self.config.max_queue_size,
+                batch_size=self.config.batch_size,
+                flush_interval=self.config.flush_interval,
+            )
+            logger.info(f"Initializing PostHog telemetry with installation ID: {self.installation_id}")
+            if os.environ.get("CUA_TELEMETRY_DEBUG", "").lower() == "on":
+                logger.debug(f"PostHog API Key: {self.api_key}")
+                logger.debug(f"PostHog Host: {self.host}")
+
+            self.initialized = True
 
             # Identify this installation
             self._identify()
-
-            # Process any queued events
-            for event in self.queued_events:
-                posthog.capture(
-                    distinct_id=self.installation_id,
-                    event=event["event"],
-                    properties=event["properties"],
-                )
-            self.queued_events = []
-
-            self.initialized = True
             return True
         except Exception as e:
             logger.warning(f"Failed to initialize PostHog: {e}")
             return False
 
+    def _capture(self, event_name: str, properties: Dict[str, Any]) -> None:
+        """Queue an event for the worker. Never blocks; the event is dropped if the queue is full."""
+        if self.worker is None:
+            return
+        queued = self.worker.submit(
+            {
+                "event": event_name,
+                "distinct_id": self.installation_id,
+                "properties": properties,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+        if not queued:
+            logger.debug(f"Telemetry queue full, dropped event: {event_name}")
+
+    def _send_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Send a batch of events to PostHog. Runs on the worker thread."""
+        # Imported here so that importing telemetry doesn't load the HTTP stack
+        import urllib.request
+
+        request = urllib.request.Request(
+            f"{self.host}/batch/",
+            data=json.dumps({"api_key": self.api_key, "batch": batch}).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=SEND_TIMEOUT) as response:
+            response.read()
+
     def _identify(self) -> None:
         """Set up user properties for the current installation with PostHog.
-        
-        Note: The Python PostHog SDK doesn't have an identify() method like the web SDK.
-        Instead, we capture an identification event with user properties.
+
+        PostHog has no separate identify call for server-side events, so an
+        identification event with user properties is captured instead.
         """
-        try:
-            properties = {
-                "version": __version__,
-                "is_ci": "CI" in os.environ,
-                "os": os.name,
-                "python_version": sys.version.split()[0],
-            }
+        properties = {
+            "version": __version__,
+            "is_ci": "CI" in os.environ,
+            "os": os.name,
+            "python_version": sys.version.split()[0],
+        }
 
-            logger.debug(
-                f"Setting up PostHog user properties for: {self.installation_id} with properties: {properties}"
-            )
-            
-            # In the Python SDK, we capture an identification event instead of calling identify()
-            posthog.capture(
-                distinct_id=self.installation_id,
-                event="$identify",
-                properties={"$set": properties}
-            )
-            
-            logger.info(f"Set up PostHog user properties for installation: {self.installation_id}")
-        except Exception as e:
-            logger.warning(f"Failed to set up PostHog user properties: {e}")
+        logger.debug(
+            f"Setting up PostHog user properties for: {self.installation_id} with properties: {properties}"
+        )
+        self._capture("$identify", {"$set": properties})
 
     def _get_or_create_installation_id(self) -> str:
         """Get or create a unique installation ID that persists across runs.
@@ -233,20 +267,8 @@ class PostHogTelemetryClient:
             "version": __version__,
         }
 
-        if self.initialized:
-            try:
-                posthog.capture(
-                    distinct_id=self.installation_id,
-                    event="counter_increment",
-                    properties=properties,
-                )
-            except Exception as e:
-                logger.debug(f"Failed to send counter event to PostHog: {e}")
-        else:
-            # Queue the event for later
-            self.queued_events.append({"event": "counter_increment", "properties": properties})
-            # Try to initialize now if not already
-            self._initialize_posthog()
+        if self.initialized or self._initialize_posthog():
+            self._capture("counter_increment", properties)
 
     def record_event(self, event_name: str, properties: Optional[Dict[str, Any]] = None) -> None:
         """Record an event with optional properties.
@@ -268,28 +290,19 @@ class PostHogTelemetryClient:
 
         event_properties = {"version": __version__, **(properties or {})}
 
-        logger.info(f"Recording event: {event_name} with properties: {event_properties}")
+        logger.debug(f"Recording event: {event_name}")
 
-        if self.initialized:
-            try:
-                posthog.capture(
-                    distinct_id=self.installation_id, event=event_name, properties=event_properties
-                )
-                logger.info(f"Sent event to PostHog: {event_name}")
-                # Flush immediately to ensure delivery
-                posthog.flush()
-            except Exception as e:
-                logger.warning(f"Failed to send event to PostHog: {e}")
-        else:
-            # Queue the event for later
-            logger.info(f"PostHog not initialized, queuing event for later: {event_name}")
-            self.queued_events.append({"event": event_name, "properties": event_properties})
-            # Try to initialize now if not already
-            initialize_result = self._initialize_posthog()
-            logger.info(f"Attempted to initialize PostHog: {initialize_result}")
+        if self.initialized or self._initialize_posthog():
+            self._capture(event_name, event_properties)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Ask the worker to send pending events to PostHog now.
+
+        Returns immediately unless ``timeout`` is given; events still queued
+        at exit are sent once by the worker.
 
-    def flush(self) -> bool:
-        """Flush any pending events to PostHog.
+        Args:
+            timeout: Seconds to wait for pending events to be sent
 
         Returns:
             bool: True if successful, False otherwise
@@ -300,26 +313,17 @@ class PostHogTelemetryClient:
         if not self.initialized and not self._initialize_posthog():
             return False
 
-        try:
-            posthog.flush()
-            return True
-        except Exception as e:
-            logger.debug(f"Failed to flush PostHog events: {e}")
-            return False
+        return self.worker.flush(timeout)
 
     def enable(self) -> None:
         """Enable telemetry collection."""
         self.config.enabled = True
-        if posthog:
-            posthog.disabled = False
         logger.info("Telemetry enabled")
         self._initialize_posthog()
 
     def disable(self) -> None:
         """Disable telemetry collection."""
         self.config.enabled = False
-        if posthog:
-            posthog.disabled = True
         logger.info("Telemetry disabled")
 
 
@@ -0,0 +1,157 @@
+"""Background worker that batches telemetry events off the caller's thread.
+
+Events are recorded from import-time hooks and from inside agent steps, so
+recording must never wait on the network. ``TelemetryWorker.submit`` only
+puts the event on a bounded in-memory queue; a daemon thread sends queued
+events in batches once ``batch_size`` events are waiting or every
+``flush_interval`` seconds. When the queue is full, new events are dropped
+rather than blocking, and whatever is still queued at interpreter exit is
+sent once, bounded by ``shutdown_timeout``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("core.telemetry")
+
+DEFAULT_MAX_QUEUE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_SHUTDOWN_TIMEOUT = 2.0
+
+SendBatch = Callable[[List[Dict[str, Any]]], None]
+
+
+class TelemetryWorker:
+    """Sends telemetry events in batches from a background thread."""
+
+    def __init__(
+        self,
+        send_batch: SendBatch,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        shutdown_timeout: float = DEFAULT_SHUTDOWN_TIMEOUT,
+    ):
+        """Initialize the worker. The thread starts with the first event.
+
+        Args:
+            send_batch: Called on the worker thread with a list of events; raising
+                counts the batch as failed (it is not retried)
+            max_queue_size: Maximum number of queued events before new ones are dropped
+            batch_size: Number of queued events that triggers a send
+            flush_interval: Maximum seconds an event waits before being sent
+            shutdown_timeout: Maximum seconds spent sending remaining events at exit
+        """
+        self.send_batch = send_batch
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.shutdown_timeout = shutdown_timeout
+        self.stats = {"queued": 0, "sent": 0, "dropped": 0, "failed": 0, "batches": 0}
+
+        self._queue: queue.Queue[Dict[str, Any]] = queue.Queue(maxsize=max_queue_size)
+        self._wakeup = threading.Event()
+        self._idle = threading.Condition()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None and not self._stopping:
+                self._thread = threading.Thread(target=self._run, name="cua-telemetry", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def submit(self, event: Dict[str, Any]) -> bool:
+        """Queue an event without blocking.
+
+        Returns:
+            bool: True if queued, False if it was dropped because the queue is
+            full or the worker is closed
+        """
+        if self._stopping:
+            self.stats["dropped"] += 1
+            return False
+        self._ensure_started()
+        with self._idle:
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                self.stats["dropped"] += 1
+                return False
+            self._pending += 1
+            self.stats["queued"] += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Ask the worker to send queued events now.
+
+        Args:
+            timeout: If given, wait up to this many seconds for the queue to be
+                sent. By default, return immediately.
+
+        Returns:
+            bool: True if the queue was sent (or the flush was requested without waiting)
+        """
+        self._wakeup.set()
+        if timeout is None:
+            return True
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Send remaining events once and stop the worker thread.
+
+        Args:
+            timeout: Maximum seconds to wait, defaults to ``shutdown_timeout``
+        """
+        self._stopping = True
+        thread = self._thread
+        if thread is None:
+            return
+        self._wakeup.set()
+        thread.join(self.shutdown_timeout if timeout is None else timeout)
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _send_queued(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            try:
+                self.send_batch(batch)
+                self.stats["sent"] += len(batch)
+                self.stats["batches"] += 1
+            except Exception as e:
+                self.stats["failed"] += len(batch)
+                logger.debug(f"Failed to send {len(batch)} telemetry events: {e}")
+            finally:
+                with self._idle:
+                    self._pending -= len(batch)
+                    self._idle.notify_all()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._send_queued()
+        self._send_queued()
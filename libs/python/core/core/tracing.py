@@ -0,0 +1,302 @@
+"""Optional tracing of agent steps, model calls and computer commands.
+
+Cua libraries open spans through the tracer returned by ``get_tracer()``.
+By default it is a no-op. ``set_tracer`` installs either the ``Tracer``
+defined here, which hands finished spans to an exporter such as
+``InMemorySpanExporter``, or an OpenTelemetry tracer, whose span API this
+module follows:
+
+    from opentelemetry import trace
+    from core import tracing
+
+    tracing.set_tracer(trace.get_tracer("cua"))
+
+Spans carry a ``cua.kind`` attribute, ``model`` for model provider calls
+and ``environment`` for computer commands, which ``latency_report`` uses
+to split a run's time between the two.
+"""
+
+import contextvars
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+KIND = "cua.kind"
+KIND_MODEL = "model"
+KIND_ENVIRONMENT = "environment"
+
+
+class NonRecordingSpan:
+    """A span that records nothing, returned while tracing is off."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+    def end(self, end_time: Optional[int] = None) -> None:
+        pass
+
+    def __enter__(self) -> "NonRecordingSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+INVALID_SPAN = NonRecordingSpan()
+
+
+class NoOpTracer:
+    """The default tracer, which opens no spans."""
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> NonRecordingSpan:
+        return INVALID_SPAN
+
+    def start_as_current_span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> NonRecordingSpan:
+        # The span doubles as its own reusable context manager
+        return INVALID_SPAN
+
+
+@dataclass
+class ReadableSpan:
+    """A finished span, as handed to exporters. Times are in nanoseconds."""
+
+    name: str
+    span_id: int
+    parent_id: Optional[int]
+    start_time: int
+    end_time: int
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Tuple[str, int, Dict[str, Any]]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds."""
+        return (self.end_time - self.start_time) / 1e9
+
+
+class InMemorySpanExporter:
+    """Keeps finished spans in memory, for tests and latency reports."""
+
+    def __init__(self) -> None:
+        self._spans: List[ReadableSpan] = []
+
+    def export(self, spans: Sequence[ReadableSpan]) -> None:
+        self._spans.extend(spans)
+
+    def get_finished_spans(self) -> Tuple[ReadableSpan, ...]:
+        return tuple(self._spans)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+    def shutdown(self) -> None:
+        self.clear()
+
+
+_span_ids = itertools.count(1)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("cua_current_span", default=None)
+
+
+class Span:
+    """A span recorded by ``Tracer``."""
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Optional[Dict[str, Any]]):
+        self._tracer = tracer
+        self._token: Optional[contextvars.Token] = None
+        self._data = ReadableSpan(
+            name=name,
+            span_id=next(_span_ids),
+            parent_id=parent._data.span_id if parent is not None else None,
+            start_time=time.time_ns(),
+            end_time=0,
+            attributes=dict(attributes or {}),
+        )
+
+    @property
+    def name(self) -> str:
+        return self._data.name
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self._data.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self._data.attributes.update(attributes)
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self._data.events.append((name, time.time_ns(), dict(attributes or {})))
+
+    def record_exception(self, exception: BaseException, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self._data.error = f"{type(exception).__name__}: {exception}"
+        self.add_event("exception", {"exception.type": type(exception).__name__, "exception.message": str(exception), **(attributes or {})})
+
+    def is_recording(self) -> bool:
+        return not self._data.end_time
+
+    def end(self, end_time: Optional[int] = None) -> None:
+        if self._data.end_time:
+            return
+        self._data.end_time = end_time or time.time_ns()
+        self._tracer.exporter.export([self._data])
+
+    # Used as a context manager by start_as_current_span
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], traceback: Any) -> None:
+        # Closing a generator early isn't an error
+        if exc is not None and not isinstance(exc, GeneratorExit):
+            self.record_exception(exc)
+        self.end()
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Exited in another context, e.g. an async generator closed elsewhere
+            pass
+
+
+class Tracer:
+    """Records spans and hands each one to ``exporter`` when it ends.
+
+    Spans opened with ``start_as_current_span`` become the parent of spans
+    opened inside them, including in tasks created there.
+    """
+
+    def __init__(self, exporter: Optional[InMemorySpanExporter] = None):
+        self.exporter = exporter or InMemorySpanExporter()
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        """Start a span under the current one without making it current. Call ``end()`` when done."""
+        return Span(self, name, _current_span.get(), attributes)
+
+    def start_as_current_span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        """Start a span to use as a context manager, current until the block exits."""
+        return Span(self, name, _current_span.get(), attributes)
+
+
+_tracer: Any = NoOpTracer()
+
+
+def set_tracer(tracer: Optional[Any]) -> None:
+    """Install the tracer Cua libraries report spans to, or the no-op tracer for ``None``."""
+    global _tracer
+    _tracer = tracer if tracer is not None else NoOpTracer()
+
+
+def get_tracer() -> Any:
+    """The installed tracer."""
+    return _tracer
+
+
+@dataclass
+class SpanStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class LatencyReport:
+    """Where the time of a run went.
+
+    Attributes:
+        total: Duration of the run in seconds
+        model: Seconds in model provider calls
+        environment: Seconds in computer commands
+        by_name: Statistics for every span name in the run
+    """
+
+    total: float
+    model: float
+    environment: float
+    by_name: Dict[str, SpanStats]
+
+    @property
+    def other(self) -> float:
+        """Seconds neither in model calls nor in computer commands."""
+        return max(self.total - self.model - self.environment, 0.0)
+
+    def format(self) -> str:
+        """The report as a plain text table."""
+
+        def share(seconds: float) -> str:
+            return f"{seconds:9.3f}s {100 * seconds / self.total if self.total else 0:5.1f}%"
+
+        lines = [
+            f"total        {self.total:9.3f}s",
+            f"model        {share(self.model)}",
+            f"environment  {share(self.environment)}",
+            f"other        {share(self.other)}",
+            "",
+            f"{'span':<32} {'count':>6} {'total':>10} {'mean':>10} {'max':>10}",
+        ]
+        for name, stats in sorted(self.by_name.items(), key=lambda item: -item[1].total):
+            lines.append(
+                f"{name:<32} {stats.count:>6} {stats.total:>9.3f}s {stats.mean:>9.3f}s {stats.max:>9.3f}s"
+            )
+        return "\n".join(lines)
+
+
+def latency_report(spans: Sequence[ReadableSpan], root: Optional[ReadableSpan] = None) -> LatencyReport:
+    """Break down the time of ``root`` and the spans under it.
+
+    Args:
+        spans: Finished spans, e.g. from ``InMemorySpanExporter.get_finished_spans()``
+        root: The span to report on; defaults to the last ``agent.run`` span,
+              or all the spans if there is none
+
+    Nested spans of the same kind, like a command inside a file transfer,
+    are only counted once towards the model and environment totals.
+    """
+    by_id = {span.span_id: span for span in spans}
+    if root is None:
+        runs = [span for span in spans if span.name == "agent.run"]
+        root = runs[-1] if runs else None
+
+    def ancestors(span: ReadableSpan) -> Iterator[ReadableSpan]:
+        while span.parent_id is not None and span.parent_id in by_id:
+            span = by_id[span.parent_id]
+            yield span
+
+    if root is not None:
+        included = [root] + [span for span in spans if any(a is root for a in ancestors(span))]
+        total = root.duration
+    else:
+        included = list(spans)
+        starts = [span.start_time for span in spans] or [0]
+        ends = [span.end_time for span in spans] or [0]
+        total = (max(ends) - min(starts)) / 1e9
+
+    by_kind: Dict[str, float] = {KIND_MODEL: 0.0, KIND_ENVIRONMENT: 0.0}
+    by_name: Dict[str, SpanStats] = {}
+    for span in included:
+        stats = by_name.setdefault(span.name, SpanStats())
+        stats.count += 1
+        stats.total += span.duration
+        stats.max = max(stats.max, span.duration)
+
+        kind = span.attributes.get(KIND)
+        if kind in by_kind and not any(a.attributes.get(KIND) == kind for a in ancestors(span)):
+            by_kind[kind] += span.duration
+
+    return LatencyReport(
+        total=total, model=by_kind[KIND_MODEL], environment=by_kind[KIND_ENVIRONMENT], by_name=by_name
+    )
@@ -0,0 +1,130 @@
+"""Tests for batched, non-blocking telemetry delivery against a local stub sink."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.telemetry.posthog_client import PostHogTelemetryClient, TelemetryConfig
+from core.telemetry.worker import TelemetryWorker
+
+
+class StubSink:
+    """HTTP server that records the batches PostHog would receive."""
+
+    def __init__(self, delay: float = 0.0):
+        self.batches = []
+        self.delay = delay
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                time.sleep(sink.delay)
+                sink.batches.append((self.path, body))
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b'{"status": 1}')
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def events(self):
+        return [event for _, body in self.batches for event in body["batch"]]
+
+
+@pytest.fixture
+def sink():
+    server = StubSink()
+    yield server
+    server.server.shutdown()
+
+
+def _client(sink, **overrides):
+    config = TelemetryConfig(host=sink.url, **overrides)
+    return PostHogTelemetryClient(config)
+
+
+def test_events_are_sent_in_batches(sink):
+    client = _client(sink, batch_size=5, flush_interval=60)
+    for i in range(11):
+        client.record_event("step", {"i": i})
+
+    assert client.flush(timeout=5)
+    # The $identify event plus 11 recorded events, in batches of at most 5
+    assert [len(body["batch"]) for _, body in sink.batches] == [5, 5, 2]
+    assert {path for path, _ in sink.batches} == {"/batch/"}
+    assert [e["properties"]["i"] for e in sink.events if e["event"] == "step"] == list(range(11))
+    assert all(e["distinct_id"] == client.installation_id for e in sink.events)
+    client.worker.close()
+
+
+def test_interval_flush_sends_partial_batch(sink):
+    client = _client(sink, batch_size=50, flush_interval=0.1)
+    client.record_event("single")
+
+    deadline = time.monotonic() + 5
+    while len(sink.events) < 2 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert [e["event"] for e in sink.events] == ["$identify", "single"]
+    client.worker.close()
+
+
+def test_recording_never_waits_on_a_slow_sink():
+    slow = StubSink(delay=0.5)
+    client = _client(slow, batch_size=1, flush_interval=60, max_queue_size=10)
+
+    started = time.monotonic()
+    for i in range(100):
+        client.record_event("burst", {"i": i})
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.25
+    # The queue holds at most 10 events; the rest are dropped rather than blocking
+    stats = client.worker.stats
+    assert stats["dropped"] >= 80
+    assert stats["queued"] + stats["dropped"] == 101
+    client.worker.close(timeout=0)
+    slow.server.shutdown()
+
+
+def test_failed_batches_are_counted_and_dropped():
+    def fail(batch):
+        raise ConnectionError("unreachable")
+
+    worker = TelemetryWorker(fail, batch_size=2, flush_interval=60)
+    for i in range(3):
+        worker.submit({"event": i})
+
+    assert worker.flush(timeout=5)
+    assert worker.stats["failed"] == 3
+    assert worker.stats["sent"] == 0
+    worker.close()
+
+
+def test_pending_events_are_sent_once_at_exit(sink):
+    script = (
+        "from core.telemetry.posthog_client import PostHogTelemetryClient, TelemetryConfig\n"
+        f"client = PostHogTelemetryClient(TelemetryConfig(host={sink.url!r}, flush_interval=60))\n"
+        "for i in range(3):\n"
+        "    client.record_event('before_exit', {'i': i})\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", script],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        check=True,
+        timeout=30,
+    )
+
+    assert len(sink.batches) == 1
+    assert [e["event"] for e in sink.events] == ["$identify"] + ["before_exit"] * 3
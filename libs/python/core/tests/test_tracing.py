@@ -0,0 +1,93 @@
+"""Tests for the tracing hooks and latency report."""
+
+import asyncio
+import time
+
+import pytest
+
+from core import tracing
+
+
+@pytest.fixture
+def exporter():
+    exporter = tracing.InMemorySpanExporter()
+    tracing.set_tracer(tracing.Tracer(exporter))
+    yield exporter
+    tracing.set_tracer(None)
+
+
+def _by_name(exporter):
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+def test_default_tracer_records_nothing():
+    tracer = tracing.get_tracer()
+    with tracer.start_as_current_span("ignored", attributes={"a": 1}) as span:
+        span.set_attribute("b", 2)
+        assert not span.is_recording()
+    assert tracer.start_span("ignored") is tracing.INVALID_SPAN
+
+
+def test_spans_nest_across_tasks(exporter):
+    tracer = tracing.get_tracer()
+
+    async def command():
+        with tracer.start_as_current_span("computer.command", attributes={"cua.command": "screenshot"}):
+            await asyncio.sleep(0)
+
+    async def main():
+        with tracer.start_as_current_span("agent.run"):
+            await asyncio.gather(command(), command())
+            side = tracer.start_span("agent.model_call")
+            side.end()
+
+    asyncio.run(main())
+
+    spans = exporter.get_finished_spans()
+    run = _by_name(exporter)["agent.run"]
+    assert [span.name for span in spans] == ["computer.command", "computer.command", "agent.model_call", "agent.run"]
+    assert all(span.parent_id == run.span_id for span in spans[:3])
+    assert run.parent_id is None
+    assert spans[0].attributes == {"cua.command": "screenshot"}
+
+
+def test_exceptions_are_recorded(exporter):
+    with pytest.raises(ValueError):
+        with tracing.get_tracer().start_as_current_span("failing"):
+            raise ValueError("boom")
+
+    span = _by_name(exporter)["failing"]
+    assert span.error == "ValueError: boom"
+    assert span.events[0][0] == "exception"
+
+
+def test_latency_report_splits_model_and_environment_time(exporter):
+    tracer = tracing.get_tracer()
+    environment = {tracing.KIND: tracing.KIND_ENVIRONMENT}
+    with tracer.start_as_current_span("agent.run"):
+        with tracer.start_as_current_span("agent.predict_step"):
+            with tracer.start_as_current_span("agent.model_call", attributes={tracing.KIND: tracing.KIND_MODEL}):
+                time.sleep(0.05)
+        with tracer.start_as_current_span("agent.handle_item"):
+            with tracer.start_as_current_span("computer.upload", attributes=environment):
+                # Counted once, as part of the upload
+                with tracer.start_as_current_span("computer.command", attributes=environment):
+                    time.sleep(0.02)
+            with tracer.start_as_current_span("computer.command", attributes=environment):
+                time.sleep(0.02)
+    # Outside the run
+    with tracer.start_as_current_span("computer.command", attributes=environment):
+        pass
+
+    report = tracing.latency_report(exporter.get_finished_spans())
+    spans = _by_name(exporter)
+    assert report.total == spans["agent.run"].duration
+    assert 0.05 <= report.model < 0.1
+    assert 0.04 <= report.environment < 0.09
+    assert report.model + report.environment + report.other == pytest.approx(report.total)
+    assert report.by_name["computer.command"].count == 2
+    assert report.by_name["agent.run"].count == 1
+
+    text = report.format()
+    assert text.splitlines()[1].startswith("model")
+    assert "computer.upload" in text
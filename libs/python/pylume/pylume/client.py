@@ -1,8 +1,8 @@
 import json
 import asyncio
-import subprocess
 from typing import Optional, Any, Dict
-import shlex
+
+import aiohttp
 
 from .exceptions import (
     LumeError,
@@ -18,6 +18,8 @@ class LumeClient:
         self.base_url = base_url
         self.timeout = timeout
         self.debug = debug
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
 
     def _log_debug(self, message: str, **kwargs) -> None:
         """Log debug information if debug mode is enabled."""
@@ -26,74 +28,67 @@ class LumeClient:
             if kwargs:
                 print(json.dumps(kwargs, indent=2))
 
-    async def _run_curl(self, method: str, path: str, data: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None) -> Any:
-        """Execute a curl command and return the response."""
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it for the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=30),
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def _request(self, method: str, path: str, data: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        """Send a request over the pooled session and return the parsed response."""
         url = f"{self.base_url}{path}"
-        if params:
-            param_str = "&".join(f"{k}={v}" for k, v in params.items())
-            url = f"{url}?{param_str}"
+        timeout = self.timeout if timeout is None else timeout
+        query = {k: str(v) for k, v in (params or {}).items() if v is not None}
 
-        cmd = ["curl", "-X", method, "-s", "-w", "%{http_code}", "-m", str(self.timeout)]
-        
-        if data is not None:
-            cmd.extend(["-H", "Content-Type: application/json", "-d", json.dumps(data)])
-        
-        cmd.append(url)
-        
-        self._log_debug(f"Running curl command: {' '.join(map(shlex.quote, cmd))}")
-        
+        self._log_debug(f"Sending {method} {url}", params=query, data=data)
+
+        session = await self._get_session()
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                raise LumeConnectionError(f"Curl command failed: {stderr.decode()}")
-            
-            # The last 3 characters are the status code
-            response = stdout.decode()
-            status_code = int(response[-3:])
-            response_body = response[:-3]  # Remove status code from response
-            
-            if status_code >= 400:
-                if status_code == 404:
-                    raise LumeNotFoundError(f"Resource not found: {path}")
-                elif status_code == 400:
-                    raise LumeConfigError(f"Invalid request: {response_body}")
-                elif status_code >= 500:
-                    raise LumeServerError(f"Server error: {response_body}")
-                else:
-                    raise LumeError(f"Request failed with status {status_code}: {response_body}")
-            
-            return json.loads(response_body) if response_body.strip() else None
-            
-        except asyncio.TimeoutError:
-            raise LumeTimeoutError(f"Request timed out after {self.timeout} seconds")
+            async with session.request(
+                method,
+                url,
+                params=query,
+                json=data,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                status_code = response.status
+                response_body = await response.text()
+        except asyncio.TimeoutError as e:
+            raise LumeTimeoutError(f"Request timed out after {timeout} seconds") from e
+        except aiohttp.ClientError as e:
+            raise LumeConnectionError(f"Request failed: {e}") from e
+
+        if status_code >= 400:
+            if status_code == 404:
+                raise LumeNotFoundError(f"Resource not found: {path}")
+            elif status_code == 400:
+                raise LumeConfigError(f"Invalid request: {response_body}")
+            elif status_code >= 500:
+                raise LumeServerError(f"Server error: {response_body}")
+            else:
+                raise LumeError(f"Request failed with status {status_code}: {response_body}")
+
+        return json.loads(response_body) if response_body.strip() else None
 
     async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
         """Make a GET request."""
-        return await self._run_curl("GET", path, params=params)
+        return await self._request("GET", path, params=params)
 
     async def post(self, path: str, data: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
         """Make a POST request."""
-        old_timeout = self.timeout
-        if timeout is not None:
-            self.timeout = timeout
-        try:
-            return await self._run_curl("POST", path, data=data)
-        finally:
-            self.timeout = old_timeout
+        return await self._request("POST", path, data=data, timeout=timeout)
 
     async def patch(self, path: str, data: Dict[str, Any]) -> None:
         """Make a PATCH request."""
-        await self._run_curl("PATCH", path, data=data)
+        await self._request("PATCH", path, data=data)
 
     async def delete(self, path: str) -> None:
         """Make a DELETE request."""
-        await self._run_curl("DELETE", path)
+        await self._request("DELETE", path)
 
     def print_curl(self, method: str, path: str, data: Optional[Dict[str, Any]] = None) -> None:
         """Print equivalent curl command for debugging."""
@@ -109,4 +104,6 @@ class LumeClient:
 
     async def close(self) -> None:
         """Close the client resources."""
-        pass  # No shared resources to clean up
\ No newline at end of file
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -6,6 +6,8 @@ import tempfile
 import logging
 import socket
 from typing import Optional
+
+import aiohttp
 import sys
 from .exceptions import LumeConnectionError
 import signal
@@ -95,23 +97,23 @@ class LumeServer:
 
         raise RuntimeError("Could not find an available port")
 
+    async def _probe(self, url: str, timeout: float) -> int:
+        """Send a GET request and return the HTTP status code."""
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            async with session.get(url) as response:
+                return response.status
+
     async def _ensure_server_running(self) -> None:
         """Ensure the lume server is running, start it if it's not."""
         try:
             self.logger.debug("Checking if lume server is running...")
             # Try to connect to the server with a short timeout
-            cmd = ["curl", "-s", "-w", "%{http_code}", "-m", "5", f"{self.base_url}/vms"]
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-
-            if process.returncode == 0:
-                response = stdout.decode()
-                status_code = int(response[-3:])
-                if status_code == 200:
+            try:
+                if await self._probe(f"{self.base_url}/vms", timeout=5) == 200:
                     self.logger.debug("PyLume server is running")
                     return
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
 
             self.logger.debug("PyLume server not running, attempting to start it")
             # Server not running, try to start it
@@ -182,19 +184,10 @@ class LumeServer:
 
                 # Try to connect to the server periodically
                 try:
-                    cmd = ["curl", "-s", "-w", "%{http_code}", "-m", "5", f"{self.base_url}/vms"]
-                    process = await asyncio.create_subprocess_exec(
-                        *cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                    )
-                    stdout, stderr = await process.communicate()
-
-                    if process.returncode == 0:
-                        response = stdout.decode()
-                        status_code = int(response[-3:])
-                        if status_code == 200:
-                            server_ready = True
-                            self.logger.debug("Server is responding to requests")
-                            break
+                    if await self._probe(f"{self.base_url}/vms", timeout=5) == 200:
+                        server_ready = True
+                        self.logger.debug("Server is responding to requests")
+                        break
                 except:
                     pass  # Server not ready yet
 
@@ -220,17 +213,7 @@ class LumeServer:
 
             # Verify server is responding
             try:
-                cmd = ["curl", "-s", "-w", "%{http_code}", "-m", "10", f"{self.base_url}/vms"]
-                process = await asyncio.create_subprocess_exec(
-                    *cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                )
-                stdout, stderr = await process.communicate()
-
-                if process.returncode != 0:
-                    raise RuntimeError(f"Curl command failed: {stderr.decode()}")
-
-                response = stdout.decode()
-                status_code = int(response[-3:])
+                status_code = await self._probe(f"{self.base_url}/vms", timeout=10)
 
                 if status_code != 200:
                     raise RuntimeError(f"Server returned status code {status_code}")
@@ -335,25 +318,7 @@ class LumeServer:
     async def _verify_server(self) -> None:
         """Verify server is responding to requests."""
         try:
-            cmd = [
-                "curl",
-                "-s",
-                "-w",
-                "%{http_code}",
-                "-m",
-                "10",
-                f"http://{self.host}:{self.port}/lume/vms",
-            ]
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                raise RuntimeError(f"Curl command failed: {stderr.decode()}")
-
-            response = stdout.decode()
-            status_code = int(response[-3:])
+            status_code = await self._probe(f"http://{self.host}:{self.port}/lume/vms", timeout=10)
 
             if status_code != 200:
                 raise RuntimeError(f"Server returned status code {status_code}")